@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import generate_program
+from pymjc.front import ast
+from pymjc.front.parser import MJParser
+from pymjc.front.scanner import MJScanner
+
+
+def count_nodes(program: ast.Program):
+    #Returns (number of nodes, shallow bytes) for every AST node and child list reachable from program.
+    number_of_nodes: int = 0
+    total_bytes: int = 0
+    seen = set()
+    stack = [program]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, list):
+            total_bytes += sys.getsizeof(node)
+            stack.extend(node)
+            continue
+        if not type(node).__module__ == ast.__name__:
+            continue
+
+        number_of_nodes += 1
+        total_bytes += sys.getsizeof(node)
+        if hasattr(node, "__dict__"):
+            total_bytes += sys.getsizeof(node.__dict__)
+            stack.extend(node.__dict__.values())
+        for klass in type(node).__mro__:
+            for slot in getattr(klass, "__slots__", ()):
+                if hasattr(node, slot):
+                    stack.append(getattr(node, slot))
+    return number_of_nodes, total_bytes
+
+
+def parse(source_code: str, track_positions: bool):
+    mj_parser = MJParser()
+    mj_parser.track_positions = track_positions
+    program = mj_parser.parse(MJScanner().tokenize(source_code))
+    return mj_parser, program
+
+
+def measure(name: str, source_code: str, track_positions: bool) -> None:
+    tracemalloc.start()
+    mj_parser, program = parse(source_code, track_positions)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    number_of_nodes, total_bytes = count_nodes(program)
+    print(f"{name:<24} {'on' if track_positions else 'off':>9} {number_of_nodes:>8} {total_bytes / number_of_nodes:>10.1f} {current / 1024:>12.0f}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.ast_memory")
+    arg_parser.add_argument("--classes", type=int, nargs="+", default=[10, 100])
+    args = arg_parser.parse_args()
+
+    corpus_path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "tests", "testdata", "correct")
+    corpus = []
+    for file_name in sorted(os.listdir(corpus_path)):
+        with open(os.path.join(corpus_path, file_name), "r") as source_file:
+            corpus.append((file_name, source_file.read()))
+
+    print(f"{'program':<24} {'positions':>9} {'nodes':>8} {'bytes/node':>10} {'retained KiB':>12}")
+    for track_positions in [True, False]:
+        for file_name, source_code in corpus:
+            measure(file_name, source_code, track_positions)
+        for number_of_classes in args.classes:
+            measure(f"synthetic-{number_of_classes}", generate_program(number_of_classes, 10), track_positions)
@@ -0,0 +1,72 @@
+import argparse
+import sys
+import time
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+from pymjc.front.canon import Canon
+from tests.test_canon import RecursiveCanon
+
+
+#Method bodies shaped like TranslateVisitor output: one right-nested SEQ chain with a statement
+#per source line, mixing plain moves, array stores through ESEQ, calls and loop tests.
+def generate_body(number_of_statements: int) -> tree.Stm:
+    fp = temp.Temp()
+    x = temp.Temp()
+    y = temp.Temp()
+    method = temp.Label("C$m")
+    loop = temp.Label()
+    done = temp.Label()
+    body: tree.Stm = tree.LABEL(done)
+    for index in range(number_of_statements - 1, -1, -1):
+        kind = index % 5
+        if kind == 0:
+            stm = tree.MOVE(tree.TEMP(x), tree.BINOP(tree.BINOP.PLUS, tree.TEMP(x), tree.CONST(index)))
+        elif kind == 1:
+            address = tree.BINOP(tree.BINOP.PLUS, tree.MEM(tree.BINOP(tree.BINOP.PLUS, tree.TEMP(fp), tree.CONST(-4))),
+                                 tree.BINOP(tree.BINOP.MUL, tree.TEMP(y), tree.CONST(4)))
+            stm = tree.MOVE(tree.MEM(address), tree.ESEQ(tree.MOVE(tree.TEMP(y), tree.CONST(index)), tree.TEMP(x)))
+        elif kind == 2:
+            args = tree.ExpList(tree.TEMP(fp), tree.ExpList(tree.TEMP(x), tree.ExpList(tree.CONST(index), None)))
+            stm = tree.MOVE(tree.TEMP(y), tree.CALL(tree.NAME(method), args))
+        elif kind == 3:
+            stm = tree.CJUMP(tree.CJUMP.LT, tree.TEMP(x), tree.TEMP(y), loop, done)
+        else:
+            stm = tree.EXP(tree.CALL(tree.NAME(method), tree.ExpList(tree.TEMP(fp), tree.ExpList(tree.CALL(tree.NAME(method), None), None))))
+        body = tree.SEQ(stm, body)
+    return tree.SEQ(tree.LABEL(loop), body)
+
+
+def time_linearize(linearize, body: tree.Stm, repeat: int) -> float:
+    best: float = None
+    for _ in range(repeat):
+        with CompilationContext():
+            start = time.perf_counter()
+            try:
+                linearize(body)
+            except RecursionError:
+                return None
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.canon")
+    arg_parser.add_argument("--statements", type=int, nargs="+", default=[10000, 30000, 100000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--recursion-limit", type=int, default=sys.getrecursionlimit(),
+                            help="recursion limit for the recursive reference")
+    args = arg_parser.parse_args()
+    sys.setrecursionlimit(args.recursion_limit)
+
+    print(f"{'statements':>10} {'recursive s':>12} {'iterative s':>12} {'speedup':>8}")
+    for number_of_statements in args.statements:
+        body: tree.Stm = generate_body(number_of_statements)
+        recursive_time = time_linearize(RecursiveCanon.linearize, body, args.repeat)
+        iterative_time = time_linearize(Canon.linearize, body, args.repeat)
+        if recursive_time is None:
+            print(f"{number_of_statements:>10} {'recursion':>12} {iterative_time:>12.4f} {'-':>8}")
+        else:
+            print(f"{number_of_statements:>10} {recursive_time:>12.4f} {iterative_time:>12.4f} {recursive_time / iterative_time:>8.2f}")
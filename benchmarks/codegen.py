@@ -0,0 +1,71 @@
+import argparse
+import glob
+import os
+import time
+from typing import List, Tuple
+
+from pymjc.back import mips
+from pymjc.context import CompilationContext
+from pymjc.front import canon, translate, tree
+from pymjc.run import CompileResult, MJCompiler
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "testdata", "correct")
+
+
+def scheduled_statements(src_file_path: str) -> List[Tuple[mips.MipsFrame, List[tree.Stm]]]:
+    #Canonical, trace scheduled statements of every method, ready for instruction selection.
+    bodies = []
+    with open(src_file_path, "r") as source_file:
+        frag: translate.Frag = MJCompiler().compile_to_ir(source_file, CompileResult(src_file_path))
+    while frag is not None:
+        if isinstance(frag, translate.ProcFrag):
+            stms: tree.StmList = canon.TraceSchedule(canon.BasicBlocks(canon.Canon.linearize(frag.body))).stms
+            bodies.append((frag.frame, stms.to_list()))
+        frag = frag.get_next()
+    return bodies
+
+
+def select(bodies) -> int:
+    number_of_instrs: int = 0
+    for frame, stms in bodies:
+        codegen = mips.Codegen(frame)
+        for stm in stms:
+            instrs = codegen.codegen(stm)
+            if instrs is not None:
+                number_of_instrs += len(instrs)
+    return number_of_instrs
+
+
+def time_select(bodies, rounds: int, repeat: int) -> Tuple[int, float]:
+    best: float = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            number_of_instrs = select(bodies)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return number_of_instrs, best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.codegen")
+    arg_parser.add_argument("sources", nargs="*", help="MiniJava programs (default: tests/testdata/correct)")
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+    src_file_paths = args.sources or sorted(glob.glob(os.path.join(DATA_DIR, "*.java")))
+
+    print(f"{'program':<20} {'stms':>6} {'instrs':>8} {'instr/s':>10}")
+    totals = [0, 0, 0.0]
+    for src_file_path in src_file_paths:
+        with CompilationContext():
+            bodies = scheduled_statements(src_file_path)
+            number_of_stms = sum(len(stms) for _frame, stms in bodies)
+            number_of_instrs, elapsed = time_select(bodies, args.rounds, args.repeat)
+        name = os.path.basename(src_file_path)
+        print(f"{name:<20} {number_of_stms:>6} {number_of_instrs:>8} {number_of_instrs * args.rounds / elapsed:>10.0f}")
+        for index, value in enumerate([number_of_stms, number_of_instrs, elapsed]):
+            totals[index] += value
+    print(f"{'total':<20} {totals[0]:>6} {totals[1]:>8} {totals[1] * args.rounds / totals[2]:>10.0f}")
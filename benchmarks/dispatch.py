@@ -0,0 +1,102 @@
+import argparse
+import gc
+import time
+
+from benchmarks.canon import generate_body
+from pymjc.back import mips
+from pymjc.context import CompilationContext
+from pymjc.front import tree
+from pymjc.front.canon import Canon
+
+
+#Stands in for a class-keyed table with the chain of tests it replaced: the entries are tried
+#one after the other, in table order, until one fits.
+class Cascade():
+
+    def __init__(self, table: dict, test):
+        self.entries: list = list(table.items())
+        self.test = test
+
+    def get(self, key, default=None):
+        for entry_key, value in self.entries:
+            if self.test(key, entry_key):
+                return value
+        return default
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+
+def count_nodes(stms: list) -> int:
+    number_of_nodes: int = 0
+    stack: list = list(stms)
+    while stack:
+        node = stack.pop()
+        number_of_nodes += 1
+        for child in vars(node).values():
+            if isinstance(child, tree.ExpList):
+                while child is not None:
+                    stack.append(child.head)
+                    child = child.tail
+            elif isinstance(child, (tree.Exp, tree.Stm)):
+                stack.append(child)
+    return number_of_nodes
+
+
+def canonicalize(body: tree.Stm) -> list:
+    stms: list = []
+    stm_list: tree.StmList = Canon.linearize(body)
+    while stm_list is not None:
+        stms.append(stm_list.head)
+        stm_list = stm_list.tail
+    return stms
+
+
+def select(stms: list) -> None:
+    codegen = mips.Codegen(mips.MipsFrame())
+    for stm in stms:
+        codegen.codegen(stm)
+
+
+def time_run(run, argument, repeat: int) -> float:
+    best: float = None
+    for _ in range(repeat):
+        gc.collect()
+        with CompilationContext():
+            start = time.perf_counter()
+            run(argument)
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def time_both(run, argument, repeat: int) -> tuple:
+    table_time = time_run(run, argument, repeat)
+    rules, tiles, leaf_matchers = Canon.rules, mips.Codegen.tiles, mips.Codegen.leaf_matchers
+    Canon.rules = Cascade(rules, issubclass)
+    mips.Codegen.tiles = Cascade(tiles, issubclass)
+    mips.Codegen.leaf_matchers = Cascade(leaf_matchers, str.__eq__)
+    try:
+        cascade_time = time_run(run, argument, repeat)
+    finally:
+        Canon.rules, mips.Codegen.tiles, mips.Codegen.leaf_matchers = rules, tiles, leaf_matchers
+    return table_time, cascade_time
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.dispatch")
+    arg_parser.add_argument("--statements", type=int, nargs="+", default=[10000, 50000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'pass':>7} {'statements':>10} {'nodes':>8} {'cascade nodes/s':>16} {'table nodes/s':>14} {'speedup':>8}")
+    for number_of_statements in args.statements:
+        body: tree.Stm = generate_body(number_of_statements)
+        with CompilationContext():
+            stms: list = canonicalize(body)
+        for name, run, argument, number_of_nodes in [("canon", canonicalize, body, count_nodes([body])),
+                                                      ("codegen", select, stms, count_nodes(stms))]:
+            table_time, cascade_time = time_both(run, argument, args.repeat)
+            print(f"{name:>7} {number_of_statements:>10} {number_of_nodes:>8} {number_of_nodes / cascade_time:>16.0f} "
+                  f"{number_of_nodes / table_time:>14.0f} {cascade_time / table_time:>8.2f}")
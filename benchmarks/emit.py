@@ -0,0 +1,72 @@
+import argparse
+import gc
+import io
+import time
+import tracemalloc
+
+from pymjc.back import emit
+from pymjc.context import CompilationContext
+from pymjc.front import translate
+from pymjc.run import CompileResult, MJCompiler
+from benchmarks.synthetic import generate_program
+
+
+#The backend as it was: the instructions of every procedure are selected, then every procedure
+#is allocated, and the assembly is put together from the lists once everything is done. Each
+#procedure is compiled in the context of its fragment, as compile_frags does.
+def accumulate(compiler: MJCompiler, frags: translate.Frag, out, result: CompileResult) -> None:
+    context: CompilationContext = CompilationContext.current()
+    selections = []
+    for index, frag in enumerate(compiler.proc_frags(frags)):
+        frag_context: CompilationContext = context.fragment(index)
+        with frag_context:
+            selections.append((frag_context, frag, compiler.select_frag_instructions(frag)))
+    allocations = []
+    for frag_context, frag, assem_instr in selections:
+        with frag_context:
+            allocations.append(compiler.allocate_frag_registers(frag, assem_instr, result))
+        last_frame = frag.frame
+    lines = []
+    for allocation in allocations:
+        for instr in allocation.instrs:
+            line = instr.format(allocation)
+            lines.append(line if line.endswith("\n") else line + "\n")
+    lines.append(last_frame.program_tail())
+    out.write("".join(lines))
+
+
+def stream(compiler: MJCompiler, frags: translate.Frag, out, result: CompileResult) -> None:
+    compiler.compile_frags(frags, result, emit.AssemblyEmitter(out))
+
+
+def measure(backend, source: str) -> tuple:
+    #Time, peak of the memory allocated by the backend, and the assembly.
+    compiler = MJCompiler()
+    out = io.StringIO()
+    with CompilationContext():
+        result = CompileResult("synthetic")
+        frags = compiler.compile_to_ir(source, result)
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        backend(compiler, frags, out, result)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak, out.getvalue()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.emit")
+    arg_parser.add_argument("--classes", type=int, nargs="+", default=[2, 8, 32])
+    arg_parser.add_argument("--methods", type=int, default=8, help="methods per class")
+    args = arg_parser.parse_args()
+
+    print(f"{'methods':>7} {'asm KiB':>8} {'list s':>8} {'list peak KiB':>13} {'stream s':>8} {'stream peak KiB':>15}")
+    for number_of_classes in args.classes:
+        source = generate_program(number_of_classes, args.methods)
+        list_time, list_peak, list_text = measure(accumulate, source)
+        stream_time, stream_peak, stream_text = measure(stream, source)
+        assert list_text == stream_text
+        print(f"{number_of_classes * args.methods:>7} {len(stream_text) / 1024:>8.0f} {list_time:>8.3f} "
+              f"{list_peak / 1024:>13.0f} {stream_time:>8.3f} {stream_peak / 1024:>15.0f}")
@@ -0,0 +1,96 @@
+import argparse
+import gc
+import glob
+import itertools
+import os
+import time
+from io import StringIO
+
+from pymjc import util
+from pymjc.back import assem, regalloc
+from pymjc.context import CompilationContext
+from benchmarks.regalloc import DATA_DIR, selected_frags
+
+
+#Formatting as it was done before templates: the assembly string is scanned one character at a
+#time into a StringIO, each operand is looked up by position and mapped twice.
+def scan_format(instr: assem.Instr, temp_map) -> str:
+    dest = instr.deff()
+    src = instr.use()
+    jump = instr.jumps().labels if instr.jumps() is not None else None
+    s: StringIO = StringIO()
+    text: str = instr.assem
+    i: int = 0
+    while i < len(text):
+        if text[i] == '`':
+            i += 1
+            if text[i] == '`':
+                s.write('`')
+            elif text[i] == 'j':
+                i += 1
+                s.write(instr.nth_label(jump, int(text[i], 10)).to_string())
+            else:
+                kind: str = text[i]
+                i += 1
+                t = instr.nth_temp(src if kind == 's' else dest, int(text[i], 10))
+                if temp_map.temp_map(t) is not None:
+                    s.write(temp_map.temp_map(t))
+                else:
+                    s.write(t.to_string())
+        else:
+            s.write(text[i])
+        i += 1
+    return s.getvalue()
+
+
+def allocated_instrs(src_file_paths: list) -> list:
+    #(instruction, register map) of every allocated method of the programs.
+    pairs = []
+    for src_file_path in src_file_paths:
+        with CompilationContext():
+            for frame, instrs in selected_frags(src_file_path):
+                allocation = regalloc.RegAlloc(frame, util.Converter.to_InstrList(instrs))
+                if allocation.instrs is not None:
+                    pairs.extend((instr, allocation) for instr in allocation.instrs)
+    return pairs
+
+
+def format_all(format_instr, pairs: list) -> int:
+    number_of_chars: int = 0
+    for instr, temp_map in pairs:
+        number_of_chars += len(format_instr(instr, temp_map))
+    return number_of_chars
+
+
+def best_of(format_instr, pairs: list, repeat: int) -> tuple:
+    best: float = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        number_of_chars = format_all(format_instr, pairs)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return number_of_chars, best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.format")
+    arg_parser.add_argument("sources", nargs="*", help="MiniJava programs (default: tests/testdata/correct)")
+    arg_parser.add_argument("--instrs", type=int, default=1000000, help="instructions formatted per run")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+    src_file_paths = args.sources or sorted(glob.glob(os.path.join(DATA_DIR, "*.java")))
+
+    distinct = allocated_instrs(src_file_paths)
+    for instr, temp_map in distinct:
+        assert instr.format(temp_map) == scan_format(instr, temp_map), instr.assem
+    pairs = list(itertools.islice(itertools.cycle(distinct), args.instrs))
+    scan_chars, scan_time = best_of(scan_format, pairs, args.repeat)
+    template_chars, template_time = best_of(lambda instr, temp_map: instr.format(temp_map), pairs, args.repeat)
+    assert scan_chars == template_chars
+
+    print(f"{'instrs':>8} {'distinct':>8} {'templates':>9} {'chars':>9} {'scan instr/s':>13} "
+          f"{'template instr/s':>16} {'speedup':>8}")
+    print(f"{len(pairs):>8} {len(distinct):>8} {len(assem.Instr.templates):>9} {template_chars:>9} "
+          f"{len(pairs) / scan_time:>13.0f} {len(pairs) / template_time:>16.0f} {scan_time / template_time:>8.2f}")
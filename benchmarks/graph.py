@@ -0,0 +1,108 @@
+import argparse
+import gc
+import random
+import time
+
+from pymjc.back import graph
+
+
+#The graph as it was: every node keeps cons lists of its successors and predecessors, edge
+#queries scan them and degrees walk them.
+class ListNode():
+
+    def __init__(self):
+        self.succs: graph.NodeList = None
+        self.preds: graph.NodeList = None
+
+    def goes_to(self, n) -> bool:
+        return graph.Graph.in_list(n, self.succs)
+
+    def comes_from(self, n) -> bool:
+        return graph.Graph.in_list(n, self.preds)
+
+    def adj(self, n) -> bool:
+        return self.goes_to(n) or self.comes_from(n)
+
+    def degree(self) -> int:
+        number: int = 0
+        for p in (self.succs, self.preds):
+            while p is not None:
+                number += 1
+                p = p.tail
+        return number
+
+
+class ListGraph():
+
+    def __init__(self, number_of_nodes: int):
+        self.nodes = [ListNode() for _ in range(number_of_nodes)]
+
+    def add_edge(self, u: int, v: int) -> None:
+        from_node, to_node = self.nodes[u], self.nodes[v]
+        if not from_node.goes_to(to_node):
+            to_node.preds = graph.NodeList(from_node, to_node.preds)
+            from_node.succs = graph.NodeList(to_node, from_node.succs)
+
+    def adjacent(self, u: int, v: int) -> bool:
+        return self.nodes[u].adj(self.nodes[v])
+
+    def degree(self, u: int) -> int:
+        return self.nodes[u].degree()
+
+
+class SetGraph():
+
+    def __init__(self, number_of_nodes: int, matrix: bool):
+        self.graph = graph.Graph()
+        if matrix:
+            self.graph.use_matrix(number_of_nodes)
+        self.nodes = [self.graph.new_node() for _ in range(number_of_nodes)]
+
+    def add_edge(self, u: int, v: int) -> None:
+        self.graph.add_edge(self.nodes[u], self.nodes[v])
+
+    def adjacent(self, u: int, v: int) -> bool:
+        return self.nodes[u].adj(self.nodes[v])
+
+    def degree(self, u: int) -> int:
+        return self.nodes[u].degree()
+
+
+#What building an interference graph does: an edge query before every insertion, then the
+#degree of every node, as simplify needs them.
+def build(g, pairs: list, number_of_nodes: int) -> int:
+    for u, v in pairs:
+        if not g.adjacent(u, v):
+            g.add_edge(u, v)
+    return sum(g.degree(u) for u in range(number_of_nodes))
+
+
+def best_of(make, pairs: list, number_of_nodes: int, repeat: int) -> tuple:
+    best: float = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        degrees = build(make(), pairs, number_of_nodes)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return degrees, best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.graph")
+    arg_parser.add_argument("--nodes", type=int, nargs="+", default=[500, 2000, 5000])
+    arg_parser.add_argument("--degree", type=int, default=60, help="average number of neighbours")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'nodes':>6} {'queries':>8} {'lists s':>9} {'sets s':>9} {'matrix s':>9} {'speedup':>8}")
+    for number_of_nodes in args.nodes:
+        rng = random.Random(number_of_nodes)
+        pairs = [tuple(rng.sample(range(number_of_nodes), 2)) for _ in range(number_of_nodes * args.degree)]
+        list_degrees, list_time = best_of(lambda: ListGraph(number_of_nodes), pairs, number_of_nodes, args.repeat)
+        set_degrees, set_time = best_of(lambda: SetGraph(number_of_nodes, False), pairs, number_of_nodes, args.repeat)
+        matrix_degrees, matrix_time = best_of(lambda: SetGraph(number_of_nodes, True), pairs, number_of_nodes, args.repeat)
+        assert list_degrees == set_degrees == matrix_degrees
+        print(f"{number_of_nodes:>6} {len(pairs):>8} {list_time:>9.4f} {set_time:>9.4f} {matrix_time:>9.4f} "
+              f"{list_time / min(set_time, matrix_time):>8.1f}")
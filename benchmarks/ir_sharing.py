@@ -0,0 +1,90 @@
+import argparse
+import time
+import tracemalloc
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+
+
+#Method bodies shaped like TranslateVisitor output for code that reads locals, fields and
+#array elements: every access rebuilds MEM(BINOP(PLUS, TEMP fp, CONST k)) and the array
+#address arithmetic around it, so the same pure subtrees show up over and over.
+def generate_body(ir: tree.TreeFactory, number_of_statements: int, number_of_locals: int) -> tree.Stm:
+    fp = temp.Temp()
+    this = temp.Temp()
+    method = temp.Label("C$m")
+
+    def local(index: int) -> tree.Exp:
+        return ir.MEM(ir.BINOP(tree.BINOP.PLUS, ir.TEMP(fp), ir.CONST(-4 * (index % number_of_locals + 1))))
+
+    def field(index: int) -> tree.Exp:
+        return ir.MEM(ir.BINOP(tree.BINOP.PLUS, ir.TEMP(this), ir.CONST(4 * (index % number_of_locals))))
+
+    def element(array: tree.Exp, index: tree.Exp) -> tree.Exp:
+        offset = ir.BINOP(tree.BINOP.MUL, ir.BINOP(tree.BINOP.PLUS, index, ir.CONST(1)), ir.CONST(4))
+        return ir.MEM(ir.BINOP(tree.BINOP.PLUS, array, offset))
+
+    body: tree.Stm = tree.EXP(ir.CONST(0))
+    for index in range(number_of_statements):
+        kind = index % 3
+        if kind == 0:
+            stm = tree.MOVE(local(index), ir.BINOP(tree.BINOP.PLUS, local(index + 1), field(index)))
+        elif kind == 1:
+            stm = tree.MOVE(element(field(index), local(index)), element(field(index + 1), local(index + 2)))
+        else:
+            args = tree.ExpArray([ir.TEMP(this), local(index), element(field(index), ir.CONST(index % 8))])
+            stm = tree.MOVE(local(index + 3), ir.CALL(ir.NAME(method), args))
+        body = tree.SEQ(body, stm)
+    return body
+
+
+def count_nodes(body: tree.Stm) -> int:
+    #Number of distinct node objects reachable from body.
+    seen = set()
+    stack = [body]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, tree.ExpArray):
+            stack.extend(node)
+            continue
+        if not isinstance(node, (tree.Exp, tree.Stm)):
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.extend(vars(node).values())
+    return len(seen)
+
+
+def measure(hash_consing: bool, number_of_statements: int, number_of_locals: int, repeat: int) -> None:
+    best: float = None
+    for _ in range(repeat):
+        with CompilationContext():
+            start = time.perf_counter()
+            generate_body(tree.TreeFactory(hash_consing), number_of_statements, number_of_locals)
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    with CompilationContext():
+        tracemalloc.start()
+        ir = tree.TreeFactory(hash_consing)
+        body = generate_body(ir, number_of_statements, number_of_locals)
+        current, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    number_of_nodes: int = count_nodes(body)
+    print(f"{number_of_statements:>10} {'on' if hash_consing else 'off':>6} {number_of_nodes:>10} "
+          f"{current / 1024:>10.0f} {best:>10.4f}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.ir_sharing")
+    arg_parser.add_argument("--statements", type=int, nargs="+", default=[1000, 10000, 50000])
+    arg_parser.add_argument("--locals", type=int, default=16)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'statements':>10} {'shared':>6} {'nodes':>10} {'memory KiB':>10} {'build s':>10}")
+    for number_of_statements in args.statements:
+        measure(False, number_of_statements, args.locals, args.repeat)
+        measure(True, number_of_statements, args.locals, args.repeat)
@@ -0,0 +1,90 @@
+import argparse
+import time
+
+from pymjc.back import assem
+from pymjc.context import CompilationContext
+from pymjc.front import temp
+from pymjc.front.arraylist import ArrayList
+
+
+def best_of(function, repeat: int) -> float:
+    best: float = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def append_all(temp_list: temp.TempList, temps) -> None:
+    for t in temps:
+        temp_list.add_tail(t)
+
+
+def index_all(instr: assem.Instr, temp_list: temp.TempList, size: int) -> None:
+    for index in range(size):
+        instr.nth_temp(temp_list, index)
+
+
+def walk(instr_list: assem.InstrList) -> None:
+    while instr_list is not None:
+        instr_list.head
+        instr_list = instr_list.tail
+
+
+def iterate(instr_list: assem.InstrArray) -> None:
+    for _instr in instr_list:
+        pass
+
+
+def elements(instr_list: assem.InstrList) -> None:
+    for _instr in ArrayList.elements(instr_list):
+        pass
+
+
+def run(size: int, max_cons: int, repeat: int) -> None:
+    with CompilationContext():
+        temps = [temp.Temp() for _ in range(size)]
+        instrs = [assem.MOVE("move `d0,`s0\n", t, t) for t in temps]
+
+    cons_temps: temp.TempList = None
+    for t in reversed(temps):
+        cons_temps = temp.TempList(t, cons_temps)
+    cons_instrs: assem.InstrList = None
+    for instr in reversed(instrs):
+        cons_instrs = assem.InstrList(instr, cons_instrs)
+    array_temps = temp.TempArray(list(temps))
+    array_instrs = assem.InstrArray(list(instrs))
+
+    rows = []
+    if size <= max_cons:
+        rows.append(("append", best_of(lambda: append_all(temp.TempList(), temps), repeat),
+                     best_of(lambda: append_all(temp.TempArray(), temps), repeat)))
+        rows.append(("nth_temp", best_of(lambda: index_all(instrs[0], cons_temps, size), repeat),
+                     best_of(lambda: index_all(instrs[0], array_temps, size), repeat)))
+    else:
+        rows.append(("append", None, best_of(lambda: append_all(temp.TempArray(), temps), repeat)))
+        rows.append(("nth_temp", None, best_of(lambda: index_all(instrs[0], array_temps, size), repeat)))
+    rows.append(("walk", best_of(lambda: walk(cons_instrs), repeat), best_of(lambda: walk(array_instrs), repeat)))
+    rows.append(("iterate", best_of(lambda: walk(cons_instrs), repeat), best_of(lambda: iterate(array_instrs), repeat)))
+    rows.append(("elements", best_of(lambda: walk(cons_instrs), repeat), best_of(lambda: elements(array_instrs), repeat)))
+
+    for name, cons_time, array_time in rows:
+        cons_text = f"{cons_time:>10.4f}" if cons_time is not None else f"{'-':>10}"
+        speedup = f"{cons_time / array_time:>8.1f}" if cons_time is not None else f"{'-':>8}"
+        print(f"{size:>8} {name:>9} {cons_text} {array_time:>10.4f} {speedup}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.lists")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    arg_parser.add_argument("--max-cons", type=int, default=20000,
+                            help="largest size for the quadratic cons-list append and indexing")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'size':>8} {'operation':>9} {'cons s':>10} {'array s':>10} {'speedup':>8}")
+    for size in args.sizes:
+        run(size, args.max_cons, args.repeat)
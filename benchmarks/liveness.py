@@ -0,0 +1,86 @@
+import argparse
+import gc
+import random
+import time
+
+from pymjc import util
+from pymjc.back import assem, flowgraph, regalloc
+from pymjc.context import CompilationContext
+from pymjc.front import temp
+from tests.test_liveness import naive_liveness
+
+
+#A long method body of blocks that each start with a label and end in a branch, back to an
+#earlier block (a loop) or on to the next one. Every instruction defines a temp from the last
+#few ones and a few temps live through the whole body, like the locals of a big method.
+def generate_instrs(number_of_instrs: int, block_size: int, seed: int) -> list:
+    rng = random.Random(seed)
+    long_lived = [temp.Temp() for _ in range(8)]
+    recent = list(long_lived)
+    labels = [temp.Label() for _ in range(number_of_instrs // block_size + 1)]
+    instrs = [assem.OPER("def", temp.TempArray(list(long_lived)), None)]
+    for index in range(number_of_instrs):
+        block = index // block_size
+        if index % block_size == 0:
+            instrs.append(assem.LABEL("L:", labels[block]))
+        if index % block_size == block_size - 1:
+            target = labels[rng.randrange(max(block - 3, 0), block + 1)] if rng.random() < 0.5 else labels[block + 1]
+            instrs.append(assem.OPER("branch", None, temp.TempArray([rng.choice(recent)]),
+                                     temp.LabelArray([target, labels[block + 1]])))
+            continue
+        src = [rng.choice(recent), rng.choice(long_lived)]
+        dst = temp.Temp() if rng.random() < 0.7 else rng.choice(recent)
+        if rng.random() < 0.1:
+            instrs.append(assem.MOVE("move", dst, src[0]))
+        else:
+            instrs.append(assem.OPER("op", temp.TempArray([dst]), temp.TempArray(src)))
+        recent.append(dst)
+        if len(recent) > 16:
+            recent.pop(0)
+    instrs.append(assem.LABEL("L:", labels[-1]))
+    instrs.append(assem.OPER("use", None, temp.TempArray(list(long_lived))))
+    return instrs
+
+
+def best_of(run, repeat: int) -> tuple:
+    best: float = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return value, best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.liveness")
+    arg_parser.add_argument("--instrs", type=int, nargs="+", default=[1000, 10000, 40000])
+    arg_parser.add_argument("--block-size", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--naive-limit", type=int, default=10000,
+                            help="largest body also run through the set based round robin")
+    args = arg_parser.parse_args()
+
+    print(f"{'instrs':>8} {'temps':>7} {'iterations':>10} {'dataflow s':>10} {'liveness s':>10} "
+          f"{'edges':>9} {'naive s':>9} {'blocks':>7} {'iterations':>10} {'dataflow s':>10} {'liveness s':>10} "
+          f"{'instr flow s':>12} {'block flow s':>12}")
+    for number_of_instrs in args.instrs:
+        with CompilationContext():
+            instrs = generate_instrs(number_of_instrs, args.block_size, number_of_instrs)
+            instr_list = util.Converter.to_InstrList(instrs)
+            flow, flow_time = best_of(lambda: flowgraph.AssemFlowGraph(instr_list), args.repeat)
+            live, liveness_time = best_of(lambda: regalloc.Liveness(flow), args.repeat)
+            _, dataflow_time = best_of(live.build_in_and_out, args.repeat)
+            block_flow, block_flow_time = best_of(lambda: flowgraph.BlockFlowGraph(instr_list), args.repeat)
+            block_live, block_liveness_time = best_of(lambda: regalloc.Liveness(block_flow), args.repeat)
+            _, block_dataflow_time = best_of(block_live.build_in_and_out, args.repeat)
+            assert block_live.out_bits == live.out_bits
+            naive = "-"
+            if number_of_instrs <= args.naive_limit:
+                naive = f"{best_of(lambda: naive_liveness(flow), 1)[1]:.4f}"
+        print(f"{len(flow.mynodes):>8} {len(live.temps):>7} {live.iterations:>10} {dataflow_time:>10.4f} "
+              f"{liveness_time:>10.4f} {live.number_of_edges:>9} {naive:>9} {len(block_flow.mynodes):>7} "
+              f"{block_live.iterations:>10} {block_dataflow_time:>10.4f} {block_liveness_time:>10.4f} "
+              f"{flow_time:>12.4f} {block_flow_time:>12.4f}")
@@ -0,0 +1,46 @@
+import argparse
+import gc
+import io
+import os
+import time
+
+from pymjc.back import emit
+from pymjc.context import CompilationContext
+from pymjc.front import translate
+from pymjc.run import CompileResult, MJCompiler
+from benchmarks.synthetic import generate_program
+
+
+def compile_backend(source: str, jobs: int) -> tuple:
+    #Time of the backend alone, from the IR of every method to the assembly, and the assembly.
+    compiler = MJCompiler(jobs=jobs)
+    out = io.StringIO()
+    with CompilationContext():
+        result = CompileResult("synthetic")
+        frags: translate.Frag = compiler.compile_to_ir(source, result)
+        gc.collect()
+        start = time.perf_counter()
+        compiler.compile_frags(frags, result, emit.AssemblyEmitter(out))
+        elapsed = time.perf_counter() - start
+    return elapsed, out.getvalue()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.parallel")
+    arg_parser.add_argument("--classes", type=int, nargs="+", default=[8, 32])
+    arg_parser.add_argument("--methods", type=int, default=8, help="methods per class")
+    arg_parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    args = arg_parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'methods':>7} {'jobs':>4} {'backend s':>9} {'speedup':>8}")
+    for number_of_classes in args.classes:
+        source = generate_program(number_of_classes, args.methods)
+        serial_time: float = None
+        serial_text: str = None
+        for jobs in args.jobs:
+            elapsed, text = compile_backend(source, jobs)
+            if serial_time is None:
+                serial_time, serial_text = elapsed, text
+            assert text == serial_text
+            print(f"{number_of_classes * args.methods:>7} {jobs:>4} {elapsed:>9.3f} {serial_time / elapsed:>8.2f}")
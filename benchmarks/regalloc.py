@@ -0,0 +1,78 @@
+import argparse
+import gc
+import glob
+import os
+import time
+
+from pymjc import util
+from pymjc.back import mips, regalloc
+from pymjc.context import CompilationContext
+from pymjc.front import translate
+from pymjc.run import CompileResult, MJCompiler
+from benchmarks.liveness import generate_instrs
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "tests", "testdata", "correct")
+
+
+def selected_frags(src_file_path: str) -> list:
+    #(frame, instructions) of every method, selected outside the timing.
+    compiler = MJCompiler()
+    with open(src_file_path, "r") as source_file:
+        frag: translate.Frag = compiler.compile_to_ir(source_file, CompileResult(src_file_path))
+    frags = []
+    while frag is not None:
+        if isinstance(frag, translate.ProcFrag):
+            frags.append((frag.frame, compiler.select_frag_instructions(frag)))
+        frag = frag.get_next()
+    return frags
+
+
+def allocate(frags: list, linear_scan: bool, repeat: int) -> tuple:
+    #Best time over repeat runs, with the spills, rounds and instructions left of the last one.
+    best: float = None
+    for _ in range(repeat):
+        spills = rounds = number_of_instrs = 0
+        gc.collect()
+        start = time.perf_counter()
+        for frame, instrs in frags:
+            allocation = regalloc.RegAlloc(frame, util.Converter.to_InstrList(instrs), linear_scan)
+            spills += allocation.number_of_spills
+            rounds += allocation.rounds
+            number_of_instrs += len(allocation.instrs) if allocation.instrs is not None else 0
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, spills, rounds, number_of_instrs
+
+
+def report(name: str, frags: list, repeat: int) -> None:
+    for linear_scan in (False, True):
+        elapsed, spills, rounds, number_of_instrs = allocate(frags, linear_scan, repeat)
+        print(f"{name:<20} {'linear' if linear_scan else 'coloring':>8} {sum(len(instrs) for _, instrs in frags):>7} "
+              f"{number_of_instrs:>7} {spills:>6} {rounds:>6} {elapsed:>9.4f}")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.regalloc")
+    arg_parser.add_argument("sources", nargs="*", help="MiniJava programs (default: tests/testdata/correct)")
+    arg_parser.add_argument("--instrs", type=int, nargs="*", default=[5000],
+                            help="sizes of generated method bodies to allocate as well")
+    arg_parser.add_argument("--block-size", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+    src_file_paths = args.sources or sorted(glob.glob(os.path.join(DATA_DIR, "*.java")))
+
+    print(f"{'program':<20} {'mode':>8} {'in':>7} {'out':>7} {'spills':>6} {'rounds':>6} {'alloc s':>9}")
+    suite = []
+    for src_file_path in src_file_paths:
+        with CompilationContext():
+            frags = selected_frags(src_file_path)
+            report(os.path.basename(src_file_path), frags, args.repeat)
+            suite.extend(frags)
+    with CompilationContext():
+        report("total", suite, args.repeat)
+    for number_of_instrs in args.instrs:
+        with CompilationContext():
+            frags = [(mips.MipsFrame(), generate_instrs(number_of_instrs, args.block_size, number_of_instrs))]
+            report(f"generated {number_of_instrs}", frags, 1)
@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from benchmarks.synthetic import generate_program
+from pymjc.front.lexer import MJLexer
+from pymjc.front.scanner import MJScanner
+
+
+def time_tokenize(lexer_class, source_code: str, repeat: int) -> float:
+    best: float = None
+    for _ in range(repeat):
+        mj_lexer = lexer_class()
+        start = time.perf_counter()
+        for _token in mj_lexer.tokenize(source_code):
+            pass
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.scanner")
+    arg_parser.add_argument("--classes", type=int, nargs="+", default=[10, 50, 200])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    print(f"{'classes':>8} {'bytes':>10} {'tokens':>8} {'MJLexer s':>10} {'MJScanner s':>12} {'speedup':>8}")
+    for number_of_classes in args.classes:
+        source_code = generate_program(number_of_classes, 10)
+        number_of_tokens = sum(1 for _token in MJScanner().tokenize(source_code))
+        lexer_time = time_tokenize(MJLexer, source_code, args.repeat)
+        scanner_time = time_tokenize(MJScanner, source_code, args.repeat)
+        print(f"{number_of_classes:>8} {len(source_code):>10} {number_of_tokens:>8} {lexer_time:>10.4f} {scanner_time:>12.4f} {lexer_time / scanner_time:>8.2f}")
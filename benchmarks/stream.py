@@ -0,0 +1,65 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_program
+from pymjc.front.lexer import MJLexer
+from pymjc.front.parser import MJParser
+from pymjc.front.scanner import MJScanner
+
+
+#Time and peak memory are taken on separate runs because tracemalloc slows allocation down.
+def measure(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(*args)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, elapsed, peak
+
+
+def count_read_tokens(lexer_class, src_file_path: str) -> int:
+    with open(src_file_path, "r") as source_file:
+        return sum(1 for _token in lexer_class().tokenize(source_file.read()))
+
+
+def count_stream_tokens(lexer_class, src_file_path: str, chunk_size: int) -> int:
+    with open(src_file_path, "r") as source_file:
+        return sum(1 for _token in lexer_class().tokenize_stream(source_file, chunk_size))
+
+
+def parse_stream(src_file_path: str, chunk_size: int) -> bool:
+    with open(src_file_path, "r") as source_file:
+        mj_parser = MJParser()
+        mj_parser.parse(MJLexer().tokenize_stream(source_file, chunk_size))
+        return mj_parser.syntax_error
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.stream")
+    arg_parser.add_argument("--classes", type=int, default=400)
+    arg_parser.add_argument("--chunk-size", type=int, default=16384,
+                            help="streaming only keeps less than reading when the file spans several chunks")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        src_file_path = os.path.join(temp_dir, "Generated.java")
+        with open(src_file_path, "w") as source_file:
+            source_file.write(generate_program(args.classes, 10))
+        size: int = os.path.getsize(src_file_path)
+        print(f"source: {size} bytes, chunk size {args.chunk_size}")
+        if size < 4 * args.chunk_size:
+            print("note: the file spans fewer than 4 chunks, so a stream keeps about as much as a read")
+
+        for lexer_class in [MJLexer, MJScanner]:
+            name: str = lexer_class.__name__
+            tokens, elapsed, peak = measure(count_read_tokens, lexer_class, src_file_path)
+            print(f"{name:>9} read + tokenize  : {tokens} tokens {elapsed:.3f} s peak {peak / 1024:.0f} KiB")
+            tokens, elapsed, peak = measure(count_stream_tokens, lexer_class, src_file_path, args.chunk_size)
+            print(f"{name:>9} tokenize_stream  : {tokens} tokens {elapsed:.3f} s peak {peak / 1024:.0f} KiB")
+        syntax_error, elapsed, peak = measure(parse_stream, src_file_path, args.chunk_size)
+        print(f"  MJLexer parse from stream: syntax error {syntax_error} {elapsed:.3f} s peak {peak / 1024:.0f} KiB (includes the AST)")
@@ -0,0 +1,89 @@
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.synthetic import generate_program
+from pymjc.front.parser import MJParser
+from pymjc.front.scanner import MJScanner
+from pymjc.front.symbol import ClassEntry, MethodEntry, Symbol, SymbolTable
+from pymjc.front.visitor import FillSymbolTableVisitor
+
+
+#The accessors as they were before the symbol table used its keys directly: every lookup
+#went through the global Symbol dictionary and contains_* scanned dict.keys().
+legacy_dictionary: Dict[str, Symbol] = {}
+
+
+def legacy_symbol(name: str) -> Symbol:
+    symbol: Symbol = legacy_dictionary.get(name)
+    if symbol is None:
+        symbol = Symbol(name)
+        legacy_dictionary[name] = symbol
+    return symbol
+
+
+def legacy_lookup(class_entry: ClassEntry, method_entry: MethodEntry, name: str):
+    if name in method_entry.locals.keys():
+        return method_entry.locals.get(legacy_symbol(name).to_string())
+    if name in method_entry.param.keys():
+        return method_entry.param.get(legacy_symbol(name).to_string())
+    return class_entry.fields.get(legacy_symbol(name).to_string())
+
+
+def lookup(class_entry: ClassEntry, method_entry: MethodEntry, name: str):
+    if method_entry.contains_local(name):
+        return method_entry.get_local_by_name(name)
+    if method_entry.contains_param(name):
+        return method_entry.get_param_by_name(name)
+    return class_entry.get_field(name)
+
+
+def collect_queries(symbol_table: SymbolTable, copy_names: bool) -> List[Tuple[ClassEntry, MethodEntry, str]]:
+    #One query per variable visible in each method; copies stand for the fresh, non-interned
+    #strings the parser produced before identifiers were interned.
+    queries = []
+    for class_entry in symbol_table.class_scopes.values():
+        for method_entry in class_entry.get_methods().values():
+            names = list(method_entry.get_locals()) + list(method_entry.get_params()) + list(class_entry.get_fields())
+            for name in names:
+                queries.append((class_entry, method_entry, "".join(list(name)) if copy_names else name))
+    return queries
+
+
+def time_queries(function, queries, repeat: int) -> float:
+    best: float = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for class_entry, method_entry, name in queries:
+            function(class_entry, method_entry, name)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.symbol_lookup")
+    arg_parser.add_argument("--classes", type=int, default=100)
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    program = MJParser().parse(MJScanner().tokenize(generate_program(args.classes, 10)))
+    symbol_table_creator = FillSymbolTableVisitor()
+    symbol_table_creator.init_semantic_errors()
+    symbol_table_creator.visit_program(program)
+    symbol_table = symbol_table_creator.get_symbol_table()
+
+    copied_queries = collect_queries(symbol_table, True) * args.rounds
+    interned_queries = collect_queries(symbol_table, False) * args.rounds
+    assert all(name is sys.intern(name) for _class, _method, name in interned_queries)
+
+    legacy_time = time_queries(legacy_lookup, copied_queries, args.repeat)
+    copied_time = time_queries(lookup, copied_queries, args.repeat)
+    interned_time = time_queries(lookup, interned_queries, args.repeat)
+    number_of_queries = len(interned_queries)
+    print(f"{'lookups':>10} {'legacy ns':>10} {'direct ns':>10} {'interned ns':>12} {'speedup':>8}")
+    print(f"{number_of_queries:>10} {legacy_time / number_of_queries * 1e9:>10.1f} {copied_time / number_of_queries * 1e9:>10.1f} "
+          f"{interned_time / number_of_queries * 1e9:>12.1f} {legacy_time / interned_time:>8.2f}")
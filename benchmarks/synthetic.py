@@ -0,0 +1,53 @@
+from typing import List
+
+
+#Machine-generated MiniJava programs used by the benchmarks. The output type-checks:
+#every class extends the previous one and every method only calls methods declared before it.
+def generate_method(class_index: int, method_index: int) -> List[str]:
+    lines: List[str] = []
+    lines.append(f"    public int m{method_index}(int x, int y) {{")
+    lines.append("        int t;")
+    lines.append("        int i;")
+    lines.append("        int[] a;")
+    lines.append("        boolean b;")
+    lines.append(f"        // method {method_index} of class C{class_index}")
+    lines.append(f"        t = x + y * {method_index + 1} - {class_index};")
+    lines.append("        a = new int[16];")
+    lines.append("        i = 0;")
+    lines.append("        while (i < a.length) {")
+    lines.append("            a[i] = t + i;")
+    lines.append("            i = i + 1;")
+    lines.append("        }")
+    lines.append("        b = (t < 100) && !(x < y);")
+    lines.append("        if (b) {")
+    lines.append("            t = a[3] * 2;")
+    lines.append("        } else {")
+    lines.append("            t = a[5] - f;")
+    lines.append("        }")
+    if method_index > 0:
+        lines.append(f"        t = t + this.m{method_index - 1}(t, i);")
+    lines.append("        System.out.println(t);")
+    lines.append("        return t;")
+    lines.append("    }")
+    return lines
+
+
+def generate_program(number_of_classes: int = 10, methods_per_class: int = 10) -> str:
+    lines: List[str] = []
+    lines.append("class Main {")
+    lines.append("    public static void main(String[] args) {")
+    lines.append(f"        System.out.println(new C{number_of_classes - 1}().m0(1, 2));")
+    lines.append("    }")
+    lines.append("}")
+    for class_index in range(number_of_classes):
+        if class_index == 0:
+            lines.append(f"class C{class_index} {{")
+            lines.append("    int f;")
+        else:
+            lines.append(f"class C{class_index} extends C{class_index - 1} {{")
+        lines.append(f"    int g{class_index};")
+        lines.append(f"    boolean h{class_index};")
+        for method_index in range(methods_per_class):
+            lines.extend(generate_method(class_index, method_index))
+        lines.append("}")
+    return "\n".join(lines) + "\n"
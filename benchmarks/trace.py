@@ -0,0 +1,75 @@
+import argparse
+import random
+import sys
+import time
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+from pymjc.front.canon import BasicBlocks, TraceSchedule
+from tests.test_canon import TextbookTraceSchedule
+
+
+#A method with a loop or branch every few statements: each block moves a few temps around and
+#ends in a CJUMP or a JUMP to a random block.
+def generate_body(number_of_blocks: int, statements_per_block: int, seed: int) -> tree.StmList:
+    rng = random.Random(seed)
+    t = temp.Temp()
+    labels = [temp.Label() for _ in range(number_of_blocks)]
+    body: tree.StmList = None
+    for index in reversed(range(number_of_blocks)):
+        if rng.random() < 0.6:
+            last: tree.Stm = tree.CJUMP(tree.CJUMP.LT, tree.TEMP(t), tree.CONST(index), rng.choice(labels), rng.choice(labels))
+        else:
+            last: tree.Stm = tree.JUMP(rng.choice(labels))
+        body = tree.StmList(last, body)
+        for _ in range(statements_per_block):
+            body = tree.StmList(tree.MOVE(tree.TEMP(t), tree.BINOP(tree.BINOP.PLUS, tree.TEMP(t), tree.CONST(1))), body)
+        body = tree.StmList(tree.LABEL(labels[index]), body)
+    return body
+
+
+def textbook_schedule(the_blocks: BasicBlocks):
+    block_cells = TextbookTraceSchedule.cells(the_blocks)
+    start = time.perf_counter()
+    TextbookTraceSchedule(the_blocks.done, block_cells)
+    return time.perf_counter() - start
+
+
+def array_schedule(the_blocks: BasicBlocks):
+    start = time.perf_counter()
+    TraceSchedule(the_blocks)
+    return time.perf_counter() - start
+
+
+#The best of repeat runs on each of seeds bodies, summed over the bodies: one run of the larger
+#sizes is short enough for a collection or a busy neighbour to swing it by a third.
+def time_schedule(schedule, number_of_blocks: int, statements_per_block: int, seeds: int, repeat: int) -> float:
+    total: float = 0.0
+    for seed in range(seeds):
+        best: float = None
+        for _ in range(repeat):
+            with CompilationContext():
+                #The textbook schedule splices the blocks it is given, so every run gets new ones.
+                the_blocks = BasicBlocks(generate_body(number_of_blocks, statements_per_block, seed))
+                elapsed = schedule(the_blocks)
+            if best is None or elapsed < best:
+                best = elapsed
+        total += best
+    return total
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="benchmarks.trace")
+    arg_parser.add_argument("--blocks", type=int, nargs="+", default=[1000, 5000, 20000])
+    arg_parser.add_argument("--statements", type=int, default=4, help="statements per block besides the label and jump")
+    arg_parser.add_argument("--seeds", type=int, default=3)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+    #The textbook schedule recurses once per trace.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10 * max(args.blocks)))
+
+    print(f"{'blocks':>8} {'textbook s':>11} {'array s':>10} {'speedup':>8}")
+    for number_of_blocks in args.blocks:
+        textbook_time = time_schedule(textbook_schedule, number_of_blocks, args.statements, args.seeds, args.repeat)
+        array_time = time_schedule(array_schedule, number_of_blocks, args.statements, args.seeds, args.repeat)
+        print(f"{number_of_blocks:>8} {textbook_time:>11.4f} {array_time:>10.4f} {textbook_time / array_time:>8.2f}")
@@ -1,10 +1,10 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from io import StringIO
-from typing import List
+from typing import Dict, List, Tuple
 
 
 from pymjc.front import temp
+from pymjc.front.arraylist import ArrayList
 
 
 class Targets():
@@ -27,70 +27,96 @@ class Instr(ABC):
         pass
 
     def nth_temp(self, temp_list: temp.TempList, i: int) -> temp.Temp:
-        if i == 0:
-            return temp_list.head
-        else:
-            return self.nth_temp(temp_list.tail, i - 1)
+        if isinstance(temp_list, ArrayList):
+            return temp_list.get(i)
+        for _ in range(i):
+            temp_list = temp_list.tail
+        return temp_list.head
   
 
     def nth_label(self, label_list: temp.LabelList, i: int) -> temp.Label:
-        if i == 0:
-            return label_list.head
-        else:
-            return self.nth_label(label_list.tail, i - 1)
-
-
-    def format(self, temp_map: temp.TempMap) -> str:
-        dest: temp.TempList = self.deff()
-        src: temp.TempList = self.use()
+        if isinstance(label_list, ArrayList):
+            return label_list.get(i)
+        for _ in range(i):
+            label_list = label_list.tail
+        return label_list.head
+
+
+    #Assembly strings are compiled once into a Template, shared by every instruction with the
+    #same string; the table is cleared when it reaches TEMPLATE_LIMIT.
+    TEMPLATE_LIMIT: int = 1 << 16
+    templates: Dict[str, Template] = {}
+
+    def template(self) -> Template:
+        template: Template = Instr.templates.get(self.assem)
+        if (template is None):
+            if (len(Instr.templates) >= Instr.TEMPLATE_LIMIT):
+                Instr.templates.clear()
+            template = Template(self.assem)
+            Instr.templates[self.assem] = template
+        return template
+
+    def items(temp_list) -> list:
+        #Items of a TempList or LabelList as a python list.
+        return ArrayList.elements(temp_list)
+
+    def operands(self) -> Tuple[list, list, list]:
+        #dest, src and jump targets, indexed by the Template operand kinds
         j: Targets = self.jumps()
-        jump: temp.LabelList = None
-        if j is not None:
-            jump = j.labels
-
-        s: StringIO = StringIO()
-        length: int = len(self.assem)
-        t: temp.Temp
-
-        for i in range(length):
-            if (self.assem[i] == '`'):
-                i += 1
-                match(self.assem[i]):
-                    case 's':
-                        i += 1
-                        n: int = int(self.assem[i], 10)
-                        t = self.nth_temp(src, n)
-                        result = temp_map.temp_map(t)
-                        if result is not None:
-                            s.write(temp_map.temp_map(t))
-                        else:
-                            s.write(t)
-
-                    case 'd':
-                        i += 1
-                        n: int = int(self.assem[i], 10)
-                        t = self.nth_temp(dest, n)
-                        result = temp_map.temp_map(t)
-                        if result is not None:
-                            s.write(temp_map.temp_map(t))
-                        else:
-                            s.write(t)
-
-                    case 'j':
-                        i += 1
-                        n: int = int(self.assem[i], 10)
-                        s.write(self.nth_label(jump, t).to_string())
-
-                    case '`':
-                        s.write('`')
-
-                    case _:
-                        raise RuntimeError("bad Assem format")
-            else:
-                s.write(self.assem[i])
-
-        return s.getvalue()
+        return (Instr.items(self.deff()), Instr.items(self.use()),
+                Instr.items(j.labels) if j is not None else None)
 
+    def format(self, temp_map: temp.TempMap) -> str:
+        template: Template = self.template()
+        if not template.slots:
+            return template.parts[0]
+        operands: Tuple[list, list, list] = self.operands()
+        parts: List[str] = template.parts.copy()
+        for place, kind, n in template.slots:
+            operand = operands[kind][n]
+            name: str = temp_map.temp_map(operand) if kind != Template.JUMP else None
+            parts[place] = name if name is not None else operand.to_string()
+        return "".join(parts)
+
+
+class Template():
+
+    #An assembly string split once into its literal segments and its operand slots: `d0 `s1
+    #`j0 name the first dest, the second src and the first jump target, `` is a backquote.
+    #parts holds the segments with a placeholder where each operand goes, and slots holds
+    #(place in parts, kind, index) for each operand.
+    DEST: int = 0
+    SRC: int = 1
+    JUMP: int = 2
+    kinds: Dict[str, int] = {"d": DEST, "s": SRC, "j": JUMP}
+
+    def __init__(self, assem: str):
+        self.parts: List[str] = []
+        self.slots: List[Tuple[int, int, int]] = []
+        literal: str = ""
+        i: int = 0
+        while True:
+            begin: int = assem.find("`", i)
+            if (begin < 0):
+                literal += assem[i:]
+                break
+            literal += assem[i:begin]
+            code: str = assem[begin + 1:begin + 2]
+            digit: str = assem[begin + 2:begin + 3]
+            if (code == "`"):
+                literal += "`"
+                i = begin + 2
+                continue
+            if (code not in Template.kinds or not digit.isdigit()):
+                raise RuntimeError("bad Assem format")
+            if literal:
+                self.parts.append(literal)
+                literal = ""
+            self.slots.append((len(self.parts), Template.kinds[code], int(digit)))
+            self.parts.append("")
+            i = begin + 3
+        if (literal or not self.parts):
+            self.parts.append(literal)
 
 
 class InstrList():
@@ -99,19 +125,18 @@ class InstrList():
         self.tail: InstrList = tail
     
     def to_list(self) -> List[Instr]:
-        instr_list = List[Instr]
-        current_head = self.head
-        current_tail = self.tail
-        while current_head is not None:
-            instr_list.append(current_head)
-            if current_tail is not None:
-                current_head = current_tail.head
-                current_tail = current_tail.tail
-            else:
-                current_head = None
+        instr_list: List[Instr] = []
+        current: InstrList = self
+        while current is not None:
+            instr_list.append(current.head)
+            current = current.tail
         return instr_list
 
 
+class InstrArray(ArrayList, InstrList):
+    pass
+
+
 class LABEL(Instr):
    def __init__(self, assem: str, label: temp.Label):
       self.assem: str = assem
@@ -137,6 +162,9 @@ class MOVE(Instr):
    def use(self) -> temp.TempList:
       return temp.TempList(self.src, None)
 
+   def operands(self) -> Tuple[list, list, list]:
+      return [self.dest], [self.src], None
+
    def deff(self) -> temp.TempList:
       return temp.TempList(self.dest, None)
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+from typing import List
+
+from pymjc.back import assem
+from pymjc.front import frame, temp, translate
+
+
+class AssemblyEmitter():
+
+    #Writes the final assembly of a program to out, a text stream, fragment by fragment: each
+    #procedure goes out in one write as soon as its registers are allocated, so none of it has
+    #to be kept. Files are opened with a BUFFER_SIZE buffer.
+    BUFFER_SIZE: int = 1 << 16
+
+    def __init__(self, out):
+        self.out = out
+        self.number_of_procs: int = 0
+        self.number_of_chars: int = 0
+
+    def open(path: str):
+        return open(path, "w", buffering=AssemblyEmitter.BUFFER_SIZE)
+
+    def write(self, text: str) -> None:
+        self.out.write(text)
+        self.number_of_chars += len(text)
+
+    def emit_proc(self, instrs: assem.InstrList, temp_map: temp.TempMap) -> None:
+        lines: List[str] = []
+        for instr in assem.Instr.items(instrs):
+            line: str = instr.format(temp_map)
+            lines.append(line if line.endswith("\n") else line + "\n")
+        self.write("".join(lines))
+        self.number_of_procs += 1
+
+    def emit_assembly(self, assembly: str) -> None:
+        #A procedure formatted elsewhere, by emit_proc of another emitter
+        self.write(assembly)
+        self.number_of_procs += 1
+
+    def emit_data(self, frag: translate.DataFrag) -> None:
+        self.write(frag.to_string() + "\n")
+
+    def emit_tail(self, frame: frame.Frame) -> None:
+        self.write(frame.program_tail())
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from abc import abstractmethod
 import sys
-from typing import List
+from typing import Dict, List, Tuple
 from pymjc.back import assem, graph
 from pymjc.front import temp, tree
+from pymjc.front.arraylist import ArrayList
 
 class FlowGraph (graph.Graph):
     
@@ -19,6 +20,34 @@ class FlowGraph (graph.Graph):
     def is_move(self,  node:graph.Node) -> bool:
         pass
 
+    #The instructions of every node, in order: node k runs from first_instr of node k up to
+    #first_instr of node k + 1.
+    @abstractmethod
+    def instr_list(self) -> List[assem.Instr]:
+        pass
+
+    @abstractmethod
+    def first_instr(self, node: graph.Node) -> int:
+        pass
+
+    def scan(instrs: assem.InstrList) -> Tuple[List[assem.Instr], Dict[temp.Label, int]]:
+        #One pass over instrs: the instructions other than labels, and the index of the
+        #instruction each label stands before. Labels with nothing after them are left out.
+        instr_list: List[assem.Instr] = []
+        label_index: Dict[temp.Label, int] = {}
+        for instr in ArrayList.elements(instrs):
+            if (isinstance(instr, assem.LABEL)):
+                label_index[instr.label] = len(instr_list)
+            elif (instr is not None):
+                instr_list.append(instr)
+        for label in [label for label, index in label_index.items() if index == len(instr_list)]:
+            del label_index[label]
+        return instr_list, label_index
+
+    def targets(instr: assem.Instr, label_index: Dict[temp.Label, int], last: int) -> List[int]:
+        #Indexes of the instructions instr jumps to; a label not in the list goes to the last one.
+        return [label_index.get(label, last) for label in ArrayList.elements(instr.jumps().labels)]
+
     def show(self, out_path: str = None) -> None:
         #sys.stdout
         if out_path is not None:
@@ -60,84 +89,133 @@ class FlowGraph (graph.Graph):
 
 
 class AssemFlowGraph (FlowGraph):
+
+    #One node for each instruction, with the key of its index.
     def __init__(self, instrs: assem.InstrList):
-        self.instructions = {}
-        self.labels = {}
-        self.mapping =  {}
-
-        node: graph.Node = None
-        last_node: graph.Node = None
-        label_instr: assem.Instr = None
-        branch_instr: assem.Instr = None
-        
-        label_list = List[assem.Instr]
-        a: assem.InstrList = instrs
-
-        while(a is not None):
-            if (isinstance(a.head, tree.LABEL)):
-                label_instr = a.head
-                label_list.append(a.head)
+        super().__init__()
+        label_index: Dict[temp.Label, int] = None
+        self.instructions, label_index = FlowGraph.scan(instrs)
+        for _ in self.instructions:
+            self.new_node()
+        #<Label, Node>
+        self.mapping: Dict[temp.Label, graph.Node] = {label: self.mynodes.get(index) for label, index in label_index.items()}
+
+        #An instruction with jumps only goes to its targets.
+        last: int = len(self.instructions) - 1
+        for index, instr in enumerate(self.instructions):
+            if (instr.jumps() is None):
+                if (index < last):
+                    self.add_key_edge(index, index + 1)
             else:
-                node = self.new_node()
-                branch_instr = a.head
-                self.instructions[node] = branch_instr
-
-                if (label_instr is not None):
-                    self.labels[node] = label_instr.label
-                    for l in label_list:
-                        self.mapping[l.label] = node
-                    
-                    label_list = List[assem.Instr]
-                    label_instr = None
-                
-                if (last_node is not None):
-                    self.add_edge(last_node, node)
-                
-                last_node = node
-            
-            a = a.tail
-        
-        i:int = 0
-        a = instrs
-        while (a is not None): #looking for jump labels
-            if (isinstance(a.head, assem.OPER)):
-                oper = a.head
-                if (oper.jumps() is not None): #if the flow changes
-                    jump_labels: temp.LabelList = oper.jumps().labels
-                    while(jump_labels is not None):
-                        l: temp.Label = jump_labels.head
-                        if (self.mapping.get(l) is None):
-                            self.add_edge(self.get_node_by_id(i), last_node)
-                        else:
-                            self.add_edge(self.get_node_by_id(i), self.mapping.get(l))
-                        jump_labels = jump_labels.tail
-                i += 1
-            a = a.tail
+                for target in FlowGraph.targets(instr, label_index, last):
+                    self.add_key_edge(index, target)
 
     def get_node_by_id(self, n: int) -> graph.Node:
-        node_list: graph.NodeList = self.nodes()
-        while(node_list is not None):
-            if node_list.head.my_key is n:
-                return node_list.head
-            node_list = node_list.tail
-        print("NODE ID NOT FOUND")
-        return None
+        return self.mynodes.get(n)
+
+    def instr(self, node: graph.Node) -> assem.Instr:
+        return self.instructions[node.my_key]
 
-    def instr(self, node: graph.Node) -> assem.Instr: 
-        return self.instructions.get(node)
+    def instr_list(self) -> List[assem.Instr]:
+        return self.instructions
+
+    def first_instr(self, node: graph.Node) -> int:
+        return node.my_key
 
     def deff(self, node: graph.Node) -> temp.TempList:
-        deff_instr: assem.Instr = self.instructions.get(node)
-        if deff_instr is not None:
-            return deff_instr.deff()
+        return self.instructions[node.my_key].deff()
 
-        return None
-	
     def use(self, node: graph.Node) -> temp.TempList:
-        use_instr: assem.Instr = self.instructions.get(node)
-        if use_instr is not None:
-            return use_instr.use()
-        return None
-	
+        return self.instructions[node.my_key].use()
+
+    def is_move(self, node: graph.Node) -> bool:
+        return isinstance(self.instructions[node.my_key], assem.MOVE)
+
+
+class BlockFlowGraph (FlowGraph):
+
+    #One node for each basic block, a run of instructions only entered at its first one and
+    #only left after its last one. Blocks start at the first instruction, at every jump target
+    #and after every instruction with jumps. instr_graph() is the same code one node for each
+    #instruction.
+    def __init__(self, instrs: assem.InstrList):
+        super().__init__()
+        self.source: assem.InstrList = instrs
+        self.instr_view: AssemFlowGraph = None
+        label_index: Dict[temp.Label, int] = None
+        self.instructions, label_index = FlowGraph.scan(instrs)
+        number_of_instrs: int = len(self.instructions)
+        last: int = number_of_instrs - 1
+
+        #Targets of every instruction with jumps, by its index
+        jump_targets: Dict[int, List[int]] = {}
+        leaders: bytearray = bytearray(number_of_instrs + 1)
+        leaders[0] = 1
+        for index, instr in enumerate(self.instructions):
+            if (instr.jumps() is not None):
+                jump_targets[index] = FlowGraph.targets(instr, label_index, last)
+                leaders[index + 1] = 1
+                for target in jump_targets[index]:
+                    leaders[target] = 1
+
+        #Index of the first instruction of each block, then one past the last instruction
+        self.starts: List[int] = []
+        #Block key of each instruction
+        self.block_of: List[int] = []
+        for index in range(number_of_instrs):
+            if leaders[index]:
+                self.starts.append(index)
+                self.new_node()
+            self.block_of.append(len(self.starts) - 1)
+        self.starts.append(number_of_instrs)
+        #<Label, Node> of the block each label is in
+        self.mapping: Dict[temp.Label, graph.Node] = {label: self.mynodes.get(self.block_of[index])
+                                                      for label, index in label_index.items()}
+
+        number_of_blocks: int = len(self.starts) - 1
+        for key in range(number_of_blocks):
+            target_list: List[int] = jump_targets.get(self.starts[key + 1] - 1)
+            if (target_list is None):
+                if (key + 1 < number_of_blocks):
+                    self.add_key_edge(key, key + 1)
+            else:
+                for target in target_list:
+                    self.add_key_edge(key, self.block_of[target])
+
+    def instr_graph(self) -> AssemFlowGraph:
+        if (self.instr_view is None):
+            self.instr_view = AssemFlowGraph(self.source)
+        return self.instr_view
+
+    def instrs(self, node: graph.Node) -> List[assem.Instr]:
+        return self.instructions[self.starts[node.my_key]:self.starts[node.my_key + 1]]
+
+    def instr_list(self) -> List[assem.Instr]:
+        return self.instructions
+
+    def first_instr(self, node: graph.Node) -> int:
+        return self.starts[node.my_key]
+
+    def deff(self, node: graph.Node) -> temp.TempList:
+        #Every temp the block defines
+        defs: List[temp.Temp] = []
+        for instr in self.instrs(node):
+            for t in ArrayList.elements(instr.deff()):
+                if t not in defs:
+                    defs.append(t)
+        return temp.TempArray(defs) if defs else None
+
+    def use(self, node: graph.Node) -> temp.TempList:
+        #Temps the block uses before defining them
+        uses: List[temp.Temp] = []
+        defs: List[temp.Temp] = []
+        for instr in self.instrs(node):
+            for t in ArrayList.elements(instr.use()):
+                if t not in uses and t not in defs:
+                    uses.append(t)
+            defs.extend(ArrayList.elements(instr.deff()))
+        return temp.TempArray(uses) if uses else None
+
     def is_move(self, node: graph.Node) -> bool:
-        return isinstance(self.instructions.get(node), assem.MOVE)
+        instrs: List[assem.Instr] = self.instrs(node)
+        return len(instrs) == 1 and isinstance(instrs[0], assem.MOVE)
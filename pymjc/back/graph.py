@@ -1,64 +1,59 @@
 from __future__ import annotations
 import sys
+from typing import Iterator, List, Set, Tuple
+
+from pymjc.front.arraylist import ArrayList
 
 class Node():
-    
+
+    #A node is its integer key in my_graph: the edges live in the successor and predecessor
+    #sets of the graph, and the NodeList accessors below are built from them on demand.
     def __init__(self, graph: Graph):
-      self.succs: NodeList = None
-      self.preds: NodeList = None
       self.my_graph: Graph = graph
       self.my_key = graph.node_count
       graph.node_count += 1
-      p: NodeList  = NodeList(self, None)
-      if (graph.mylast is None):
-          graph.mynodes = graph.mylast = p
-      else:
-          graph.mylast = graph.mylast.tail = p
+      graph.mynodes.add_tail(self)
+      graph.succ_sets.append(set())
+      graph.pred_sets.append(set())
+      if (graph.matrix is not None and self.my_key >= graph.matrix_size):
+        graph.matrix = None
 
     def succ(self) -> NodeList:
-        return self.succs
+        return self.my_graph.node_list(self.my_graph.succ_sets[self.my_key])
 
     def pred(self) -> NodeList:
-        return self.preds
+        return self.my_graph.node_list(self.my_graph.pred_sets[self.my_key])
 
     def cat(self, a: NodeList, b: NodeList) -> NodeList:
-        if (a is None):
-            return b
-        else:
-            return NodeList(a.head, self.cat(a.tail, b))
+        nodes: NodeArray = NodeArray(ArrayList.elements(a) + ArrayList.elements(b))
+        return nodes if len(nodes) > 0 else None
 
-    def adj(self) -> NodeList:
-        return self.cat(self.succ(), self.pred())
+    #adj() lists the neighbours, adj(n) tells whether n is one.
+    def adj(self, n: Node = None):
+        if (n is None):
+            return self.cat(self.succ(), self.pred())
+        return self.my_graph.adjacent(self.my_key, n.my_key)
 
     def len_note_list(self, l: NodeList) -> int:
-        i: int = 0
-        p: NodeList = l
-        while(p is not None):
-          p = p.tail
-          i += 1
-
-        return i
+        return len(ArrayList.elements(l))
 
     def in_degree(self) -> int:
-        return self.len_note_list(self.pred())
+        return len(self.my_graph.pred_sets[self.my_key])
 
     def out_degree(self) -> int:
-        return self.len_note_list(self.succ())
+        return len(self.my_graph.succ_sets[self.my_key])
 
     def degree(self) -> int:
         return self.in_degree() + self.out_degree()
 
     def goes_to(self, n: Node) -> bool:
-        return Graph.in_list(n, self.succ())
+        return n.my_key in self.my_graph.succ_sets[self.my_key]
 
     def comes_from(self, n: Node) -> bool:
-        return Graph.in_list(n, self.pred())
-
-    def adj(self, n: Node) -> bool:
-        return self.goes_to(n) or self.comes_from(n)
+        return n.my_key in self.my_graph.pred_sets[self.my_key]
 
     def to_string(self) -> str:
-        return str(self.mykey)
+        return str(self.my_key)
 
 class NodeList():
   def __init__(self, h: Node, t: NodeList):
@@ -66,38 +61,83 @@ class NodeList():
     self.tail: NodeList = t
 
 
+class NodeArray(ArrayList, NodeList):
+  pass
+
+
 class Graph():
+
+  #Nodes are numbered densely from 0. succ_sets and pred_sets hold the keys of the successors
+  #and predecessors of each node, so edge queries and degrees are O(1). Interference graphs,
+  #whose edge queries ignore direction, may also keep a symmetric bit-matrix of adjacency
+  #(use_matrix); it is dropped if the graph outgrows it.
   def __init__(self):
     self.node_count = 0
-    self.mynodes: NodeList = None 
-    self.mylast: NodeList = None
+    self.mynodes: NodeArray = NodeArray()
+    self.succ_sets: List[Set[int]] = []
+    self.pred_sets: List[Set[int]] = []
+    self.number_of_edges: int = 0
+    self.matrix: bytearray = None
+    self.matrix_size: int = 0
 
   def nodes(self) -> NodeList:
+    if (len(self.mynodes) == 0):
+      return None
     return self.mynodes
 
   def new_node(self) -> Node:
     return Node(self)
 
+  def node(self, key: int) -> Node:
+    return self.mynodes.get(key)
+
+  def node_list(self, keys: Set[int]) -> NodeList:
+    if not keys:
+      return None
+    return NodeArray([self.mynodes.items[key] for key in sorted(keys)])
+
+  def use_matrix(self, size: int) -> None:
+    #Sizes the bit-matrix for size nodes; only before any edge is added.
+    if (self.number_of_edges > 0):
+      raise RuntimeError("Graph.use_matrix on a graph with edges")
+    self.matrix_size = size
+    self.matrix = bytearray((size * size + 7) // 8) if self.node_count <= size else None
+
   def check(self, n: Node) -> None:
-    if (n.mygraph is not self):
+    if (n.my_graph is not self):
       raise RuntimeError("Graph.addEdge using nodes from the wrong graph")
 
   def in_list(a: Node , l: NodeList) -> bool:
-    p: NodeList = l
-    while(p is not None):
-      if (p.head is a):
-        return True      
-      p = p.tail
+    return any(node is a for node in ArrayList.elements(l))
+
+  def adjacent(self, u: int, v: int) -> bool:
+    #An edge from u to v or from v to u.
+    if (self.matrix is not None):
+      bit: int = u * self.matrix_size + v
+      return self.matrix[bit >> 3] & (1 << (bit & 7)) != 0
+    return v in self.succ_sets[u] or v in self.pred_sets[u]
+
+  def set_matrix(self, u: int, v: int, value: bool) -> None:
+    for bit in (u * self.matrix_size + v, v * self.matrix_size + u):
+      if value:
+        self.matrix[bit >> 3] |= 1 << (bit & 7)
+      else:
+        self.matrix[bit >> 3] &= ~(1 << (bit & 7))
 
-    return False
+  def add_key_edge(self, u: int, v: int) -> None:
+    succs: Set[int] = self.succ_sets[u]
+    if (v in succs):
+      return None
+    succs.add(v)
+    self.pred_sets[v].add(u)
+    self.number_of_edges += 1
+    if (self.matrix is not None):
+      self.set_matrix(u, v, True)
 
   def add_edge(self, from_node: Node , to_node: Node) -> None:
     self.check(from_node)
     self.check(to_node)
-    if (from_node.goes_to(to_node)):
-      return None
-    to_node.preds = NodeList(from_node, to_node.preds)
-    from_node.succs = NodeList(to_node, from_node.succs)
+    self.add_key_edge(from_node.my_key, to_node.my_key)
 
   def delete_node(self, a: Node, l: NodeList) -> NodeList:
     if (l is None):
@@ -108,8 +148,21 @@ class Graph():
       return NodeList(l.head, self.delete_node(a, l.tail))
 
   def rm_edge(self, from_node: Node, to_node: Node) -> None:
-    to_node.preds = self.delete_node(from_node, to_node.preds)
-    from_node.succs = self.delete_node(to_node, from_node.succs)
+    u: int = from_node.my_key
+    v: int = to_node.my_key
+    if (v not in self.succ_sets[u]):
+      raise RuntimeError("Graph.rmEdge: edge nonexistent")
+    self.succ_sets[u].discard(v)
+    self.pred_sets[v].discard(u)
+    self.number_of_edges -= 1
+    if (self.matrix is not None and u not in self.succ_sets[v]):
+      self.set_matrix(u, v, False)
+
+  def edges(self) -> Iterator[Tuple[int, int]]:
+    #Every edge as a (from key, to key) pair.
+    for u, succs in enumerate(self.succ_sets):
+      for v in succs:
+        yield u, v
 
    #Print a human-readable dump for debugging.
   def show(self, out_path: str) -> None:
@@ -118,7 +171,7 @@ class Graph():
     p: NodeList = self.nodes()
     while(p is not None):
       n: Node  = p.head
-      print(n.to_string)
+      print(n.to_string())
       q: NodeList = n.succ()
       print(": ")
       while(q is not None):
@@ -126,4 +179,4 @@ class Graph():
         print(" ")
         q = q.tail
       print("\n")
-      p = p.tail
\ No newline at end of file
+      p = p.tail
@@ -1,8 +1,10 @@
 from contextlib import nullcontext
 import itertools
-from typing import List
+from typing import Dict, List
 from pymjc.back import assem
+from pymjc.context import CompilationContext
 from pymjc.front import frame, temp, tree
+from pymjc.front.arraylist import ArrayList
 from pymjc.front.symbol import Symbol
 from pymjc.util import BoolList
 
@@ -29,255 +31,369 @@ class InReg(frame.Access):
     def to_string(self) -> str:
         return self.temp.to_string()
 
+class Tile():
+
+    #A row of the MIPS tiling table: a tree pattern and either an assembly template or the name of
+    #the Codegen method that emits it. kind is Codegen.REG when the tile leaves its value in a
+    #register and Codegen.STM for statements.
+    def __init__(self, kind: str, pattern, template: str = None, emitter: str = None):
+        self.kind: str = kind
+        self.pattern = pattern
+        self.template: str = template
+        self.emitter: str = emitter
+
+    def size(self) -> int:
+        #Number of tree nodes the pattern covers, the maximal munch order.
+        stack: list = [self.pattern]
+        size: int = 0
+        while stack:
+            pattern = stack.pop()
+            if isinstance(pattern, tuple):
+                size += 1
+                stack.extend(item for item in pattern[1:] if not isinstance(item, int))
+            elif pattern not in Codegen.operand_leaves and pattern != Codegen.DST:
+                size += 1
+        return size
+
+
 class Codegen():
 
+    #Tile kinds.
+    REG: str = "reg"
+    STM: str = "stm"
+
+    #Pattern leaves. reg is any expression computed into a register, computed is the same
+    #without TEMP, temp only takes a TEMP and dst binds the temp a MOVE writes. The constant
+    #leaves only take a CONST that fits the immediate field: imm is signed 16 bits, uimm
+    #unsigned, negimm one whose negation fits, shamt a shift amount and pow2 a power of two
+    #(bound as its shift amount). const takes any CONST, zero only CONST 0 and label a NAME.
+    REG_LEAF: str = "reg"
+    COMPUTED: str = "computed"
+    TEMP_LEAF: str = "temp"
+    DST: str = "dst"
+    IMM: str = "imm"
+    UIMM: str = "uimm"
+    NEGIMM: str = "negimm"
+    SHAMT: str = "shamt"
+    POW2: str = "pow2"
+    CONSTANT: str = "const"
+    ZERO: str = "zero"
+    LABEL_LEAF: str = "label"
+
+    operand_leaves: tuple = (REG_LEAF, COMPUTED, TEMP_LEAF)
+
+    #Fields matched by the items of a pattern after its node class.
+    fields = {tree.BINOP: ("op", "left_exp", "right_exp"),
+              tree.MEM: ("exp",),
+              tree.CALL: (),
+              tree.MOVE: ("dest", "src"),
+              tree.EXP: ("exp",),
+              tree.JUMP: ("exp",),
+              tree.CJUMP: ("rel_op", "left_exp", "right_exp"),
+              tree.LABEL: (),
+              tree.TEMP: ()}
+
+    #Tiles by the class of the root node, in maximal munch order.
+    tiles = {}
+
     def __init__(self, frame: frame.Frame):
         self.frame = frame
-        self.instr_list = None
-        self.last = None
+        self.instr_list: assem.InstrArray = assem.InstrArray()
 
     def emit(self, instr: assem.Instr) -> None:
-        if (self.last is None):
-            self.instr_list = assem.InstrList(instr, None)
-            self.last = assem.InstrList(instr, None)
-        else:
-            self.instr_list.tail = assem.InstrList(instr, None)
-            self.last = self.instr_list.tail
-
-
-    def munch_stm(self, stmt: tree.Stm) -> None:
-        if isinstance(stmt, tree.SEQ):
-            self.munch_stm(stmt.left_stm)
-            self.munch_stm(stmt.right_stm)
-
-        elif isinstance(stmt, tree.LABEL):
-            self.emit(assem.LABEL(stmt.label.to_string() + ":\n", stmt.label.to_string()))
-
-        elif isinstance(stmt, tree.MOVE):
-            self.munch_move(stmt.dest, stmt.src)
-
-        elif  isinstance(stmt, tree.JUMP):
-            self.munch_jump(stmt)
+        self.instr_list.add_tail(instr)
+
+    #Matchers of the pattern leaves: each binds its operand at node and says whether it fits.
+    def match_reg(node, operands: list) -> bool:
+        operands.append((Codegen.REG_LEAF, node))
+        return True
+
+    def match_computed(node, operands: list) -> bool:
+        if type(node) is tree.TEMP:
+            return False
+        operands.append((Codegen.REG_LEAF, node))
+        return True
+
+    def match_temp(node, operands: list) -> bool:
+        if type(node) is not tree.TEMP:
+            return False
+        operands.append((Codegen.REG_LEAF, node))
+        return True
+
+    def match_dst(node, operands: list) -> bool:
+        if type(node) is not tree.TEMP:
+            return False
+        operands.append((Codegen.DST, node.temp))
+        return True
+
+    def match_label(node, operands: list) -> bool:
+        if type(node) is not tree.NAME:
+            return False
+        operands.append((Codegen.CONSTANT, node.label.to_string()))
+        return True
+
+    def match_const(low: int, high: int, convert=None):
+        def match(node, operands: list) -> bool:
+            if type(node) is not tree.CONST:
+                return False
+            value: int = node.value
+            if low is not None and not low <= value <= high:
+                return False
+            operands.append((Codegen.CONSTANT, convert(value) if convert is not None else value))
+            return True
+        return match
+
+    def match_pow2(node, operands: list) -> bool:
+        if type(node) is not tree.CONST:
+            return False
+        value: int = node.value
+        if value <= 0 or value & (value - 1) != 0:
+            return False
+        operands.append((Codegen.CONSTANT, value.bit_length() - 1))
+        return True
+
+    def match_zero(node, operands: list) -> bool:
+        return type(node) is tree.CONST and node.value == 0
+
+    leaf_matchers = {REG_LEAF: match_reg,
+                     COMPUTED: match_computed,
+                     TEMP_LEAF: match_temp,
+                     DST: match_dst,
+                     LABEL_LEAF: match_label,
+                     IMM: match_const(-32768, 32767),
+                     UIMM: match_const(0, 65535),
+                     NEGIMM: match_const(-32767, 32768, lambda value: -value),
+                     SHAMT: match_const(0, 31),
+                     POW2: match_pow2,
+                     CONSTANT: match_const(None, None),
+                     ZERO: match_zero}
+
+    def match_leaf(leaf: str, node, operands: list) -> bool:
+        return Codegen.leaf_matchers[leaf](node, operands)
+
+    def match(pattern, node, operands: list) -> bool:
+        #Binds the operands of pattern at node, in the left to right order of the pattern:
+        #(reg, exp) for each subtree computed into a register, (dst, temp) and (const, value).
+        if type(pattern) is str:
+            return Codegen.leaf_matchers[pattern](node, operands)
+        if type(node) is not pattern[0]:
+            return False
+        for field, item in zip(Codegen.fields[pattern[0]], pattern[1:]):
+            value = getattr(node, field)
+            if isinstance(item, int):
+                if value != item:
+                    return False
+            elif not Codegen.match(item, value, operands):
+                return False
+        return True
+
+    def select(node) -> tuple:
+        #Maximal munch: the largest tile that matches at node, with the operands it binds. A
+        #larger tile never costs more instructions than the smaller ones it covers, so the
+        #first match is also the cheapest.
+        for tile in Codegen.tiles.get(type(node), ()):
+            operands: list = []
+            if Codegen.match(tile.pattern, node, operands):
+                return tile, operands
+        raise RuntimeError("No MIPS tile for " + type(node).__name__)
+
+    def reduce(self, node, dest: temp.Temp = None) -> temp.Temp:
+        #Emits the tile selected at node after the tiles of its operands. A register tile writes
+        #into dest when it is given.
+        tile, operands = Codegen.select(node)
+        if tile.emitter is not None:
+            return getattr(self, tile.emitter)(node, tile, operands, dest)
+
+        src = temp.TempArray()
+        dst = temp.TempArray()
+        values: list = []
+        for kind, operand in operands:
+            if kind == Codegen.REG_LEAF:
+                src.add_tail(self.reduce(operand))
+            elif kind == Codegen.DST:
+                dst.add_tail(operand)
+            else:
+                values.append(operand)
 
-        elif isinstance(stmt, tree.CJUMP):
-            self.munch_cjump(stmt)
+        result: temp.Temp = None
+        if tile.kind == Codegen.REG:
+            result = dest if dest is not None else temp.Temp()
+            dst.add_head(result)
 
-        elif  isinstance(stmt, tree.EXP) and isinstance(stmt.exp, tree.CALL):
-            r: temp.Temp  = self.munch_exp(stmt.exp.func_exp)
-            l: temp.TempList = self.munch_args(0, stmt.exp.arg_exp_list)
-            if isinstance(stmt.exp.func_exp, tree.NAME):
-                temp_list = temp.TempList()
-                for element in MipsFrame.call_defs:
-                    temp_list.add_tail(element)
-                self.emit(assem.OPER("jal " + stmt.exp.func_exp.label.to_string() + "\n", temp_list, temp.TempList(r, l)))
+        jumps: temp.LabelList = None
+        if type(node) is tree.CJUMP:
+            jumps = temp.LabelArray([node.if_true, node.if_false])
+        elif type(node) is tree.JUMP:
+            jumps = node.targets
 
-    def munch_exp(self, exp: tree.Exp) -> temp.Temp:
-        if isinstance(exp, tree.MEM):
-            return self.munch_mem(exp)
+        self.emit(assem.OPER(tile.template.format(*values), dst if len(dst) > 0 else None,
+                             src if len(src) > 0 else None, jumps))
+        return result
 
-        elif isinstance(exp, tree.BINOP):
-            return self.munch_binop(exp)
-        
-        elif isinstance(exp, tree.CONST):
-            r = temp.Temp()
-            self.emit(assem.OPER("li `d0,"+ str(exp.value) + "\n", temp.TempList(r, None), None))
-            return r
-        
-        elif isinstance(exp, tree.TEMP):
-            return exp.temp
-        
-        elif isinstance(exp, tree.NAME):
-            return temp.Temp()
+    def munch_stm(self, stmt: tree.Stm) -> None:
+        self.reduce(stmt)
 
-        return None
+    def munch_exp(self, exp: tree.Exp, dest: temp.Temp = None) -> temp.Temp:
+        return self.reduce(exp, dest)
 
     def munch_args(self, i: int, args: tree.ExpList) -> temp.TempList:
-        tmp: tree.ExpList  = args
-        out = temp.TempList()
+        #The first arguments go to the argument registers, which the call then uses, and the
+        #rest to the outgoing area at the bottom of the frame.
+        out = temp.TempArray()
+        for arg in ArrayList.elements(args):
+            if i < len(MipsFrame.arg_regs):
+                out.add_tail(self.munch_exp(arg, MipsFrame.arg_regs[i]))
+            else:
+                value: temp.Temp = self.munch_exp(arg)
+                self.emit(assem.OPER("sw `s0," + str(i * MipsFrame.WORD_SIZE) + "(`s1)\n", None,
+                                     temp.TempArray([value, MipsFrame.SP])))
+            i += 1
 
-        while tmp is not None:
-            out.add_tail(self.munch_exp(tmp.head))
-            tmp = tmp.tail
-        
+        if self.frame is not None:
+            self.frame.max_arg_offset = max(self.frame.max_arg_offset, i * MipsFrame.WORD_SIZE)
         return out
 
-
-    def munch_move(self, dst: tree.Exp, src: tree.Exp):
-        if isinstance(dst, tree.MEM):
-            self.munch_move_mem(dst, src)
-
-        elif isinstance(dst, tree.TEMP) and isinstance(src, tree.CALL):
-            r: temp.Temp = self.munch_exp(src.func_exp)
-            l: temp.TempList = self.munch_args(0, src.arg_exp_list)
-            if isinstance(src.func_exp, tree.NAME):
-                self.emit(assem.OPER("jal " + src.func_exp.label.to_string() + "\n", temp.TempList(r, None), l))
-
-        elif isinstance(dst, tree.TEMP):
-            self.munch_move_temp(dst, src)
-
-    def munch_move_mem(self, dst: tree.MEM, src: tree.Exp) -> None:
-        srcTemps: temp.TempList 
-        dstTemps: temp.TempList
-
-        if isinstance(dst.exp, tree.BINOP):
-            if dst.exp.op == tree.BINOP.PLUS and isinstance(dst.exp.right_exp, tree.CONST):
-                dstTemps = temp.TempList(self.munch_exp(dst.exp.left_exp), None)
-                srcTemps = temp.TempList(self.munch_exp(src), None)
-                self.emit(assem.OPER("sw `s0," + str(dst.exp.right_exp.value) + "(`d0)\n", dstTemps, srcTemps))
-            elif dst.exp.op == tree.BINOP.PLUS and isinstance(dst.exp.left_exp, tree.CONST):
-                dstTemps = temp.TempList(self.munch_exp(dst.exp.right_exp), None)
-                srcTemps = temp.TempList(self.munch_exp(src), None)
-                self.emit(assem.OPER("sw `s0," + str(dst.exp.left_exp.value) + "(`d0)\n", dstTemps, srcTemps))
-
-        elif isinstance(src, tree.MEM):
-            dstTemps = temp.TempList(self.munch_exp(dst.exp), None)
-            srcTemps = temp.TempList(self.munch_exp(src.exp), None)
-            self.emit(assem.OPER("move `d0, `s0\n", dstTemps, srcTemps))
-        
-        elif isinstance(dst.exp, tree.CONST):
-            srcTemps = temp.TempList(self.munch_exp(src), None)
-            dstTemps = temp.TempList(self.munch_exp(dst.exp), None)
-            self.emit(assem.OPER("sw `s0,"+ str(dst.exp.value) +"(`d0)\n", dstTemps, srcTemps))
-        
+    def munch_call(self, call: tree.CALL, dest: temp.Temp) -> temp.Temp:
+        args: temp.TempArray = self.munch_args(0, call.arg_exp_list)
+        call_defs = temp.TempArray(list(MipsFrame.call_defs))
+        if type(call.func_exp) is tree.NAME:
+            self.emit(assem.OPER("jal " + call.func_exp.label.to_string() + "\n", call_defs, args))
         else:
-            dstTemps = temp.TempList(self.munch_exp(dst.exp), None);
-            srcTemps = temp.TempList(self.munch_exp(src), None);
-            self.emit(assem.OPER("sw `s0, 0(`d0)\n", dstTemps, srcTemps))
-
-    def munch_move_temp(self, dst: tree.TEMP, src: tree.Exp) -> None:
-        tmp: temp.Temp = self.munch_exp(src)
-        self.emit(assem.MOVE("move `s0,`d0\n", dst.temp, tmp))
-
+            args.add_head(self.munch_exp(call.func_exp))
+            self.emit(assem.OPER("jalr `s0\n", call_defs, args))
+        if dest is not None:
+            self.emit(assem.MOVE("move `d0,`s0\n", dest, MipsFrame.V0))
+        return dest
+
+    #Emitters of the tiles that are not a single templated instruction.
+
+    def emit_temp(self, node: tree.TEMP, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        if dest is not None and dest is not node.temp:
+            self.emit(assem.MOVE("move `d0,`s0\n", dest, node.temp))
+            return dest
+        return node.temp
+
+    def emit_zero(self, node: tree.CONST, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        if dest is not None:
+            self.emit(assem.MOVE("move `d0,`s0\n", dest, MipsFrame.ZERO))
+            return dest
+        return MipsFrame.ZERO
+
+    def emit_call(self, node: tree.CALL, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        return self.munch_call(node, dest if dest is not None else temp.Temp())
+
+    def emit_move(self, node: tree.MOVE, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        self.emit(assem.MOVE("move `d0,`s0\n", node.dest.temp, node.src.temp))
+        return None
 
+    def emit_move_into(self, node: tree.MOVE, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        #The source tile writes straight into the destination temp.
+        self.reduce(node.src, node.dest.temp)
+        return None
 
-    def munch_cjump(self, stmt: tree.CJUMP) -> None:
-        r: temp.Temp = self.munch_exp(tree.BINOP(tree.BINOP.MINUS, stmt.left_exp, stmt.right_exp))
-        if (stmt.rel_op == tree.CJUMP.EQ):
-            self.emit(assem.OPER("beq `s0,$zero,`j0\n", None, temp.TempList(r, None), temp.LabelList(stmt.if_true, None)))
-        
-        elif (stmt.rel_op == tree.CJUMP.GE):
-            self.emit(assem.OPER("bge `s0,$zero,`j0\n", None, temp.TempList(r, None),temp.LabelList(stmt.if_true, None)))
-        
-        elif (stmt.rel_op == tree.CJUMP.LT):
-            self.emit(assem.OPER("blt `s0,$zero,`j0\n", None, 
-                    temp.TempList(r, None), temp.LabelList(stmt.if_true, None)))
-        
-        elif (stmt.rel_op == tree.CJUMP.NE):
-            self.emit(assem.OPER("bne `s0,$zero,`j0\n", None, temp.TempList(r, None), temp.LabelList(stmt.if_true, None)))
-        
-        elif (stmt.rel_op == tree.CJUMP.GT):
-            self.emit(assem.OPER("bgt `s0,$zero,`j0\n", None, temp.TempList(r, None), temp.LabelList(stmt.if_true, None)))
-        
+    def emit_exp(self, node: tree.EXP, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        if type(node.exp) is tree.CALL:
+            self.munch_call(node.exp, None)
         else:
-            self.emit(assem.OPER("j `j0\n", None, None, temp.LabelList(stmt.if_false, None)))
-
-
-    def munch_jump(self, stmt: tree.JUMP) -> None:
-        self.emit(assem.OPER("j `j0\n", None, None, temp.LabelList(stmt.exp.label, None)))
-
-
-
-    def munch_mem(self, mem: tree.MEM) -> temp.Temp:
-        if isinstance(mem.exp, tree.BINOP):
-            if (mem.exp.op == tree.BINOP.PLUS) and isinstance(mem.exp.right_exp, tree.CONST):
-                r = temp.Temp()
-                self.emit(assem.OPER("lw `d0," + str(mem.exp.right_exp.value) +"(`s0)\n",
-                          temp.TempList(r, None),
-                          temp.TempList(self.munch_exp(mem.exp.left_exp), None)))
-                return r
-
-            elif (mem.exp.op == tree.BINOP.PLUS) and isinstance(mem.exp.left_exp, tree.CONST):
-                r = temp.Temp()
-                self.emit(assem.OPER("lw `d0," + str(mem.exp.left_exp.value) +"(`s0)\n",
-                          temp.TempList(r, None),
-                          temp.TempList(self.munch_exp(mem.exp.right_exp), None)))
-                return r
-
-        elif isinstance(mem.exp, tree.CONST):
-            r = temp.Temp()
-            self.emit(assem.OPER("lw `d0," + str(mem.exp.value) +"($zero)\n", temp.TempList(r, None), None))
-            return r
-
-        r = temp.Temp()
-        self.emit(assem.OPER("lw `d0,`s0\n", temp.TempList(r, None), temp.TempList(self.munch_exp(mem.exp), None)))
-        return r
+            self.reduce(node.exp)
+        return None
 
+    def emit_label(self, node: tree.LABEL, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        self.emit(assem.LABEL(node.label.to_string() + ":\n", node.label))
+        return None
 
-    def munch_binop(self, stmt: tree.BINOP) -> temp.Temp:
-        r = temp.Temp()
-        
-        # munch_exp(BINOP(PLUS,e1,CONST (i)))
-        if (stmt.op == tree.BINOP.PLUS) and isinstance(stmt.right_exp, tree.CONST):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), None)
-            self.emit(assem.OPER("addi `d0,`s0," + str(stmt.right_exp.value) + "\n",temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(PLUS,CONST (i),e1))
-        if (stmt.op == tree.BINOP.PLUS) and isinstance(stmt.left_exp, tree.CONST):            
-            src = temp.TempList(self.munch_exp(stmt.right_exp), None)
-            self.emit(assem.OPER("addi `d0,`s0," + str(stmt.left_exp.value) + "\n",temp.TempList(r, None), src))
-            return r            
-
-
-        # munch_exp(BINOP(PLUS,e1,e2))
-        if (stmt.op == tree.BINOP.PLUS):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("add `d0,`s0,`s1\n", temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(MUL,e1,e2))
-        if (stmt.op == tree.BINOP.MUL):
-            src = temp.TempList(self.munch_exp(stmt.left), temp.TempList(self.munch_exp(stmt.right), None))
-            self.emit(assem.OPER("mul `d0,`s0,`s1\n",temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(DIV,e1,e2))
-        if (stmt.op == tree.BINOP.DIV):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("div `s0,`s1\nmflo `d0\n", temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(SUB,e1,CONST(i)))
-        if (stmt.op == tree.BINOP.MINUS) and isinstance(stmt.right_exp, tree.CONST):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("sub `d0,`s0,`s1\n", temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(SUB,e1,e2))
-        if (stmt.op == tree.BINOP.MINUS):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("sub `d0,`s0, `s1\n", temp.TempList(r, None), src))
-            return r
-
-        # munch_exp(BINOP(AND,e1,e2))
-        if (stmt.binop == tree.BINOP.AND):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("and `d0,`s0, `s1\n", temp.TempList(r, None), src))
-            return r
-        
-        # munch_exp(BINOP(OR,e1,e2))
-        if (stmt.op == tree.BINOP.OR):
-            src = temp.TempList(self.munch_exp(stmt.left_exp), temp.TempList(self.munch_exp(stmt.right_exp), None))
-            self.emit(assem.OPER("or `d0,`s0, `s1\n", temp.TempList(r, None), src))
-            return r
-        
+    def emit_set_and_branch(self, node: tree.CJUMP, tile: Tile, operands: list, dest: temp.Temp) -> temp.Temp:
+        #CJUMP(LT or GE, e, CONST k): slti into a scratch temp and branch on it.
+        flag: temp.Temp = temp.Temp()
+        self.emit(assem.OPER("slti `d0,`s0," + str(operands[1][1]) + "\n", temp.TempArray([flag]),
+                             temp.TempArray([self.reduce(operands[0][1])])))
+        self.emit(assem.OPER(tile.template, None, temp.TempArray([flag]), temp.LabelArray([node.if_true, node.if_false])))
         return None
 
+    def build_tiles() -> dict:
+        REG = Codegen.REG
+        STM = Codegen.STM
+        R = Codegen.REG_LEAF
+        IMM = Codegen.IMM
+        NEGIMM = Codegen.NEGIMM
+        PLUS = tree.BINOP.PLUS
+        MINUS = tree.BINOP.MINUS
+        rows: List[Tile] = []
+
+        #Arithmetic with an immediate operand, then register to register.
+        for op, mnemonic, leaf, commutes in [(PLUS, "addi", IMM, True), (tree.BINOP.AND, "andi", Codegen.UIMM, True),
+                                             (tree.BINOP.OR, "ori", Codegen.UIMM, True), (tree.BINOP.XOR, "xori", Codegen.UIMM, True),
+                                             (tree.BINOP.LSHIFT, "sll", Codegen.SHAMT, False),
+                                             (tree.BINOP.RSHIFT, "srl", Codegen.SHAMT, False),
+                                             (tree.BINOP.ARSHIFT, "sra", Codegen.SHAMT, False),
+                                             (tree.BINOP.MUL, "sll", Codegen.POW2, True)]:
+            rows.append(Tile(REG, (tree.BINOP, op, R, leaf), mnemonic + " `d0,`s0,{0}\n"))
+            if commutes:
+                rows.append(Tile(REG, (tree.BINOP, op, leaf, R), mnemonic + " `d0,`s0,{0}\n"))
+        rows.append(Tile(REG, (tree.BINOP, MINUS, R, NEGIMM), "addi `d0,`s0,{0}\n"))
+        for op, mnemonic in [(PLUS, "add"), (MINUS, "sub"), (tree.BINOP.MUL, "mul"), (tree.BINOP.AND, "and"),
+                             (tree.BINOP.OR, "or"), (tree.BINOP.XOR, "xor"), (tree.BINOP.LSHIFT, "sllv"),
+                             (tree.BINOP.RSHIFT, "srlv"), (tree.BINOP.ARSHIFT, "srav")]:
+            rows.append(Tile(REG, (tree.BINOP, op, R, R), mnemonic + " `d0,`s0,`s1\n"))
+        rows.append(Tile(REG, (tree.BINOP, tree.BINOP.DIV, R, R), "div `s0,`s1\nmflo `d0\n"))
+
+        #Loads and stores fold the address arithmetic into their offset.
+        for address, template in [((tree.BINOP, PLUS, R, IMM), "{0}(`s0)"), ((tree.BINOP, PLUS, IMM, R), "{0}(`s0)"),
+                                  ((tree.BINOP, MINUS, R, NEGIMM), "{0}(`s0)"), (IMM, "{0}($zero)"), (R, "0(`s0)")]:
+            rows.append(Tile(REG, (tree.MEM, address), "lw `d0," + template + "\n"))
+            value: str = "`s1" if "`s0" in template else "`s0"
+            rows.append(Tile(STM, (tree.MOVE, (tree.MEM, address), R), "sw " + value + "," + template + "\n"))
+
+        rows.append(Tile(REG, Codegen.ZERO, emitter="emit_zero"))
+        rows.append(Tile(REG, IMM, "li `d0,{0}\n"))
+        rows.append(Tile(REG, Codegen.CONSTANT, "li `d0,{0}\n"))
+        rows.append(Tile(REG, Codegen.LABEL_LEAF, "la `d0,{0}\n"))
+        rows.append(Tile(REG, (tree.TEMP,), emitter="emit_temp"))
+        rows.append(Tile(REG, (tree.CALL,), emitter="emit_call"))
+
+        rows.append(Tile(STM, (tree.MOVE, Codegen.DST, Codegen.TEMP_LEAF), emitter="emit_move"))
+        rows.append(Tile(STM, (tree.MOVE, Codegen.DST, Codegen.COMPUTED), emitter="emit_move_into"))
+        rows.append(Tile(STM, (tree.EXP, R), emitter="emit_exp"))
+        rows.append(Tile(STM, (tree.LABEL,), emitter="emit_label"))
+        rows.append(Tile(STM, (tree.JUMP, Codegen.LABEL_LEAF), "j `j0\n"))
+        rows.append(Tile(STM, (tree.JUMP, R), "jr `s0\n"))
+
+        #Compare and branch: against zero, against an immediate through slti, and between two
+        #registers (every branch but beq and bne is a two instruction pseudo-op).
+        CJUMP = tree.CJUMP
+        for rel_op, mnemonic in [(CJUMP.EQ, "beq `s0,$zero"), (CJUMP.NE, "bne `s0,$zero"), (CJUMP.LT, "bltz `s0"),
+                                 (CJUMP.GE, "bgez `s0"), (CJUMP.GT, "bgtz `s0"), (CJUMP.LE, "blez `s0")]:
+            rows.append(Tile(STM, (CJUMP, rel_op, R, Codegen.ZERO), mnemonic + ",`j0\n"))
+        rows.append(Tile(STM, (CJUMP, CJUMP.LT, R, IMM), "bne `s0,$zero,`j0\n", "emit_set_and_branch"))
+        rows.append(Tile(STM, (CJUMP, CJUMP.GE, R, IMM), "beq `s0,$zero,`j0\n", "emit_set_and_branch"))
+        for rel_op, mnemonic in [(CJUMP.EQ, "beq"), (CJUMP.NE, "bne"), (CJUMP.LT, "blt"), (CJUMP.GE, "bge"),
+                                 (CJUMP.GT, "bgt"), (CJUMP.LE, "ble"), (CJUMP.ULT, "bltu"),
+                                 (CJUMP.UGE, "bgeu"), (CJUMP.UGT, "bgtu"), (CJUMP.ULE, "bleu")]:
+            rows.append(Tile(STM, (CJUMP, rel_op, R, R), mnemonic + " `s0,`s1,`j0\n"))
+
+        tiles = {}
+        for tile in sorted(rows, key=Tile.size, reverse=True):
+            if isinstance(tile.pattern, tuple):
+                root_types = [tile.pattern[0]]
+            elif tile.pattern == Codegen.LABEL_LEAF:
+                root_types = [tree.NAME]
+            else:
+                root_types = [tree.CONST]
+            for root_type in root_types:
+                tiles.setdefault(root_type, []).append(tile)
+        return tiles
 
     def codegen(self, stmt: tree.Stm) -> assem.InstrList:
-        l: assem.InstrList
+        l: assem.InstrArray
         self.munch_stm(stmt)
         l = self.instr_list
-        self.instr_list = self.last = None
+        self.instr_list = assem.InstrArray()
+        if (len(l) == 0):
+            return None
         return l
 
 
-
-
-
-
-
-
+Codegen.tiles = Codegen.build_tiles()
 
 
 class MipsFrame(frame.Frame):
@@ -327,7 +443,7 @@ class MipsFrame(frame.Frame):
     # registers that a callee may use without preserving
     caller_saves = [T0, T1, T2, T3, T4, T5, T6, T7, T8, T9, V0, V1]
 
-    FP = temp.Temp() # virtual frame pointer (eliminated)
+    FP_TEMP = temp.Temp() # virtual frame pointer (eliminated)
 
     bad_ptr: temp.Label  = temp.Label("BADPTR")
 
@@ -364,7 +480,8 @@ class MipsFrame(frame.Frame):
                 GP: "$gp",
                 SP: "$sp",
                 S8: "$fp",
-                RA: "$ra"}
+                RA: "$ra",
+                FP_TEMP: "$fp"}
 
 
     # registers live on return
@@ -377,64 +494,68 @@ class MipsFrame(frame.Frame):
 
     spilling: bool = True
 
-    functions = {}
-
     labels = {}
 
-    word_size = 4
+    WORD_SIZE = 4
+
+    #Escapes of the characters of a string literal, octal for those below ' ' or past '~'
+    escapes: Dict[str, str] = {chr(v): "\\" + format(v, "03o") for v in [*range(32), *range(127, 256)]}
+    escapes.update({'\b': "\\b", '\t': "\\t", '\n': "\\n", '\f': "\\f", '\r': "\\r", '"': "\\\"", '\\': "\\\\"})
+
+    #Runtime support appended to every program
+    PROGRAM_TAIL: str = '\n'.join(["         .text            ", "         .globl _halloc   ", "_halloc:                  ",
+                                   "         li $v0, 9        ", "         syscall          ", "         j $ra            ",
+                                   "                          ", "         .text            ", "         .globl _printint ",
+                                   "_printint:                ", "         li $v0, 1        ", "         syscall          ",
+                                   "         la $a0, newl     ", "         li $v0, 4        ", "         syscall          ",
+                                   "         j $ra            ", "                          ", "         .data            ",
+                                   "         .align   0       ", "newl:    .asciiz \"\\n\"  ", "         .data            ",
+                                   "         .align   0       ", "str_er:  .asciiz \" ERROR: abnormal termination\\n\" ",
+                                   "                          ", "         .text            ", "         .globl _error    ",
+                                   "_error:                   ", "         li $v0, 4        ", "         la $a0, str_er   ",
+                                   "         syscall          ", "         li $v0, 10       ", "         syscall          "]) + "\n"
 
     def __init__(self, symbol: Symbol = None, formal_list: BoolList = None):
         self.offset :int = 0
         self.max_arg_offset :int = 0
+        self.name: temp.Label = None
+        self.actuals: List[frame.Access] = []
+        self.formals: List[frame.Access] = []
         if (symbol is not None) and (formal_list is not None):
-            count = MipsFrame.functions.get(symbol.to_string())
+            functions = CompilationContext.current().frame_functions
+            count = functions.get(symbol.to_string())
 
             if count is None:
                 count = 0
-                self.name = temp.Label(symbol)
+                self.name = temp.Label(symbol=symbol)
             else:
                 count += 1 
                 self.name = temp.Label(symbol.to_string() + "." + str(count))
             
-            MipsFrame.functions[symbol.to_string()] = count
-            self.actuals = List[frame.Access]
-            self.formals = List[frame.Access]
+            functions[symbol.to_string()] = count
 
+            #The first formals come in the argument registers and the rest in the caller's frame.
             offset :int = 0
-            if len(formal_list.list) == 0:
-                return None
-            
             escapes = iter(formal_list.list)
-            escape = next(escapes)
-            self.formals.append(self.alloc_local(escape))
-            self.actuals.append(InReg(MipsFrame.V0))
-
-            for i in range(len(self.arg_regs)):
-                try:
-                    escape = next(escapes)
-                except StopIteration:
-                    break
-            
-            offset += self.word_size
-            self.actuals.append(InReg(self.arg_regs[i]))
-
-            if escape:
-                self.formals.append(InFrame(offset))
-            else:
-                self.formals.append(InReg(temp.Temp()))
-            
-            try:
-                while True:
-                    escape = next(escapes)
-                    offset += MipsFrame.word_size
-                    actual = InFrame(offset)
-                    self.actuals.append(actual)
-                    if escape:
-                        self.formals.append(actual)
-                    else:
-                        self.formals.append(InReg(temp.Temp()))                    
-            except StopIteration:
-                return None
+            for arg_reg in self.arg_regs:
+                escape = next(escapes, None)
+                if escape is None:
+                    return None
+                offset += MipsFrame.WORD_SIZE
+                self.actuals.append(InReg(arg_reg))
+                if escape:
+                    self.formals.append(InFrame(offset))
+                else:
+                    self.formals.append(InReg(temp.Temp()))
+
+            for escape in escapes:
+                offset += MipsFrame.WORD_SIZE
+                actual = InFrame(offset)
+                self.actuals.append(actual)
+                if escape:
+                    self.formals.append(actual)
+                else:
+                    self.formals.append(InReg(temp.Temp()))
 
     def new_frame(self, symbol: Symbol, formal_list: BoolList) -> frame.Frame:
         if (self.name is not None):
@@ -445,17 +566,18 @@ class MipsFrame(frame.Frame):
 
     def alloc_local(self, escape: bool) -> frame.Access:
         if escape:
-            result = InFrame(self.offset)
-            self.offset -= MipsFrame.word_size
-            return result
+            #Locals and spills go below $fp. The word at $fp and those above it hold this and the
+            #formals that the caller passed in its frame.
+            self.offset -= MipsFrame.WORD_SIZE
+            return InFrame(self.offset)
         else:
             return InReg(temp.Temp())
 
     def FP(self) -> temp.Temp:
-        return MipsFrame.FP
+        return MipsFrame.FP_TEMP
 
     def  word_size(self) -> int:
-        return MipsFrame.word_size
+        return MipsFrame.WORD_SIZE
 
     def external_call(self, func:str, args: List[tree.Exp]) -> tree.Exp:
         label: temp.Label = self.labels.get(func)
@@ -474,39 +596,13 @@ class MipsFrame(frame.Frame):
         return MipsFrame.V0
 
     def string(self, label: temp.Label, str_value: str) -> str:
-        length = len(str_value)
-        lit: str = ""
-        for i in range(length):
-            c = str_value[i]
-            match c:
-                case '\b':
-                    lit += "\\b"
-
-                case '\t':
-                    lit += "\\t"
-
-                case '\n':
-                    lit += "\\n"
-
-                case '\f':
-                    lit += "\\f"
-
-                case '\r':
-                    lit += "\\r"
-                
-                case '\"':
-                    lit += "\\\""
-
-                case '\\':
-                    lit += "\\\\"
-
-                case __:
-                    if (c < ' ' or c > '~'):
-                        v: int = ord(c)
-                        lit += "\\" + ((v >> 6) & 7) + ((v >> 3) & 7) + (v & 7)
-                    else:
-                        lit += c
-        return "\t.data\n\t.word " + str(length) + "\n" + label.to_string() + ":\t.asciiz\t\"" + lit + "\""
+        escapes: Dict[str, str] = MipsFrame.escapes
+        lit: str = "".join([escapes.get(c, c) if c <= "\xff" else MipsFrame.escape(c) for c in str_value])
+        return "".join(["\t.data\n\t.word ", str(len(str_value)), "\n", label.to_string(), ":\t.asciiz\t\"", lit, "\""])
+
+    def escape(c: str) -> str:
+        #Octal escapes of the UTF-8 bytes of a character past \xff
+        return "".join(["\\" + format(byte, "03o") for byte in c.encode("utf-8")])
 
     def bad_ptr(self) -> temp.Label:
         MipsFrame.bad_ptr
@@ -515,17 +611,17 @@ class MipsFrame(frame.Frame):
         MipsFrame.bad_sub
 
     def temp_map(self, temp: temp.Temp) -> str:
-        MipsFrame.tmp_map.get(temp)
+        return MipsFrame.tmp_map.get(temp)
 
     def codegen(self, stmts: List[tree.Stm]) -> List[assem.Instr]:
         code_gen = Codegen(self)
-        frame_assem_list = List[assem.Instr]
+        frame_assem_list: List[assem.Instr] = []
         instr_list: assem.InstrList = None
         
         for stmt in stmts:
             instr_list = code_gen.codegen(stmt)
-            for instr in instr_list.to_list():
-                frame_assem_list.append(instr)
+            if instr_list is not None:
+                frame_assem_list.extend(instr_list.to_list())
 
         return frame_assem_list
 
@@ -542,62 +638,78 @@ class MipsFrame(frame.Frame):
         index = 0        
         #assign formals
         for (formal, actual) in zip(self.formals, self.actuals):
-            body.insert(index, tree.MOVE(formal.exp(tree.TEMP(MipsFrame.FP)), actual.exp(tree.TEMP(MipsFrame.FP))))
+            body.insert(index, tree.MOVE(formal.exp(tree.TEMP(MipsFrame.FP_TEMP)), actual.exp(tree.TEMP(MipsFrame.FP_TEMP))))
             index += 1
 
         #assign callees
         for i in range(len(MipsFrame.callee_saves)):
             access: frame.Access = self.alloc_local(not MipsFrame.spilling) 
-            body.insert(i, tree.MOVE(access.exp(tree.TEMP(MipsFrame.FP)), tree.TEMP(MipsFrame.callee_saves[i])))
-            body.append(tree.MOVE(access.exp(tree.TEMP(MipsFrame.callee_saves[i])), tree.TEMP(MipsFrame.FP)))
-
+            body.insert(i, tree.MOVE(access.exp(tree.TEMP(MipsFrame.FP_TEMP)), tree.TEMP(MipsFrame.callee_saves[i])))
+            body.append(tree.MOVE(tree.TEMP(MipsFrame.callee_saves[i]), access.exp(tree.TEMP(MipsFrame.FP_TEMP))))
 
-    def OPER(assem: str, dest: List[temp.Temp], src: List[temp.Temp]) -> assem.Instr:
-        dest_list = temp.TempList()
-        for d in dest:
-            dest_list.add_tail(d)
 
-        src_list = temp.TempList()
-        for s in src:
-            src_list.add_tail(s)
-
-        return tree.OPER(assem, dest_list, src_list)
+    def OPER(assem_str: str, dest: List[temp.Temp], src: List[temp.Temp]) -> assem.Instr:
+        dest_list: temp.TempList = temp.TempArray(list(dest)) if dest else None
+        src_list: temp.TempList = temp.TempArray(list(src)) if src else None
+        return assem.OPER(assem_str, dest_list, src_list)
 
     def proc_entry_exit2(self, body: List[assem.Instr]) -> None:
         body.append(MipsFrame.OPER("#\treturn", None, MipsFrame.return_sink))
 
     def proc_entry_exit3(self, body: List[assem.Instr]) -> None:
         frame_size = self.max_arg_offset - self.offset
-        index = 0
-        body.insert(index, MipsFrame.OPER("\t.text", None, None))
-        index +=1
-        body.insert(index, MipsFrame.OPER(self.name.to_string() + ":", None, None))
-        index +=1
-        body.insert(index, MipsFrame.OPER(self.name.to_string() + "_framesize=" + str(frame_size), None, None))
-        index +=1
+        prologue: List[assem.Instr] = [MipsFrame.OPER("\t.text", None, None),
+                                       MipsFrame.OPER(self.name.to_string() + ":", None, None),
+                                       MipsFrame.OPER(self.name.to_string() + "_framesize=" + str(frame_size), None, None)]
+        epilogue: List[assem.Instr] = []
         if (frame_size != 0):
-            body.insert(index, MipsFrame.OPER("\tsubu $sp " + self.name.to_string() + "_framesize", [MipsFrame.SP], [MipsFrame.SP]))
-            index +=1
-            body.insert(index, MipsFrame.OPER("\taddu $sp " + self.name.to_string() + "_framesize", [MipsFrame.SP], [MipsFrame.SP]))
-            index +=1
-        body.add(index, MipsFrame.OPER("\tj $ra", None, [MipsFrame.RA]))
+            prologue.append(MipsFrame.OPER("\tsubu $sp " + self.name.to_string() + "_framesize", [MipsFrame.SP], [MipsFrame.SP]))
+            epilogue.append(MipsFrame.OPER("\taddu $sp " + self.name.to_string() + "_framesize", [MipsFrame.SP], [MipsFrame.SP]))
+        epilogue.append(MipsFrame.OPER("\tj $ra", None, [MipsFrame.RA]))
+        body[0:0] = prologue
+        body.extend(epilogue)
 
     def registers(self) -> List[temp.Temp]:
-        return MipsFrame.caller_saves + MipsFrame.callee_saves + MipsFrame.arg_regs + MipsFrame.special_regs
+        #Registers the allocator may hand out, in order of preference; the special ones are
+        #only ever precolored.
+        return MipsFrame.caller_saves + MipsFrame.callee_saves + MipsFrame.arg_regs
 
     def spill(self, insns: List[assem.Instr], spills: List[temp.Temp]) -> None:
-        pass
+        #Every spilled temp gets a frame slot. An instruction that uses or defines one works on
+        #a new temp instead, loaded from the slot right before it and stored right after it.
+        slots = {spilled: self.alloc_local(True) for spilled in spills}
+        fp: temp.Temp = MipsFrame.FP_TEMP
+        rewritten: List[assem.Instr] = []
+        for instr in insns:
+            used: List[temp.Temp] = [t for t in MipsFrame.temps(instr.use()) if t in slots]
+            defined: List[temp.Temp] = [t for t in MipsFrame.temps(instr.deff()) if t in slots]
+            if not used and not defined:
+                rewritten.append(instr)
+                continue
+            renamed = {t: temp.Temp() for t in used + defined}
+            for t in dict.fromkeys(used):
+                rewritten.append(MipsFrame.OPER("lw `d0," + str(slots[t].offset) + "(`s0)\n", [renamed[t]], [fp]))
+            if isinstance(instr, assem.MOVE):
+                rewritten.append(assem.MOVE(instr.assem, renamed.get(instr.dest, instr.dest), renamed.get(instr.src, instr.src)))
+            else:
+                rewritten.append(assem.OPER(instr.assem,
+                                            MipsFrame.renamed(instr.deff(), renamed), MipsFrame.renamed(instr.use(), renamed),
+                                            instr.jumps().labels if instr.jumps() is not None else None))
+            for t in dict.fromkeys(defined):
+                rewritten.append(MipsFrame.OPER("sw `s0," + str(slots[t].offset) + "(`s1)\n", None, [renamed[t], fp]))
+        insns[:] = rewritten
+
+    def temps(temp_list: temp.TempList) -> List[temp.Temp]:
+        return ArrayList.elements(temp_list)
+
+    def renamed(temp_list: temp.TempList, renamed: dict) -> temp.TempList:
+        if temp_list is None:
+            return None
+        return temp.TempArray([renamed.get(t, t) for t in MipsFrame.temps(temp_list)])
 
     def program_tail(self) -> str:
-        tail_list = ["         .text            ", "         .globl _halloc   ", "_halloc:                  ",
-                     "         li $v0, 9        ", "         syscall          ", "         j $ra            ",
-                     "                          ", "         .text            ", "         .globl _printint ",
-                     "_printint:                ", "         li $v0, 1        ", "         syscall          ",
-                     "         la $a0, newl     ", "         li $v0, 4        ", "         syscall          ",
-                     "         j $ra            ", "                          ", "         .data            ",
-                     "         .align   0       ", "newl:    .asciiz \"\\n\"  ", "         .data            ",
-                     "         .align   0       ", "str_er:  .asciiz \" ERROR: abnormal termination\\n\" "   , #verificar
-                     "                          ", "         .text            ", "         .globl _error    ",
-                     "_error:                   ", "         li $v0, 4        ", "         la $a0, str_er   ",
-                     "         syscall          ", "         li $v0, 10       ", "         syscall          "]
-        return '\n'.join(tail_list) + "\n"
\ No newline at end of file
+        return MipsFrame.PROGRAM_TAIL
+
+#The machine registers are the same temps in every process.
+for index, register in enumerate(MipsFrame.tmp_map):
+    register.share("mips." + str(index))
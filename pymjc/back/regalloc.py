@@ -1,34 +1,455 @@
 from __future__ import annotations
 from abc import abstractmethod
+import bisect
+import heapq
 import sys
-from typing import Set
+from typing import Dict, List, Set, Tuple
 from pymjc.back import assem, flowgraph, graph
+from pymjc.context import CompilationContext
 from pymjc.front import frame, temp
+from pymjc.front.arraylist import ArrayList
 
 
 class RegAlloc (temp.TempMap):
-    def __init__(self, frame: frame.Frame, instr_list: assem.InstrList):
+    def __init__(self, frame: frame.Frame, instr_list: assem.InstrList, linear_scan: bool = False):
         self.frame: frame.Frame = frame
         self.instrs: assem.InstrList = instr_list
-        #TODO
+        #With linear_scan, registers are given out over live intervals in instruction order
+        #instead of by coloring the interference graph.
+        self.linear_scan: bool = linear_scan
+        self.color: temp.TempMap = None
+
+        #Spilled temps over every round, rounds of liveness and coloring, moves coalesced away
+        self.number_of_spills: int = 0
+        self.rounds: int = 0
+        self.number_of_coalesced_moves: int = 0
+
+        registers: temp.TempArray = temp.TempArray(list(frame.registers()))
+        instrs: List[assem.Instr] = instr_list.to_list() if instr_list is not None else []
+        while True:
+            self.rounds += 1
+            flow: flowgraph.BlockFlowGraph = flowgraph.BlockFlowGraph(assem.InstrArray(instrs) if instrs else None)
+            if linear_scan:
+                self.color = LinearScan(Liveness(flow, False), frame, registers)
+            else:
+                self.color = Color(Liveness(flow), frame, registers)
+            spills: temp.TempList = self.color.spills()
+            if spills is None:
+                break
+            self.number_of_spills += len(spills)
+            frame.spill(instrs, spills.to_list())
+
+        #Moves between temps of the same register are gone once the temps are replaced.
+        kept: List[assem.Instr] = []
+        for instr in instrs:
+            if (isinstance(instr, assem.MOVE) and self.temp_map(instr.dest) == self.temp_map(instr.src)):
+                continue
+            kept.append(instr)
+        self.number_of_coalesced_moves = len(instrs) - len(kept)
+        self.instrs = assem.InstrArray(kept) if kept else None
 
     def temp_map(self, temp: temp.Temp) -> str:
-        #TODO
-        return temp.to_string()
+        return self.color.temp_map(temp)
     
 
 class Color(temp.TempMap):
+
+    #Iterated register coalescing (George and Appel). Nodes are the interference nodes by key,
+    #interference is kept both as an adjacency bit-matrix (a set of pairs past MATRIX_LIMIT
+    #nodes) for the membership tests and as adjacency lists for the walks, and every worklist
+    #is a set, so moving a node or a move between them is O(1).
+    MATRIX_LIMIT: int = 8192
+
+    #Move states
+    WORKLIST: int = 0
+    ACTIVE: int = 1
+    COALESCED: int = 2
+    CONSTRAINED: int = 3
+    FROZEN: int = 4
+
     def __init__(self, ig: InterferenceGraph, initial: temp.TempMap, registers: temp.TempList):
-        #TODO
-        pass
-    
+        self.ig: InterferenceGraph = ig
+        self.initial: temp.TempMap = initial
+        #<Temp, register name> once colored
+        self.color_table: Dict[temp.Temp, str] = {}
+        self.nodes: List[graph.Node] = list(ArrayList.elements(ig.nodes()))
+        number_of_nodes: int = len(self.nodes)
+
+        #Register names in order of preference
+        self.registers: List[str] = [initial.temp_map(register) for register in ArrayList.elements(registers)]
+        self.K: int = len(self.registers)
+
+        #Color of each node, precolored ones from the initial map
+        self.colors: List[str] = [initial.temp_map(ig.gtemp(node)) for node in self.nodes]
+        self.precolored: List[bool] = [color is not None for color in self.colors]
+
+        self.adj_matrix: bytearray = None
+        self.adj_set: Set[int] = None
+        if (number_of_nodes <= Color.MATRIX_LIMIT):
+            self.adj_matrix = bytearray((number_of_nodes * number_of_nodes + 7) // 8)
+        else:
+            self.adj_set = set()
+        self.adj_list: List[List[int]] = [[] for _ in range(number_of_nodes)]
+        #Precolored nodes have infinite degree.
+        self.degree: List[int] = [sys.maxsize if precolored else 0 for precolored in self.precolored]
+        self.alias: List[int] = list(range(number_of_nodes))
+
+        self.moves: List[Tuple[int, int]] = []
+        self.move_state: List[int] = []
+        self.move_list: List[List[int]] = [[] for _ in range(number_of_nodes)]
+
+        self.simplify_worklist: Set[int] = set()
+        self.freeze_worklist: Set[int] = set()
+        self.spill_worklist: Set[int] = set()
+        self.worklist_moves: Set[int] = set()
+        self.spilled_nodes: List[int] = []
+        self.coalesced_nodes: Set[int] = set()
+        self.select_stack: List[int] = []
+        self.on_stack: bytearray = bytearray(number_of_nodes)
+
+        self.build()
+        self.make_worklist()
+        while (self.simplify_worklist or self.worklist_moves or self.freeze_worklist or self.spill_worklist):
+            if self.simplify_worklist:
+                self.simplify()
+            elif self.worklist_moves:
+                self.coalesce()
+            elif self.freeze_worklist:
+                self.freeze()
+            else:
+                self.select_spill()
+        self.assign_colors()
+
+    def number_of_coalesced_moves(self) -> int:
+        return self.move_state.count(Color.COALESCED)
+
+    def adjacent(self, u: int, v: int) -> bool:
+        if (self.adj_matrix is not None):
+            bit: int = u * len(self.nodes) + v
+            return self.adj_matrix[bit >> 3] & (1 << (bit & 7)) != 0
+        return u * len(self.nodes) + v in self.adj_set
+
+    def add_edge(self, u: int, v: int) -> None:
+        if (u == v or self.adjacent(u, v)):
+            return
+        number_of_nodes: int = len(self.nodes)
+        for bit in (u * number_of_nodes + v, v * number_of_nodes + u):
+            if (self.adj_matrix is not None):
+                self.adj_matrix[bit >> 3] |= 1 << (bit & 7)
+            else:
+                self.adj_set.add(bit)
+        if not self.precolored[u]:
+            self.adj_list[u].append(v)
+            self.degree[u] += 1
+        if not self.precolored[v]:
+            self.adj_list[v].append(u)
+            self.degree[v] += 1
+
+    def build(self) -> None:
+        #Precolored temps of the same register are one node.
+        registers: Dict[str, int] = {}
+        for n, color in enumerate(self.colors):
+            if (color is not None):
+                first: int = registers.setdefault(color, n)
+                if (first != n):
+                    self.alias[n] = first
+                    self.coalesced_nodes.add(n)
+
+        for u, v in self.ig.edges():
+            self.add_edge(self.get_alias(u), self.get_alias(v))
+
+        move_list: MoveList = self.ig.moves()
+        while(move_list is not None):
+            index: int = len(self.moves)
+            src: int = self.get_alias(move_list.src.my_key)
+            dst: int = self.get_alias(move_list.dst.my_key)
+            self.moves.append((src, dst))
+            self.move_state.append(Color.WORKLIST)
+            self.move_list[src].append(index)
+            self.move_list[dst].append(index)
+            self.worklist_moves.add(index)
+            move_list = move_list.tail
+
+    def make_worklist(self) -> None:
+        for n in range(len(self.nodes)):
+            if self.precolored[n]:
+                continue
+            if (self.degree[n] >= self.K):
+                self.spill_worklist.add(n)
+            elif self.move_related(n):
+                self.freeze_worklist.add(n)
+            else:
+                self.simplify_worklist.add(n)
+
+    def adjacent_nodes(self, n: int) -> List[int]:
+        return [m for m in self.adj_list[n] if not self.on_stack[m] and m not in self.coalesced_nodes]
+
+    def node_moves(self, n: int) -> List[int]:
+        return [m for m in self.move_list[n] if self.move_state[m] <= Color.ACTIVE]
+
+    def move_related(self, n: int) -> bool:
+        for m in self.move_list[n]:
+            if self.move_state[m] <= Color.ACTIVE:
+                return True
+        return False
+
+    def simplify(self) -> None:
+        n: int = self.simplify_worklist.pop()
+        self.select_stack.append(n)
+        self.on_stack[n] = 1
+        for m in self.adjacent_nodes(n):
+            self.decrement_degree(m)
+
+    def decrement_degree(self, m: int) -> None:
+        d: int = self.degree[m]
+        self.degree[m] = d - 1
+        if (d == self.K):
+            self.enable_moves(m)
+            for n in self.adjacent_nodes(m):
+                self.enable_moves(n)
+            self.spill_worklist.discard(m)
+            if self.move_related(m):
+                self.freeze_worklist.add(m)
+            else:
+                self.simplify_worklist.add(m)
+
+    def enable_moves(self, n: int) -> None:
+        for m in self.move_list[n]:
+            if self.move_state[m] == Color.ACTIVE:
+                self.move_state[m] = Color.WORKLIST
+                self.worklist_moves.add(m)
+
+    def get_alias(self, n: int) -> int:
+        while n in self.coalesced_nodes:
+            n = self.alias[n]
+        return n
+
+    def add_work_list(self, u: int) -> None:
+        if (not self.precolored[u] and not self.move_related(u) and self.degree[u] < self.K):
+            self.freeze_worklist.discard(u)
+            self.simplify_worklist.add(u)
+
+    def ok(self, t: int, r: int) -> bool:
+        return self.degree[t] < self.K or self.precolored[t] or self.adjacent(t, r)
+
+    def conservative(self, nodes: List[int]) -> bool:
+        k: int = 0
+        for n in set(nodes):
+            if self.degree[n] >= self.K:
+                k += 1
+        return k < self.K
+
+    def coalesce(self) -> None:
+        m: int = self.worklist_moves.pop()
+        x: int = self.get_alias(self.moves[m][0])
+        y: int = self.get_alias(self.moves[m][1])
+        if self.precolored[y]:
+            u, v = y, x
+        else:
+            u, v = x, y
+
+        if (u == v):
+            self.move_state[m] = Color.COALESCED
+            self.add_work_list(u)
+        elif (self.precolored[v] or self.adjacent(u, v)):
+            self.move_state[m] = Color.CONSTRAINED
+            self.add_work_list(u)
+            self.add_work_list(v)
+        elif ((self.precolored[u] and all(self.ok(t, u) for t in self.adjacent_nodes(v)))
+              or (not self.precolored[u] and self.conservative(self.adjacent_nodes(u) + self.adjacent_nodes(v)))):
+            self.move_state[m] = Color.COALESCED
+            self.combine(u, v)
+            self.add_work_list(u)
+        else:
+            self.move_state[m] = Color.ACTIVE
+
+    def combine(self, u: int, v: int) -> None:
+        if v in self.freeze_worklist:
+            self.freeze_worklist.remove(v)
+        else:
+            self.spill_worklist.discard(v)
+        self.coalesced_nodes.add(v)
+        self.alias[v] = u
+        self.move_list[u].extend(self.move_list[v])
+        self.enable_moves(v)
+        for t in self.adjacent_nodes(v):
+            self.add_edge(t, u)
+            self.decrement_degree(t)
+        if (self.degree[u] >= self.K and u in self.freeze_worklist):
+            self.freeze_worklist.remove(u)
+            self.spill_worklist.add(u)
+
+    def freeze(self) -> None:
+        u: int = self.freeze_worklist.pop()
+        self.simplify_worklist.add(u)
+        self.freeze_moves(u)
+
+    def freeze_moves(self, u: int) -> None:
+        for m in self.node_moves(u):
+            x, y = self.moves[m]
+            if (self.get_alias(y) == self.get_alias(u)):
+                v: int = self.get_alias(x)
+            else:
+                v: int = self.get_alias(y)
+            self.move_state[m] = Color.FROZEN
+            if (not self.precolored[v] and not self.node_moves(v) and self.degree[v] < self.K):
+                self.freeze_worklist.discard(v)
+                self.simplify_worklist.add(v)
+
+    def select_spill(self) -> None:
+        #Cheapest to spill: fewest uses and defs for the most interference.
+        m: int = min(self.spill_worklist, key=lambda n: (self.ig.spill_cost(self.nodes[n]) / self.degree[n], n))
+        self.spill_worklist.remove(m)
+        self.simplify_worklist.add(m)
+        self.freeze_moves(m)
+
+    def assign_colors(self) -> None:
+        while self.select_stack:
+            n: int = self.select_stack.pop()
+            used: Set[str] = set()
+            for w in self.adj_list[n]:
+                a: int = self.get_alias(w)
+                if self.colors[a] is not None:
+                    used.add(self.colors[a])
+            for register in self.registers:
+                if register not in used:
+                    self.colors[n] = register
+                    break
+            else:
+                self.spilled_nodes.append(n)
+        for n in self.coalesced_nodes:
+            self.colors[n] = self.colors[self.get_alias(n)]
+        for n, node in enumerate(self.nodes):
+            self.color_table[self.ig.gtemp(node)] = self.colors[n]
+
+    def spills(self) -> temp.TempList:
+        if not self.spilled_nodes:
+            return None
+        return temp.TempArray([self.ig.gtemp(self.nodes[n]) for n in self.spilled_nodes])
+
+    def temp_map(self, temp: temp.Temp) -> str:
+        color: str = self.color_table.get(temp)
+        if (color is None):
+            return self.initial.temp_map(temp)
+        return color
+
+class LinearScan(temp.TempMap):
+
+    #Linear scan (Poletto and Sarkar) over the instruction order of the flow graph. Instruction
+    #i has two points: 2i where its uses and live-in temps are, 2i + 1 where its defs and
+    #live-out temps are. A temp lives over the interval from its first point to its last one.
+    #Precolored temps are kept as bitsets of the points where each register is taken, so that
+    #a temp only gets a register whose bitset is clear over its whole interval.
+    def __init__(self, live: Liveness, initial: temp.TempMap, registers: temp.TempList):
+        self.live: Liveness = live
+        self.initial: temp.TempMap = initial
+        #<Temp, register name> once allocated
+        self.color_table: Dict[temp.Temp, str] = {}
+        self.spilled: List[temp.Temp] = []
+
+        self.registers: List[str] = [initial.temp_map(register) for register in ArrayList.elements(registers)]
+        self.allocatable: Set[str] = set(self.registers)
+
+        number_of_temps: int = len(live.temps)
+        self.start: List[int] = [-1] * number_of_temps
+        self.end: List[int] = [-1] * number_of_temps
+        #<register name, bitset of points>
+        self.busy: Dict[str, int] = {}
+        #Temps each temp is moved to or from, by number
+        self.partners: List[List[int]] = [[] for _ in range(number_of_temps)]
+        self.build_intervals()
+        self.allocate()
+
+    def build_intervals(self) -> None:
+        live: Liveness = self.live
+        points: List[int] = []
+        for index in range(len(live.instrs)):
+            points.append(live.in_bits[index] | live.gen_bits[index])
+            points.append(live.out_bits[index] | live.kill_bits[index])
+
+        seen: int = 0
+        for point, bits in enumerate(points):
+            for index in Liveness.members(bits & ~seen):
+                self.start[index] = point
+            seen |= bits
+        seen = 0
+        for point in range(len(points) - 1, -1, -1):
+            bits: int = points[point]
+            for index in Liveness.members(bits & ~seen):
+                self.end[index] = point
+            seen |= bits
+
+        for instr in live.instrs:
+            if isinstance(instr, assem.MOVE):
+                src: int = live.temp_index[instr.use().head]
+                dst: int = live.temp_index[instr.deff().head]
+                self.partners[src].append(dst)
+                self.partners[dst].append(src)
+
+        precolored: int = 0
+        for index, t in enumerate(live.temps):
+            if (self.initial.temp_map(t) is not None):
+                precolored |= 1 << index
+        for point, bits in enumerate(points):
+            for index in Liveness.members(bits & precolored):
+                register: str = self.initial.temp_map(live.temps[index])
+                self.busy[register] = self.busy.get(register, 0) | 1 << point
+
+    def is_free(self, register: str, index: int) -> bool:
+        start: int = self.start[index]
+        mask: int = ((1 << (self.end[index] - start + 1)) - 1) << start
+        return self.busy.get(register, 0) & mask == 0
+
+    def allocate(self) -> None:
+        temps: List[temp.Temp] = self.live.temps
+        order: List[int] = sorted((index for index, t in enumerate(temps) if self.initial.temp_map(t) is None),
+                                  key=lambda index: (self.start[index], index))
+        #Intervals holding a register, as (end, temp number) sorted by end
+        active: List[Tuple[int, int]] = []
+        taken: Dict[str, int] = {}
+        for index in order:
+            start: int = self.start[index]
+            while active and active[0][0] < start:
+                _end, expired = active.pop(0)
+                del taken[self.color_table[temps[expired]]]
+
+            #A register the temp is moved to or from comes first, so that the move goes away.
+            register: str = None
+            hints: List[str] = [self.temp_map(temps[partner]) for partner in self.partners[index]]
+            for candidate in hints + self.registers:
+                if candidate in self.allocatable and candidate not in taken and self.is_free(candidate, index):
+                    register = candidate
+                    break
+
+            if register is None:
+                #Spill whichever ends last, this interval or one holding a register it could use.
+                victim: Tuple[int, int] = None
+                for entry in reversed(active):
+                    if entry[0] > self.end[index] and self.is_free(self.color_table[temps[entry[1]]], index):
+                        victim = entry
+                        break
+                if victim is None:
+                    self.spilled.append(temps[index])
+                    continue
+                active.remove(victim)
+                register = self.color_table.pop(temps[victim[1]])
+                self.spilled.append(temps[victim[1]])
+
+            self.color_table[temps[index]] = register
+            taken[register] = index
+            bisect.insort(active, (self.end[index], index))
+
     def spills(self) -> temp.TempList:
-        #TODO
-        return None
+        if not self.spilled:
+            return None
+        return temp.TempArray(list(self.spilled))
 
     def temp_map(self, temp: temp.Temp) -> str:
-        #TODO
-        return temp.to_string()
+        color: str = self.color_table.get(temp)
+        if (color is None):
+            return self.initial.temp_map(temp)
+        return color
+
 
 class InterferenceGraph(graph.Graph):
     
@@ -50,18 +471,41 @@ class InterferenceGraph(graph.Graph):
 
 class Liveness (InterferenceGraph):
 
-    def __init__(self, flow: flowgraph.FlowGraph):
-        self.live_map = {}
-        
+    def __init__(self, flow: flowgraph.FlowGraph, interference: bool = True):
+        super().__init__()
+
         #Flow Graph
         self.flowgraph: flowgraph.FlowGraph = flow
-        
-        #IN, OUT, GEN, and KILL map tables
-        #The table maps complies with: <Node, Set[Temp]>
-        self.in_node_table = {}
-        self.out_node_table = {}
-        self.gen_node_table = {}
-        self.kill_node_table = {}
+        #Flow nodes by their key, with the keys of their successors and predecessors
+        self.flow_nodes: List[graph.Node] = flow.mynodes.to_list()
+        self.succ_keys: List[List[int]] = []
+        self.pred_keys: List[List[int]] = []
+        #Instructions in order, and the index of the first one of each flow node, then one past
+        #the last one. The dataflow runs over the flow nodes, which may be basic blocks, and a
+        #sweep through each node gives the live sets of its instructions.
+        self.instrs: List[assem.Instr] = flow.instr_list()
+        self.starts: List[int] = [flow.first_instr(node) for node in self.flow_nodes] + [len(self.instrs)]
+
+        #Temps are numbered densely in order of appearance: temp_index maps each one to its
+        #number and temps is the reverse. Each temp gets the interference node of the same number.
+        self.temp_index: Dict[temp.Temp, int] = {}
+        self.temps: List[temp.Temp] = []
+
+        #IN, OUT, GEN, and KILL by instruction index and by flow node key, as bitsets of temp numbers
+        self.in_bits: List[int] = []
+        self.out_bits: List[int] = []
+        self.gen_bits: List[int] = []
+        self.kill_bits: List[int] = []
+        self.node_in_bits: List[int] = []
+        self.node_out_bits: List[int] = []
+        self.node_gen_bits: List[int] = []
+        self.node_kill_bits: List[int] = []
+
+        #Instructions using or defining each temp, by number
+        self.occurrences: List[int] = []
+
+        #Node evaluations the dataflow took to reach its fixpoint
+        self.iterations: int = 0
 
         #Util map tables
         #<Node, Temp>
@@ -74,23 +518,25 @@ class Liveness (InterferenceGraph):
 
         self.build_gen_and_kill()
         self.build_in_and_out()
-        self.build_interference_graph()
+        #Linear scan only needs the live sets.
+        if interference:
+            self.build_interference_graph()
     
     def add_ndge(self, source_node: graph.Node, destiny_node: graph.Node):
-        if (source_node is not destiny_node and not destiny_node.comes_from(source_node) and not source_node.comes_from(destiny_node)):
-            super.add_edge(source_node, destiny_node)
+        #Interference is undirected: a single edge for each pair of nodes.
+        if (source_node is not destiny_node and not self.adjacent(source_node.my_key, destiny_node.my_key)):
+            self.add_key_edge(source_node.my_key, destiny_node.my_key)
 
     def show(self, out_path: str) -> None:
         if out_path is not None:
             sys.stdout = open(out_path, 'w')   
         node_list: graph.NodeList = self.nodes()
         while(node_list is not None):
-            temp: temp.Temp = self.rev_node_table.get(node_list.head)
-            print(temp + ": [ ")
-            adjs: graph.NodeList = node_list.head.adj()
-            while(adjs is not None):
-                print(self.rev_node_table.get(adjs.head) + " ")
-                adjs = adjs.tail
+            print(self.rev_node_table.get(node_list.head).to_string() + ": [ ")
+            for adjs in (node_list.head.succ(), node_list.head.pred()):
+                while(adjs is not None):
+                    print(self.rev_node_table.get(adjs.head).to_string() + " ")
+                    adjs = adjs.tail
 
             print("]")
             node_list = node_list.tail
@@ -104,43 +550,64 @@ class Liveness (InterferenceGraph):
 
       return requested_node
 
-    def node_handler(self, node: graph.Node):
-        def_temp_list: temp.TempList = self.flowgraph.deff(node)
-        while(def_temp_list is not None):
-            got_node: graph.Node  = self.get_node(def_temp_list.head)
-
-            for live_out in self.out_node_table.get(node):
-                current_live_out = self.get_node(live_out)
-                self.add_edge(got_node, current_live_out)
-
-            def_temp_list = def_temp_list.tail
-
-  
-    def move_handler(self, node: graph.Node):
-        source_node: graph.Node  = self.get_node(self.flowgraph.use(node).head)
-        destiny_node: graph.Node = self.get_node(self.flowgraph.deff(node).head)
+    def number(self, temp_list: temp.TempList) -> int:
+        #Bitset of the temps in temp_list, numbering the new ones.
+        bits: int = 0
+        for t in ArrayList.elements(temp_list):
+            index: int = self.temp_index.get(t)
+            if (index is None):
+                index = len(self.temps)
+                self.temp_index[t] = index
+                self.temps.append(t)
+                self.occurrences.append(0)
+            self.occurrences[index] += 1
+            bits |= 1 << index
+        return bits
+
+    def members(bits: int) -> List[int]:
+        #Numbers in a bitset, lowest first.
+        digits: str = bin(bits)[:1:-1]
+        indexes: List[int] = []
+        index: int = digits.find("1")
+        while (index >= 0):
+            indexes.append(index)
+            index = digits.find("1", index + 1)
+        return indexes
+
+    def node_handler(self, index: int):
+        def_nodes: List[graph.Node] = [self.mynodes.get(number) for number in Liveness.members(self.kill_bits[index])]
+        if not def_nodes:
+            return
+        for live_out in Liveness.members(self.out_bits[index]):
+            current_live_out: graph.Node = self.mynodes.get(live_out)
+            for got_node in def_nodes:
+                self.add_ndge(got_node, current_live_out)
+
+    def move_handler(self, index: int):
+        source_node: graph.Node  = self.get_node(self.instrs[index].use().head)
+        destiny_node: graph.Node = self.get_node(self.instrs[index].deff().head)
 
         self.move_list = MoveList(source_node, destiny_node, self.move_list)
     
-        for temp in self.out_node_table.get(node):
-            got_node: graph.Node = self.get_node(temp)
-            if (got_node is not source_node ):
-                self.addEdge(destiny_node, got_node)
-
+        for live_out in Liveness.members(self.out_bits[index]):
+            got_node: graph.Node = self.mynodes.get(live_out)
+            if (got_node is not source_node):
+                self.add_ndge(destiny_node, got_node)
 
     def out(self, node: graph.Node) -> Set[temp.Temp]:
-        temp_set = self.out_node_table.get(node)
-        return temp_set
+        return {self.temps[index] for index in Liveness.members(self.node_out_bits[node.my_key])}
 
+    def live_in(self, node: graph.Node) -> Set[temp.Temp]:
+        return {self.temps[index] for index in Liveness.members(self.node_in_bits[node.my_key])}
+
+    def instr_out(self, index: int) -> Set[temp.Temp]:
+        return {self.temps[number] for number in Liveness.members(self.out_bits[index])}
 
     def tnode(self, temp:temp.Temp) -> graph.Node:
-        node: graph.Node = self.map_node_table.get(temp)
-        if (node is None ):
-            node = self.new_node()
-            self.map_node_table[temp] = node
-            self.rev_node_table[node] = temp
-        
-        return node
+        return self.get_node(temp)
+
+    def spill_cost(self, node: graph.Node) -> int:
+        return self.occurrences[node.my_key] if node.my_key < len(self.occurrences) else 1
 
     def gtemp(self, node: graph.Node) -> temp.Temp:
         temp: temp.Temp = self.rev_node_table.get(node)
@@ -150,36 +617,123 @@ class Liveness (InterferenceGraph):
         return self.move_list
 
     def build_gen_and_kill(self):
-        #TODO
-        pass
+        for instr in self.instrs:
+            self.gen_bits.append(self.number(instr.use()))
+            self.kill_bits.append(self.number(instr.deff()))
+        for key in range(len(self.flow_nodes)):
+            gen: int = 0
+            kill: int = 0
+            for index in range(self.starts[key + 1] - 1, self.starts[key] - 1, -1):
+                gen = self.gen_bits[index] | (gen & ~self.kill_bits[index])
+                kill |= self.kill_bits[index]
+            self.node_gen_bits.append(gen)
+            self.node_kill_bits.append(kill)
+        self.succ_keys = [sorted(succs) for succs in self.flowgraph.succ_sets]
+        self.pred_keys = [sorted(preds) for preds in self.flowgraph.pred_sets]
+
+        #One interference node for each temp, with the key of its number
+        for t in self.temps:
+            self.get_node(t)
+
+    def postorder(self) -> List[int]:
+        #Flow node keys in postorder of a depth first search from the entry, that is reverse
+        #postorder of the reversed graph, so that successors mostly come before their
+        #predecessors. Nodes the entry does not reach follow, in the same order.
+        number_of_nodes: int = len(self.flow_nodes)
+        visited: bytearray = bytearray(number_of_nodes)
+        order: List[int] = []
+        for root in range(number_of_nodes):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            stack: List[Tuple[int, int]] = [(root, 0)]
+            while stack:
+                key, next_succ = stack[-1]
+                succs: List[int] = self.succ_keys[key]
+                while next_succ < len(succs) and visited[succs[next_succ]]:
+                    next_succ += 1
+                if next_succ < len(succs):
+                    succ: int = succs[next_succ]
+                    stack[-1] = (key, next_succ + 1)
+                    visited[succ] = 1
+                    stack.append((succ, 0))
+                else:
+                    stack.pop()
+                    order.append(key)
+        return order
 
     def build_in_and_out(self):
-        #TODO
-        pass
+        #Backward worklist: out[n] is the union of in[s] over the successors s of n and
+        #in[n] = gen[n] | (out[n] & ~kill[n]). Nodes are taken by their place in the postorder
+        #and a node whose in changes puts its predecessors back on the list.
+        order: List[int] = self.postorder()
+        number_of_nodes: int = len(order)
+        rank: List[int] = [0] * number_of_nodes
+        for place, key in enumerate(order):
+            rank[key] = place
+
+        in_bits: List[int] = [0] * number_of_nodes
+        out_bits: List[int] = [0] * number_of_nodes
+        gen_bits: List[int] = self.node_gen_bits
+        kill_bits: List[int] = self.node_kill_bits
+        succ_keys: List[List[int]] = self.succ_keys
+        pred_keys: List[List[int]] = self.pred_keys
+        on_list: bytearray = bytearray(b"\x01") * number_of_nodes
+        worklist: List[int] = list(range(number_of_nodes))
+        iterations: int = 0
+
+        while worklist:
+            key: int = order[heapq.heappop(worklist)]
+            on_list[key] = 0
+            iterations += 1
+            live_out: int = 0
+            for succ in succ_keys[key]:
+                live_out |= in_bits[succ]
+            out_bits[key] = live_out
+            live_in: int = gen_bits[key] | (live_out & ~kill_bits[key])
+            if live_in != in_bits[key]:
+                in_bits[key] = live_in
+                for pred in pred_keys[key]:
+                    if not on_list[pred]:
+                        on_list[pred] = 1
+                        heapq.heappush(worklist, rank[pred])
+
+        self.node_in_bits = in_bits
+        self.node_out_bits = out_bits
+        self.iterations = iterations
+
+        #Backwards through the instructions of each node, from its OUT
+        self.in_bits = [0] * len(self.instrs)
+        self.out_bits = [0] * len(self.instrs)
+        for key in range(number_of_nodes):
+            live: int = out_bits[key]
+            for index in range(self.starts[key + 1] - 1, self.starts[key] - 1, -1):
+                self.out_bits[index] = live
+                live = self.gen_bits[index] | (live & ~self.kill_bits[index])
+                self.in_bits[index] = live
 
     def build_interference_graph(self):
-        #TODO
-        pass
+        for index, instr in enumerate(self.instrs):
+            if (isinstance(instr, assem.MOVE)):
+                self.move_handler(index)
+            else:
+                self.node_handler(index)
 
 class Edge():
 
-    edges_table = {}
-
-    def __init__(self):
-        super.__init__()
-    
-    def get_edge(self, origin_node: graph.Node, destiny_node: graph.Node) -> Edge:
-        
-        origin_table = Edge.edges_table.get(origin_node)
-        destiny_table = Edge.edges_table.get(destiny_node)
+    def get_edge(origin_node: graph.Node, destiny_node: graph.Node) -> Edge:
+        #Edges are kept in the table of the current compilation context.
+        edges_table = CompilationContext.current().edges_table
+        origin_table = edges_table.get(origin_node)
+        destiny_table = edges_table.get(destiny_node)
         
         if (origin_table is None):
             origin_table = {}
-            Edge.edges_table[origin_node] = origin_table
+            edges_table[origin_node] = origin_table
 
         if (destiny_table is None):
             destiny_table = {}
-            Edge.edges_table[destiny_node] = destiny_table
+            edges_table[destiny_node] = destiny_table
         
         requested_edge: Edge  = origin_table.get(destiny_node)
 
@@ -0,0 +1,68 @@
+from __future__ import annotations
+from contextvars import ContextVar, Token
+from typing import Dict
+
+
+class CompilationContext():
+
+    #Compilation active in the current thread (or asyncio task); the default context
+    #numbers everything created outside a compilation, such as the MIPS machine registers.
+    active: ContextVar = ContextVar("pymjc_compilation_context")
+
+    default: CompilationContext = None
+
+    def __init__(self, first_temp: int = None, label_prefix: str = "L"):
+        if first_temp is None:
+            first_temp = CompilationContext.default.temp_count if CompilationContext.default is not None else 0
+        self.temp_count: int = first_temp
+        self.label_count: int = 0
+        #New labels are named label_prefix followed by their number.
+        self.label_prefix: str = label_prefix
+        #Symbol intern table, keyed by name.
+        self.symbols: Dict[str, object] = {}
+        #Interference edges of regalloc.Edge, keyed by origin node and then destiny node.
+        self.edges_table: Dict[object, Dict[object, object]] = {}
+        #How many frames were created for each function name, to keep frame labels unique.
+        self.frame_functions: Dict[str, int] = {}
+        self.tokens = []
+
+    def current() -> CompilationContext:
+        return CompilationContext.active.get(CompilationContext.default)
+
+    def scope() -> CompilationContext:
+        #The active compilation, or a new one when there is none: entry points that may be called
+        #on their own never number or intern anything in the default context.
+        context: CompilationContext = CompilationContext.active.get(None)
+        return context if context is not None else CompilationContext()
+
+    def new_temp_number(self) -> int:
+        number: int = self.temp_count
+        self.temp_count += 1
+        return number
+
+    def new_label_number(self) -> int:
+        number: int = self.label_count
+        self.label_count += 1
+        return number
+
+    def fragment(self, index: int) -> CompilationContext:
+        #Context for the backend of the index-th fragment of this compilation: temps go on from
+        #here and labels carry the index, so they are the same whichever process compiles the
+        #fragment and whatever else it compiled before.
+        return CompilationContext(self.temp_count, "L" + str(index) + "_")
+
+    def activate(self) -> Token:
+        return CompilationContext.active.set(self)
+
+    def deactivate(self, token: Token) -> None:
+        CompilationContext.active.reset(token)
+
+    def __enter__(self) -> CompilationContext:
+        self.tokens.append(self.activate())
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.deactivate(self.tokens.pop())
+
+
+CompilationContext.default = CompilationContext(0)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import itertools
+
+
+class ArrayList():
+
+    #Python list seen through the head/tail accessors of the cons lists (StmList, ExpList,
+    #TempList, LabelList, InstrList, NodeList). Walking with tail creates a light view of the
+    #same items, while add_tail, get and len are O(1). An empty list has a None head, like
+    #TempList(); tail is None past the last item. Loops over every item go through elements.
+    __slots__ = ("items", "start")
+
+    def __init__(self, items: list = None, start: int = 0):
+        self.items: list = items if items is not None else []
+        self.start: int = start
+
+    @property
+    def head(self):
+        if self.start < len(self.items):
+            return self.items[self.start]
+        return None
+
+    @head.setter
+    def head(self, element) -> None:
+        if self.start < len(self.items):
+            self.items[self.start] = element
+        else:
+            self.items.append(element)
+
+    @property
+    def tail(self):
+        if self.start + 1 < len(self.items):
+            return type(self)(self.items, self.start + 1)
+        return None
+
+    @tail.setter
+    def tail(self, tail) -> None:
+        #Replaces everything after head, copying the new tail.
+        del self.items[self.start + 1:]
+        while tail is not None:
+            self.items.append(tail.head)
+            tail = tail.tail
+
+    def add_head(self, element) -> None:
+        self.items.insert(self.start, element)
+
+    def add_tail(self, element) -> None:
+        self.items.append(element)
+
+    def get(self, index: int):
+        return self.items[self.start + index]
+
+    def to_list(self) -> list:
+        return self.items[self.start:]
+
+    def __len__(self) -> int:
+        return len(self.items) - self.start
+
+    def __iter__(self):
+        return itertools.islice(self.items, self.start, None)
+
+    def elements(cons_list) -> list:
+        #Items of a cons list or an ArrayList as a python list, for loops that would otherwise
+        #build a view at every tail. The list of an ArrayList is shared, not copied.
+        if isinstance(cons_list, ArrayList):
+            return cons_list.items if cons_list.start == 0 else cons_list.to_list()
+        items: list = []
+        while cons_list is not None:
+            items.append(cons_list.head)
+            cons_list = cons_list.tail
+        return items
@@ -5,6 +5,11 @@ from pymjc.front.visitorkinds import *
 from pymjc.front import translate
 
 class Component(ABC):
+    __slots__ = ("lineno",)
+
+    def get_lineno(self) -> int:
+        return getattr(self, "lineno", 0)
+
     @abstractmethod
     def accept(self, visitor: Visitor) -> None:
         pass
@@ -18,6 +23,8 @@ class Component(ABC):
         pass
 
 class Program(Component):
+    __slots__ = ("main_class", "class_decl_list")
+
     def __init__(self, main_class: MainClass, class_decl_list: ClassDeclList):
         self.main_class = main_class
         self.class_decl_list = class_decl_list
@@ -32,6 +39,8 @@ class Program(Component):
         return visitor.visit_program(self)
 
 class MainClass(Component):
+    __slots__ = ("class_name_id", "arg_name_id", "statement")
+
     def __init__(self, class_name_id: Identifier, arg_name_id: Identifier, statement: Statement) -> None:
         self.class_name_id = class_name_id
         self.arg_name_id = arg_name_id
@@ -47,6 +56,7 @@ class MainClass(Component):
         return visitor.visit_main_class(self)
 
 class ClassDecl(Component):
+    __slots__ = ()
 
     @abstractmethod
     def accept(self, visitor: Visitor) -> None:
@@ -62,6 +72,8 @@ class ClassDecl(Component):
 
 
 class ClassDeclList():
+    __slots__ = ("class_decl_list",)
+
     def __init__(self):
         self.class_decl_list = []
     
@@ -78,6 +90,8 @@ class ClassDeclList():
       return len(self.class_decl_list)
 
 class ClassDeclExtends(ClassDecl):
+    __slots__ = ("class_name_id", "super_class_name_id", "var_decl_list", "method_decl_list")
+
     def __init__(self, class_name_id: Identifier, super_class_name_id: Identifier, var_decl_list: VarDeclList, method_decl_list: MethodDeclList):
         self.class_name_id = class_name_id
         self.super_class_name_id = super_class_name_id
@@ -95,6 +109,8 @@ class ClassDeclExtends(ClassDecl):
 
 
 class ClassDeclSimple(ClassDecl):
+    __slots__ = ("class_name_id", "var_decl_list", "method_decl_list")
+
     def __init__(self, class_name_id: Identifier, var_decl_list: VarDeclList, method_decl_list: MethodDeclList):
         self.class_name_id = class_name_id
         self.var_decl_list = var_decl_list
@@ -110,6 +126,8 @@ class ClassDeclSimple(ClassDecl):
         return visitor.visit_class_decl_simple(self)
 
 class VarDecl(Component):
+    __slots__ = ("type", "name_id")
+
     def __init__(self, type: Type, name_id: Identifier):
         self.type = type
         self.name_id = name_id
@@ -124,6 +142,8 @@ class VarDecl(Component):
         return visitor.visit_var_decl(self)
 
 class VarDeclList():
+    __slots__ = ("var_decl_list",)
+
     def __init__(self):
         self.var_decl_list = []
     
@@ -141,6 +161,8 @@ class VarDeclList():
 
 
 class MethodDecl(Component):
+    __slots__ = ("type", "name_id", "formal_param_list", "var_decl_list", "statement_list", "return_exp")
+
     def __init__(self, type: Type, name_id: Identifier, formal_param_list: FormalList, var_decl_list: VarDeclList, statement_list: StatementList, return_exp: Exp):
         self.type = type
         self.name_id = name_id
@@ -159,6 +181,8 @@ class MethodDecl(Component):
         return visitor.visit_method_decl(self)
 
 class MethodDeclList():
+    __slots__ = ("method_decl_list",)
+
     def __init__(self):
         self.method_decl_list = []
     
@@ -176,6 +200,8 @@ class MethodDeclList():
 
 
 class Formal(Component):
+    __slots__ = ("type", "name_id")
+
     def __init__(self, type: Type, name_id: Identifier):
         self.type = type
         self.name_id = name_id
@@ -190,6 +216,8 @@ class Formal(Component):
         return visitor.visit_formal(self)
 
 class FormalList():
+    __slots__ = ("formal_list",)
+
     def __init__(self):
         self.formal_list = []
     
@@ -207,6 +235,7 @@ class FormalList():
 
 
 class Statement(Component):
+    __slots__ = ()
 
     @abstractmethod
     def accept(self, visitor: Visitor) -> None:
@@ -221,6 +250,8 @@ class Statement(Component):
         pass
 
 class StatementList():
+    __slots__ = ("statement_list",)
+
     def __init__(self):
         self.statement_list = []
     
@@ -238,6 +269,8 @@ class StatementList():
 
 
 class Print(Statement):
+    __slots__ = ("print_exp",)
+
     def __init__(self, print_exp: Exp):
         self.print_exp = print_exp
 
@@ -251,6 +284,8 @@ class Print(Statement):
         return visitor.visit_print(self)
 
 class If(Statement):
+    __slots__ = ("condition_exp", "if_statement", "else_statement")
+
     def __init__(self, condition_exp: Exp, if_statement: Statement, else_statement: Statement):
         self.condition_exp = condition_exp
         self.if_statement = if_statement
@@ -266,6 +301,8 @@ class If(Statement):
         return visitor.visit_if(self)
 
 class While(Statement):
+    __slots__ = ("condition_exp", "statement")
+
     def __init__(self, condition_exp: Exp, statement: Statement):
         self.condition_exp = condition_exp
         self.statement = statement
@@ -280,6 +317,8 @@ class While(Statement):
         return visitor.visit_while(self)
 
 class Assign(Statement):
+    __slots__ = ("left_side_id", "right_side_exp")
+
     def __init__(self, left_side_id: Identifier, right_side_exp: Exp):
         self.left_side_id = left_side_id
         self.right_side_exp = right_side_exp
@@ -295,6 +334,8 @@ class Assign(Statement):
 
 
 class Block(Statement):
+    __slots__ = ("statement_list",)
+
     def __init__(self, statement_list: StatementList):
         self.statement_list = statement_list
 
@@ -308,6 +349,8 @@ class Block(Statement):
         return visitor.visit_block(self)
 
 class ArrayAssign(Statement):
+    __slots__ = ("array_name_id", "array_exp", "right_side_exp")
+
     def __init__(self, array_name_id: Identifier, array_exp: Exp, right_side_exp: Exp):
         self.array_name_id = array_name_id
         self.array_exp = array_exp
@@ -323,6 +366,8 @@ class ArrayAssign(Statement):
         return visitor.visit_array_assign(self)
 
 class Identifier(Component):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -336,6 +381,7 @@ class Identifier(Component):
         return visitor.visit_identifier(self)
 
 class Type(Component):
+    __slots__ = ()
 
     @abstractmethod
     def accept(self, visitor: Visitor) -> None:
@@ -350,6 +396,8 @@ class Type(Component):
         pass
 
 class BooleanType(Type):
+    __slots__ = ()
+
     
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_boolean_type(self)
@@ -361,6 +409,8 @@ class BooleanType(Type):
         return visitor.visit_boolean_type(self)
 
 class IntegerType(Type):
+    __slots__ = ()
+
     
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_integer_type(self)
@@ -372,6 +422,7 @@ class IntegerType(Type):
         return visitor.visit_integer_type(self)
 
 class IntArrayType(Type):
+    __slots__ = ()
 
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_int_array_type(self)
@@ -383,6 +434,8 @@ class IntArrayType(Type):
         return visitor.visit_int_array_type(self)
 
 class IdentifierType(Type):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -396,6 +449,7 @@ class IdentifierType(Type):
         return visitor.visit_identifier_type(self)
 
 class Exp(Component):
+    __slots__ = ()
 
     @abstractmethod
     def accept(self, visitor: Visitor) -> None:
@@ -410,6 +464,8 @@ class Exp(Component):
         pass
 
 class ExpList():
+    __slots__ = ("exp_list",)
+
     def __init__(self):
         self.exp_list = []
     
@@ -426,6 +482,7 @@ class ExpList():
       return len(self.exp_list)
 
 class This(Exp):
+    __slots__ = ()
 
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_this(self)
@@ -437,6 +494,8 @@ class This(Exp):
         return visitor.visit_this(self)
 
 class IdentifierExp(Exp):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -450,6 +509,8 @@ class IdentifierExp(Exp):
         return visitor.visit_identifier_exp(self)
 
 class FalseExp(Exp):
+    __slots__ = ()
+
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_false_exp(self)
 
@@ -460,6 +521,8 @@ class FalseExp(Exp):
         return visitor.visit_false_exp(self)
 
 class TrueExp(Exp):
+    __slots__ = ()
+
     def accept(self, visitor: Visitor) -> None:
         visitor.visit_true_exp(self)
 
@@ -470,6 +533,8 @@ class TrueExp(Exp):
         return visitor.visit_true_exp(self)
 
 class IntegerLiteral(Exp):
+    __slots__ = ("value",)
+
     def __init__(self, value: int):
         self.value = value
     
@@ -483,6 +548,8 @@ class IntegerLiteral(Exp):
         return visitor.visit_integer_literal(self)
 
 class Minus(Exp):
+    __slots__ = ("left_side_exp", "right_side_exp")
+
     def __init__(self, left_side_exp: Exp, right_side_exp: Exp):
         self.left_side_exp = left_side_exp
         self.right_side_exp = right_side_exp
@@ -497,6 +564,8 @@ class Minus(Exp):
         return visitor.visit_minus(self)
 
 class Plus(Exp):
+    __slots__ = ("left_side_exp", "right_side_exp")
+
     def __init__(self, left_side_exp: Exp, right_side_exp: Exp):
         self.left_side_exp = left_side_exp
         self.right_side_exp = right_side_exp
@@ -512,6 +581,8 @@ class Plus(Exp):
 
 
 class Times(Exp):
+    __slots__ = ("left_side_exp", "right_side_exp")
+
     def __init__(self, left_side_exp: Exp, right_side_exp: Exp):
         self.left_side_exp = left_side_exp
         self.right_side_exp = right_side_exp
@@ -526,6 +597,8 @@ class Times(Exp):
         return visitor.visit_times(self)
 
 class LessThan(Exp):
+    __slots__ = ("left_side_exp", "right_side_exp")
+
     def __init__(self, left_side_exp: Exp, right_side_exp: Exp):
         self.left_side_exp = left_side_exp
         self.right_side_exp = right_side_exp
@@ -540,6 +613,8 @@ class LessThan(Exp):
         return visitor.visit_less_than(self)
 
 class And(Exp):
+    __slots__ = ("left_side_exp", "right_side_exp")
+
     def __init__(self, left_side_exp: Exp, right_side_exp: Exp):
         self.left_side_exp = left_side_exp
         self.right_side_exp = right_side_exp
@@ -554,6 +629,8 @@ class And(Exp):
         return visitor.visit_and(self)
 
 class ArrayLookup(Exp):
+    __slots__ = ("out_side_exp", "in_side_exp")
+
     def __init__(self, out_side_exp: Exp, in_side_exp: Exp):
         self.out_side_exp = out_side_exp
         self.in_side_exp = in_side_exp
@@ -568,6 +645,8 @@ class ArrayLookup(Exp):
         return visitor.visit_array_lookup(self)
 
 class Call(Exp):
+    __slots__ = ("callee_exp", "callee_name_id", "arg_list")
+
     def __init__(self, callee_exp: Exp, callee_name_id: Identifier, arg_list: ExpList):
         self.callee_exp = callee_exp
         self.callee_name_id = callee_name_id
@@ -584,6 +663,8 @@ class Call(Exp):
 
 
 class ArrayLength(Exp):
+    __slots__ = ("length_exp",)
+
     def __init__(self, length_exp: Exp):
         self.length_exp = length_exp
     
@@ -597,6 +678,8 @@ class ArrayLength(Exp):
         return visitor.visit_array_length(self)
 
 class Not(Exp):
+    __slots__ = ("negated_exp",)
+
     def __init__(self, negated_exp: Exp):
         self.negated_exp = negated_exp
     
@@ -610,6 +693,8 @@ class Not(Exp):
         return visitor.visit_not(self)
 
 class NewArray(Exp):
+    __slots__ = ("new_exp",)
+
     def __init__(self, new_exp: Exp):
         self.new_exp = new_exp
     
@@ -623,6 +708,8 @@ class NewArray(Exp):
         return visitor.visit_new_array(self)
 
 class NewObject(Exp):
+    __slots__ = ("object_name_id",)
+
     def __init__(self, object_name_id: Identifier):
         self.object_name_id = object_name_id
     
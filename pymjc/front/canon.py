@@ -1,77 +1,93 @@
 from __future__ import annotations
+from typing import Dict, List
+
 from pymjc.front import temp, tree
+from pymjc.front.arraylist import ArrayList
+
+class Block():
 
-class StmListList():
+    #A basic block: its statements start with its LABEL and end with its only JUMP or CJUMP.
+    #successors are the labels it may jump to and predecessors the indices of the blocks that
+    #may jump to it.
+    def __init__(self, label: temp.Label, stms: List[tree.Stm]):
+        self.label: temp.Label = label
+        self.stms: List[tree.Stm] = stms
+        self.successors: List[temp.Label] = []
+        self.predecessors: List[int] = []
 
-    def __init__(self, head: tree.StmList, tail: StmListList):
-        self.head: tree.StmList = head
-        self.tail: StmListList = tail
+    def get_last(self) -> tree.Stm:
+        return self.stms[-1]
 
 
 class BasicBlocks():
 
     def __init__(self, stms: tree.StmList):
         self.done: temp.Label = temp.Label()
+        self.blocks: List[Block] = []
+        #Index in blocks of the block starting with each label.
+        self.table: Dict[temp.Label, int] = {}
         self.mk_blocks(stms)
-        self.blocks: StmListList = None
-        self.last_block: StmListList = None
-        self.last_stm: tree.StmList = None
-
-    def add_stm(self, stm: tree.Stm) -> None:
-        self.last_stm = self.last_stm.tail = tree.StmList(stm, None)
-
-    def do_stms(self, stm_list: tree.StmList) -> None:
-        if (stm_list is None):
-            self.do_stms(tree.StmList(tree.JUMP(self.done), None))
-        elif (isinstance(stm_list.head, tree.JUMP) or isinstance(stm_list.head, tree.CJUMP)):
-            self.add_stm(stm_list.head)
-            self.mk_blocks(stm_list.tail)
-        elif (isinstance(stm_list.head, tree.LABEL)):
-            self.do_stms(tree.StmList(tree.JUMP(stm_list.head.label), stm_list))
-        else:
-            self.add_stm(stm_list.head)
-            self.do_stms(stm_list.tail)
+        self.link_blocks()
 
+    def add_block(self, stms: List[tree.Stm]) -> None:
+        block: Block = Block(stms[0].label, stms)
+        last: tree.Stm = stms[-1]
+        if (isinstance(last, tree.JUMP)):
+            block.successors.extend(ArrayList.elements(last.targets))
+        else:
+            block.successors.append(last.if_true)
+            block.successors.append(last.if_false)
+        self.table[block.label] = len(self.blocks)
+        self.blocks.append(block)
 
     def mk_blocks(self, stm_list: tree.StmList) -> None:
-        if (stm_list is None):
-            return None
-        elif (isinstance(stm_list.head, tree.LABEL)):
-            self.last_stm = tree.StmList(stm_list.head, None)
-            if (self.last_block is None):
-                self.last_block = self.blocks = StmListList(self.last_stm, None)
+        #One pass over the statements: a LABEL starts a block (after a JUMP to it closing the
+        #one before), a JUMP or CJUMP ends it, and a block with no label gets a new one.
+        stms: List[tree.Stm] = None
+        items: List[tree.Stm] = ArrayList.elements(stm_list)
+        index: int = 0
+        while (index < len(items)):
+            s: tree.Stm = items[index]
+            if (stms is None):
+                if (not isinstance(s, tree.LABEL)):
+                    stms = [tree.LABEL(temp.Label())]
+                    continue
+                stms = [s]
+            elif (isinstance(s, tree.LABEL)):
+                stms.append(tree.JUMP(s.label))
+                self.add_block(stms)
+                stms = None
+                continue
             else:
-                self.last_block = self.last_block.tail = StmListList(self.last_stm, None)
-            self.do_stms(stm_list.tail)
-        else:
-            self.mk_blocks(tree.StmList(tree.LABEL(temp.Label()), stm_list))
-
-
-
-
-class MoveCall(tree.Stm):
-
-    def __init__(self, dst: tree.TEMP, src: tree.CALL):
-        self.dst: tree.TEMP = dst
-        self.src: tree.CALL = src
+                stms.append(s)
+                if (isinstance(s, tree.JUMP) or isinstance(s, tree.CJUMP)):
+                    self.add_block(stms)
+                    stms = None
+            index += 1
+
+        if (stms is not None):
+            stms.append(tree.JUMP(self.done))
+            self.add_block(stms)
+
+    def link_blocks(self) -> None:
+        for index in range(len(self.blocks)):
+            for label in self.blocks[index].successors:
+                successor: int = self.table.get(label)
+                if (successor is not None):
+                    self.blocks[successor].predecessors.append(index)
+
+
+class KidList (tree.Exp):
+    #Stands for a bare expression list, so that reorder can run through canonicalize.
+    def __init__(self, exps: tree.ExpList):
+        self.exps: tree.ExpList = exps
 
     def kids(self) -> tree.ExpList:
-        return self.src.kids()
-
-    def build(self, kids: tree.ExpList) -> tree.Stm:
-        return tree.MOVE(self.dst, self.src.build(kids))
+        return self.exps
 
+    def build(self, kids: tree.ExpList) -> tree.Exp:
+        return KidList(kids)
 
-class ExpCall (tree.Stm):
-    def __init__(self, call: tree.CALL):
-        self.call: tree.CALL = call
-
-    def kids(self) -> tree.ExpList:
-        return self.call.kids()
-
-    def build(self, kids: tree.ExpList) -> tree.Stm:
-        return tree.EXP(self.call.build(kids))
-    
 
 class StmExpList ():
 
@@ -82,6 +98,13 @@ class StmExpList ():
 
 class Canon():
 
+    #Tasks of the explicit stack used by canonicalize.
+    STM: int = 0
+    EXP: int = 1
+    BUILD_STM: int = 2
+    BUILD_EXP: int = 3
+    REORDER: int = 4
+
     def is_nop(a: tree.Stm) -> bool:
         return isinstance(a, tree.EXP) and isinstance(a.exp, tree.CONST)
 
@@ -93,161 +116,307 @@ class Canon():
         else:
             return tree.SEQ(a, b)
 
-    def commute(a: tree.Stm, b: tree.Exp) -> bool:
-        return Canon.is_nop(a) or isinstance(b,tree.NAME) or isinstance(b, tree.CONST)
-
-    def do_stm(s: tree.Stm) -> tree.Stm:
-        if (isinstance(s, tree.SEQ)):
-            return Canon.do_stm_seq(s)
-        elif (isinstance(s, tree.MOVE)):
-            return Canon.do_stm_move(s)
-        elif (isinstance(s, tree.EXP)):
-            return Canon.do_stm_exp(s)
-        else:
-            return Canon.reorder_stm(s)
-
-
-    def do_stm_seq(s: tree.SEQ) -> tree.Stm:
-        return Canon.seq(Canon.do_stm(s.left), Canon.do_stm(s.right))
-
-    def do_stm_move(s: tree.MOVE) -> tree.Stm:
-        if (isinstance(s.dst, tree.TEMP) and isinstance(s.src, tree.CALL)):
-            return Canon.reorder_stm(MoveCall(s.dst, s.src))
-        elif (isinstance(s.dst, tree.ESEQ)):
-            return Canon.do_stm(tree.SEQ(s.dst.stm, tree.MOVE(s.dst.exp, s.src)))
-        else:
-            return Canon.reorder_stm(s)
-
-    def do_stm_exp(s: tree.EXP) -> tree.Stm:
-        if (isinstance(s.exp, tree.CALL)):
-            return Canon.reorder_stm(ExpCall(s.exp))
-        else:
-            return Canon.reorder_stm(s)
+    def to_list(exps: tree.ExpList) -> list:
+        return list(ArrayList.elements(exps))
+
+    def to_exp_list(kids: list) -> tree.ExpList:
+        exps: tree.ExpList = None
+        for kid in reversed(kids):
+            exps = tree.ExpList(kid, exps)
+        return exps
+
+    def to_stm(stms: list, nop: tree.Stm) -> tree.Stm:
+        if (len(stms) == 0):
+            return nop
+        s: tree.Stm = stms[-1]
+        for stm in reversed(stms[:-1]):
+            s = tree.SEQ(stm, s)
+        return s
+
+    def canonicalize(s: tree.Stm, e: tree.Exp = None) -> tuple:
+        #Same rewriting as the textbook recursive do_stm/do_exp/reorder, driven by an explicit
+        #stack. Statements are emitted straight into a flat list in their linearized order, nops
+        #are dropped (the last one is kept in case nothing else is left) and a reorder saves one
+        #slot after each subexpression for the MOVE that it may need once the statements of the
+        #following subexpressions are known. Temps are created in the same order as recursion.
+        #Returns (statements, last statement-level nop, value of e).
+        STM = Canon.STM
+        EXP = Canon.EXP
+        BUILD_STM = Canon.BUILD_STM
+        BUILD_EXP = Canon.BUILD_EXP
+        REORDER = Canon.REORDER
+        is_nop = Canon.is_nop
+        rules: dict = Canon.rules
+        generic: tuple = Canon.generic_rule
+        out: list = []
+        values: list = []
+        nop: tree.Stm = Canon.nop_null.stm
+        emitted: int = 0
+        stack: list = [(EXP, e)] if e is not None else []
+        if s is not None:
+            stack.append((STM, s))
+
+        while stack:
+            task, node = stack.pop()
+
+            if task == EXP or task == STM:
+                split, kids_of, build = rules.get(type(node), generic)
+                if split is not None and split(node, stack):
+                    continue
+                kids: list = kids_of(node)
+                task = BUILD_EXP if task == EXP else BUILD_STM
+
+            elif task == BUILD_STM:
+                node, build, number_of_kids = node
+                built: tree.Stm = build(node, values[len(values) - number_of_kids:])
+                del values[len(values) - number_of_kids:]
+                if is_nop(built):
+                    nop = built
+                else:
+                    out.append(built)
+                    emitted += 1
+                continue
 
+            elif task == BUILD_EXP:
+                node, build, number_of_kids = node
+                built: tree.Exp = build(node, values[len(values) - number_of_kids:])
+                del values[len(values) - number_of_kids:]
+                values.append(built)
+                continue
 
+            else:
+                #node is [kids, index, emitted before the kid, kid values, slots, kids with statements]
+                frame: list = node
+                frame[3].append(values.pop())
+                frame[4].append(len(out))
+                frame[5].append(emitted > frame[2])
+                out.append(None)
+                if Canon.next_kid(stack, frame, out, emitted):
+                    continue
+
+                #Every kid is done: walk back deciding which values must be saved in a temp.
+                kids_values: list = frame[3]
+                slots: list = frame[4]
+                later_stms: bool = False
+                for index in range(len(kids_values) - 1, -1, -1):
+                    value: tree.Exp = kids_values[index]
+                    if later_stms and not isinstance(value, tree.NAME) and not isinstance(value, tree.CONST):
+                        t: temp.Temp = temp.Temp()
+                        out[slots[index]] = tree.MOVE(tree.TEMP(t), value)
+                        emitted += 1
+                        kids_values[index] = tree.TEMP(t)
+                        later_stms = True
+                    else:
+                        later_stms = later_stms or frame[5][index]
+                values.extend(kids_values)
+                continue
+
+            stack.append((task, (node, build, len(kids))))
+            if kids:
+                frame: list = [kids, -1, 0, [], [], []]
+                if Canon.next_kid(stack, frame, out, emitted):
+                    continue
+                values.extend(frame[3])
+
+        return [stm for stm in out if stm is not None], nop, values.pop() if e is not None else None
+
+    #Rules of canonicalize for each node class, as (split, kids, build). split, when there is
+    #one, pushes the tasks that take the place of the node and says whether it did; kids gives
+    #the subexpressions that are reordered and build makes the node back from their values.
+    #A call right under a MOVE to a TEMP or an EXP is left in place, so its own kids are the
+    #ones reordered.
+    def split_seq(s: tree.SEQ, stack: list) -> bool:
+        stack.append((Canon.STM, s.right_stm))
+        stack.append((Canon.STM, s.left_stm))
+        return True
+
+    def split_eseq(e: tree.ESEQ, stack: list) -> bool:
+        stack.append((Canon.EXP, e.exp))
+        stack.append((Canon.STM, e.stm))
+        return True
+
+    def split_move(s: tree.MOVE, stack: list) -> bool:
+        if type(s.dest) is not tree.ESEQ:
+            return False
+        stack.append((Canon.STM, tree.MOVE(s.dest.exp, s.src)))
+        stack.append((Canon.STM, s.dest.stm))
+        return True
+
+    def no_kids(node) -> list:
+        return []
+
+    def same(node, kids: list):
+        return node
+
+    def call_kids(e: tree.CALL) -> list:
+        return [e.func_exp] + Canon.to_list(e.arg_exp_list)
+
+    def call_build(e: tree.CALL, kids: list) -> tree.CALL:
+        return tree.CALL(kids[0], Canon.to_exp_list(kids[1:]))
+
+    def move_kids(s: tree.MOVE) -> list:
+        if type(s.dest) is tree.TEMP and type(s.src) is tree.CALL:
+            return Canon.call_kids(s.src)
+        if type(s.dest) is tree.MEM:
+            return [s.dest.exp, s.src]
+        return [s.src]
+
+    def move_build(s: tree.MOVE, kids: list) -> tree.MOVE:
+        if type(s.dest) is tree.TEMP and type(s.src) is tree.CALL:
+            return tree.MOVE(s.dest, Canon.call_build(s.src, kids))
+        if type(s.dest) is tree.MEM:
+            return tree.MOVE(tree.MEM(kids[0]), kids[1])
+        return tree.MOVE(s.dest, kids[0])
+
+    def exp_kids(s: tree.EXP) -> list:
+        if type(s.exp) is tree.CALL:
+            return Canon.call_kids(s.exp)
+        return [s.exp]
+
+    def exp_build(s: tree.EXP, kids: list) -> tree.EXP:
+        if type(s.exp) is tree.CALL:
+            return tree.EXP(Canon.call_build(s.exp, kids))
+        return tree.EXP(kids[0])
+
+    rules: dict = {tree.CONST: (None, no_kids, same),
+                   tree.NAME: (None, no_kids, same),
+                   tree.TEMP: (None, no_kids, same),
+                   tree.BINOP: (None, lambda e: [e.left_exp, e.right_exp],
+                                lambda e, kids: tree.BINOP(e.op, kids[0], kids[1])),
+                   tree.MEM: (None, lambda e: [e.exp], lambda e, kids: tree.MEM(kids[0])),
+                   tree.CALL: (None, call_kids, call_build),
+                   tree.ESEQ: (split_eseq, None, None),
+                   tree.SEQ: (split_seq, None, None),
+                   tree.MOVE: (split_move, move_kids, move_build),
+                   tree.EXP: (None, exp_kids, exp_build),
+                   tree.JUMP: (None, lambda s: [s.exp], lambda s, kids: tree.JUMP(exp=kids[0], targets=s.targets)),
+                   tree.CJUMP: (None, lambda s: [s.left_exp, s.right_exp],
+                                lambda s, kids: tree.CJUMP(s.rel_op, kids[0], kids[1], s.if_true, s.if_false)),
+                   tree.LABEL: (None, no_kids, same),
+                   KidList: (None, lambda e: Canon.to_list(e.exps), lambda e, kids: KidList(Canon.to_exp_list(kids)))}
+
+    #Any other node is taken apart through its own kids() and build().
+    generic_rule: tuple = (None, lambda node: Canon.to_list(node.kids()),
+                           lambda node, kids: node.build(Canon.to_exp_list(kids)))
+
+    leaves: tuple = (tree.CONST, tree.NAME, tree.TEMP)
+
+    def next_kid(stack: list, frame: list, out: list, emitted: int) -> bool:
+        #Moves the reorder in frame to its next kid. Leaves are their own value and emit nothing,
+        #so they are taken on the spot; returns False once every kid has a value.
+        kids: list = frame[0]
+        leaves: tuple = Canon.leaves
+        while True:
+            frame[1] += 1
+            if frame[1] == len(kids):
+                return False
+            a: tree.Exp = kids[frame[1]]
+            if type(a) in leaves:
+                frame[3].append(a)
+                frame[4].append(len(out))
+                frame[5].append(False)
+                out.append(None)
+                continue
+            frame[2] = emitted
+            if (isinstance(a, tree.CALL)):
+                t: temp.Temp = temp.Temp()
+                a = tree.ESEQ(tree.MOVE(tree.TEMP(t), a), tree.TEMP(t))
+            stack.append((Canon.REORDER, frame))
+            stack.append((Canon.EXP, a))
+            return True
 
-    def reorder_stm(s: tree.Stm) -> tree.Stm:
-        x: StmExpList = Canon.reorder(s.kids())
-        return Canon.seq(x.stm, s.build(x.exps))
+    def do_stm(s: tree.Stm) -> tree.Stm:
+        stms, nop, _ = Canon.canonicalize(s)
+        return Canon.to_stm(stms, nop)
 
     def do_exp(e: tree.Exp) -> tree.ESEQ:
-        if (isinstance(e, tree.ESEQ)):
-            return Canon.do_exp_eseq(e)
-        else:
-            return Canon.reorder_exp(e)
-
-    def do_exp_eseq(e: tree.ESEQ) -> tree.ESEQ:
-        stms: tree.Stm = Canon.do_stm(e.stm)
-        b: tree.ESEQ = Canon.do_exp(e.exp)
-        return tree.ESEQ(Canon.seq(stms, b.stm), b.exp)
-
-
-    def reorder_exp(e: tree.Exp) -> tree.ESEQ:
-        x: StmExpList  = Canon.reorder(e.kids())
-        return tree.ESEQ(x.stm, e.build(x.exps))
-
-    nop_null: StmExpList = StmExpList(tree.EXP(tree.CONST(0)), None)
+        stms, _, value = Canon.canonicalize(None, e)
+        return tree.ESEQ(Canon.to_stm(stms, Canon.nop_null.stm), value)
 
     def reorder(exps: tree.ExpList) -> StmExpList:
         if (exps is None):
             return Canon.nop_null
-        else:
-            a: tree.Exp = exps.head
-            if (isinstance(a, tree.CALL)):
-                t: temp.Temp = temp.Temp()
-                e: tree.Exp = tree.ESEQ(tree.MOVE(tree.TEMP(t), a), tree.TEMP(t))
-                return Canon.reorder(tree.ExpList(e, exps.tail))
-            else:
-                aa: tree.ESEQ = Canon.do_exp(a)
-                bb: StmExpList  = Canon.reorder(exps.tail)
-                if (Canon.commute(bb.stm, aa.exp)):
-                    return StmExpList(Canon.seq(aa.stm, bb.stm), tree.ExpList(aa.exp, bb.exps))
-                else:
-                    t: temp.Temp = temp.Temp()
-                    return StmExpList(Canon.seq(aa.stm, Canon.seq(tree.MOVE(tree.TEMP(t), aa.exp), bb.stm)), tree.ExpList(tree.TEMP(t), bb.exps))
+        stms, _, value = Canon.canonicalize(None, KidList(exps))
+        return StmExpList(Canon.to_stm(stms, Canon.nop_null.stm), value.exps)
 
+    nop_null: StmExpList = StmExpList(tree.EXP(tree.CONST(0)), None)
 
     def linear(s: tree.Stm, l: tree.StmList) -> tree.StmList:
-        if (isinstance(s, tree.SEQ)):
-            return Canon.linear_seq(s, l)
-        else:
-            return tree.StmList(s, l)
-
-    def linear_seq(s: tree.SEQ, l: tree.StmList) -> tree.StmList:
-        return Canon.linear(s.left, Canon.linear(s.right, l))
-
+        stack: list = [s]
+        while stack:
+            s = stack.pop()
+            if (isinstance(s, tree.SEQ)):
+                stack.append(s.left_stm)
+                stack.append(s.right_stm)
+            else:
+                l = tree.StmList(s, l)
+        return l
 
     def linearize(s: tree.Stm) -> tree.StmList:
-        return Canon.linear(Canon.do_stm(s), None)
+        stms, nop, _ = Canon.canonicalize(s)
+        if (len(stms) == 0):
+            return tree.StmList(nop, None)
+        l: tree.StmList = None
+        for stm in reversed(stms):
+            l = tree.StmList(stm, l)
+        return l
 
 
 
 class TraceSchedule():
 
+    #Lays the blocks out in traces, so that each block is followed when possible by the target of
+    #its JUMP or the false label of its CJUMP. Blocks are found through the table of BasicBlocks,
+    #keyed by Label, and every block is scheduled once.
     def __init__(self, the_blocks: BasicBlocks):
-        self.stms: tree.StmList = None
         self.the_blocks: BasicBlocks = the_blocks
-        self.table = {}
-        stm_list: StmListList = the_blocks.blocks 
-        
-        while(stm_list is not None):
-            if(isinstance(stm_list.head.head, tree.LABEL)):
-                self.table[stm_list.head.head.label.to_string()] = stm_list.head
-        
-        self.stms = self.get_next()
-        self.table = None
-        
-
-
-    def get_last(self, block: tree.StmList) -> tree.StmList:
-        l: tree.StmList = block
-        while (l.tail.tail is not None):
-            l = l.tail
-        return l
-
-    def trace(self, l: tree.StmList) -> None:
-        while True:
-            lab: tree.LABEL = l.head
-            self.table.pop(lab.label)
-            last: tree.StmList = self.get_last(l)
-            s: tree.Stm = last.tail.head
-            if (isinstance(s, tree.JUMP)):
-                target: tree.StmList = self.table.get(s.targets.head)
-                if (s.targets.tail is None and target is not None):
-                    last.tail = target
-                    l = target
+        self.stms: tree.StmList = tree.StmArray(self.schedule())
+
+    def schedule(self) -> List[tree.Stm]:
+        blocks: List[Block] = self.the_blocks.blocks
+        table: Dict[temp.Label, int] = self.the_blocks.table
+        out: List[tree.Stm] = []
+        scheduled: List[bool] = [False] * len(blocks)
+        for first in range(len(blocks)):
+            if (scheduled[first]):
+                continue
+
+            index: int = first
+            while (index is not None):
+                scheduled[index] = True
+                block: Block = blocks[index]
+                out.extend(block.stms[:-1])
+                s: tree.Stm = block.get_last()
+                index = None
+                if (isinstance(s, tree.JUMP)):
+                    if (s.targets.tail is None):
+                        index = table.get(s.targets.head)
+                        if (index is not None and scheduled[index]):
+                            index = None
+                    if (index is None):
+                        out.append(s)
+
+                elif (isinstance(s, tree.CJUMP)):
+                    t: int = table.get(s.if_true)
+                    f: int = table.get(s.if_false)
+                    if (t is not None and scheduled[t]):
+                        t = None
+                    if (f is not None and scheduled[f]):
+                        f = None
+
+                    if (f is not None):
+                        out.append(s)
+                        index = f
+                    elif (t is not None):
+                        out.append(tree.CJUMP(tree.CJUMP.not_rel(s.rel_op), s.left_exp, s.right_exp, s.if_false, s.if_true))
+                        index = t
+                    else:
+                        ff: temp.Label = temp.Label()
+                        out.append(tree.CJUMP(s.rel_op, s.left_exp, s.right_exp, s.if_true, ff))
+                        out.append(tree.LABEL(ff))
+                        out.append(tree.JUMP(s.if_false))
                 else:
-                    last.tail.tail = self.get_next()
-                    return None
-
-            elif (isinstance(s, tree.CJUMP)):
-                t: tree.StmList = self.table.get(s.if_true)
-                f: tree.StmList = self.table.get(s.if_false)
-                if (f is not None):
-                    last.tail.tail = f
-                    l = f
-                elif (t is not None):
-                    last.tail.head = tree.CJUMP(tree.CJUMP.not_rel(s.rel_op), s.left_exp, s.right_exp, s.if_false, s.if_true)
-                    last.tail.tail = t
-                    l = t
-                else:
-                    ff: temp.Label = temp.Label()
-                    last.tail.head = tree.CJUMP(s.rel_op, s.left_exp, s.right_exp, s.if_true, ff)
-                    last.tail.tail = tree.StmList(tree.LABEL(ff), tree.StmList(tree.JUMP(s.if_false), self.get_next()))
-                    return None
-            else:
-                raise RuntimeError("Bad basic block in TraceSchedule")
+                    raise RuntimeError("Bad basic block in TraceSchedule")
 
-
-    def get_next(self) -> tree.StmList:
-        if (self.the_blocks.blocks is None):
-            return tree.StmList(tree.LABEL(self.the_blocks.done), None)
-        else:
-            s: tree.StmList = self.the_blocks.blocks.head
-            lab: tree.LABEL = s.head
-            if (self.table.get(lab.label) is not None):
-                self.trace(s)
-                return s
-            else:
-                self.the_blocks.blocks = self.the_blocks.blocks.tail
-                return self.get_next()
\ No newline at end of file
+        out.append(tree.LABEL(self.the_blocks.done))
+        return out
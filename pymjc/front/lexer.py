@@ -62,6 +62,31 @@ class MJLexer(Lexer):
     def ignore_newline(self, token):
         self.lineno += token.value.count('\n')
 
+    def tokenize_stream(self, source_file, chunk_size: int = 65536, lineno: int = 1):
+        #Reads the source chunk_size characters at a time and tokenizes the complete lines read
+        #so far. No token spans a line, so only the unfinished last line waits for the next chunk.
+        #Indices stay absolute.
+        rest: str = ""
+        offset: int = 0
+        self.lineno = lineno
+        at_eof: bool = False
+
+        while not at_eof:
+            chunk: str = source_file.read(chunk_size)
+            at_eof = not chunk
+            end: int = len(chunk) if at_eof else chunk.rfind("\n") + 1
+            if end == 0 and not at_eof:
+                rest += chunk
+                continue
+
+            text: str = rest + chunk[:end]
+            rest = chunk[end:]
+            for token in self.tokenize(text, self.lineno):
+                token.index += offset
+                token.end += offset
+                yield token
+            offset += len(text)
+
     def error(self, token):
         MJLogger.lexer_log(self.src_file_name, self.lineno, token.value[0])
         self.index += 1
@@ -1,7 +1,11 @@
+import sys
+
 from pymjc.front.ast import *
 from pymjc.front.lexer import MJLexer
 from sly import Parser
+from sly.yacc import YaccError
 
+from pymjc.front.parsetab import ParseTableCache
 from pymjc.log import MJLogger
 
 class MJParser(Parser):
@@ -22,7 +26,92 @@ class MJParser(Parser):
 
     syntax_error = False
 
-    debugfile = 'parser.out'
+    debugfile = None
+
+    #Private steps of Parser._build that the cached build reuses. A sly without them builds its own tables.
+    sly_build_steps = ("_Parser__collect_rules", "_Parser__validate_specification", "_Parser__build_grammar")
+
+    @classmethod
+    def _build(cls, definitions):
+        if not all(hasattr(cls, step) for step in cls.sly_build_steps):
+            #Parser._build returns at once on a class with its own _build, so sly builds the tables
+            #of a stand-in class from the same definitions and they are taken from it.
+            attributes = {name: value for name, value in definitions if name != "_build" and not name.startswith("__")}
+            attributes["_"] = None
+            built = type(cls)(cls.__name__, (Parser,), attributes)
+            cls._grammar = built._grammar
+            cls._lrtable = built._lrtable
+            return
+
+        #Same steps as Parser._build, but the LALR tables come from the on-disk cache when the grammar is unchanged.
+        rules = cls._Parser__collect_rules(definitions)
+        if not cls._Parser__validate_specification():
+            raise YaccError('Invalid parser specification')
+
+        cls._Parser__build_grammar(rules)
+        cls._lrtable = ParseTableCache().load_or_build(cls._grammar, cls.precedence)
+
+        num_sr = len(cls._lrtable.sr_conflicts)
+        if num_sr > 0 and num_sr != getattr(cls, 'expected_shift_reduce', None):
+            cls.log.warning('%d shift/reduce conflict(s)', num_sr)
+
+        num_rr = len(cls._lrtable.rr_conflicts)
+        if num_rr > 0 and num_rr != getattr(cls, 'expected_reduce_reduce', None):
+            cls.log.warning('%d reduce/reduce conflict(s)', num_rr)
+
+        if cls.debugfile:
+            cls.write_debugfile(cls.debugfile)
+
+    def parse(self, tokens):
+        program = super().parse(tokens)
+        if self.track_positions:
+            self.set_positions(program)
+        return program
+
+    def set_positions(self, program: Program) -> None:
+        #sly keeps the first line of every reduced value in dicts keyed by id(). The lines are moved
+        #into the lineno slot of the AST nodes and the dicts are released right after parsing.
+        line_positions = self._line_positions
+        stack = [program]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+                continue
+
+            node_slots = MJParser.node_slots(type(node))
+            if node_slots is None:
+                continue
+
+            if isinstance(node, Component):
+                lineno = line_positions.get(id(node))
+                if lineno is not None:
+                    node.lineno = lineno
+
+            for slot in node_slots:
+                stack.append(getattr(node, slot, None))
+
+        self._line_positions = {}
+        self._index_positions = {}
+
+    node_slots_table = {}
+
+    def node_slots(node_type: type) -> tuple:
+        if node_type not in MJParser.node_slots_table:
+            node_slots = None
+            if node_type.__module__ == Component.__module__:
+                node_slots = tuple(slot for klass in node_type.__mro__ for slot in getattr(klass, "__slots__", ()) if slot != "lineno")
+            MJParser.node_slots_table[node_type] = node_slots
+        return MJParser.node_slots_table[node_type]
+
+    @classmethod
+    def write_debugfile(cls, debugfile: str = 'parser.out') -> str:
+        with open(debugfile, 'w') as f:
+            f.write(str(cls._grammar))
+            f.write('\n')
+            f.write(str(cls._lrtable))
+        cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, debugfile)
+        return debugfile
 
 
     ###################################
@@ -257,7 +346,8 @@ class MJParser(Parser):
     ###################################
     @_('ID')
     def Identifier(self, p):
-        return Identifier(str(p.ID))
+        #Interned so that symbol table lookups by identifier name compare by identity.
+        return Identifier(sys.intern(p.ID))
 
     @_('')
     def Empty(self, p):
@@ -288,5 +378,8 @@ class MJParser(Parser):
         return IntegerLiteral(int(p.NUM))
 
     def error(self, p):
-        MJLogger.parser_log(self.src_file_name, p.lineno, p.value[0])
+        if p is None:
+            MJLogger.parser_log(self.src_file_name, "EOF", "EOF")
+        else:
+            MJLogger.parser_log(self.src_file_name, p.lineno, p.value[0])
         self.syntax_error = True
\ No newline at end of file
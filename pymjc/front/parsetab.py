@@ -0,0 +1,84 @@
+from __future__ import annotations
+import hashlib
+import os
+import pickle
+import tempfile
+
+import sly
+from sly.yacc import Grammar, LRTable
+
+
+class ParseTable():
+
+    def __init__(self, lr_action: dict, lr_goto: dict, defaulted_states: dict,
+                 sr_conflicts: list, rr_conflicts: list, text: str):
+        self.lr_action: dict = lr_action
+        self.lr_goto: dict = lr_goto
+        self.defaulted_states: dict = defaulted_states
+        self.sr_conflicts: list = sr_conflicts
+        self.rr_conflicts: list = rr_conflicts
+        self.text: str = text
+
+    def from_lrtable(lrtable: LRTable) -> ParseTable:
+        rr_conflicts = [(state, str(rule), str(rejected)) for state, rule, rejected in lrtable.rr_conflicts]
+        return ParseTable(lrtable.lr_action, lrtable.lr_goto, lrtable.defaulted_states,
+                          list(lrtable.sr_conflicts), rr_conflicts, str(lrtable))
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class ParseTableCache():
+
+    VERSION: int = 1
+
+    def __init__(self, cache_dir: str = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get("PYMJC_CACHE_DIR")
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "__pycache__")
+        self.cache_dir: str = cache_dir
+
+    def signature(self, grammar: Grammar, precedence: tuple) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"pymjc-parsetab-{ParseTableCache.VERSION}\n".encode("utf-8"))
+        digest.update(f"sly-{sly.__version__}\n".encode("utf-8"))
+        digest.update((repr(precedence) + "\n").encode("utf-8"))
+        digest.update((" ".join(sorted(grammar.Terminals)) + "\n").encode("utf-8"))
+        for production in grammar.Productions:
+            digest.update((str(production) + "\n").encode("utf-8"))
+        return digest.hexdigest()
+
+    def cache_file_path(self, signature: str) -> str:
+        return os.path.join(self.cache_dir, f"parsetab-{signature[:16]}.pickle")
+
+    def load(self, signature: str) -> ParseTable:
+        try:
+            with open(self.cache_file_path(signature), "rb") as cache_file:
+                cached = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+
+        if not isinstance(cached, dict) or cached.get("signature") != signature:
+            return None
+
+        return cached.get("table")
+
+    def store(self, signature: str, table: ParseTable) -> None:
+        #Written to a temporary file and renamed so that concurrent compiler processes never read a partial cache.
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            file_descriptor, temp_file_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                pickle.dump({"signature": signature, "table": table}, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file_path, self.cache_file_path(signature))
+        except OSError:
+            pass
+
+    def load_or_build(self, grammar: Grammar, precedence: tuple) -> ParseTable:
+        signature = self.signature(grammar, precedence)
+        table: ParseTable = self.load(signature)
+        if table is None:
+            table = ParseTable.from_lrtable(LRTable(grammar))
+            self.store(signature, table)
+        return table
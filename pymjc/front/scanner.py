@@ -0,0 +1,143 @@
+import re
+
+from sly.lex import Token
+
+from pymjc.log import MJLogger
+
+
+class MJScanner():
+
+    #Keyword table applied to every identifier, like the ID[...] remapping of MJLexer.
+    KEYWORDS = {"boolean": "BOOLEAN", "extends": "EXTENDS", "String": "STRING", "public": "PUBLIC",
+                "length": "LENGTH", "static": "STATIC", "return": "RETURN", "while": "WHILE",
+                "class": "CLASS", "false": "FALSE", "else": "ELSE", "true": "TRUE", "void": "VOID",
+                "main": "MAIN", "this": "THIS", "int": "INT", "new": "NEW", "if": "IF"}
+
+    OPERATORS = {"&&": "AND", "!": "NOT", "=": "EQUALS", "<": "LESS", "+": "PLUS", "-": "MINUS",
+                 "*": "TIMES", ".": "DOT", ";": "SEMICOLON", ",": "COMMA", "{": "LEFTBRACE",
+                 "}": "RIGHTBRACE", "(": "LEFTPARENT", ")": "RIGHTPARENT", "[": "LEFTSQRBRACKET",
+                 "]": "RIGHTSQRBRACKET"}
+
+    #Longest lookahead needed to decide a match: the length of System.out.println.
+    LOOKAHEAD: int = 18
+
+    #One pass over the source: each match consumes the blanks in front of a lexeme, so the loop
+    #runs roughly once per token. The alternatives never overlap (PRINT is tried before ID, as in
+    #MJLexer), which lets them be ordered by frequency; the comment pattern is the MJLexer one.
+    PATTERN = re.compile(r"[ \t\r\f]*(?:"
+                         r"(?P<PRINT>System\.out\.println)"
+                         r"|(?P<ID>[a-zA-Z_][a-zA-Z0-9_]*)"
+                         r"|(?P<OPERATOR>[!=<+\-*.;,{}()\[\]]|&&)"
+                         r"|(?P<NEWLINE>\n+)"
+                         r"|(?P<NUM>\d+)"
+                         r"|(?P<COMMENT>//.*|/\*\.?\*/)"
+                         r"|(?P<ERROR>.)"
+                         r"|$)")
+
+    def __init__(self):
+        self.bad_tokens = []
+        self.src_file_name = "UnknownSRCFile"
+        self.lineno: int = 1
+        self.index: int = 0
+        MJLogger.configure()
+
+    def tokenize(self, text: str, lineno: int = 1, index: int = 0):
+        self.text = text
+        keywords = MJScanner.KEYWORDS
+        operators = MJScanner.OPERATORS
+
+        for match in MJScanner.PATTERN.finditer(text, index):
+            kind = match.lastgroup
+            if kind is None or kind == "COMMENT":
+                continue
+
+            if kind == "NEWLINE":
+                lineno += match.end() - match.start(kind)
+                continue
+
+            token = Token()
+            token.lineno = lineno
+            token.index = match.start(kind)
+            token.end = match.end()
+            if kind == "ERROR":
+                self.lineno = lineno
+                self.index = token.index
+                token.type = kind
+                token.value = text[token.index:]
+                self.error(token)
+                continue
+
+            token.value = value = match.group(kind)
+            if kind == "ID":
+                token.type = keywords.get(value, kind)
+            elif kind == "OPERATOR":
+                token.type = operators[value]
+            else:
+                token.type = kind
+            yield token
+
+        self.lineno = lineno
+        self.index = len(text)
+
+    def tokenize_stream(self, source_file, chunk_size: int = 65536, lineno: int = 1):
+        #Reads the source chunk_size characters at a time. A match is only trusted when the buffer
+        #holds LOOKAHEAD more characters after it, so lexemes, blank runs and comments cut by a
+        #chunk boundary are scanned again once the next chunk arrives. The value of a bad token
+        #is the rest of the current buffer instead of the rest of the file.
+        keywords = MJScanner.KEYWORDS
+        operators = MJScanner.OPERATORS
+        buffer: str = ""
+        offset: int = 0
+        at_eof: bool = False
+
+        while not at_eof:
+            chunk: str = source_file.read(chunk_size)
+            at_eof = not chunk
+            buffer += chunk
+            limit: int = len(buffer) - MJScanner.LOOKAHEAD
+            consumed: int = 0
+
+            for match in MJScanner.PATTERN.finditer(buffer):
+                if not at_eof and match.end() >= limit:
+                    break
+
+                consumed = match.end()
+                kind = match.lastgroup
+                if kind is None or kind == "COMMENT":
+                    continue
+
+                if kind == "NEWLINE":
+                    lineno += match.end() - match.start(kind)
+                    continue
+
+                token = Token()
+                token.lineno = lineno
+                token.index = offset + match.start(kind)
+                token.end = offset + match.end()
+                if kind == "ERROR":
+                    self.lineno = lineno
+                    self.index = token.index
+                    token.type = kind
+                    token.value = buffer[match.start(kind):]
+                    self.error(token)
+                    continue
+
+                token.value = value = match.group(kind)
+                if kind == "ID":
+                    token.type = keywords.get(value, kind)
+                elif kind == "OPERATOR":
+                    token.type = operators[value]
+                else:
+                    token.type = kind
+                yield token
+
+            buffer = buffer[consumed:]
+            offset += consumed
+
+        self.lineno = lineno
+        self.index = offset
+
+    def error(self, token):
+        MJLogger.lexer_log(self.src_file_name, self.lineno, token.value[0])
+        self.index += 1
+        self.bad_tokens.append(token)
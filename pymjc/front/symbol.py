@@ -1,23 +1,26 @@
 from __future__ import annotations
-from typing import Type
+import sys
+from typing import Dict, List, Type
+
+from pymjc.context import CompilationContext
 
 class Symbol():
     
     def __init__(self, name: str) -> None:
         self.name = name
     
-    dictionary = {}
-
     def to_string(self) -> str:
         return self.name
 
     
     def symbol(name: str) -> Symbol:
-        symbol: Symbol = Symbol.dictionary.get(name)
+        #Interned in the symbol table of the current compilation context.
+        symbols: Dict[str, Symbol] = CompilationContext.current().symbols
+        symbol: Symbol = symbols.get(name)
         
         if symbol is None:
-            symbol = Symbol(name)
-            Symbol.dictionary[name] = symbol
+            symbol = Symbol(sys.intern(name))
+            symbols[symbol.name] = symbol
 
         return symbol
 
@@ -33,13 +36,13 @@ class MethodEntry():
         return self.param
 
     def get_param_by_name(self, id: str) -> Type:
-        return self.param.get(Symbol.symbol(id).to_string())
+        return self.param.get(id)
 
     def get_locals(self):
         return self.locals
 
     def get_local_by_name(self, id: str) -> Type:
-        return self.locals.get(Symbol.symbol(id).to_string())        
+        return self.locals.get(id)        
 
     def get_num_params(self) -> int:
         return len(self.param_list)
@@ -51,28 +54,28 @@ class MethodEntry():
         return self.return_type
 
     def add_local(self, id: str, type: Type) -> bool:
-        if(self.contains_local(Symbol.symbol(id).to_string()) or self.contains_param(Symbol.symbol(id).to_string())):
+        if(self.contains_local(id) or self.contains_param(id)):
             return False
         else:
-            self.locals[Symbol.symbol(id).to_string()] = type
+            self.locals[sys.intern(id)] = type
 
         return True
 
 
     def add_param(self, id: str, type: Type) -> bool:
-        if(self.contains_param(Symbol.symbol(id).to_string())):
+        if(self.contains_param(id)):
             return False
         else:
-            self.param[Symbol.symbol(id).to_string()] = type
+            self.param[sys.intern(id)] = type
             self.param_list.append(type)
         
         return True
 
     def contains_local(self, key: str) -> bool:
-        return key in self.locals.keys()
+        return key in self.locals
 
     def contains_param(self, key: str) -> bool:
-        return key in self.param.keys()
+        return key in self.param
 
 
 
@@ -92,37 +95,177 @@ class ClassEntry():
         return self.fields
 
     def get_field(self, id: str) -> Type:
-        return self.fields.get(Symbol.symbol(id).to_string())
+        return self.fields.get(id)
     
     def get_methods(self):
         return self.methods
 
     def get_method(self, id: str) -> MethodEntry:
-        return self.methods.get(Symbol.symbol(id).to_string())    
+        return self.methods.get(id)    
     
     def add_var(self, id : str, type: Type) -> bool:
-        if(self.contains_field(Symbol.symbol(id).to_string())):
+        if(self.contains_field(id)):
             return False
         else:
-            self.fields[Symbol.symbol(id).to_string()] = type
+            self.fields[sys.intern(id)] = type
         
         return True
 
     def add_method(self, id: str, entry: MethodEntry) -> bool:
-        if(self.contains_method(Symbol.symbol(id).to_string())):
+        if(self.contains_method(id)):
             return False
         else:
-            self.methods[Symbol.symbol(id).to_string()] = entry
+            self.methods[sys.intern(id)] = entry
     
         return True
 
     def contains_field(self, key: str) -> bool:
-        return key in self.fields.keys()
+        return key in self.fields
     
 
     def contains_method(self, key: str) -> bool:
-        return key in self.methods.keys()
+        return key in self.methods
+
+
+
+class ClassHierarchy():
+
+    def __init__(self, class_scopes: Dict[str, ClassEntry]) -> None:
+        self.class_scopes: Dict[str, ClassEntry] = class_scopes
+        self.class_order: List[str] = []
+        self.super_class: Dict[str, str] = {}
+        self.sub_classes: Dict[str, List[str]] = {}
+        #Flattened views of each class: its own members over the inherited ones. The class
+        #entries keep only what each class declares.
+        self.fields: Dict[str, Dict[str, Type]] = {}
+        self.methods: Dict[str, Dict[str, MethodEntry]] = {}
+        self.field_slots: Dict[str, Dict[str, int]] = {}
+        self.method_slots: Dict[str, Dict[str, int]] = {}
+        self.num_fields: Dict[str, int] = {}
+        self.pre_order: Dict[str, int] = {}
+        self.post_order: Dict[str, int] = {}
+        self.build()
+
+    def build(self) -> None:
+        #Superclass links that point to undeclared classes or close a cycle are dropped,
+        #so the hierarchy is always a forest.
+        for class_id in self.class_scopes:
+            self.sub_classes[class_id] = []
+
+        state: Dict[str, int] = {}
+        for class_id in self.class_scopes:
+            path: List[str] = []
+            curr_id: str = class_id
+            while curr_id is not None and curr_id not in state:
+                state[curr_id] = 1
+                path.append(curr_id)
+                next_id: str = self.class_scopes[curr_id].get_supper_class_id()
+                if next_id not in self.class_scopes or state.get(next_id) == 1:
+                    next_id = None
+                self.super_class[curr_id] = next_id
+                curr_id = next_id
+
+            for path_id in reversed(path):
+                state[path_id] = 2
+                self.class_order.append(path_id)
+                if self.super_class[path_id] is not None:
+                    self.sub_classes[self.super_class[path_id]].append(path_id)
+
+        for class_id in self.class_order:
+            self.flatten(class_id)
+
+        counter: int = 0
+        for root_id in self.class_order:
+            if self.super_class[root_id] is not None:
+                continue
+            stack = [(root_id, False)]
+            while stack:
+                class_id, done = stack.pop()
+                if done:
+                    self.post_order[class_id] = counter
+                    counter += 1
+                    continue
+                self.pre_order[class_id] = counter
+                counter += 1
+                stack.append((class_id, True))
+                for sub_class_id in reversed(self.sub_classes[class_id]):
+                    stack.append((sub_class_id, False))
+
+    def flatten(self, class_id: str) -> None:
+        #Superclasses are flattened first (class_order is topological), so inherited
+        #entries keep the slot they have in the superclass. A field declared again hides the
+        #inherited one and gets a slot of its own, which the superclass methods never see;
+        #a method declared again overrides the inherited one in its slot.
+        entry: ClassEntry = self.class_scopes[class_id]
+        super_id: str = self.super_class[class_id]
+        fields: Dict[str, Type] = {}
+        methods: Dict[str, MethodEntry] = {}
+        field_slots: Dict[str, int] = {}
+        method_slots: Dict[str, int] = {}
+        num_fields: int = 0
+
+        if super_id is not None:
+            fields.update(self.fields[super_id])
+            methods.update(self.methods[super_id])
+            field_slots.update(self.field_slots[super_id])
+            method_slots.update(self.method_slots[super_id])
+            num_fields = self.num_fields[super_id]
+
+        for field_id in entry.fields:
+            field_slots[field_id] = num_fields
+            num_fields += 1
+
+        for method_id in entry.methods:
+            if method_id not in method_slots:
+                method_slots[method_id] = len(method_slots)
+
+        fields.update(entry.fields)
+        methods.update(entry.methods)
+        self.fields[class_id] = fields
+        self.methods[class_id] = methods
+        self.field_slots[class_id] = field_slots
+        self.method_slots[class_id] = method_slots
+        self.num_fields[class_id] = num_fields
+
+    def get_class_order(self) -> List[str]:
+        return self.class_order
+
+    def get_super_class(self, class_id: str) -> str:
+        return self.super_class.get(class_id)
+
+    def get_fields(self, class_id: str) -> Dict[str, Type]:
+        return self.fields.get(class_id, {})
+
+    def get_field(self, class_id: str, field_id: str) -> Type:
+        return self.get_fields(class_id).get(field_id)
+
+    def contains_field(self, class_id: str, field_id: str) -> bool:
+        return field_id in self.get_fields(class_id)
+
+    def get_methods(self, class_id: str) -> Dict[str, MethodEntry]:
+        return self.methods.get(class_id, {})
+
+    def get_method(self, class_id: str, method_id: str) -> MethodEntry:
+        return self.get_methods(class_id).get(method_id)
+
+    def get_field_offset(self, class_id: str, field_id: str) -> int:
+        return self.field_slots[class_id].get(field_id)
+
+    def get_method_offset(self, class_id: str, method_id: str) -> int:
+        return self.method_slots[class_id].get(method_id)
+
+    def get_num_fields(self, class_id: str) -> int:
+        return self.num_fields[class_id]
+
+    def get_num_methods(self, class_id: str) -> int:
+        return len(self.method_slots[class_id])
+
+    def is_subtype(self, sub_class_id: str, super_class_id: str) -> bool:
+        if sub_class_id not in self.pre_order or super_class_id not in self.pre_order:
+            return False
 
+        return (self.pre_order[super_class_id] <= self.pre_order[sub_class_id]
+                and self.post_order[sub_class_id] <= self.post_order[super_class_id])
 
 
 class SymbolTable():
@@ -133,15 +276,40 @@ class SymbolTable():
         self.curr_method = None
         self.curr_class_name = None
         self.curr_method_name = None
+        self.hierarchy: ClassHierarchy = None
+
+    def build_hierarchy(self) -> ClassHierarchy:
+        self.hierarchy = ClassHierarchy(self.class_scopes)
+        return self.hierarchy
+
+    def get_hierarchy(self) -> ClassHierarchy:
+        #Built on first use after the last declaration, which drops it.
+        if self.hierarchy is None:
+            self.build_hierarchy()
+        return self.hierarchy
+
+    def is_subtype(self, sub_class_id: str, super_class_id: str) -> bool:
+        return self.get_hierarchy().is_subtype(sub_class_id, super_class_id)
+
+    def get_field(self, class_id: str, field_id: str) -> Type:
+        #A field of the class or of one of its superclasses
+        return self.get_hierarchy().get_field(class_id, field_id)
+
+    def contains_field(self, class_id: str, field_id: str) -> bool:
+        return self.get_hierarchy().contains_field(class_id, field_id)
+
+    def get_method(self, class_id: str, method_id: str) -> MethodEntry:
+        #A method of the class or of one of its superclasses
+        return self.get_hierarchy().get_method(class_id, method_id)
 
     def contains_class(self, key: str) -> bool:
-        return key in self.class_scopes.keys()
+        return key in self.class_scopes
 
     def get_class_entry(self, id: str) -> ClassEntry:
-        return self.class_scopes.get(Symbol.symbol(id).to_string())
+        return self.class_scopes.get(id)
 
     def set_curr_class(self, id: str) -> None:
-        self.curr_class = self.class_scopes.get(Symbol.symbol(id).to_string());      
+        self.curr_class = self.class_scopes.get(id);      
         self.curr_class_name = id
         self.curr_method = None
         self.curr_method_name = None
@@ -151,32 +319,21 @@ class SymbolTable():
         self.curr_method_name = id
 
     def add_scope(self, id: str, entry: ClassEntry) -> bool:
+        self.hierarchy = None
         self.curr_class = entry
         self.curr_class_name = id
         self.curr_method = None
         self.curr_method_name = None
         
-        if(self.contains_class(Symbol.symbol(id).to_string())):
+        if(self.contains_class(id)):
             return False
         else:
-            self.class_scopes[Symbol.symbol(id).to_string()] = entry
+            self.class_scopes[sys.intern(id)] = entry
 
         return True
 
-    def add_extends_entry(self, id: str, supper_class_id: str) -> None:
-
-        base: ClassEntry = self.get_class_entry(Symbol.symbol(id).to_string())
-        supper_class: ClassEntry = self.get_class_entry(Symbol.symbol(supper_class_id).to_string())
-
-        if supper_class is not None:
-            for supper_field_id in supper_class.get_fields().keys():
-                base.add_var(supper_field_id, supper_class.get_field(supper_field_id))
-            
-            for supper_method_id in supper_class.get_methods().keys():
-                base.add_method(supper_method_id, supper_class.get_method(supper_method_id))
-
-
     def add_method(self, id: str, entry: MethodEntry) -> bool:
+        self.hierarchy = None
         self.curr_method = entry
         self.curr_method_name = id
         
@@ -187,6 +344,7 @@ class SymbolTable():
         
 
     def add_field(self, id: str, type: Type) -> bool:
+        self.hierarchy = None
         return self.curr_class.add_var(id, type)
 
     def add_param(self, id: str, type: Type) -> bool:
@@ -1,18 +1,36 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Dict
 
+from pymjc.context import CompilationContext
+from pymjc.front.arraylist import ArrayList
 from pymjc.front.symbol import Symbol
 
 class Temp():
-    count: int = 0
+
+    #Temps that stand for the same thing in every process, the machine registers, are shared
+    #under a key: they are pickled as their key and come back as the same object.
+    shared: Dict[str, Temp] = {}
+    shared_key: str = None
 
     def __init__(self):
-        self.number = Temp.count
-        Temp.count += 1
+        self.number = CompilationContext.current().new_temp_number()
 
     def to_string(self) -> str:
         return "t" + str(self.number)
 
+    def share(self, key: str) -> None:
+        self.shared_key = key
+        Temp.shared[key] = self
+
+    def get_shared(key: str) -> Temp:
+        return Temp.shared[key]
+
+    def __reduce__(self):
+        if self.shared_key is not None:
+            return (Temp.get_shared, (self.shared_key,))
+        return (object.__new__, (Temp,), self.__dict__)
+
 
 class TempList():
     
@@ -28,12 +46,15 @@ class TempList():
         if self.head is None:
             self.head = element
         else:
-            last: TempList = self.tail
-            while last is not None:
+            last: TempList = self
+            while last.tail is not None:
                 last = last.tail
             last.tail = TempList(element, None)
 
-        
+
+class TempArray(ArrayList, TempList):
+    pass
+
 
 
 class TempMap(ABC):
@@ -65,16 +86,14 @@ class CombineMap(TempMap):
 
 class Label():
 
-    count: int = 0
-
     def __init__(self, name: str = None, symbol: Symbol = None):
         if name is not None:
             self.name = name
         elif symbol is not None:
             self.name = symbol.to_string()
         else:
-            self.name = "L" + str(Label.count)
-            Label.count += 1
+            context: CompilationContext = CompilationContext.current()
+            self.name = context.label_prefix + str(context.new_label_number())
     
     def to_string(self) -> str:
         return self.name 
@@ -84,4 +103,8 @@ class LabelList():
 
     def __init__(self, head: Label, tail: LabelList):
         self.head: Label = head
-        self.tail: LabelList = tail    
\ No newline at end of file
+        self.tail: LabelList = tail    
+
+
+class LabelArray(ArrayList, LabelList):
+    pass
@@ -217,7 +217,7 @@ class IfThenElseExp(Exp):
 
 class Frag():
     def __init__(self, frag: Frag = None):
-        self.nex: Frag = frag
+        self.next: Frag = frag
 
     def add_next(self, next: Frag) -> None:
         self.next = next
@@ -229,12 +229,14 @@ class Frag():
 class ProcFrag (Frag):
 
     def __init__(self, stmt: tree.Stm, frame: frame.Frame):
+        super().__init__()
         self.body: tree.Stm = stmt
         self.frame: frame.Frame = frame
 
 class DataFrag (Frag):
 
     def __init__(self, data: str):
+        super().__init__()
         self.data: str = data
     
     def to_string(self) -> str:
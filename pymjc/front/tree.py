@@ -1,7 +1,9 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 import sys
+from typing import Dict, List
 
+from pymjc.front.arraylist import ArrayList
 from pymjc.front.temp import DefaultMap, Label, LabelList, Temp, TempMap
 
 
@@ -28,11 +30,15 @@ class ExpList():
         if self.head is None:
             self.head = element
         else:
-            last: ExpList = self.tail
-            while last is not None:
+            last: ExpList = self
+            while last.tail is not None:
                 last = last.tail
             last.tail = ExpList(element, None)
 
+
+class ExpArray(ArrayList, ExpList):
+    pass
+
 class BINOP(Exp):
     PLUS = 0
     MINUS = 1
@@ -66,7 +72,7 @@ class CALL(Exp):
         return ExpList(self.func_exp, self.arg_exp_list)
 
     def build(self, kids: ExpList) -> Exp:
-        return CALL(kids.head, kids.tail.head)
+        return CALL(kids.head, kids.tail)
 
 
 class CONST(Exp):
@@ -144,6 +150,10 @@ class StmList():
         self.tail: StmList = tail
 
 
+class StmArray(ArrayList, StmList):
+    pass
+
+
 class LABEL(Stm):
     def __init__(self, label: Label):
         self.label: Label = label
@@ -166,6 +176,30 @@ class SEQ(Stm):
     def build(self, kids: ExpList) -> Stm:
         raise RuntimeError("build() not applicable to SEQ")
 
+    #A SEQ is pickled as the statements of its whole nest, in order, and comes back as a chain
+    #of SEQs to the right; canonical code does not depend on how a nest is grouped. Pickling
+    #only recurses as deep as statements nest inside expressions, not as long as a method is.
+    def __reduce__(self):
+        return (SEQ.chain, (SEQ.statements(self),))
+
+    def statements(self) -> List[Stm]:
+        stms: List[Stm] = []
+        stack: List[Stm] = [self]
+        while stack:
+            stm: Stm = stack.pop()
+            if isinstance(stm, SEQ):
+                stack.append(stm.right_stm)
+                stack.append(stm.left_stm)
+            else:
+                stms.append(stm)
+        return stms
+
+    def chain(stms: List[Stm]) -> SEQ:
+        seq: Stm = stms[-1]
+        for stm in reversed(stms[:-1]):
+            seq = SEQ(stm, seq)
+        return seq
+
 
 class EXP(Stm):
     def __init__(self, exp: Exp):
@@ -210,7 +244,7 @@ class JUMP(Stm):
 
 
     def build(self, kids: ExpList) -> Stm:
-        return JUMP(kids.head, self.targets)
+        return JUMP(exp=kids.head, targets=self.targets)
 
 
 class CJUMP(Stm):
@@ -266,11 +300,148 @@ class CJUMP(Stm):
 
 
 
+class TreeFactory():
+
+    #Hash-consing constructors for the pure expression nodes. With hash_consing on, equal CONST,
+    #NAME, TEMP, MEM and BINOP trees built by one factory are a single shared object: identity is
+    #structural equality, and the key of a node (its class, operator and the identity of its
+    #kids) works as a cached structural hash for CSE tables. CALL and ESEQ have side effects and
+    #are always new nodes, and so is any node with such a kid. Shared nodes must not be mutated.
+    def __init__(self, hash_consing: bool = True):
+        self.table: Dict[tuple, Exp] = {} if hash_consing else None
+        self.keys: Dict[int, tuple] = {}
+
+    def intern(self, key: tuple, node: Exp) -> Exp:
+        shared: Exp = self.table.get(key)
+        if shared is None:
+            self.table[key] = shared = node
+            self.keys[id(node)] = key
+        return shared
+
+    def is_shared(self, exp: Exp) -> bool:
+        return id(exp) in self.keys
+
+    def get_key(self, exp: Exp) -> tuple:
+        return self.keys.get(id(exp))
+
+    def size(self) -> int:
+        return len(self.table) if self.table is not None else 0
+
+    def CONST(self, value: int) -> Exp:
+        if self.table is None:
+            return CONST(value)
+        shared: Exp = self.table.get((CONST, value))
+        if shared is not None:
+            return shared
+        return self.intern((CONST, value), CONST(value))
+
+    def NAME(self, label: Label) -> Exp:
+        if self.table is None:
+            return NAME(label)
+        shared: Exp = self.table.get((NAME, label))
+        if shared is not None:
+            return shared
+        return self.intern((NAME, label), NAME(label))
+
+    def TEMP(self, temp: Temp) -> Exp:
+        if self.table is None:
+            return TEMP(temp)
+        shared: Exp = self.table.get((TEMP, temp))
+        if shared is not None:
+            return shared
+        return self.intern((TEMP, temp), TEMP(temp))
+
+    def MEM(self, exp: Exp) -> Exp:
+        if self.table is None or id(exp) not in self.keys:
+            return MEM(exp)
+        shared: Exp = self.table.get((MEM, exp))
+        if shared is not None:
+            return shared
+        return self.intern((MEM, exp), MEM(exp))
+
+    def BINOP(self, op: int, left_exp: Exp, right_exp: Exp) -> Exp:
+        if self.table is None or id(left_exp) not in self.keys or id(right_exp) not in self.keys:
+            return BINOP(op, left_exp, right_exp)
+        shared: Exp = self.table.get((BINOP, op, left_exp, right_exp))
+        if shared is not None:
+            return shared
+        return self.intern((BINOP, op, left_exp, right_exp), BINOP(op, left_exp, right_exp))
+
+    def CALL(self, func_exp: Exp, arg_exp_list: ExpList) -> Exp:
+        return CALL(func_exp, arg_exp_list)
+
+    def ESEQ(self, stm: Stm, exp: Exp) -> Exp:
+        return ESEQ(stm, exp)
+
+    def share(self, exp: Exp) -> Exp:
+        #Rebuilds the pure parts of a tree made elsewhere with shared nodes, bottom-up.
+        if self.table is None:
+            return exp
+        shared: Dict[int, Exp] = {}
+        stack: list = [(exp, False)]
+        while stack:
+            node, kids_done = stack.pop()
+            if id(node) in self.keys:
+                shared[id(node)] = node
+            elif type(node) is CONST:
+                shared[id(node)] = self.CONST(node.value)
+            elif type(node) is NAME:
+                shared[id(node)] = self.NAME(node.label)
+            elif type(node) is TEMP:
+                shared[id(node)] = self.TEMP(node.temp)
+            elif type(node) is MEM:
+                if kids_done:
+                    shared[id(node)] = self.MEM(shared[id(node.exp)])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.exp, False))
+            elif type(node) is BINOP:
+                if kids_done:
+                    shared[id(node)] = self.BINOP(node.op, shared[id(node.left_exp)], shared[id(node.right_exp)])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right_exp, False))
+                    stack.append((node.left_exp, False))
+            else:
+                shared[id(node)] = node
+        return shared[id(exp)]
+
+    def equal(self, a, b) -> bool:
+        #Shared nodes are equal only when they are the same object; anything else is compared
+        #field by field.
+        stack: list = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if ((isinstance(a, ExpList) and isinstance(b, ExpList)) or (isinstance(a, StmList) and isinstance(b, StmList))
+                    or (isinstance(a, LabelList) and isinstance(b, LabelList))):
+                stack.append((a.tail, b.tail))
+                stack.append((a.head, b.head))
+                continue
+            if type(a) is not type(b):
+                return False
+            if id(a) in self.keys and id(b) in self.keys:
+                return False
+            if isinstance(a, Exp) or isinstance(a, Stm):
+                a_fields: dict = vars(a)
+                b_fields: dict = vars(b)
+                if a_fields.keys() != b_fields.keys():
+                    return False
+                for field in a_fields:
+                    stack.append((a_fields[field], b_fields[field]))
+            elif a != b:
+                return False
+        return True
+
+
+
 class Print():
-    #sys.stdout
-    def __init__(self, out_path: str = None, temp_map: TempMap = None):
+    #sys.stdout, or the text stream out
+    def __init__(self, out_path: str = None, temp_map: TempMap = None, out = None):
         if out_path is not None:
             sys.stdout = open(out_path, 'w')
+        self.out = out
         
         if temp_map is None:
             self.temp_map = DefaultMap()
@@ -280,13 +451,13 @@ class Print():
 
     def indent(self, d: int):
         #for index in range(d):
-        print(d * ' ',  end='')
+        print(d * ' ',  end='', file=self.out)
 
     def say(self, string: str):
-         print(string)
+         print(string, file=self.out)
 
     def say(self, string: str):
-         print(string, end='')
+         print(string, end='', file=self.out)
 
     def sayln(self, string: str):
          self.say(string)
@@ -323,9 +494,9 @@ class Print():
     def print_seq(self, stmt : SEQ, d: int):
         self.indent(d)
         self.sayln("SEQ(")
-        self.print_stm(stmt.left, d + 1)
+        self.print_stm(stmt.left_stm, d + 1)
         self.sayln(",")
-        self.print_stm(stmt.right, d + 1)
+        self.print_stm(stmt.right_stm, d + 1)
         self.say(")")
 
 
@@ -442,7 +613,7 @@ class Print():
         self.indent(d)
         self.say("BINOP(")
 
-        match(exp.binop):
+        match(exp.op):
             case BINOP.PLUS:
                 self.say("PLUS")
 
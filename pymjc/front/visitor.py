@@ -9,7 +9,7 @@ from pymjc.front import temp, translate, tree
 from pymjc.front.visitorkinds import *
 from pymjc.front.symbol import *
 from pymjc.log import MJLogger
-from pymjc.util import Converter
+from pymjc.util import BoolList, Converter
 
 class SemanticErrorType(enum.Enum):
     ALREADY_DECLARED_CLASS = 1
@@ -560,6 +560,9 @@ class FillSymbolTableVisitor(Visitor):
         for index in range(element.class_decl_list.size()):
             element.class_decl_list.element_at(index).accept(self)
 
+        #Inherited fields and methods are flattened once every class is known, superclasses first.
+        self.symbol_table.build_hierarchy()
+
 
     def visit_main_class(self, element: MainClass) -> None:
         self.symbol_table.set_curr_class(element.class_name_id.name)
@@ -588,8 +591,6 @@ class FillSymbolTableVisitor(Visitor):
         for index in range(element.method_decl_list.size()):
             element.method_decl_list.element_at(index).accept(self)
 
-        self.symbol_table.add_extends_entry(element.class_name_id.name, element.super_class_name_id.name)
-
         return None
 
     def visit_class_decl_simple(self, element: ClassDeclSimple) -> None:
@@ -782,6 +783,31 @@ class FillSymbolTableVisitor(Visitor):
 
 
 
+class DeclarationVisitor(FillSymbolTableVisitor):
+    #Header-only variant of FillSymbolTableVisitor: collects classes, fields, method
+    #signatures and locals without walking statement bodies, which FusedTypeCheckingVisitor
+    #then walks once to type check and translate them. It reports the same declaration errors.
+
+    def visit_main_class(self, element: MainClass) -> None:
+        self.symbol_table.set_curr_class(element.class_name_id.name)
+        self.symbol_table.add_method("main", MethodEntry(None))
+        self.symbol_table.add_param(element.arg_name_id.name, None)
+        return None
+
+    def visit_method_decl(self, element: MethodDecl) -> None:
+        if not self.symbol_table.add_method(element.name_id.name, MethodEntry(element.type)):
+            self.add_semantic_error(SemanticErrorType.ALREADY_DECLARED_METHOD)
+            MJLogger.semantic_log(self.src_file_name, SemanticErrorType.ALREADY_DECLARED_METHOD.name, self.symbol_table.curr_class_name + "#" + element.name_id.name)
+
+        for index in range(element.formal_param_list.size()):
+            element.formal_param_list.element_at(index).accept(self)
+
+        for index in range(element.var_decl_list.size()):
+            element.var_decl_list.element_at(index).accept(self)
+
+        return None
+
+
 ########################################
 # AST Type Visitors
 ########################################
@@ -1011,69 +1037,78 @@ class TypeCheckingVisitor(TypeVisitor):
     def get_symbol_table(self) -> SymbolTable:
         return self.symbol_table
 
+    def is_class_mismatch(self, expected_type: Type, actual_type: Type) -> bool:
+        #An object fits where its class or one of its superclasses is expected. Undeclared classes are reported on their own.
+        return (isinstance(expected_type, IdentifierType) and isinstance(actual_type, IdentifierType)
+                and self.symbol_table.contains_class(expected_type.name) and self.symbol_table.contains_class(actual_type.name)
+                and not self.symbol_table.is_subtype(actual_type.name, expected_type.name))
+
+    def type_of(self, element: Component) -> Type:
+        return element.accept_type(self)
+
     def visit_program(self, element: Program) -> Type:
-        element.main_class.accept_type(self)
+        self.type_of(element.main_class)
         for index in range(element.class_decl_list.size()):
-            element.class_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.class_decl_list.element_at(index))
         return None
 
     def visit_main_class(self, element: MainClass) -> Type:
         self.symbol_table.set_curr_class(element.class_name_id.name)
         self.symbol_table.set_curr_method("main")
-        element.class_name_id.accept_type(self)
-        element.arg_name_id.accept_type(self)
-        element.statement.accept_type(self)
+        self.type_of(element.class_name_id)
+        self.type_of(element.arg_name_id)
+        self.type_of(element.statement)
         return None
 
     def visit_class_decl_extends(self, element: ClassDeclExtends) -> Type:
         self.symbol_table.set_curr_class(element.class_name_id.name)
-        element.class_name_id.accept_type(self)
-        element.super_class_name_id.accept_type(self)
+        self.type_of(element.class_name_id)
+        self.type_of(element.super_class_name_id)
 
         for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.var_decl_list.element_at(index))
     
         for index in range(element.method_decl_list.size()):
-            element.method_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.method_decl_list.element_at(index))
 
         return None    
 
     def visit_class_decl_simple(self, element: ClassDeclSimple) -> Type:
         self.symbol_table.set_curr_class(element.class_name_id.name)
-        element.class_name_id.accept_type(self)
+        self.type_of(element.class_name_id)
 
         for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.var_decl_list.element_at(index))
     
         for index in range(element.method_decl_list.size()):
-            element.method_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.method_decl_list.element_at(index))
         
         return None
 
     def visit_var_decl(self, element: VarDecl) -> Type:
-        element.type.accept_type(self)
-        element.name_id.accept_type(self)
+        self.type_of(element.type)
+        self.type_of(element.name_id)
         return None
      
 
     def visit_method_decl(self, element: MethodDecl) -> Type:
         self.symbol_table.set_curr_method(element.name_id.name)
-        element.type.accept_type(self)
-        element.name_id.accept_type(self)
+        self.type_of(element.type)
+        self.type_of(element.name_id)
 
         for index in range(element.formal_param_list.size()):
-            element.formal_param_list.element_at(index).accept_type(self)
+            self.type_of(element.formal_param_list.element_at(index))
 
         for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_type(self)
+            self.type_of(element.var_decl_list.element_at(index))
 
         for index in range(element.statement_list.size()):
-            element.statement_list.element_at(index).accept_type(self)
+            self.type_of(element.statement_list.element_at(index))
 
         method_return_type = self.symbol_table.curr_method.get_return_type()
-        return_exp_type = element.return_exp.accept_type(self)
+        return_exp_type = self.type_of(element.return_exp)
         
-        if(type(method_return_type) != type(return_exp_type)):
+        if(type(method_return_type) != type(return_exp_type) or self.is_class_mismatch(method_return_type, return_exp_type)):
             self.add_semantic_error(SemanticErrorType.RETURN_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
             error_msg = " expected return type " + str(type(method_return_type)) + " not " + str(type(return_exp_type))
@@ -1083,8 +1118,8 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_formal(self, element: Formal) -> Type:
-        element.type.accept_type(self)
-        element.name_id.accept_type(self)
+        self.type_of(element.type)
+        self.type_of(element.name_id)
         return None
 
 
@@ -1108,44 +1143,43 @@ class TypeCheckingVisitor(TypeVisitor):
     
     def visit_block(self, element: Block) -> Type:
         for index in range(element.statement_list.size()):
-            element.statement_list.element_at(index).accept_type(self)
+            self.type_of(element.statement_list.element_at(index))
         
         return None
 
     def visit_if(self, element: If) -> Type:
-        condition_exp_type = element.condition_exp.accept_type(self)
+        condition_exp_type = self.type_of(element.condition_exp)
         if(not isinstance(condition_exp_type, BooleanType)):
             self.add_semantic_error(SemanticErrorType.IF_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
             error_msg = error_msg + " if condition type must be BooleanType not " + str(type(condition_exp_type))
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.IF_TYPE_MISMATCH.name, error_msg)
 
-        element.if_statement.accept_type(self)
-        element.else_statement.accept_type(self)
+        self.type_of(element.if_statement)
+        self.type_of(element.else_statement)
         return None
   
 
     def visit_while(self, element: While) -> Type:
-        condition_exp_type = element.condition_exp.accept_type(self)
+        condition_exp_type = self.type_of(element.condition_exp)
         if(not isinstance(condition_exp_type, BooleanType)):
             self.add_semantic_error(SemanticErrorType.WHILE_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
             error_msg = error_msg + " while condition type must be BooleanType not " + str(type(condition_exp_type))
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.WHILE_TYPE_MISMATCH.name, error_msg)
 
-        element.statement.accept_type(self)
+        self.type_of(element.statement)
         return None
 
     
     def visit_print(self, element: Print) -> Type:
-        element.print_exp.accept_type(self)
+        self.type_of(element.print_exp)
         return None
 
 
     def visit_assign(self, element: Assign) -> Type:
-        curr_class = self.symbol_table.curr_class
         curr_method = self.symbol_table.curr_method
-        check_field_decl = curr_class.contains_field(element.left_side_id.name)
+        check_field_decl = self.symbol_table.contains_field(self.symbol_table.curr_class_name, element.left_side_id.name)
         check_local_decl = curr_method.contains_local(element.left_side_id.name)
         check_param_decl = curr_method.contains_param(element.left_side_id.name)
             
@@ -1154,10 +1188,11 @@ class TypeCheckingVisitor(TypeVisitor):
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name + " " + element.left_side_id.name + " is an undeclared identifier."
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.UNDECLARED_IDENTIFIER.name, error_msg)            
 
-        left_side_type = element.left_side_id.accept_type(self)
-        right_side_type = element.right_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_id)
+        right_side_type = self.type_of(element.right_side_exp)
 
-        if((type(left_side_type) is None) or (type(right_side_type) is None) or (type(left_side_type) != type(right_side_type))):
+        if((type(left_side_type) is None) or (type(right_side_type) is None) or (type(left_side_type) != type(right_side_type))
+           or self.is_class_mismatch(left_side_type, right_side_type)):
             self.add_semantic_error(SemanticErrorType.ASSIGN_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
             error_msg = error_msg + " left side type " + str(type(left_side_type))
@@ -1168,9 +1203,8 @@ class TypeCheckingVisitor(TypeVisitor):
 
     
     def visit_array_assign(self, element: ArrayAssign) -> Type:
-        curr_class = self.symbol_table.curr_class
         curr_method = self.symbol_table.curr_method
-        check_field_decl = curr_class.contains_field(element.array_name_id.name)
+        check_field_decl = self.symbol_table.contains_field(self.symbol_table.curr_class_name, element.array_name_id.name)
         check_local_decl = curr_method.contains_local(element.array_name_id.name)
         check_param_decl = curr_method.contains_param(element.array_name_id.name)
             
@@ -1179,8 +1213,8 @@ class TypeCheckingVisitor(TypeVisitor):
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name + " " + element.array_name_id.name + " is an undeclared identifier."
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.UNDECLARED_IDENTIFIER.name, error_msg)
 
-        array_type = element.array_name_id.accept_type(self)
-        array_index_type = element.array_exp.accept_type(self)
+        array_type = self.type_of(element.array_name_id)
+        array_index_type = self.type_of(element.array_exp)
 
         if(not isinstance(array_index_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.INDEX_TYPE_MISMATCH)
@@ -1190,7 +1224,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.INDEX_TYPE_MISMATCH.name, error_msg)
 
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
 
         if((not isinstance(array_type, IntArrayType)) or (not isinstance(right_side_type, IntegerType))):
             self.add_semantic_error(SemanticErrorType.ARRAY_ASSIGN_TYPE_MISMATCH)
@@ -1203,7 +1237,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
     
     def visit_and(self, element: And) -> Type:
-        left_side_type = element.left_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_exp)
         if(not isinstance(left_side_type, BooleanType)):
             self.add_semantic_error(SemanticErrorType.AND_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1211,7 +1245,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.AND_TYPE_MISMATCH.name, error_msg)
             return None
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
         if(not isinstance(right_side_type, BooleanType)):
             self.add_semantic_error(SemanticErrorType.AND_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1222,7 +1256,7 @@ class TypeCheckingVisitor(TypeVisitor):
         return BooleanType()
 
     def visit_less_than(self, element: LessThan) -> Type:
-        left_side_type = element.left_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_exp)
         if(not isinstance(left_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.LESS_THAN_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1230,7 +1264,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.LESS_THAN_TYPE_MISMATCH.name, error_msg)
             return None
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
         if(not isinstance(right_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.LESS_THAN_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1242,7 +1276,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_plus(self, element: Plus) -> Type:
-        left_side_type = element.left_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_exp)
         if(not isinstance(left_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.PLUS_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1250,7 +1284,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.PLUS_TYPE_MISMATCH.name, error_msg)
             return None
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
         if(not isinstance(right_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.PLUS_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1262,7 +1296,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_minus(self, element: Minus) -> Type:
-        left_side_type = element.left_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_exp)
         if(not isinstance(left_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.MINUS_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1270,7 +1304,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.MINUS_TYPE_MISMATCH.name, error_msg)
             return None
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
         if(not isinstance(right_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.MINUS_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1282,7 +1316,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
     
     def visit_times(self, element: Times) -> Type:
-        left_side_type = element.left_side_exp.accept_type(self)
+        left_side_type = self.type_of(element.left_side_exp)
         if(not isinstance(left_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.TIMES_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1290,7 +1324,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.TIMES_TYPE_MISMATCH.name, error_msg)
             return None
 
-        right_side_type = element.right_side_exp.accept_type(self)
+        right_side_type = self.type_of(element.right_side_exp)
         if(not isinstance(right_side_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.TIMES_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1302,7 +1336,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_array_lookup(self, element: ArrayLookup) -> Type:
-        out_side_exp_type = element.out_side_exp.accept_type(self)
+        out_side_exp_type = self.type_of(element.out_side_exp)
         if(not isinstance(out_side_exp_type, IntArrayType)):
             self.add_semantic_error(SemanticErrorType.ARRAY_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1310,7 +1344,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.ARRAY_TYPE_MISMATCH.name, error_msg)
             return None
 
-        in_side_exp_type = element.in_side_exp.accept_type(self)
+        in_side_exp_type = self.type_of(element.in_side_exp)
         if(not isinstance(in_side_exp_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.INDEX_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1321,7 +1355,7 @@ class TypeCheckingVisitor(TypeVisitor):
         return IntegerType()
 
     def visit_array_length(self, element: ArrayLength) -> Type:
-        length_exp_type = element.length_exp.accept_type(self)
+        length_exp_type = self.type_of(element.length_exp)
         if(not isinstance(length_exp_type, IntArrayType)):
             self.add_semantic_error(SemanticErrorType.ARRAY_LENGTH_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1333,7 +1367,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_call(self, element: Call) -> Type:
-        callee_exp_type = element.callee_exp.accept_type(self)
+        callee_exp_type = self.type_of(element.callee_exp)
         
         if(not isinstance(callee_exp_type, IdentifierType)):
             self.add_semantic_error(SemanticErrorType.INVALID_OBJECT_IDENTIFIER)
@@ -1350,7 +1384,7 @@ class TypeCheckingVisitor(TypeVisitor):
             MJLogger.semantic_log(self.src_file_name, SemanticErrorType.UNDECLARED_CLASS.name, error_msg)
             return None
         
-        method_entry = class_entry.get_method(element.callee_name_id.name)
+        method_entry = self.symbol_table.get_method(callee_exp_type.name, element.callee_name_id.name)
 
         if(method_entry is None):
             self.add_semantic_error(SemanticErrorType.UNDECLARED_METHOD)
@@ -1369,10 +1403,10 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
         for index in range(element.arg_list.size()):
-            arg_type = element.arg_list.element_at(index).accept_type(self)
+            arg_type = self.type_of(element.arg_list.element_at(index))
             expected_type = method_entry.get_param_by_position(index)
 
-            if((arg_type is None) or (type(arg_type) != type(expected_type))):
+            if((arg_type is None) or (type(arg_type) != type(expected_type)) or self.is_class_mismatch(expected_type, arg_type)):
                 self.add_semantic_error(SemanticErrorType.ARG_TYPE_MISMATCH)
                 error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
                 error_msg = error_msg + " expected " + str(type(expected_type)) + " got " + str(type(arg_type))                
@@ -1406,7 +1440,7 @@ class TypeCheckingVisitor(TypeVisitor):
                 return return_type
 
         if(self.symbol_table.curr_class is not None):
-            return_type = self.symbol_table.curr_class.get_field(element.name)
+            return_type = self.symbol_table.get_field(self.symbol_table.curr_class_name, element.name)
             if(return_type is not None):
                 return return_type
 
@@ -1429,7 +1463,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_new_array(self, element: NewArray) -> Type:
-        new_exp_type = element.new_exp.accept_type(self)
+        new_exp_type = self.type_of(element.new_exp)
         if(not isinstance(new_exp_type, IntegerType)):
             self.add_semantic_error(SemanticErrorType.NEW_ARRAY_TYPE_MISMATCH)
             error_msg = self.symbol_table.curr_class_name + "#" + self.symbol_table.curr_method_name
@@ -1450,7 +1484,7 @@ class TypeCheckingVisitor(TypeVisitor):
 
 
     def visit_not(self, element: Not) -> Type:
-        negated_exp_type = element.negated_exp.accept_type(self)
+        negated_exp_type = self.type_of(element.negated_exp)
 
         if(not isinstance(negated_exp_type, BooleanType)):
             self.add_semantic_error(SemanticErrorType.NOT_TYPE_MISMATCH)
@@ -1479,7 +1513,7 @@ class TypeCheckingVisitor(TypeVisitor):
                 return return_type
 
         if(self.symbol_table.curr_class is not None):
-            return_type = self.symbol_table.curr_class.get_field(element.name)
+            return_type = self.symbol_table.get_field(self.symbol_table.curr_class_name, element.name)
             if(return_type is not None):
                 return return_type
 
@@ -1492,10 +1526,12 @@ class TypeCheckingVisitor(TypeVisitor):
 #TODO
 class TranslateVisitor(IRVisitor):
 
-    def __init__(self, symbol_table: SymbolTable, frame: Frame) -> None:
+    def __init__(self, symbol_table: SymbolTable, frame: Frame, ir: tree.TreeFactory = None) -> None:
         super().__init__()
         self.symbol_table: SymbolTable = symbol_table
         self.current_frame: Frame = frame
+        #Builds the IR nodes; a hash-consing factory shares equal pure subtrees.
+        self.ir: tree.TreeFactory = ir if ir is not None else tree.TreeFactory(False)
         self.frags: translate.Frag = translate.Frag()
         self.head_frags = self.frags
         self.var_access = {}
@@ -1516,108 +1552,134 @@ class TranslateVisitor(IRVisitor):
     def get_result(self) -> translate.Frag:
         return self.head_frags
 
+    def exp_of(self, element: Component) -> translate.Exp:
+        return element.accept_ir(self)
+
+    def field_exp(self, name: str) -> tree.Exp:
+        #A field of the current class that no parameter or local hides lives in this object, in its
+        #slot of the class hierarchy after the first word. None for any other name.
+        curr_method: MethodEntry = self.symbol_table.curr_method
+        if curr_method is not None and (curr_method.contains_param(name) or curr_method.contains_local(name)):
+            return None
+        if self.symbol_table.get_class_entry(self.symbol_table.curr_class_name) is None:
+            return None
+        offset: int = self.symbol_table.get_hierarchy().get_field_offset(self.symbol_table.curr_class_name, name)
+        if offset is None:
+            return None
+        this: tree.Exp = self.ir.MEM(self.ir.TEMP(self.current_frame.FP()))
+        return self.ir.MEM(self.ir.BINOP(tree.BINOP.PLUS, this, self.ir.CONST((offset + 1) * self.current_frame.word_size())))
+
     def visit_program(self, element: Program) -> translate.Exp:
-        element.main_class.accept_ir(self)
+        self.exp_of(element.main_class)
 
-        for index in range(len(element.class_decl_list)):
-            element.class_decl_list.element_at(index).accept_ir(self)
+        for index in range(element.class_decl_list.size()):
+            self.exp_of(element.class_decl_list.element_at(index))
 
         return None
 
     def visit_main_class(self, element: MainClass) -> translate.Exp:
-        element.class_name_id.accept_ir(self)
-        element.arg_name_id.accept_ir(self)
+        self.enter_main_class(element)
+        self.exit_main_class(self.exp_of(element.statement))
+        return None
+
+    #The frame of main, before its statement is translated.
+    def enter_main_class(self, element: MainClass) -> None:
+        self.exp_of(element.class_name_id)
+        self.exp_of(element.arg_name_id)
         self.symbol_table.set_curr_class(element.class_name_id.name)
         self.symbol_table.set_curr_method("main")
 
-        escapes_list = List[bool]
+        escapes_list: BoolList = BoolList()
         for i in range(self.symbol_table.curr_method.get_num_params()):
-            escapes_list.append(False)
+            escapes_list.add_bool(False)
         
         frame_aux = self.current_frame.new_frame(Symbol.symbol(element.class_name_id.name + "$" + self.symbol_table.curr_method_name), escapes_list)
         self.current_frame = frame_aux
-        
-        stmt: translate.Exp = element.statement.accept_ir(self)
-        return_exp: translate.Exp = translate.Exp(tree.CONST(0))
-        body: tree.Stm = tree.MOVE(tree.TEMP(self.current_frame.RV()), tree.ESEQ(tree.EXP(stmt.un_ex()), return_exp.un_ex()))
 
-        stmt_list = List[tree.Stm]
-        stmt_list.append(body)
+    def exit_main_class(self, stmt: translate.Exp) -> None:
+        return_exp: translate.Exp = translate.Ex(self.ir.CONST(0))
+        body: tree.Stm = tree.MOVE(self.ir.TEMP(self.current_frame.RV()), tree.ESEQ(stmt.un_nx(), return_exp.un_ex()))
+
+        stmt_list: List[tree.Stm] = [body]
         self.current_frame.proc_entry_exit1(stmt_list)
         self.proc_entry_exit(Converter.to_SEQ(stmt_list))
 
-        return None
-
 
     def visit_class_decl_extends(self, element: ClassDeclExtends) -> translate.Exp:
-        self.symbol_table.set_curr_class(element.class_name_id.name)
-        element.class_name_id.accept_ir(self)
-        element.super_class_name_id.accept_ir(self)
+        self.enter_class(element)
 
-        for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_ir(self)
-        
         for index in range(element.method_decl_list.size()):
-            element.method_decl_list.element_at(index).accept_ir(self)
+            self.exp_of(element.method_decl_list.element_at(index))
 
         return None
 
     def visit_class_decl_simple(self, element: ClassDeclSimple) -> translate.Exp:
-        self.symbol_table.set_curr_class(element.class_name_id.name)
-        element.class_name_id.accept_ir(self)
+        self.enter_class(element)
 
-        for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_ir(self)
-        
         for index in range(element.method_decl_list.size()):
-            element.method_decl_list.element_at(index).accept_ir(self)
+            self.exp_of(element.method_decl_list.element_at(index))
 
         return None
 
+    def enter_class(self, element: ClassDecl) -> None:
+        self.symbol_table.set_curr_class(element.class_name_id.name)
+        self.exp_of(element.class_name_id)
+
+        for index in range(element.var_decl_list.size()):
+            self.exp_of(element.var_decl_list.element_at(index))
+
     def visit_var_decl(self, element: VarDecl) -> translate.Exp:
-        element.name_id.accept_ir(self)
-        element.type.accept_ir(self)
+        self.exp_of(element.name_id)
+        self.exp_of(element.type)
         return None
   
     def visit_method_decl(self, element: MethodDecl) -> translate.Exp:
+        self.enter_method(element)
+        return_exp: translate.Exp = self.exp_of(element.return_exp)
+        statements: List[translate.Exp] = [self.exp_of(element.statement_list.element_at(index))
+                                           for index in range(element.statement_list.size())]
+        self.exit_method(statements, return_exp)
+        return None
+
+    #The frame of a method, before its statements and return expression are translated.
+    def enter_method(self, element: MethodDecl) -> None:
         self.symbol_table.set_curr_method(element.name_id.name)
-        element.type.accept_ir(self)
-        element.name_id.accept_ir(self)
+        self.exp_of(element.type)
+        self.exp_of(element.name_id)
 
-        escapes_list = List[bool]
+        escapes_list: BoolList = BoolList()
 
         for index in range(element.formal_param_list.size()):
-            element.formal_param_list.element_at(index).accept_ir(self)
-            escapes_list.append(False)
+            self.exp_of(element.formal_param_list.element_at(index))
+            escapes_list.add_bool(False)
 
         for index in range(element.var_decl_list.size()):
-            element.var_decl_list.element_at(index).accept_ir(self)
+            self.exp_of(element.var_decl_list.element_at(index))
 
         self.current_frame = self.current_frame.new_frame(Symbol.symbol(self.symbol_table.curr_class_name + "$" + self.symbol_table.curr_method_name), escapes_list)
 
+    def exit_method(self, statements: List[translate.Exp], return_exp: translate.Exp) -> None:
         body: tree.Stm
-        body_list = List[tree.Stm]
-        return_exp: tree.Exp = element.return_exp.accept_ir(self).un_ex()
+        body_list: List[tree.Stm] = []
 
-        if element.statement_list.size() == 0:
-            body = tree.MOVE(tree.TEMP(self.current_frame.RV()), return_exp)
+        if len(statements) == 0:
+            body = tree.MOVE(self.ir.TEMP(self.current_frame.RV()), return_exp.un_ex())
         else:
-            body = tree.EXP(element.statement_list.element_at(0).accept_ir(self).un_ex())
-            for i in range(1, element.statement_list.size()):
-                body = tree.SEQ(body, tree.EXP(element.statement_list.element_at(i).accept_ir(self).un_ex()))
+            body = statements[0].un_nx()
+            for statement in statements[1:]:
+                body = tree.SEQ(body, statement.un_nx())
             
-            body = tree.MOVE(tree.TEMP(self.current_frame.RV()), tree.ESEQ(body, return_exp))
+            body = tree.MOVE(self.ir.TEMP(self.current_frame.RV()), tree.ESEQ(body, return_exp.un_ex()))
         
         body_list.append(body)
         self.current_frame.proc_entry_exit1(body_list)
         self.proc_entry_exit(Converter.to_SEQ(body_list))
         self.var_access = {}
-        return None
 
     
     def visit_formal(self, element: Formal) -> translate.Exp:
-        element.type.accept_ir(self)
-        element.name_id.accept_ir(self)
+        self.exp_of(element.type)
+        self.exp_of(element.name_id)
         return None
 
     def visit_int_array_type(self, element: IntArrayType) -> translate.Exp:
@@ -1638,7 +1700,7 @@ class TranslateVisitor(IRVisitor):
         if(element.statement_list.size() == 0):
             return translate.Nx(None)
 
-        exp: translate.Exp = element.statement_list.element_at(0).accept_ir(self)
+        exp: translate.Exp = self.exp_of(element.statement_list.element_at(0))
         
         if(element.statement_list.size() == 1):
             return exp
@@ -1646,16 +1708,16 @@ class TranslateVisitor(IRVisitor):
         stm: tree.Stm = exp.un_nx()
         
         for i in range(1, element.statement_list.size()):
-            exp = element.statement_list.element_at(i).accept_ir(self)
+            exp = self.exp_of(element.statement_list.element_at(i))
             stm = tree.SEQ(stm, exp.un_nx())
 
         return translate.Nx(stm)
 
        
     def visit_if(self, element: If) -> translate.Exp:
-        exp: translate.Exp = element.condition_exp.accept_ir(self)
-        if_stm: translate.Exp = element.if_statement.accept_ir(self)
-        else_stm: translate.Exp = element.else_statement.accept_ir(self)
+        exp: translate.Exp = self.exp_of(element.condition_exp)
+        if_stm: translate.Exp = self.exp_of(element.if_statement)
+        else_stm: translate.Exp = self.exp_of(element.else_statement)
         
         true_label: temp.Label = temp.Label()
         false_label: temp.Label = temp.Label()
@@ -1665,7 +1727,7 @@ class TranslateVisitor(IRVisitor):
                                 tree.SEQ(
                                     tree.SEQ(
                                         tree.SEQ(
-                                            tree.CJUMP(tree.CJUMP.EQ, exp.un_ex(), tree.CONST(1), true_label, false_label),
+                                            tree.CJUMP(tree.CJUMP.EQ, exp.un_ex(), self.ir.CONST(1), true_label, false_label),
                                             tree.SEQ(tree.LABEL(true_label), if_stm.un_nx())),
                                         tree.JUMP(end_if_label)),
                                     tree.SEQ(tree.LABEL(false_label), else_stm.un_nx())), 
@@ -1676,57 +1738,54 @@ class TranslateVisitor(IRVisitor):
         test: temp.Label = temp.Label()
         true_label: temp.Label = temp.Label()
         false_label: temp.Label = temp.Label()
-        exp: translate.Exp = element.condition_exp.accept_ir(self)
-        body: translate.Exp = element.statement.accept_ir(self)
+        exp: translate.Exp = self.exp_of(element.condition_exp)
+        body: translate.Exp = self.exp_of(element.statement)
 
        
         return translate.Nx(tree.SEQ(
                                 tree.SEQ(
                                     tree.SEQ(tree.LABEL(test),
-                                             tree.CJUMP(tree.CJUMP.EQ, exp.un_ex(), tree.CONST(1),true_label,false_label)),
+                                             tree.CJUMP(tree.CJUMP.EQ, exp.un_ex(), self.ir.CONST(1),true_label,false_label)),
                                     tree.SEQ(tree.LABEL(true_label),body.un_nx())), 
                                 tree.LABEL(false_label)))
 
 
 
     def visit_print(self, element: Print) -> translate.Exp:
-        print_exp: translate.Exp = element.print_exp.accept_ir(self)
+        print_exp: translate.Exp = self.exp_of(element.print_exp)
         
-        args = List[tree.Exp]
-        args.add(print_exp.un_ex())
+        args: List[tree.Exp] = [print_exp.un_ex()]
         
         exp: tree.Exp = self.current_frame.external_call("print", args)
 
-        return translate.Nx(tree.MOVE(tree.TEMP(temp.Temp()), exp))
+        return translate.Nx(tree.MOVE(self.ir.TEMP(temp.Temp()), exp))
 
     def visit_assign(self, element: Assign) -> translate.Exp:
-        var: translate.Exp = element.left_side_id.accept_ir(self)
-        exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        var: translate.Exp = self.exp_of(element.left_side_id)
+        exp: translate.Exp = self.exp_of(element.right_side_exp)
         
         if (isinstance(var.un_ex(), tree.TEMP)):
             return translate.Nx(tree.MOVE (var.un_ex(),  exp.un_ex()))
         else:
-            temp: temp.Temp = temp.Temp()
-            return translate.Nx(tree.MOVE(tree.MEM(tree.BINOP.PLUS, tree.TEMP(temp), var.un_ex())), exp.un_ex())
+            return translate.Nx(tree.MOVE(var.un_ex(), exp.un_ex()))
 
 
     def visit_array_assign(self, element: ArrayAssign) -> translate.Exp:
         word_size = self.current_frame.word_size()
-        array_exp: tree.Exp = element.array_name_id.accept_ir(self).un_ex()
+        array_exp: tree.Exp = self.exp_of(element.array_name_id).un_ex()
 
+        #An array in a field is read once, into a temp.
+        array_stm: tree.Stm = None
         if (not isinstance(array_exp, tree.TEMP)):
-            temp_01: temp.Temp = temp.Temp()
-            temp_02: temp.Temp = temp.Temp()
-            array_exp = tree.ESEQ(tree.SEQ(
-                                tree.MOVE(tree.TEMP(temp_01), tree.BINOP(tree.BINOP.MUL, array_exp, tree.CONST(word_size))), 
-                                tree.MOVE(tree.TEMP(temp_02), tree.MEM(tree.BINOP(tree.BINOP.PLUS, tree.TEMP(temp.Temp(0), tree.TEMP(temp_01))))), 
-                                tree.TEMP(temp_02)))
-
-
-        index_exp: tree.Exp = element.array_exp.accept_ir(self).un_ex()
-        temp_index = temp.Temp = temp.Temp()
-        temp_size = temp.Temp = temp.Temp()
-        args: tree.ExpList = tree.ExpList()
+            temp_array: temp.Temp = temp.Temp()
+            array_stm = tree.MOVE(self.ir.TEMP(temp_array), array_exp)
+            array_exp = self.ir.TEMP(temp_array)
+
+
+        index_exp: tree.Exp = self.exp_of(element.array_exp).un_ex()
+        temp_index: temp.Temp = temp.Temp()
+        temp_size: temp.Temp = temp.Temp()
+        args: List[tree.Exp] = []
         true_label: temp.Label = temp.Label()
         false_label: temp.Label = temp.Label()
 
@@ -1737,78 +1796,78 @@ class TranslateVisitor(IRVisitor):
                                     tree.SEQ(
                                         tree.SEQ(
                                             tree.MOVE(
-                                                tree.TEMP(temp_index), 
-                                                tree.BINOP(tree.BINOP.MUL, index_exp, tree.CONST(word_size))),
-                                            tree.MOVE(tree.TEMP(temp_size), tree.MEM(array_exp))),
-                                        tree.CJUMP(tree.CJUMP.GE, tree.TEMP(temp_index), tree.TEMP(temp_size), true_label, false_label)),
+                                                self.ir.TEMP(temp_index), 
+                                                self.ir.BINOP(tree.BINOP.MUL, index_exp, self.ir.CONST(word_size))),
+                                            tree.MOVE(self.ir.TEMP(temp_size), self.ir.MEM(array_exp))),
+                                        tree.CJUMP(tree.CJUMP.GE, self.ir.TEMP(temp_index), self.ir.TEMP(temp_size), true_label, false_label)),
                                     tree.LABEL(true_label)),
                                 tree.MOVE(
-                                    tree.TEMP(temp.Temp()), 
+                                    self.ir.TEMP(temp.Temp()), 
                                     self.current_frame.external_call("_error", args))), 
                             tree.LABEL(false_label)),
-                        tree.TEMP(temp_index))
+                        self.ir.TEMP(temp_index))
 
 
 
-        value_exp: tree.Exp = element.right_side_exp.accept_ir(self).un_ex()
+        value_exp: tree.Exp = self.exp_of(element.right_side_exp).un_ex()
         
-        return translate.Nx(
-            tree.MOVE(tree.MEM(
-                          tree.BINOP(
-                               tree.BINOP.PLUS, array_exp, 
-                               tree.BINOP(tree.BINOP.PLUS, index_exp,tree.CONST(word_size)))), 
-                      value_exp))
+        array_move: tree.Stm = tree.MOVE(self.ir.MEM(
+                                             self.ir.BINOP(
+                                                  tree.BINOP.PLUS, array_exp, 
+                                                  self.ir.BINOP(tree.BINOP.PLUS, index_exp,self.ir.CONST(word_size)))), 
+                                         value_exp)
+        return translate.Nx(array_move if array_stm is None else tree.SEQ(array_stm, array_move))
 
 
     def visit_and(self, element: And) -> translate.Exp:
-        left_side_exp: translate.Exp = element.left_side_exp.accept_ir(self)
-        right_side_exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        left_side_exp: translate.Exp = self.exp_of(element.left_side_exp)
+        right_side_exp: translate.Exp = self.exp_of(element.right_side_exp)
 
-        binop: tree.BINOP = tree.BINOP(tree.BINOP.AND, left_side_exp.un_ex(), right_side_exp.un_ex())
+        binop: tree.BINOP = self.ir.BINOP(tree.BINOP.AND, left_side_exp.un_ex(), right_side_exp.un_ex())
         return translate.Ex(binop)
 
 
     def visit_less_than(self, element: LessThan) -> translate.Exp:
-        left_side_exp: translate.Exp = element.left_side_exp.accept_ir(self)
-        right_side_exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        left_side_exp: translate.Exp = self.exp_of(element.left_side_exp)
+        right_side_exp: translate.Exp = self.exp_of(element.right_side_exp)
 
         return translate.RelCx(tree.CJUMP.LT, right_side_exp.un_ex(), left_side_exp.un_ex())
 
 
 
     def visit_plus(self, element: Plus) -> translate.Exp:
-        left_side_exp: translate.Exp = element.left_side_exp.accept_ir(self)
-        right_side_exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        left_side_exp: translate.Exp = self.exp_of(element.left_side_exp)
+        right_side_exp: translate.Exp = self.exp_of(element.right_side_exp)
 
-        binop: tree.BINOP = tree.BINOP(tree.BINOP.PLUS, left_side_exp.un_ex(), right_side_exp.un_ex())
+        binop: tree.BINOP = self.ir.BINOP(tree.BINOP.PLUS, left_side_exp.un_ex(), right_side_exp.un_ex())
         return translate.Ex(binop)
 
 
     def visit_minus(self, element: Minus) -> translate.Exp:
-        left_side_exp: translate.Exp = element.left_side_exp.accept_ir(self)
-        right_side_exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        left_side_exp: translate.Exp = self.exp_of(element.left_side_exp)
+        right_side_exp: translate.Exp = self.exp_of(element.right_side_exp)
 
-        binop: tree.BINOP = tree.BINOP(tree.BINOP.MINUS, left_side_exp.un_ex(), right_side_exp.un_ex())
+        binop: tree.BINOP = self.ir.BINOP(tree.BINOP.MINUS, left_side_exp.un_ex(), right_side_exp.un_ex())
         return translate.Ex(binop)
 
 
 
     def visit_times(self, element: Times) -> translate.Exp:
-        left_side_exp: translate.Exp = element.left_side_exp.accept_ir(self)
-        right_side_exp: translate.Exp = element.right_side_exp.accept_ir(self)
+        left_side_exp: translate.Exp = self.exp_of(element.left_side_exp)
+        right_side_exp: translate.Exp = self.exp_of(element.right_side_exp)
 
-        binop: tree.BINOP = tree.BINOP(tree.BINOP.MUL, left_side_exp.un_ex(), right_side_exp.un_ex())
+        binop: tree.BINOP = self.ir.BINOP(tree.BINOP.MUL, left_side_exp.un_ex(), right_side_exp.un_ex())
         return translate.Ex(binop)
 
 
     def visit_array_lookup(self, element: ArrayLookup) -> translate.Exp:
         t_index: temp.Temp = temp.Temp()
         t_size: temp.Temp() = temp.Temp()
-        array: translate.Exp = element.out_side_exp.accept_ir(self).un_ex()
-        index: translate.Exp = element.in_side_exp.accept_ir(self).un_ex()
+        array: translate.Exp = self.exp_of(element.out_side_exp).un_ex()
+        index: translate.Exp = self.exp_of(element.in_side_exp).un_ex()
         false_label: temp.Label = temp.Label()
         true_label: temp.Label = temp.Label()
-        args = List[tree.Exp]
+        args: List[tree.Exp] = []
         word_size = self.current_frame.word_size()
 
         stm_01: tree.Stm = tree.SEQ(
@@ -1816,64 +1875,64 @@ class TranslateVisitor(IRVisitor):
                                     tree.SEQ(
                                         tree.SEQ(
                                             tree.SEQ(
-                                                tree.MOVE(tree.TEMP(t_index),tree.BINOP(tree.BINOP.MUL,index,tree.CONST(word_size))),
-                                                tree.MOVE(tree.TEMP(t_size),tree.MEM(array))),
-                                            tree.CJUMP(tree.CJUMP.GE,tree.TEMP(t_index),tree.TEMP(t_size),true_label,false_label)),
+                                                tree.MOVE(self.ir.TEMP(t_index),self.ir.BINOP(tree.BINOP.MUL,index,self.ir.CONST(word_size))),
+                                                tree.MOVE(self.ir.TEMP(t_size),self.ir.MEM(array))),
+                                            tree.CJUMP(tree.CJUMP.GE,self.ir.TEMP(t_index),self.ir.TEMP(t_size),true_label,false_label)),
                                             tree.LABEL(true_label)),
-                                            tree.MOVE(tree.TEMP(temp.Temp()), self.current_frame.external_call("_error",args))),
+                                            tree.MOVE(self.ir.TEMP(temp.Temp()), self.current_frame.external_call("_error",args))),
                                 tree.LABEL(false_label))
         
         t: temp.Temp = temp.Temp()
         stm_02: tree.Stm = tree.SEQ(
                                 stm_01,
                                 tree.MOVE(
-                                    tree.TEMP(t),
-                                    tree.MEM(
-                                        tree.BINOP(
+                                    self.ir.TEMP(t),
+                                    self.ir.MEM(
+                                        self.ir.BINOP(
                                             tree.BINOP.PLUS,array,
-                                            tree.BINOP(
+                                            self.ir.BINOP(
                                                 tree.BINOP.PLUS,
-                                                tree.BINOP(
+                                                self.ir.BINOP(
                                                     tree.BINOP.MUL, index, 
-                                                    tree.CONST(word_size)),
-                                                    tree.CONST(word_size))))))
+                                                    self.ir.CONST(word_size)),
+                                                    self.ir.CONST(word_size))))))
         
-        return translate.Ex(tree.ESEQ(stm_02,tree.TEMP(t)))
+        return translate.Ex(tree.ESEQ(stm_02,self.ir.TEMP(t)))
 
 
     def visit_array_length(self, element: ArrayLength) -> translate.Exp:
-        exp: translate.Exp = element.length_exp.accept_ir(self)
-        mem: tree.MEM = tree.MEM(exp.un_ex())
+        exp: translate.Exp = self.exp_of(element.length_exp)
+        mem: tree.MEM = self.ir.MEM(exp.un_ex())
         return translate.Ex(mem)
 
     def visit_call(self, element: Call) -> translate.Exp:
-        class_exp: translate.Exp = element.callee_exp.accept_ir(self)
+        class_exp: translate.Exp = self.exp_of(element.callee_exp)
         fn_label: temp.Label = temp.Label(self.call_class_name + "$" + element.callee_name_id.name)
         
         arg_list: tree.ExpList = tree.ExpList(class_exp.un_ex(), None)
-        args = List[tree.Exp]
+        args: List[tree.Exp] = []
         
         args.append(class_exp.un_ex())
 
         for i in range(element.arg_list.size()):
-            arg: translate.Exp = element.arg_list.element_at(i).accept_ir(self)
-            args.insert(0, arg.un_ex())
+            arg: translate.Exp = self.exp_of(element.arg_list.element_at(i))
+            args.append(arg.un_ex())
         
         arg_list = Converter.to_ExpList(args)
-        fn_call: tree.CALL = tree.CALL(tree.NAME(fn_label), arg_list)
+        fn_call: tree.CALL = tree.CALL(self.ir.NAME(fn_label), arg_list)
         return translate.Ex(fn_call)
 
 
     def visit_integer_literal(self, element: IntegerLiteral) -> translate.Exp:
-        return translate.Ex(tree.CONST(element.value))
+        return translate.Ex(self.ir.CONST(element.value))
 
     def visit_true_exp(self, element: TrueExp) -> translate.Exp:
-        true_const = tree.CONST(1)
+        true_const = self.ir.CONST(1)
         return translate.Ex(true_const)
 
 
     def visit_false_exp(self, element: FalseExp) -> translate.Exp:
-        false_const = tree.CONST(0)
+        false_const = self.ir.CONST(0)
         return translate.Ex(false_const)
 
 
@@ -1883,38 +1942,45 @@ class TranslateVisitor(IRVisitor):
         if(type is None):
             type = self.symbol_table.curr_method.get_local_by_name(element.name)
             if(type is None):
-                type = self.symbol_table.curr_class.get_field(element.name)
+                type = self.symbol_table.get_field(self.symbol_table.curr_class_name, element.name)
         
         if (isinstance(type, IdentifierType)):
             self.call_class_name = type.name
+
+        field: tree.Exp = self.field_exp(element.name)
+        if field is not None:
+            return translate.Ex(field)
             
         access: Access = self.var_access.get(element.name)
         if (access is None):
             access = self.current_frame.alloc_local(False)
             self.var_access[element.name] = access
 
-        return translate.Ex(access.exp(tree.TEMP(self.current_frame.FP())))
+        return translate.Ex(self.ir.share(access.exp(self.ir.TEMP(self.current_frame.FP()))))
 
     def visit_this(self, element: This) -> translate.Exp:
         self.call_class_name = self.symbol_table.curr_class_name
-        return translate.Ex(tree.MEM(tree.TEMP(self.current_frame.FP())))
+        return translate.Ex(self.ir.MEM(self.ir.TEMP(self.current_frame.FP())))
 
 
     def visit_new_array(self, element: NewArray) -> translate.Exp:
-        exp: translate.Exp = element.new_exp.accept_ir(self)
+        exp: translate.Exp = self.exp_of(element.new_exp)
         word_size = self.current_frame.word_size()
+        # the length is evaluated once and read back from temp_size
+        temp_size: temp.Temp = temp.Temp()
+        stm_size: tree.Stm = tree.MOVE(self.ir.TEMP(temp_size), exp.un_ex())
         # computing array size
-        num_of_items: tree.BINOP = tree.BINOP(tree.BINOP.PLUS, exp.un_ex(), tree.CONST(1))
-        array_size: tree.Exp = tree.BINOP(tree.BINOP.MUL, num_of_items, tree.CONST(word_size))
+        num_of_items: tree.BINOP = self.ir.BINOP(tree.BINOP.PLUS, self.ir.TEMP(temp_size), self.ir.CONST(1))
+        array_size: tree.Exp = self.ir.BINOP(tree.BINOP.MUL, num_of_items, self.ir.CONST(word_size))
 
         temp_01: temp.Temp = temp.Temp()
         temp_02: temp.Temp = temp.Temp()
-        args = List[tree.Exp]
+        args: List[tree.Exp] = []
         args.append(array_size)
         
        # call malloc get pointer to space allocated in temp_01
         alloc: tree.Exp = self.current_frame.external_call("malloc", args)
-        stm_01: tree.Stm = tree.MOVE(tree.TEMP(temp_01), alloc)
+        stm_01: tree.Stm = tree.MOVE(self.ir.TEMP(temp_01), alloc)
 
         cj: temp.Label = temp.Label()
         false_label: temp.Label = temp.Label()
@@ -1927,41 +1993,121 @@ class TranslateVisitor(IRVisitor):
                                         tree.SEQ(
                                             tree.SEQ(
                                                 tree.SEQ(
-                                                    tree.MOVE(tree.TEMP(temp_02),tree.CONST(word_size)),
-                                                    tree.SEQ(tree.LABEL(cj), tree.CJUMP(tree.CJUMP.LT, tree.TEMP(temp_02), array_size, false_label, true_label))),
+                                                    tree.MOVE(self.ir.TEMP(temp_02),self.ir.CONST(word_size)),
+                                                    tree.SEQ(tree.LABEL(cj), tree.CJUMP(tree.CJUMP.LT, self.ir.TEMP(temp_02), array_size, false_label, true_label))),
                                                 tree.LABEL(true_label)),
-                                            tree.MOVE(tree.MEM(tree.BINOP(tree.BINOP.PLUS,tree.TEMP(temp_01),tree.TEMP(temp_02))),tree.CONST(0))),
-                                        tree.MOVE(tree.TEMP(temp_02),tree.BINOP(tree.BINOP.PLUS,tree.TEMP(temp_02), tree.CONST(word_size)))),
+                                            tree.MOVE(self.ir.MEM(self.ir.BINOP(tree.BINOP.PLUS,self.ir.TEMP(temp_01),self.ir.TEMP(temp_02))),self.ir.CONST(0))),
+                                        tree.MOVE(self.ir.TEMP(temp_02),self.ir.BINOP(tree.BINOP.PLUS,self.ir.TEMP(temp_02), self.ir.CONST(word_size)))),
                                     tree.JUMP(cj)),
-                                tree.SEQ(tree.LABEL(false_label),tree.MOVE(tree.MEM(tree.TEMP(temp_01)),tree.BINOP(tree.BINOP.MUL,exp.un_ex(),tree.CONST(word_size)))))
+                                tree.SEQ(tree.LABEL(false_label),tree.MOVE(self.ir.MEM(self.ir.TEMP(temp_01)),self.ir.BINOP(tree.BINOP.MUL,self.ir.TEMP(temp_size),self.ir.CONST(word_size)))))
 
 	       
-        return translate.Ex(tree.ESEQ(tree.SEQ(stm_01,stm_02), tree.TEMP(temp_01)))
+        return translate.Ex(tree.ESEQ(tree.SEQ(stm_size, tree.SEQ(stm_01,stm_02)), self.ir.TEMP(temp_01)))
 
 
     def visit_new_object(self, element: NewObject) -> translate.Exp:
         self.call_class_name = element.object_name_id.name
-        c: ClassEntry = self.symbol_table.get_class_entry(element.object_name_id.name)
-        tam: int = len(c.get_fields().keys())
+        tam: int = self.symbol_table.get_hierarchy().get_num_fields(element.object_name_id.name)
 
-        params = List[tree.Exp]
-        params.append(tree.BINOP(tree.BINOP.MUL, tree.CONST(tam + 1), tree.CONST(self.current_frame.word_size())))
+        params: List[tree.Exp] = []
+        params.append(self.ir.BINOP(tree.BINOP.MUL, self.ir.CONST(tam + 1), self.ir.CONST(self.current_frame.word_size())))
         
         alloc: tree.Exp = self.current_frame.external_call("malloc", params)
-        return translate.Ex(tree.MOVE(tree.TEMP(temp.Temp()), alloc))
+        return translate.Ex(alloc)
 
 
     def visit_not(self, element: Not) -> translate.Exp:
-        exp: translate.Exp = element.negated_exp.accept_ir(self)
-        binop: tree.BINOP = tree.BINOP(tree.BINOP.XOR, tree.CONST(1), exp.un_ex())
+        exp: translate.Exp = self.exp_of(element.negated_exp)
+        binop: tree.BINOP = self.ir.BINOP(tree.BINOP.XOR, self.ir.CONST(1), exp.un_ex())
         return translate.Ex(binop)
 
 
     def visit_identifier(self, element: Identifier) -> translate.Exp:
         self.call_class_name = element.name
+        field: tree.Exp = self.field_exp(element.name)
+        if field is not None:
+            return translate.Ex(field)
+
         access: Access = self.var_access.get(element.name)
         if access is None:
             access = self.current_frame.alloc_local(False)
             self.var_access[element.name] = access
         
-        return translate.Ex(access.exp(tree.TEMP(self.current_frame.FP())))
\ No newline at end of file
+        return translate.Ex(self.ir.share(access.exp(self.ir.TEMP(self.current_frame.FP()))))
+
+
+class FusedTranslateVisitor(TranslateVisitor):
+    #Translates the statements and expressions that FusedTypeCheckingVisitor hands it as they type
+    #check. Their children were handed over first, so a node takes their translations from
+    #translations instead of walking them again.
+
+    def __init__(self, symbol_table: SymbolTable, frame: Frame, ir: tree.TreeFactory = None) -> None:
+        super().__init__(symbol_table, frame, ir)
+        #Translation of a node and the call_class_name it left, by id of the node, until its parent takes it.
+        self.translations = {}
+
+    def add_translation(self, element: Component) -> None:
+        exp: translate.Exp = element.accept_ir(self)
+        self.translations[id(element)] = (exp, self.call_class_name)
+
+    def exp_of(self, element: Component) -> translate.Exp:
+        translation: tuple = self.translations.pop(id(element), None)
+        if translation is None:
+            return element.accept_ir(self)
+        exp, self.call_class_name = translation
+        return exp
+
+
+class FusedTypeCheckingVisitor(TypeCheckingVisitor):
+    #Type checks and translates method bodies in a single walk, over a symbol table built from the
+    #headers by DeclarationVisitor. The walk is the type checker's, so it reports the same errors;
+    #each statement and expression is translated once it type checks. Translation stops at the
+    #first semantic error, since a program with errors is not translated.
+
+    def __init__(self, translator: FusedTranslateVisitor) -> None:
+        super().__init__()
+        self.translator: FusedTranslateVisitor = translator
+        self.translating: bool = True
+
+    def fill_semantic_errors(self, semantic_errors) -> None:
+        super().fill_semantic_errors(semantic_errors)
+        self.translating = sum(semantic_errors.values()) == 0
+
+    def add_semantic_error(self, error_type: SemanticErrorType) -> None:
+        super().add_semantic_error(error_type)
+        self.translating = False
+
+    def type_of(self, element: Component) -> Type:
+        element_type: Type = element.accept_type(self)
+        if self.translating and isinstance(element, (Statement, Exp)):
+            self.translator.add_translation(element)
+        return element_type
+
+    def visit_main_class(self, element: MainClass) -> Type:
+        if self.translating:
+            self.translator.enter_main_class(element)
+        super().visit_main_class(element)
+        if self.translating:
+            self.translator.exit_main_class(self.translator.exp_of(element.statement))
+        return None
+
+    def visit_class_decl_extends(self, element: ClassDeclExtends) -> Type:
+        if self.translating:
+            self.translator.enter_class(element)
+        return super().visit_class_decl_extends(element)
+
+    def visit_class_decl_simple(self, element: ClassDeclSimple) -> Type:
+        if self.translating:
+            self.translator.enter_class(element)
+        return super().visit_class_decl_simple(element)
+
+    def visit_method_decl(self, element: MethodDecl) -> Type:
+        if self.translating:
+            self.translator.enter_method(element)
+        super().visit_method_decl(element)
+        if self.translating:
+            return_exp: translate.Exp = self.translator.exp_of(element.return_exp)
+            statements: List[translate.Exp] = [self.translator.exp_of(element.statement_list.element_at(index))
+                                               for index in range(element.statement_list.size())]
+            self.translator.exit_method(statements, return_exp)
+        return None
@@ -1,75 +1,390 @@
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
 import sys
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Tuple
 
 from pymjc import util
-from pymjc.back import assem, flowgraph, mips, regalloc
-from pymjc.front import ast, canon, lexer, parser,translate, tree, visitor
+from pymjc.back import assem, emit, mips, regalloc
+from pymjc.front import ast, canon, lexer, parser, scanner, translate, tree, visitor
+from pymjc.context import CompilationContext
+from pymjc.front.symbol import SymbolTable
+
+
+class CompileResult():
+
+    def __init__(self, src_file_name: str):
+        self.src_file_name: str = src_file_name
+        self.stage: str = None
+        self.bad_tokens: int = 0
+        self.syntax_error: bool = False
+        self.semantic_errors = {}
+        self.number_of_frags: int = 0
+        self.spills: int = 0
+        self.coalesced_moves: int = 0
+        self.timings = {}
+        self.error: str = None
+
+    def number_of_semantic_errors(self) -> int:
+        return sum(self.semantic_errors.values())
+
+    def merge(self, other: CompileResult) -> None:
+        #Adds up the counts and timings of a part of the compilation, such as a fragment.
+        self.spills += other.spills
+        self.coalesced_moves += other.coalesced_moves
+        for stage, elapsed in other.timings.items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def has_errors(self) -> bool:
+        return (self.bad_tokens > 0 or self.syntax_error or self.number_of_semantic_errors() > 0
+                or self.error is not None)
+
+    def to_dict(self) -> dict:
+        return {"src_file_name": self.src_file_name,
+                "stage": self.stage,
+                "bad_tokens": self.bad_tokens,
+                "syntax_error": self.syntax_error,
+                "semantic_errors": {name: count for name, count in self.semantic_errors.items() if count > 0},
+                "number_of_frags": self.number_of_frags,
+                "spills": self.spills,
+                "coalesced_moves": self.coalesced_moves,
+                "timings": self.timings,
+                "error": self.error}
+
 
 class MJCompiler():
 
-    def compile(self, source_file):
+    def __init__(self, lexer_class = lexer.MJLexer, fused_semantics: bool = False, hash_consing: bool = False,
+                 linear_scan: bool = False, jobs: int = 1):
+        self.lexer_class = lexer_class
+        self.fused_semantics: bool = fused_semantics
+        self.hash_consing: bool = hash_consing
+        self.linear_scan: bool = linear_scan
+        #Worker processes of the backend
+        self.jobs: int = jobs
+
+    def compile(self, source_file, output = None) -> CompileResult:
+        result = CompileResult(source_file.name)
+        with CompilationContext():
+            program_frags: translate.Frag = self.compile_to_ir(source_file, result)
+            if program_frags is not None:
+                #Instrucion Selection - MIPS, Register Allocation and, with an output stream, Assembly
+                self.compile_frags(program_frags, result, emit.AssemblyEmitter(output) if output is not None else None)
+
+        return result
+
+    def compile_frags(self, program_frags: translate.Frag, result: CompileResult, emitter: emit.AssemblyEmitter) -> None:
+        #Fragments go through the backend one after the other, or over a pool of jobs processes,
+        #and their assembly is written in fragment order either way. Each one is compiled in a
+        #context of its own (CompilationContext.fragment), so the output is the same. Once written,
+        #the IR of a fragment is dropped, so the serial backend holds a single procedure however
+        #many there are.
+        context: CompilationContext = CompilationContext.current()
+        last_frame: mips.MipsFrame = None
+        frag_jobs = ((self, context.fragment(index), translate.ProcFrag(frag.body, frag.frame), emitter is not None)
+                     for index, frag in enumerate(self.proc_frags(program_frags)))
+        #Only procedures go to the pool; data fragments are written as they are.
+        number_of_procs: int = sum(1 for frag in self.proc_frags(program_frags))
+        executor: ProcessPoolExecutor = None
+        if self.jobs > 1 and number_of_procs > 1:
+            executor = ProcessPoolExecutor(max_workers=self.jobs)
+            frag_outputs = executor.map(compile_frag_job, frag_jobs, chunksize=max(1, number_of_procs // (self.jobs * 4)))
+        else:
+            frag_outputs = map(compile_frag_job, frag_jobs)
+
+        try:
+            frag: translate.Frag = program_frags
+            while(frag is not None):
+                if(isinstance(frag, translate.ProcFrag)):
+                    frag_result, assembly = next(frag_outputs)
+                    result.merge(frag_result)
+                    if emitter is not None:
+                        self.run_stage(result, "emit", emitter.emit_assembly, assembly)
+                    frag.body = None
+                    last_frame = frag.frame
+                elif(isinstance(frag, translate.DataFrag) and emitter is not None):
+                    self.run_stage(result, "emit", emitter.emit_data, frag)
+                frag = frag.get_next()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        if emitter is not None and last_frame is not None:
+            self.run_stage(result, "emit", emitter.emit_tail, last_frame)
+
+    def compile_frag(self, context: CompilationContext, frag: translate.ProcFrag, emit_assembly: bool) -> Tuple[CompileResult, str]:
+        #Backend of one fragment: its counts and timings, and its assembly when asked for.
+        result = CompileResult(frag.frame.name.to_string())
+        assembly: str = None
+        with context:
+            assem_instr: List[assem.Instr] = self.run_stage(result, "codegen", self.select_frag_instructions, frag)
+            allocation: regalloc.RegAlloc = self.run_stage(result, "regalloc", self.allocate_frag_registers,
+                                                           frag, assem_instr, result)
+            if emit_assembly:
+                emitter = emit.AssemblyEmitter(io.StringIO())
+                self.run_stage(result, "emit", emitter.emit_proc, allocation.instrs, allocation)
+                assembly = emitter.out.getvalue()
+        return result, assembly
+
+    def proc_frags(self, program_frags: translate.Frag):
+        frag: translate.Frag = program_frags
+        while(frag is not None):
+            if(isinstance(frag, translate.ProcFrag)):
+                yield frag
+            frag = frag.get_next()
+
+    def compile_source(self, source, result: CompileResult) -> List[List[assem.Instr]]:
+        with CompilationContext.scope():
+            program_frags: translate.Frag = self.compile_to_ir(source, result)
+            if program_frags is None:
+                return []
+
+            #Instrucion Selection - MIPS
+            return self.run_stage(result, "codegen", self.select_instructions, program_frags)
+
+    def compile_to_ir(self, source, result: CompileResult) -> translate.Frag:
+        with CompilationContext.scope():
+            program: ast.Program
+            program_frags: translate.Frag
+            if self.fused_semantics:
+                #Lexical and Syntax Analysis, then Semantic Analysis and Translation in one walk over method bodies
+                program = self.run_stage(result, "parse", self.parse, source, result)
+                if result.bad_tokens > 0 or result.syntax_error or program is None:
+                    return None
+
+                program_frags = self.run_stage(result, "semantic", self.check_and_translate, program, result)
+                if result.number_of_semantic_errors() > 0:
+                    return None
+            else:
+                symbol_table: SymbolTable
+                program, symbol_table = self.analyze(source, result)
+                if program is None:
+                    return None
+
+                #Translation to Intermidiate Representation
+                program_frags = self.run_stage(result, "translate", self.translate_program, program, symbol_table, result)
+
+            result.number_of_frags = self.count_frags(program_frags)
+            return program_frags
+
+    def analyze(self, source, result: CompileResult) -> Tuple[ast.Program, SymbolTable]:
+        with CompilationContext.scope():
+            #Lexical and Syntax Analysis
+            program: ast.Program = self.run_stage(result, "parse", self.parse, source, result)
+            if result.bad_tokens > 0 or result.syntax_error or program is None:
+                return None, None
+
+            #Semantic Analysis
+            symbol_table: SymbolTable = self.run_stage(result, "semantic", self.check_semantics, program, result)
+            if result.number_of_semantic_errors() > 0:
+                return None, None
+
+            return program, symbol_table
 
-        #Lexical and Semantic Analysis
-        source_code = source_file.read()
-        mj_lexer = lexer.MJLexer()
-        mj_lexer.src_file_name = source_file.name
+    def run_stage(self, result: CompileResult, stage: str, function, *args):
+        #A stage run once for each fragment adds up its timings.
+        result.stage = stage
+        start = time.perf_counter()
+        value = function(*args)
+        result.timings[stage] = result.timings.get(stage, 0.0) + time.perf_counter() - start
+        return value
+
+    def parse(self, source, result: CompileResult) -> ast.Program:
+        mj_lexer = self.lexer_class()
+        mj_lexer.src_file_name = result.src_file_name
         mj_parser = parser.MJParser()
-        mj_parser.src_file_name = source_file.name
-        program:ast.Program = mj_parser.parse(mj_lexer.tokenize(source_code))
+        mj_parser.src_file_name = result.src_file_name
+
+        #Source may be a string or an open file; files are streamed when the lexer supports it.
+        if isinstance(source, str):
+            tokens = mj_lexer.tokenize(source)
+        elif hasattr(mj_lexer, "tokenize_stream"):
+            tokens = mj_lexer.tokenize_stream(source)
+        else:
+            tokens = mj_lexer.tokenize(source.read())
 
-        #Semantic Analysis: Symbol Table Construction 
-        symbol_table_creator = visitor.FillSymbolTableVisitor()
-        symbol_table_creator.src_file_name = source_file.name
+        program: ast.Program = mj_parser.parse(tokens)
+        result.bad_tokens = len(mj_lexer.bad_tokens)
+        result.syntax_error = mj_parser.syntax_error
+        return program
+
+    def check_semantics(self, program: ast.Program, result: CompileResult) -> SymbolTable:
+        #Semantic Analysis: Symbol Table Construction (headers only with fused_semantics, bodies are left to the type checker)
+        symbol_table_creator = visitor.DeclarationVisitor() if self.fused_semantics else visitor.FillSymbolTableVisitor()
+        symbol_table_creator.src_file_name = result.src_file_name
         symbol_table_creator.init_semantic_errors()
         symbol_table_creator.visit_program(program)
 
         #Semantic Analysis: Type Checking
         type_checker = visitor.TypeCheckingVisitor()
-        type_checker.src_file_name = source_file.name
+        type_checker.src_file_name = result.src_file_name
         type_checker.fill_semantic_errors(symbol_table_creator.semantic_errors)
         type_checker.set_symbol_table(symbol_table_creator.get_symbol_table())
         type_checker.visit_program(program)
 
-        #Translation to Intermidiate Representation
-        translate_visitor = visitor.TranslateVisitor(symbol_table_creator.get_symbol_table(), mips.MipsFrame())
-        translate_visitor.src_file_name = source_file.name
+        result.semantic_errors = type_checker.semantic_errors
+        return symbol_table_creator.get_symbol_table()
+
+    def check_and_translate(self, program: ast.Program, result: CompileResult) -> translate.Frag:
+        #Semantic Analysis: Symbol Table Construction from the headers
+        declaration_collector = visitor.DeclarationVisitor()
+        declaration_collector.src_file_name = result.src_file_name
+        declaration_collector.init_semantic_errors()
+        declaration_collector.visit_program(program)
+        symbol_table: SymbolTable = declaration_collector.get_symbol_table()
+
+        #Semantic Analysis: Type Checking, translating each method body as it is checked
+        translate_visitor = visitor.FusedTranslateVisitor(symbol_table, mips.MipsFrame(), tree.TreeFactory(self.hash_consing))
+        translate_visitor.src_file_name = result.src_file_name
+        type_checker = visitor.FusedTypeCheckingVisitor(translate_visitor)
+        type_checker.src_file_name = result.src_file_name
+        type_checker.fill_semantic_errors(declaration_collector.semantic_errors)
+        type_checker.set_symbol_table(symbol_table)
+        type_checker.visit_program(program)
+
+        result.semantic_errors = type_checker.semantic_errors
+        return translate_visitor.get_result()
+
+    def translate_program(self, program: ast.Program, symbol_table: SymbolTable, result: CompileResult) -> translate.Frag:
+        translate_visitor = visitor.TranslateVisitor(symbol_table, mips.MipsFrame(), tree.TreeFactory(self.hash_consing))
+        translate_visitor.src_file_name = result.src_file_name
         translate_visitor.visit_program(program)
-        translate_visitor.set_symbol_table(symbol_table_creator.get_symbol_table())
-        program_frags: translate.Frag = translate_visitor.get_result()
+        translate_visitor.set_symbol_table(symbol_table)
+        return translate_visitor.get_result()
 
-        #Instrucion Selection - MIPS
-        stm_list: tree.StmList
-        frags_assem_instr = List[List[assem.Instr]]
+    def count_frags(self, program_frags: translate.Frag) -> int:
+        count: int = 0
+        frag: translate.Frag = program_frags
+        while(frag is not None):
+            if(isinstance(frag, (translate.ProcFrag, translate.DataFrag))):
+                count += 1
+            frag = frag.get_next()
+        return count
+
+    def select_instructions(self, program_frags: translate.Frag) -> List[List[assem.Instr]]:
+        frags_assem_instr: List[List[assem.Instr]] = []
         frag: translate.Frag = program_frags
         while(frag is not None):
             if(isinstance(frag, translate.ProcFrag)):
-                stm_list = canon.Canon.linearize(frag.body)
-                basic_blocks: canon.BasicBlocks = canon.BasicBlocks(stm_list)
-                schedule: canon.TraceSchedule  = canon.TraceSchedule(basic_blocks)
-                assem_instr = List[assem.Instr]
+                frags_assem_instr.append(self.select_frag_instructions(frag))
 
-                instr_list: List[assem.Instr] = frag.frame.codegen(util.Converter.to_ListStm(schedule.stms))
-                for instr in instr_list:
-                  assem_instr.append(instr)
+            frag = frag.get_next()
 
-                frag.frame.proc_entry_exit2(assem_instr)
-                frag.frame.proc_entry_exit3(assem_instr)
-                frags_assem_instr.append(assem_instr)     
+        return frags_assem_instr
 
-            frag = frag.get_next()
+    def allocate_frag_registers(self, frag: translate.ProcFrag, assem_instr: List[assem.Instr],
+                                result: CompileResult) -> regalloc.RegAlloc:
+        allocation = regalloc.RegAlloc(frag.frame, util.Converter.to_InstrList(assem_instr), self.linear_scan)
+        result.spills += allocation.number_of_spills
+        result.coalesced_moves += allocation.number_of_coalesced_moves
+
+        #The size of the frame is known once the allocator stops spilling into it.
+        allocated_instr: List[assem.Instr] = allocation.instrs.to_list() if allocation.instrs is not None else []
+        frag.frame.proc_entry_exit3(allocated_instr)
+        allocation.instrs = assem.InstrArray(allocated_instr)
+        return allocation
+
+    def select_frag_instructions(self, frag: translate.ProcFrag) -> List[assem.Instr]:
+        stm_list: tree.StmList = canon.Canon.linearize(frag.body)
+        basic_blocks: canon.BasicBlocks = canon.BasicBlocks(stm_list)
+        schedule: canon.TraceSchedule  = canon.TraceSchedule(basic_blocks)
+        assem_instr: List[assem.Instr] = []
+
+        instr_list: List[assem.Instr] = frag.frame.codegen(util.Converter.to_ListStm(schedule.stms))
+        for instr in instr_list:
+          assem_instr.append(instr)
+
+        frag.frame.proc_entry_exit2(assem_instr)
+        return assem_instr
+
+
+def compile_frag_job(frag_job: Tuple[MJCompiler, CompilationContext, translate.ProcFrag, bool]) -> Tuple[CompileResult, str]:
+    compiler, context, frag, emit_assembly = frag_job
+    return compiler.compile_frag(context, frag, emit_assembly)
+
+
+def compile_file(src_file_path: str, lexer_class = lexer.MJLexer, fused_semantics: bool = False,
+                 hash_consing: bool = False, linear_scan: bool = False) -> CompileResult:
+    result = CompileResult(src_file_path)
+    try:
+        with open(src_file_path, "r") as source_file, CompilationContext():
+            compiler = MJCompiler(lexer_class, fused_semantics, hash_consing, linear_scan)
+            program_frags: translate.Frag = compiler.compile_to_ir(source_file, result)
+            if program_frags is not None:
+                #Instrucion Selection - MIPS and Register Allocation, with no assembly written
+                compiler.compile_frags(program_frags, result, None)
+    except Exception as error:
+        result.error = f"{type(error).__name__}: {error}"
+
+    return result
+
+
+class MJBatchCompiler():
+
+    def __init__(self, max_workers: int = None, lexer_class = lexer.MJLexer, fused_semantics: bool = False,
+                 hash_consing: bool = False, linear_scan: bool = False):
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.lexer_class = lexer_class
+        self.fused_semantics: bool = fused_semantics
+        self.hash_consing: bool = hash_consing
+        self.linear_scan: bool = linear_scan
+
+    def collect_source_files(self, paths: List[str]) -> List[str]:
+        src_file_paths: List[str] = []
+        for path in paths:
+            if os.path.isdir(path):
+                for dir_path, dir_names, file_names in os.walk(path):
+                    dir_names.sort()
+                    for file_name in sorted(file_names):
+                        if file_name.endswith(".java"):
+                            src_file_paths.append(os.path.join(dir_path, file_name))
+            else:
+                src_file_paths.append(path)
+
+        return src_file_paths
 
-        #Flow Graph Building
-        flow_graph: flowgraph.AssemFlowGraph = None
-        for assem_instr in frags_assem_instr:
-            flow_graph = flowgraph.AssemFlowGraph(util.Converter.to_InstrList(assem_instr))
-            flow_graph.show()
+    def compile(self, paths: List[str]) -> List[CompileResult]:
+        src_file_paths = self.collect_source_files(paths)
+        compile_function = partial(compile_file, lexer_class=self.lexer_class, fused_semantics=self.fused_semantics,
+                                   hash_consing=self.hash_consing, linear_scan=self.linear_scan)
+        if self.max_workers == 1 or len(src_file_paths) <= 1:
+            return [compile_function(src_file_path) for src_file_path in src_file_paths]
 
+        chunk_size = max(1, len(src_file_paths) // (self.max_workers * 4))
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(compile_function, src_file_paths, chunksize=chunk_size))
 
 
 if __name__ == '__main__':
-    args = sys.argv[1:]
+    arg_parser = argparse.ArgumentParser(prog="pymjc.run")
+    arg_parser.add_argument("sources", nargs="+", help="MiniJava source files or directories")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="number of worker processes: for the files in batch mode, for the methods of a single file otherwise")
+    arg_parser.add_argument("--batch", action="store_true", help="report structured per-file results as JSON lines")
+    arg_parser.add_argument("--scanner", action="store_true", help="use the hand-written MJScanner instead of the sly lexer")
+    arg_parser.add_argument("--fused", action="store_true", help="collect declarations from headers only and type check and translate method bodies in one walk")
+    arg_parser.add_argument("--hash-consing", action="store_true", help="share equal pure IR subtrees while translating")
+    arg_parser.add_argument("--linear-scan", action="store_true", help="allocate registers by linear scan instead of graph coloring")
+    arg_parser.add_argument("-o", "--output", default=None, help="write the MIPS assembly of a single source file here instead of to stdout")
+    args = arg_parser.parse_args()
+    lexer_class = scanner.MJScanner if args.scanner else lexer.MJLexer
 
-    if len(args) == 1:
-        with open(args[0], "r") as source_file:
-            compiler = MJCompiler()
-            compiler.compile(source_file)
\ No newline at end of file
+    if len(args.sources) == 1 and not args.batch and not os.path.isdir(args.sources[0]):
+        with open(args.sources[0], "r") as source_file:
+            compiler = MJCompiler(lexer_class, args.fused, args.hash_consing, args.linear_scan, args.jobs or 1)
+            if args.output is None:
+                result = compiler.compile(source_file, sys.stdout)
+            else:
+                with emit.AssemblyEmitter.open(args.output) as output:
+                    result = compiler.compile(source_file, output)
+        if result.has_errors():
+            print(json.dumps(result.to_dict()), file=sys.stderr)
+    else:
+        batch_compiler = MJBatchCompiler(args.jobs, lexer_class, args.fused, args.hash_consing, args.linear_scan)
+        for result in batch_compiler.compile(args.sources):
+            print(json.dumps(result.to_dict()))
@@ -0,0 +1,141 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+from typing import List
+
+from pymjc.back import emit
+from pymjc.context import CompilationContext
+from pymjc.front import lexer, scanner, temp, translate, tree
+from pymjc.run import CompileResult, MJCompiler
+
+
+class MJCompileServer():
+
+    OUTPUTS = ("diagnostics", "ir", "assembly")
+
+    def __init__(self, lexer_class = lexer.MJLexer, fused_semantics: bool = False):
+        #The lexer and parser tables are built once, when their modules are imported,
+        #and stay warm for every request served by this process.
+        self.compiler: MJCompiler = MJCompiler(lexer_class, fused_semantics)
+        self.running: bool = True
+
+    def handle_line(self, line: str) -> str:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as error:
+            return json.dumps({"id": None, "ok": False, "error": f"JSONDecodeError: {error}"})
+
+        return json.dumps(self.handle_request(request))
+
+    def handle_request(self, request: dict) -> dict:
+        request_id = request.get("id")
+        command: str = request.get("command", "compile")
+
+        if command == "ping":
+            return {"id": request_id, "ok": True}
+
+        if command == "shutdown":
+            self.running = False
+            return {"id": request_id, "ok": True}
+
+        if command != "compile":
+            return {"id": request_id, "ok": False, "error": f"Unknown command {command}"}
+
+        output: str = request.get("output", "diagnostics")
+        if output not in MJCompileServer.OUTPUTS:
+            return {"id": request_id, "ok": False, "error": f"Unknown output {output}"}
+
+        result = CompileResult(request.get("file_name", "UnknownSRCFile"))
+        response = {"id": request_id}
+        #Temps, labels and symbols of a request live in its own context and are dropped with it.
+        try:
+            with CompilationContext():
+                self.compile_request(request, output, result, response)
+        except Exception as error:
+            result.error = f"{type(error).__name__}: {error}"
+
+        response["ok"] = not result.has_errors()
+        response["diagnostics"] = result.to_dict()
+        return response
+
+    def compile_request(self, request: dict, output: str, result: CompileResult, response: dict) -> None:
+        if output == "diagnostics":
+            self.compiler.analyze(request.get("source", ""), result)
+        else:
+            program_frags: translate.Frag = self.compiler.compile_to_ir(request.get("source", ""), result)
+            if program_frags is not None and output == "ir":
+                response["ir"] = self.describe_frags(program_frags)
+            elif program_frags is not None and output == "assembly":
+                #The backend of the command line: the same allocated assembly, written to a string.
+                assembly = io.StringIO()
+                self.compiler.compile_frags(program_frags, result, emit.AssemblyEmitter(assembly))
+                response["assembly"] = assembly.getvalue()
+
+    def describe_frags(self, program_frags: translate.Frag) -> List[dict]:
+        frags: List[dict] = []
+        frag: translate.Frag = program_frags
+        while(frag is not None):
+            if(isinstance(frag, translate.ProcFrag)):
+                frags.append({"kind": "proc", "name": frag.frame.name.to_string(), "ir": self.print_frag(frag)})
+            elif(isinstance(frag, translate.DataFrag)):
+                frags.append({"kind": "data", "data": frag.to_string()})
+            frag = frag.get_next()
+        return frags
+
+    def print_frag(self, frag: translate.ProcFrag) -> str:
+        #One statement of the body after the other, so that a long body is not one deep SEQ.
+        ir = io.StringIO()
+        printer = tree.Print(temp_map=temp.CombineMap(frag.frame, temp.DefaultMap()), out=ir)
+        for stmt in tree.SEQ.statements(frag.body):
+            printer.print_only_stm(stmt)
+        return ir.getvalue()
+
+    def serve_stream(self, input_stream, output_stream) -> None:
+        for line in input_stream:
+            if not line.strip():
+                continue
+            output_stream.write(self.handle_line(line) + "\n")
+            output_stream.flush()
+            if not self.running:
+                break
+
+    def serve_unix_socket(self, socket_path: str) -> None:
+        compile_server = self
+
+        class MJRequestHandler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    self.wfile.write((compile_server.handle_line(line.decode("utf-8")) + "\n").encode("utf-8"))
+                    self.wfile.flush()
+                    if not compile_server.running:
+                        break
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        with socketserver.UnixStreamServer(socket_path, MJRequestHandler) as unix_server:
+            try:
+                while compile_server.running:
+                    unix_server.handle_request()
+            finally:
+                os.remove(socket_path)
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(prog="pymjc.server")
+    arg_parser.add_argument("--socket", default=None, help="serve on a Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--scanner", action="store_true", help="use the hand-written MJScanner instead of the sly lexer")
+    arg_parser.add_argument("--fused", action="store_true", help="collect declarations from headers only and type check and translate method bodies in one walk")
+    args = arg_parser.parse_args()
+
+    server = MJCompileServer(scanner.MJScanner if args.scanner else lexer.MJLexer, args.fused)
+    if args.socket is None:
+        server.serve_stream(sys.stdin, sys.stdout)
+    else:
+        server.serve_unix_socket(args.socket)
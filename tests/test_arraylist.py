@@ -0,0 +1,79 @@
+import unittest
+
+from pymjc.back import assem, graph, mips
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+from pymjc.front.arraylist import ArrayList
+
+
+def walk(cells):
+    items = []
+    while cells is not None:
+        items.append(cells.head)
+        cells = cells.tail
+    return items
+
+
+class ArrayListTest(unittest.TestCase):
+
+    def test_same_walk_as_cons_list(self):
+        items = list(range(10))
+        cons: tree.ExpList = None
+        for item in reversed(items):
+            cons = tree.ExpList(item, cons)
+        array = tree.ExpArray(list(items))
+        self.assertEqual(walk(array), walk(cons))
+        self.assertEqual(walk(array.tail.tail), items[2:])
+        self.assertIsInstance(array.tail, tree.ExpList)
+        self.assertIsNone(tree.ExpArray([1]).tail)
+        self.assertEqual(array.tail.get(3), 4)
+        self.assertEqual(len(array.tail), 9)
+        self.assertEqual(list(array.tail), items[1:])
+
+    def test_add_and_set(self):
+        array = temp.TempArray()
+        self.assertIsNone(array.head)
+        for item in range(5):
+            array.add_tail(item)
+        array.add_head(-1)
+        self.assertEqual(array.to_list(), [-1, 0, 1, 2, 3, 4])
+        view = array.tail.tail
+        view.tail = temp.TempList(7, temp.TempList(8, None))
+        self.assertEqual(array.to_list(), [-1, 0, 1, 7, 8])
+        view.head = 9
+        self.assertEqual(array.to_list(), [-1, 0, 9, 7, 8])
+
+    def test_cons_add_tail(self):
+        cons = temp.TempList()
+        for item in range(4):
+            cons.add_tail(item)
+        self.assertEqual(walk(cons), [0, 1, 2, 3])
+
+    def test_nth_temp(self):
+        with CompilationContext():
+            temps = [temp.Temp() for _ in range(6)]
+            cons: temp.TempList = None
+            for t in reversed(temps):
+                cons = temp.TempList(t, cons)
+            instr = assem.OPER("add `d0,`s0,`s1\n", temp.TempArray(temps[:1]), temp.TempArray(temps[1:]))
+            for index in range(6):
+                self.assertIs(instr.nth_temp(cons, index), temps[index])
+            self.assertIs(instr.nth_temp(instr.use(), 4), temps[5])
+            self.assertEqual(instr.nth_label(temp.LabelArray([temp.Label("a"), temp.Label("b")]), 1).to_string(), "b")
+
+    def test_codegen_keeps_every_instruction(self):
+        with CompilationContext():
+            codegen = mips.Codegen(None)
+            labels = [temp.Label() for _ in range(5)]
+            for label in labels:
+                codegen.emit(assem.LABEL(label.to_string() + ":\n", label))
+            instrs: assem.InstrList = codegen.codegen(tree.LABEL(temp.Label("last")))
+            self.assertIsInstance(instrs, ArrayList)
+            self.assertEqual([instr.assem for instr in walk(instrs)], [label.to_string() + ":\n" for label in labels] + ["last:\n"])
+            self.assertIsNone(codegen.codegen(tree.EXP(tree.TEMP(temp.Temp()))))
+
+    def test_graph_nodes(self):
+        flow_graph = graph.Graph()
+        self.assertIsNone(flow_graph.nodes())
+        nodes = [graph.Node(flow_graph) for _ in range(4)]
+        self.assertEqual(walk(flow_graph.nodes()), nodes)
@@ -0,0 +1,46 @@
+import unittest
+
+from pymjc.back import assem, mips
+from pymjc.context import CompilationContext
+from pymjc.front import temp
+
+
+class AssemFormatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+        self.frame = mips.MipsFrame()
+        self.a, self.b = temp.Temp(), temp.Temp()
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def test_operands(self):
+        instr = assem.OPER("add `d0,`s1,`s0\n", temp.TempArray([self.a]),
+                           temp.TempList(mips.MipsFrame.FP_TEMP, temp.TempList(self.b, None)))
+        self.assertEqual(instr.format(self.frame), f"add {self.a.to_string()},{self.b.to_string()},$fp\n")
+
+    def test_jumps_and_escape(self):
+        done = temp.Label("done")
+        instr = assem.OPER("beq `s0,$0,`j1 # ``\n", None, temp.TempArray([self.a]),
+                           temp.LabelArray([temp.Label(), done]))
+        self.assertEqual(instr.format(self.frame), f"beq {self.a.to_string()},$0,done # `\n")
+
+    def test_move_and_label(self):
+        self.assertEqual(assem.MOVE("move `d0,`s0\n", mips.MipsFrame.FP_TEMP, self.b).format(self.frame),
+                         f"move $fp,{self.b.to_string()}\n")
+        self.assertEqual(assem.LABEL("L1:\n", temp.Label("L1")).format(self.frame), "L1:\n")
+
+    def test_templates_are_shared(self):
+        first = assem.OPER("sub `d0,`s0,`s1\n", temp.TempArray([self.a]), temp.TempArray([self.a, self.b]))
+        second = assem.OPER("sub `d0,`s0,`s1\n", temp.TempArray([self.b]), temp.TempArray([self.b, self.a]))
+        self.assertIs(first.template(), second.template())
+        self.assertEqual(first.template().parts, ["sub ", "", ",", "", ",", "", "\n"])
+        self.assertEqual(first.template().slots, [(1, assem.Template.DEST, 0), (3, assem.Template.SRC, 0),
+                                                  (5, assem.Template.SRC, 1)])
+
+    def test_bad_format(self):
+        for text in ("add `x0\n", "add `d\n"):
+            with self.assertRaises(RuntimeError):
+                assem.OPER(text, None, None).format(self.frame)
@@ -0,0 +1,74 @@
+import json
+import os
+import unittest
+
+from pymjc.run import MJBatchCompiler
+
+from tests import util
+
+
+class BatchTest(unittest.TestCase):
+
+    results = {}
+
+    test_suite_oracles = {}
+
+    @classmethod
+    def setUpClass(cls):
+        test_suite_oracles_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testoracle" + str(os.path.sep) + "semantic_test_suite_oracles.json"
+        with open(test_suite_oracles_path) as test_suite_oracles_file:
+            cls.test_suite_oracles = json.load(test_suite_oracles_file)
+
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        batch_compiler = MJBatchCompiler(max_workers=2)
+        for result in batch_compiler.compile([os.path.join(test_data_path, "correct"),
+                                              os.path.join(test_data_path, "faulty")]):
+            cls.results[os.path.basename(result.src_file_name)] = result
+
+    def test_all_files_are_compiled(self):
+        self.assertEqual(len(self.results), 33)
+
+    def test_parallel_matches_serial(self):
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        paths = [os.path.join(test_data_path, "faulty", "semantic")]
+        serial_results = MJBatchCompiler(max_workers=1).compile(paths)
+        parallel_results = MJBatchCompiler(max_workers=2).compile(paths)
+        self.assertEqual([result.src_file_name for result in serial_results],
+                         [result.src_file_name for result in parallel_results])
+        for serial_result, parallel_result in zip(serial_results, parallel_results):
+            self.assertEqual(serial_result.semantic_errors, parallel_result.semantic_errors, serial_result.src_file_name)
+
+    def test_semantic_errors(self):
+        for test_file_name in self.test_suite_oracles:
+            actual = util.compute_semantic_oracles(self.results[test_file_name].semantic_errors)
+            expected = self.test_suite_oracles[test_file_name]
+            self.assertEqual(actual, expected, test_file_name)
+
+    def test_syntax_errors(self):
+        for test_file_name, result in self.results.items():
+            if test_file_name.startswith("SyntaxFaulty"):
+                self.assertTrue(result.syntax_error, test_file_name)
+                self.assertEqual(result.stage, "parse", test_file_name)
+
+    def test_bad_tokens(self):
+        for test_file_name, result in self.results.items():
+            if test_file_name.startswith("TokenFaulty"):
+                self.assertGreater(result.bad_tokens, 0, test_file_name)
+            else:
+                self.assertEqual(result.bad_tokens, 0, test_file_name)
+
+    def test_stage_timings(self):
+        for test_file_name, result in self.results.items():
+            self.assertIn("parse", result.timings, test_file_name)
+
+    def test_register_allocation(self):
+        #Correct files go through the backend, with either allocator.
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        linear_results = MJBatchCompiler(max_workers=1, linear_scan=True).compile([os.path.join(test_data_path, "correct")])
+        for linear_result in linear_results:
+            result = self.results[os.path.basename(linear_result.src_file_name)]
+            self.assertFalse(result.has_errors(), result.src_file_name)
+            self.assertIn("regalloc", result.timings, result.src_file_name)
+            self.assertGreater(result.coalesced_moves, 0, result.src_file_name)
+            self.assertFalse(linear_result.has_errors(), linear_result.src_file_name)
+            self.assertGreater(linear_result.coalesced_moves, 0, linear_result.src_file_name)
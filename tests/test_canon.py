@@ -0,0 +1,416 @@
+import random
+import sys
+import unittest
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+from pymjc.front.canon import BasicBlocks, Canon, StmExpList, TraceSchedule
+
+
+class MoveCall(tree.Stm):
+
+    def __init__(self, dst: tree.TEMP, src: tree.CALL):
+        self.dst: tree.TEMP = dst
+        self.src: tree.CALL = src
+
+    def kids(self) -> tree.ExpList:
+        return self.src.kids()
+
+    def build(self, kids: tree.ExpList) -> tree.Stm:
+        return tree.MOVE(self.dst, self.src.build(kids))
+
+
+class ExpCall (tree.Stm):
+    def __init__(self, call: tree.CALL):
+        self.call: tree.CALL = call
+
+    def kids(self) -> tree.ExpList:
+        return self.call.kids()
+
+    def build(self, kids: tree.ExpList) -> tree.Stm:
+        return tree.EXP(self.call.build(kids))
+
+
+class RecursiveCanon():
+    #Textbook recursive canonicalization, kept as the oracle for the iterative Canon.
+
+    def do_stm(s: tree.Stm) -> tree.Stm:
+        if isinstance(s, tree.SEQ):
+            return Canon.seq(RecursiveCanon.do_stm(s.left_stm), RecursiveCanon.do_stm(s.right_stm))
+        if isinstance(s, tree.MOVE):
+            if isinstance(s.dest, tree.TEMP) and isinstance(s.src, tree.CALL):
+                return RecursiveCanon.reorder_stm(MoveCall(s.dest, s.src))
+            if isinstance(s.dest, tree.ESEQ):
+                return RecursiveCanon.do_stm(tree.SEQ(s.dest.stm, tree.MOVE(s.dest.exp, s.src)))
+        if isinstance(s, tree.EXP) and isinstance(s.exp, tree.CALL):
+            return RecursiveCanon.reorder_stm(ExpCall(s.exp))
+        return RecursiveCanon.reorder_stm(s)
+
+    def reorder_stm(s: tree.Stm) -> tree.Stm:
+        x: StmExpList = RecursiveCanon.reorder(s.kids())
+        return Canon.seq(x.stm, s.build(x.exps))
+
+    def do_exp(e: tree.Exp) -> tree.ESEQ:
+        if isinstance(e, tree.ESEQ):
+            stms: tree.Stm = RecursiveCanon.do_stm(e.stm)
+            b: tree.ESEQ = RecursiveCanon.do_exp(e.exp)
+            return tree.ESEQ(Canon.seq(stms, b.stm), b.exp)
+        x: StmExpList = RecursiveCanon.reorder(e.kids())
+        return tree.ESEQ(x.stm, e.build(x.exps))
+
+    def reorder(exps: tree.ExpList) -> StmExpList:
+        if exps is None:
+            return Canon.nop_null
+        a: tree.Exp = exps.head
+        if isinstance(a, tree.CALL):
+            t: temp.Temp = temp.Temp()
+            return RecursiveCanon.reorder(tree.ExpList(tree.ESEQ(tree.MOVE(tree.TEMP(t), a), tree.TEMP(t)), exps.tail))
+        aa: tree.ESEQ = RecursiveCanon.do_exp(a)
+        bb: StmExpList = RecursiveCanon.reorder(exps.tail)
+        if RecursiveCanon.commute(bb.stm, aa.exp):
+            return StmExpList(Canon.seq(aa.stm, bb.stm), tree.ExpList(aa.exp, bb.exps))
+        t: temp.Temp = temp.Temp()
+        return StmExpList(Canon.seq(aa.stm, Canon.seq(tree.MOVE(tree.TEMP(t), aa.exp), bb.stm)), tree.ExpList(tree.TEMP(t), bb.exps))
+
+    def commute(a: tree.Stm, b: tree.Exp) -> bool:
+        return Canon.is_nop(a) or isinstance(b, tree.NAME) or isinstance(b, tree.CONST)
+
+    def linear(s: tree.Stm, l: tree.StmList) -> tree.StmList:
+        if isinstance(s, tree.SEQ):
+            return RecursiveCanon.linear(s.left_stm, RecursiveCanon.linear(s.right_stm, l))
+        return tree.StmList(s, l)
+
+    def linearize(s: tree.Stm) -> tree.StmList:
+        return RecursiveCanon.linear(RecursiveCanon.do_stm(s), None)
+
+
+class RecursiveBasicBlocks():
+    #Textbook recursive block builder, kept as the oracle for BasicBlocks. blocks is a list with
+    #the cons cells of each block.
+
+    def __init__(self, stms: tree.StmList):
+        self.done: temp.Label = temp.Label()
+        self.blocks = []
+        self.last_stm: tree.StmList = None
+        self.mk_blocks(stms)
+
+    def add_stm(self, stm: tree.Stm) -> None:
+        self.last_stm.tail = tree.StmList(stm, None)
+        self.last_stm = self.last_stm.tail
+
+    def do_stms(self, l: tree.StmList) -> None:
+        if l is None:
+            self.do_stms(tree.StmList(tree.JUMP(self.done), None))
+        elif isinstance(l.head, (tree.JUMP, tree.CJUMP)):
+            self.add_stm(l.head)
+            self.mk_blocks(l.tail)
+        elif isinstance(l.head, tree.LABEL):
+            self.do_stms(tree.StmList(tree.JUMP(l.head.label), l))
+        else:
+            self.add_stm(l.head)
+            self.do_stms(l.tail)
+
+    def mk_blocks(self, l: tree.StmList) -> None:
+        if l is None:
+            return
+        if isinstance(l.head, tree.LABEL):
+            self.last_stm = tree.StmList(l.head, None)
+            self.blocks.append(self.last_stm)
+            self.do_stms(l.tail)
+        else:
+            self.mk_blocks(tree.StmList(tree.LABEL(temp.Label()), l))
+
+
+class TextbookTraceSchedule():
+    #Textbook trace scheduling that splices the cons cells of the blocks and walks each block to
+    #its end, kept as the oracle for TraceSchedule.
+
+    def cells(the_blocks: BasicBlocks) -> list:
+        block_cells = []
+        for block in the_blocks.blocks:
+            stm_list: tree.StmList = None
+            for stm in reversed(block.stms):
+                stm_list = tree.StmList(stm, stm_list)
+            block_cells.append(stm_list)
+        return block_cells
+
+    def __init__(self, done: temp.Label, block_cells: list):
+        self.done: temp.Label = done
+        self.block_cells = block_cells
+        self.next_block: int = 0
+        self.table = {}
+        for cells in block_cells:
+            self.table[cells.head.label] = cells
+        self.stms: tree.StmList = self.get_next()
+
+    def get_last(self, block: tree.StmList) -> tree.StmList:
+        l: tree.StmList = block
+        while l.tail.tail is not None:
+            l = l.tail
+        return l
+
+    def trace(self, l: tree.StmList) -> None:
+        while True:
+            self.table.pop(l.head.label)
+            last: tree.StmList = self.get_last(l)
+            s: tree.Stm = last.tail.head
+            if isinstance(s, tree.JUMP):
+                target: tree.StmList = self.table.get(s.targets.head)
+                if s.targets.tail is None and target is not None:
+                    last.tail = target
+                    l = target
+                else:
+                    last.tail.tail = self.get_next()
+                    return
+            else:
+                t: tree.StmList = self.table.get(s.if_true)
+                f: tree.StmList = self.table.get(s.if_false)
+                if f is not None:
+                    last.tail.tail = f
+                    l = f
+                elif t is not None:
+                    last.tail.head = tree.CJUMP(tree.CJUMP.not_rel(s.rel_op), s.left_exp, s.right_exp, s.if_false, s.if_true)
+                    last.tail.tail = t
+                    l = t
+                else:
+                    ff: temp.Label = temp.Label()
+                    last.tail.head = tree.CJUMP(s.rel_op, s.left_exp, s.right_exp, s.if_true, ff)
+                    last.tail.tail = tree.StmList(tree.LABEL(ff), tree.StmList(tree.JUMP(s.if_false), self.get_next()))
+                    return
+
+    def get_next(self) -> tree.StmList:
+        while self.next_block < len(self.block_cells):
+            s: tree.StmList = self.block_cells[self.next_block]
+            if s.head.label in self.table:
+                self.trace(s)
+                return s
+            self.next_block += 1
+        return tree.StmList(tree.LABEL(self.done), None)
+
+
+def random_cfg(seed: int, number_of_blocks: int) -> tree.StmList:
+    #Straight-line code cut by labels and jumps between them; some blocks have no label or fall
+    #through, and some jumps have several targets.
+    rng = random.Random(seed)
+    t = temp.Temp()
+    labels = [temp.Label() for _ in range(number_of_blocks)]
+    stms = []
+    for index, label in enumerate(labels):
+        if index == 0 or rng.random() < 0.9:
+            stms.append(tree.LABEL(label))
+        for _ in range(rng.randrange(3)):
+            stms.append(tree.MOVE(tree.TEMP(t), tree.CONST(index)))
+        choice = rng.randrange(5)
+        if choice == 0 or choice == 1:
+            stms.append(tree.CJUMP(tree.CJUMP.LT, tree.TEMP(t), tree.CONST(index), rng.choice(labels), rng.choice(labels)))
+        elif choice == 2:
+            stms.append(tree.JUMP(rng.choice(labels)))
+        elif choice == 3:
+            targets = temp.LabelList(rng.choice(labels), temp.LabelList(rng.choice(labels), None))
+            stms.append(tree.JUMP(exp=tree.TEMP(t), targets=targets))
+    stm_list: tree.StmList = None
+    for stm in reversed(stms):
+        stm_list = tree.StmList(stm, stm_list)
+    return stm_list
+
+
+def dump(node):
+    #Nested tuples and lists with temps and labels by name, to compare IR structurally.
+    if node is None or isinstance(node, (int, str)):
+        return node
+    if isinstance(node, (temp.Temp, temp.Label)):
+        return node.to_string()
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if isinstance(node, (tree.ExpList, tree.StmList, temp.LabelList)):
+        items = []
+        while node is not None:
+            items.append(dump(node.head))
+            node = node.tail
+        return items
+    return (type(node).__name__,) + tuple(dump(value) for value in vars(node).values())
+
+
+class RandomIR():
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.temps = [temp.Temp() for _ in range(4)]
+        self.labels = [temp.Label() for _ in range(3)]
+
+    def exp(self, depth: int) -> tree.Exp:
+        choice = self.random.randrange(9 if depth > 0 else 3)
+        if choice == 0:
+            return tree.CONST(self.random.randrange(3))
+        if choice == 1:
+            return tree.TEMP(self.random.choice(self.temps))
+        if choice == 2:
+            return tree.NAME(self.random.choice(self.labels))
+        if choice == 3 or choice == 4:
+            return tree.BINOP(tree.BINOP.PLUS, self.exp(depth - 1), self.exp(depth - 1))
+        if choice == 5:
+            return tree.MEM(self.exp(depth - 1))
+        if choice == 6 or choice == 7:
+            return tree.ESEQ(self.stm(depth - 1), self.exp(depth - 1))
+        args = [self.exp(depth - 1) for _ in range(self.random.randrange(4))]
+        return tree.CALL(tree.NAME(self.random.choice(self.labels)), Canon.to_exp_list(args))
+
+    def stm(self, depth: int) -> tree.Stm:
+        choice = self.random.randrange(9 if depth > 0 else 2)
+        if choice == 0:
+            return tree.LABEL(self.random.choice(self.labels))
+        if choice == 1:
+            return tree.EXP(tree.CONST(self.random.randrange(3)))
+        if choice == 2 or choice == 3:
+            return tree.SEQ(self.stm(depth - 1), self.stm(depth - 1))
+        if choice == 4:
+            return tree.MOVE(tree.TEMP(self.random.choice(self.temps)), self.exp(depth - 1))
+        if choice == 5:
+            return tree.MOVE(tree.MEM(self.exp(depth - 1)), self.exp(depth - 1))
+        if choice == 6:
+            return tree.MOVE(tree.ESEQ(self.stm(depth - 1), tree.TEMP(self.random.choice(self.temps))), self.exp(depth - 1))
+        if choice == 7:
+            return tree.EXP(self.exp(depth - 1))
+        return tree.CJUMP(tree.CJUMP.LT, self.exp(depth - 1), self.exp(depth - 1), self.labels[0], self.labels[1])
+
+
+class CanonTest(unittest.TestCase):
+
+    def assert_same_linearization(self, s: tree.Stm, message=None):
+        with CompilationContext(1000):
+            expected = dump(RecursiveCanon.linearize(s))
+        with CompilationContext(1000):
+            actual = dump(Canon.linearize(s))
+        self.assertEqual(actual, expected, message)
+
+    def test_same_as_recursive_canon(self):
+        with CompilationContext():
+            for seed in range(500):
+                self.assert_same_linearization(RandomIR(seed).stm(5), seed)
+
+    def test_same_exp_and_reorder(self):
+        with CompilationContext():
+            for seed in range(200):
+                random_ir = RandomIR(seed)
+                e = random_ir.exp(5)
+                exps = Canon.to_exp_list([random_ir.exp(3) for _ in range(4)])
+                with CompilationContext(1000):
+                    expected_eseq = RecursiveCanon.do_exp(e)
+                    expected_reorder = RecursiveCanon.reorder(exps)
+                with CompilationContext(1000):
+                    actual_eseq = Canon.do_exp(e)
+                    actual_reorder = Canon.reorder(exps)
+                self.assertEqual(dump(Canon.linear(actual_eseq.stm, None)), dump(RecursiveCanon.linear(expected_eseq.stm, None)), seed)
+                self.assertEqual(dump(actual_eseq.exp), dump(expected_eseq.exp), seed)
+                self.assertEqual(dump(Canon.linear(actual_reorder.stm, None)), dump(RecursiveCanon.linear(expected_reorder.stm, None)), seed)
+                self.assertEqual(dump(actual_reorder.exps), dump(expected_reorder.exps), seed)
+
+    def test_call_arguments_are_saved(self):
+        with CompilationContext(100):
+            f = temp.Label("f")
+            x = temp.Temp()
+            call = tree.CALL(tree.NAME(f), Canon.to_exp_list([tree.TEMP(x), tree.CALL(tree.NAME(f), None)]))
+            stms = dump(Canon.linearize(tree.EXP(call)))
+        self.assertEqual(stms, [("MOVE", ("TEMP", "t102"), ("TEMP", "t100")),
+                                ("MOVE", ("TEMP", "t101"), ("CALL", ("NAME", "f"), None)),
+                                ("EXP", ("CALL", ("NAME", "f"), [("TEMP", "t102"), ("TEMP", "t101")]))])
+
+    def test_deep_nesting(self):
+        number_of_statements = 20000
+        with CompilationContext():
+            t = temp.Temp()
+            body: tree.Stm = tree.EXP(tree.CONST(0))
+            value: tree.Exp = tree.TEMP(t)
+            for index in range(number_of_statements):
+                body = tree.SEQ(tree.MOVE(tree.TEMP(t), tree.BINOP(tree.BINOP.PLUS, tree.TEMP(t), tree.CONST(index))), body)
+                value = tree.ESEQ(tree.EXP(tree.CONST(1)), tree.BINOP(tree.BINOP.PLUS, value, tree.CONST(1)))
+            stm_list: tree.StmList = Canon.linearize(tree.SEQ(body, tree.MOVE(tree.TEMP(t), value)))
+        self.assertGreater(number_of_statements, sys.getrecursionlimit())
+        length: int = 0
+        while stm_list is not None:
+            self.assertNotIsInstance(stm_list.head, tree.SEQ)
+            length += 1
+            stm_list = stm_list.tail
+        self.assertEqual(length, number_of_statements + 1)
+
+
+class BasicBlocksTest(unittest.TestCase):
+
+    def test_same_as_recursive_blocks(self):
+        for seed in range(300):
+            with CompilationContext(1000):
+                recursive_blocks = RecursiveBasicBlocks(random_cfg(seed, 1 + seed % 20))
+                expected = [dump(cells) for cells in recursive_blocks.blocks]
+            with CompilationContext(1000):
+                basic_blocks = BasicBlocks(random_cfg(seed, 1 + seed % 20))
+                actual = [dump(block.stms) for block in basic_blocks.blocks]
+            self.assertEqual(actual, expected, seed)
+            self.assertEqual(basic_blocks.done.to_string(), recursive_blocks.done.to_string())
+
+    def test_edges(self):
+        with CompilationContext():
+            t = temp.Temp()
+            loop, body = temp.Label(), temp.Label()
+            stms = [tree.MOVE(tree.TEMP(t), tree.CONST(0)),
+                    tree.LABEL(loop), tree.CJUMP(tree.CJUMP.LT, tree.TEMP(t), tree.CONST(10), body, temp.Label("exit")),
+                    tree.LABEL(body), tree.MOVE(tree.TEMP(t), tree.CONST(1)), tree.JUMP(loop)]
+            basic_blocks = BasicBlocks(Canon.linearize(Canon.to_stm(stms, None)))
+        blocks = basic_blocks.blocks
+        self.assertEqual(len(blocks), 3)
+        self.assertEqual([block.label for block in blocks[1:]], [loop, body])
+        self.assertEqual(blocks[0].successors, [loop])
+        self.assertEqual(blocks[1].successors[0], body)
+        self.assertEqual(blocks[2].successors, [loop])
+        self.assertEqual(blocks[0].predecessors, [])
+        self.assertEqual(blocks[1].predecessors, [0, 2])
+        self.assertEqual(blocks[2].predecessors, [1])
+        self.assertIs(basic_blocks.table[body], 2)
+        self.assertIsInstance(blocks[2].get_last(), tree.JUMP)
+
+    def test_long_method(self):
+        number_of_blocks = 20000
+        with CompilationContext():
+            t = temp.Temp()
+            stm_list: tree.StmList = None
+            for index in reversed(range(number_of_blocks)):
+                stm_list = tree.StmList(tree.LABEL(temp.Label()), tree.StmList(tree.MOVE(tree.TEMP(t), tree.CONST(index)), stm_list))
+            basic_blocks = BasicBlocks(stm_list)
+        self.assertEqual(len(basic_blocks.blocks), number_of_blocks)
+        self.assertIs(basic_blocks.blocks[-1].successors[0], basic_blocks.done)
+        self.assertEqual(basic_blocks.blocks[-1].predecessors, [number_of_blocks - 2])
+
+
+class TraceScheduleTest(unittest.TestCase):
+
+    def test_same_as_textbook_schedule(self):
+        for seed in range(300):
+            with CompilationContext(1000):
+                basic_blocks = BasicBlocks(random_cfg(seed, 1 + seed % 20))
+                expected = dump(TextbookTraceSchedule(basic_blocks.done, TextbookTraceSchedule.cells(basic_blocks)).stms)
+            with CompilationContext(1000):
+                actual = dump(TraceSchedule(BasicBlocks(random_cfg(seed, 1 + seed % 20))).stms)
+            self.assertEqual(actual, expected, seed)
+
+    def test_cjump_falls_through_to_false_label(self):
+        for seed in range(100):
+            with CompilationContext():
+                basic_blocks = BasicBlocks(random_cfg(seed, 15))
+                stms = TraceSchedule(basic_blocks).stms.to_list()
+            for stm, next_stm in zip(stms, stms[1:]):
+                if isinstance(stm, tree.CJUMP):
+                    self.assertIs(next_stm.label, stm.if_false)
+            scheduled_labels = [stm.label for stm in stms if isinstance(stm, tree.LABEL)]
+            for block in basic_blocks.blocks:
+                self.assertEqual(scheduled_labels.count(block.label), 1)
+            self.assertIs(stms[-1].label, basic_blocks.done)
+
+    def test_thousands_of_blocks(self):
+        number_of_blocks = 20000
+        with CompilationContext():
+            labels = [temp.Label() for _ in range(number_of_blocks)]
+            stm_list: tree.StmList = None
+            for index in reversed(range(number_of_blocks)):
+                jump = tree.JUMP(labels[(index * 7919 + 1) % number_of_blocks])
+                stm_list = tree.StmList(tree.LABEL(labels[index]), tree.StmList(jump, stm_list))
+            stms = TraceSchedule(BasicBlocks(stm_list)).stms
+        self.assertGreater(len(stms), number_of_blocks)
@@ -0,0 +1,111 @@
+import glob
+import os
+import unittest
+
+from pymjc.back import assem, mips
+from pymjc.context import CompilationContext
+from pymjc.front import canon, temp, translate, tree
+from pymjc.run import CompileResult, MJCompiler
+
+
+class CodegenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+        self.a = temp.Temp()
+        self.b = temp.Temp()
+        self.true_label = temp.Label()
+        self.false_label = temp.Label()
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def select(self, stm: tree.Stm) -> list:
+        instrs: assem.InstrList = mips.Codegen(None).codegen(stm)
+        return instrs.to_list() if instrs is not None else []
+
+    def assems(self, stm: tree.Stm) -> list:
+        return [instr.assem for instr in self.select(stm)]
+
+    def test_addressing_modes(self):
+        frame_slot = tree.MEM(tree.BINOP(tree.BINOP.PLUS, tree.TEMP(self.a), tree.CONST(-8)))
+        instrs = self.select(tree.MOVE(tree.TEMP(self.b), frame_slot))
+        self.assertEqual([instr.assem for instr in instrs], ["lw `d0,-8(`s0)\n"])
+        self.assertIs(instrs[0].deff().head, self.b)
+        self.assertIs(instrs[0].use().head, self.a)
+
+        instrs = self.select(tree.MOVE(tree.MEM(tree.BINOP(tree.BINOP.PLUS, tree.CONST(4), tree.TEMP(self.a))), tree.TEMP(self.b)))
+        self.assertEqual([instr.assem for instr in instrs], ["sw `s1,4(`s0)\n"])
+        self.assertEqual(instrs[0].use().to_list(), [self.a, self.b])
+        self.assertIsNone(instrs[0].deff())
+
+        self.assertEqual(self.assems(tree.MOVE(tree.TEMP(self.b), tree.MEM(tree.BINOP(tree.BINOP.MINUS, tree.TEMP(self.a), tree.CONST(12))))),
+                         ["lw `d0,-12(`s0)\n"])
+        self.assertEqual(self.assems(tree.MOVE(tree.MEM(tree.TEMP(self.a)), tree.CONST(0))), ["sw `s1,0(`s0)\n"])
+
+    def test_immediates(self):
+        def value(exp: tree.Exp) -> list:
+            return self.assems(tree.MOVE(tree.TEMP(self.b), exp))
+
+        self.assertEqual(value(tree.BINOP(tree.BINOP.PLUS, tree.TEMP(self.a), tree.CONST(5))), ["addi `d0,`s0,5\n"])
+        self.assertEqual(value(tree.BINOP(tree.BINOP.PLUS, tree.CONST(5), tree.TEMP(self.a))), ["addi `d0,`s0,5\n"])
+        self.assertEqual(value(tree.BINOP(tree.BINOP.MINUS, tree.TEMP(self.a), tree.CONST(5))), ["addi `d0,`s0,-5\n"])
+        self.assertEqual(value(tree.BINOP(tree.BINOP.MUL, tree.TEMP(self.a), tree.CONST(8))), ["sll `d0,`s0,3\n"])
+        self.assertEqual(value(tree.BINOP(tree.BINOP.AND, tree.TEMP(self.a), tree.CONST(1))), ["andi `d0,`s0,1\n"])
+        self.assertEqual(value(tree.BINOP(tree.BINOP.PLUS, tree.TEMP(self.a), tree.CONST(100000))),
+                         ["li `d0,100000\n", "add `d0,`s0,`s1\n"])
+        self.assertEqual(value(tree.TEMP(self.a)), ["move `d0,`s0\n"])
+        self.assertEqual(value(tree.CONST(0)), ["move `d0,`s0\n"])
+
+    def test_compare_and_branch(self):
+        def branch(rel_op: int, right: tree.Exp) -> list:
+            instrs = self.select(tree.CJUMP(rel_op, tree.TEMP(self.a), right, self.true_label, self.false_label))
+            self.assertEqual(instrs[-1].jumps().labels.to_list(), [self.true_label, self.false_label])
+            return [instr.assem for instr in instrs]
+
+        self.assertEqual(branch(tree.CJUMP.LT, tree.TEMP(self.b)), ["blt `s0,`s1,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.NE, tree.TEMP(self.b)), ["bne `s0,`s1,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.EQ, tree.CONST(0)), ["beq `s0,$zero,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.LE, tree.CONST(0)), ["blez `s0,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.LT, tree.CONST(10)), ["slti `d0,`s0,10\n", "bne `s0,$zero,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.GE, tree.CONST(10)), ["slti `d0,`s0,10\n", "beq `s0,$zero,`j0\n"])
+        self.assertEqual(branch(tree.CJUMP.GT, tree.CONST(10)), ["li `d0,10\n", "bgt `s0,`s1,`j0\n"])
+
+    def test_calls(self):
+        f = temp.Label("f")
+        args = tree.ExpArray([tree.TEMP(self.a), tree.CONST(3)] + [tree.CONST(index) for index in range(4)])
+        frame = mips.MipsFrame()
+        instrs = mips.Codegen(frame).codegen(tree.MOVE(tree.TEMP(self.b), tree.CALL(tree.NAME(f), args))).to_list()
+        self.assertEqual([instr.assem for instr in instrs],
+                         ["move `d0,`s0\n", "li `d0,3\n", "move `d0,`s0\n", "li `d0,1\n",
+                          "li `d0,2\n", "sw `s0,16(`s1)\n", "li `d0,3\n", "sw `s0,20(`s1)\n", "jal f\n", "move `d0,`s0\n"])
+        self.assertEqual(instrs[8].use().to_list(), mips.MipsFrame.arg_regs)
+        self.assertIs(instrs[9].dest, self.b)
+        self.assertIs(instrs[9].src, mips.MipsFrame.V0)
+        self.assertEqual(frame.max_arg_offset, 24)
+        self.assertEqual(self.assems(tree.EXP(tree.CALL(tree.NAME(f), None))), ["jal f\n"])
+
+    def test_no_tile(self):
+        with self.assertRaises(RuntimeError):
+            self.select(tree.EXP(tree.ESEQ(tree.EXP(tree.CONST(0)), tree.CONST(0))))
+
+
+class CodegenProgramsTest(unittest.TestCase):
+
+    def test_correct_programs(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            with CompilationContext(), open(src_file_path, "r") as source_file:
+                result = CompileResult(src_file_path)
+                compiler = MJCompiler()
+                frags = compiler.compile_to_ir(source_file, result)
+                self.assertIsNotNone(frags, src_file_path)
+                number_of_instrs: int = 0
+                while frags is not None:
+                    if isinstance(frags, translate.ProcFrag):
+                        stms = canon.TraceSchedule(canon.BasicBlocks(canon.Canon.linearize(frags.body))).stms.to_list()
+                        for stm in stms:
+                            number_of_instrs += len(mips.Codegen(frags.frame).codegen(stm) or [])
+                    frags = frags.get_next()
+            self.assertGreater(number_of_instrs, 0, src_file_path)
@@ -0,0 +1,96 @@
+import threading
+import unittest
+
+from pymjc.back import graph, mips, regalloc
+from pymjc.context import CompilationContext
+from pymjc.front import temp
+from pymjc.front.symbol import Symbol
+from pymjc.run import CompileResult, MJCompiler
+from pymjc.util import BoolList
+
+
+SOURCE = ("class Main { public static void main(String[] a) { System.out.println(new A().m(1)); } }\n"
+          "class A { public int m(int x) { int y; y = x + 1; return y; } }\n")
+
+
+def new_names():
+    temps = [temp.Temp().to_string() for _ in range(5)]
+    labels = [temp.Label().to_string() for _ in range(5)]
+    return temps, labels
+
+
+class ContextTest(unittest.TestCase):
+
+    def test_same_names_in_every_context(self):
+        with CompilationContext():
+            first = new_names()
+        with CompilationContext():
+            second = new_names()
+        self.assertEqual(first, second)
+        self.assertEqual(first[1], ["L0", "L1", "L2", "L3", "L4"])
+
+    def test_temps_do_not_collide_with_registers(self):
+        registers = {register.to_string() for register in mips.MipsFrame.tmp_map}
+        with CompilationContext():
+            temps, _labels = new_names()
+        self.assertFalse(registers & set(temps))
+
+    def test_nested_contexts(self):
+        with CompilationContext() as outer:
+            temp.Temp()
+            with CompilationContext() as inner:
+                temp.Temp()
+                self.assertIs(CompilationContext.current(), inner)
+            self.assertIs(CompilationContext.current(), outer)
+            self.assertEqual(outer.temp_count, inner.temp_count)
+        self.assertIs(CompilationContext.current(), CompilationContext.default)
+
+    def test_threads(self):
+        names = {}
+        barrier = threading.Barrier(4)
+
+        def compile_names(thread_index: int):
+            with CompilationContext():
+                barrier.wait()
+                names[thread_index] = new_names()
+
+        threads = [threading.Thread(target=compile_names, args=(thread_index,)) for thread_index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(repr(value) for value in names.values())), 1)
+
+    def test_tables_are_dropped_with_context(self):
+        default_edges = len(CompilationContext.default.edges_table)
+        with CompilationContext() as context:
+            interference_graph = graph.Graph()
+            origin = graph.Node(interference_graph)
+            destiny = graph.Node(interference_graph)
+            edge = regalloc.Edge.get_edge(origin, destiny)
+            self.assertIs(regalloc.Edge.get_edge(destiny, origin), edge)
+            Symbol.symbol("main")
+            mips.MipsFrame(Symbol.symbol("A$m"), BoolList())
+            mips.MipsFrame(Symbol.symbol("A$m"), BoolList())
+            self.assertEqual(context.frame_functions, {"A$m": 1})
+            self.assertEqual(len(context.edges_table), 2)
+        self.assertEqual(len(CompilationContext.default.edges_table), default_edges)
+        self.assertNotIn("A$m", CompilationContext.default.frame_functions)
+
+    def test_entry_points_leave_default_alone(self):
+        #Library calls made outside a compilation run in one of their own.
+        default = CompilationContext.default
+        before = (default.temp_count, default.label_count, len(default.symbols), len(default.edges_table),
+                  len(default.frame_functions))
+        compiler = MJCompiler()
+        self.assertIsNotNone(compiler.analyze(SOURCE, CompileResult("A.java"))[0])
+        self.assertIsNotNone(compiler.compile_to_ir(SOURCE, CompileResult("A.java")))
+        self.assertTrue(compiler.compile_source(SOURCE, CompileResult("A.java")))
+        after = (default.temp_count, default.label_count, len(default.symbols), len(default.edges_table),
+                 len(default.frame_functions))
+        self.assertEqual(after, before)
+
+    def test_scope_reuses_active_context(self):
+        with CompilationContext() as context:
+            self.assertIs(CompilationContext.scope(), context)
+        self.assertIsNot(CompilationContext.scope(), CompilationContext.default)
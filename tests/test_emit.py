@@ -0,0 +1,109 @@
+import glob
+import io
+import os
+import pickle
+import re
+import unittest
+from unittest import mock
+
+from pymjc.back import emit, mips
+from pymjc.context import CompilationContext
+from pymjc.front import temp, translate, tree
+from pymjc.run import CompileResult, MJCompiler
+
+
+class EmitTest(unittest.TestCase):
+
+    def test_correct_programs(self):
+        #Every procedure is written once, with registers only, and the runtime comes last.
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            output = io.StringIO()
+            with open(src_file_path, "r") as source_file:
+                result = MJCompiler().compile(source_file, output)
+            self.assertFalse(result.has_errors(), src_file_path)
+            self.assertIn("emit", result.timings)
+            text = output.getvalue()
+            self.assertTrue(text.endswith(mips.MipsFrame.PROGRAM_TAIL), src_file_path)
+            self.assertEqual(len(re.findall(r"_framesize=", text)), result.number_of_frags, src_file_path)
+            self.assertNotIn("`", text)
+            self.assertIsNone(re.search(r"(?<![$\w])t\d+\b", text), src_file_path)
+
+    def test_frags_are_released(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        with CompilationContext(), open(os.path.join(data_dir, "Factorial.java"), "r") as source_file:
+            compiler = MJCompiler()
+            result = CompileResult(source_file.name)
+            frags: translate.Frag = compiler.compile_to_ir(source_file, result)
+            emitter = emit.AssemblyEmitter(io.StringIO())
+            compiler.compile_frags(frags, result, emitter)
+            self.assertEqual(emitter.number_of_procs, result.number_of_frags)
+            self.assertEqual(emitter.number_of_chars, len(emitter.out.getvalue()))
+            while frags is not None:
+                if isinstance(frags, translate.ProcFrag):
+                    self.assertIsNone(frags.body)
+                frags = frags.get_next()
+
+    def test_string(self):
+        with CompilationContext():
+            literal = mips.MipsFrame().string(temp.Label("S1"), "a\"b\\\n\x01€")
+        self.assertEqual(literal, "\t.data\n\t.word 7\nS1:\t.asciiz\t\"a\\\"b\\\\\\n\\001\\342\\202\\254\"")
+
+
+class ParallelTest(unittest.TestCase):
+
+    def compile(self, source: str, jobs: int) -> str:
+        output = io.StringIO()
+        source_file = io.StringIO(source)
+        source_file.name = "Source.java"
+        result = MJCompiler(jobs=jobs).compile(source_file, output)
+        self.assertFalse(result.has_errors(), result.error)
+        return output.getvalue()
+
+    def test_parallel_matches_serial(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            with open(src_file_path, "r") as source_file:
+                source = source_file.read()
+            serial = self.compile(source, 1)
+            #Labels made by the backend carry the index of their fragment.
+            self.assertIn("L0_", serial, src_file_path)
+            self.assertEqual(self.compile(source, 1), serial, src_file_path)
+            self.assertEqual(self.compile(source, 2), serial, src_file_path)
+
+    def test_data_frags_are_not_pooled(self):
+        #One procedure and a data fragment are compiled in this process.
+        with CompilationContext():
+            compiler = MJCompiler(jobs=2)
+            result = CompileResult("Main.java")
+            frags: translate.Frag = compiler.compile_to_ir("class Main { public static void main(String[] a) { System.out.println(1); } }", result)
+            last: translate.Frag = frags
+            while last.get_next() is not None:
+                last = last.get_next()
+            last.add_next(translate.DataFrag("S0:\t.asciiz\t\"\""))
+            result.number_of_frags += 1
+            emitter = emit.AssemblyEmitter(io.StringIO())
+            with mock.patch("pymjc.run.ProcessPoolExecutor") as executor:
+                compiler.compile_frags(frags, result, emitter)
+            executor.assert_not_called()
+            self.assertEqual(emitter.number_of_procs, 1)
+            self.assertIn("S0:", emitter.out.getvalue())
+
+    def test_long_method(self):
+        body = "\n".join(f"        t = t + {i};" for i in range(2000))
+        source = ("class Main { public static void main(String[] a) { System.out.println(new D().m(1)); } }\n"
+                  "class D { public int m(int x) { int t; t = x;\n" + body + "\n return t; }\n"
+                  " public int n(int y) { return y; } }\n")
+        self.assertEqual(self.compile(source, 2), self.compile(source, 1))
+
+    def test_pickling(self):
+        with CompilationContext():
+            t = temp.Temp()
+            stms = [tree.MOVE(tree.TEMP(t), tree.CONST(n)) for n in range(3)]
+            seq = tree.SEQ(tree.SEQ(stms[0], stms[1]), tree.SEQ(stms[2], tree.EXP(tree.TEMP(mips.MipsFrame.FP_TEMP))))
+            copy = pickle.loads(pickle.dumps(seq))
+        self.assertEqual([stm.src.value for stm in copy.statements()[:3]], [0, 1, 2])
+        self.assertIsInstance(copy.right_stm, tree.SEQ)
+        self.assertIs(copy.statements()[3].exp.temp, mips.MipsFrame.FP_TEMP)
+        self.assertIs(copy.statements()[0].dest.temp, copy.statements()[1].dest.temp)
+        self.assertEqual(copy.statements()[0].dest.temp.number, t.number)
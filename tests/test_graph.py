@@ -0,0 +1,70 @@
+import unittest
+
+from pymjc.back import graph
+
+
+def keys(node_list: graph.NodeList) -> list:
+    result = []
+    while node_list is not None:
+        result.append(node_list.head.my_key)
+        node_list = node_list.tail
+    return result
+
+
+class GraphTest(unittest.TestCase):
+
+    def build(self, number_of_nodes: int, edges: list, matrix: bool = False) -> graph.Graph:
+        g = graph.Graph()
+        if matrix:
+            g.use_matrix(number_of_nodes)
+        for _ in range(number_of_nodes):
+            g.new_node()
+        for u, v in edges:
+            g.add_edge(g.node(u), g.node(v))
+        return g
+
+    def test_edges(self):
+        for matrix in (False, True):
+            g = self.build(4, [(0, 1), (0, 2), (2, 0), (0, 1), (3, 1)], matrix)
+            a, b, c, d = g.mynodes.to_list()
+            self.assertEqual(g.number_of_edges, 4)
+            self.assertEqual(sorted(g.edges()), [(0, 1), (0, 2), (2, 0), (3, 1)])
+            self.assertEqual(keys(a.succ()), [1, 2])
+            self.assertEqual(keys(b.pred()), [0, 3])
+            self.assertIsNone(b.succ())
+            self.assertEqual(keys(a.adj()), [1, 2, 2])
+            self.assertTrue(a.goes_to(b))
+            self.assertFalse(b.goes_to(a))
+            self.assertTrue(b.comes_from(a))
+            self.assertTrue(b.adj(a) and a.adj(b) and b.adj(d))
+            self.assertFalse(c.adj(d))
+            self.assertEqual((a.out_degree(), a.in_degree(), a.degree()), (2, 1, 3))
+
+    def test_rm_edge(self):
+        for matrix in (False, True):
+            g = self.build(3, [(0, 1), (1, 0), (1, 2)], matrix)
+            a, b, c = g.mynodes.to_list()
+            g.rm_edge(a, b)
+            self.assertFalse(a.goes_to(b))
+            self.assertTrue(a.adj(b))
+            g.rm_edge(b, a)
+            self.assertFalse(a.adj(b))
+            self.assertEqual(b.degree(), 1)
+            self.assertEqual(g.number_of_edges, 1)
+            with self.assertRaises(RuntimeError):
+                g.rm_edge(a, c)
+
+    def test_matrix_outgrown(self):
+        g = self.build(2, [], True)
+        self.assertIsNotNone(g.matrix)
+        c = g.new_node()
+        self.assertIsNone(g.matrix)
+        g.add_edge(c, g.node(0))
+        self.assertTrue(g.node(0).adj(c))
+        with self.assertRaises(RuntimeError):
+            g.use_matrix(3)
+
+    def test_wrong_graph(self):
+        g, other = self.build(1, []), self.build(1, [])
+        with self.assertRaises(RuntimeError):
+            g.add_edge(g.node(0), other.node(0))
@@ -0,0 +1,144 @@
+import glob
+import os
+import unittest
+
+from pymjc import util
+from pymjc.back import assem, flowgraph, regalloc
+from pymjc.context import CompilationContext
+from pymjc.front import temp
+from pymjc.run import CompileResult, MJCompiler
+
+
+def naive_liveness(flow: flowgraph.FlowGraph) -> tuple:
+    #Round robin over python sets until nothing changes.
+    def temps(temp_list: temp.TempList) -> set:
+        result = set()
+        while temp_list is not None:
+            result.add(temp_list.head)
+            temp_list = temp_list.tail
+        return result
+
+    nodes = flow.mynodes.to_list()
+    live_in = {node: set() for node in nodes}
+    live_out = {node: set() for node in nodes}
+    changed = True
+    while changed:
+        changed = False
+        for node in reversed(nodes):
+            out = set()
+            succs = node.succ()
+            while succs is not None:
+                out |= live_in[succs.head]
+                succs = succs.tail
+            new_in = temps(flow.use(node)) | (out - temps(flow.deff(node)))
+            if out != live_out[node] or new_in != live_in[node]:
+                live_out[node] = out
+                live_in[node] = new_in
+                changed = True
+    return live_in, live_out
+
+
+def temps_of(temp_list: temp.TempList) -> list:
+    result = []
+    while temp_list is not None:
+        result.append(temp_list.head)
+        temp_list = temp_list.tail
+    return result
+
+
+class LivenessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def oper(self, dest: list, src: list, jumps: list = None) -> assem.OPER:
+        return assem.OPER("op", temp.TempArray(dest) if dest else None, temp.TempArray(src) if src else None,
+                          temp.LabelArray(jumps) if jumps else None)
+
+    def interferes(self, live: regalloc.Liveness, a: temp.Temp, b: temp.Temp) -> bool:
+        return live.tnode(a).adj(live.tnode(b))
+
+    def test_loop(self):
+        #a = 0; L1: b = a + 1; c = c + b; a = b * 2; if a < N goto L1; return c
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        loop, done = temp.Label(), temp.Label()
+        instrs = [self.oper([a], []), assem.LABEL("L1:", loop), self.oper([b], [a]), self.oper([c], [c, b]),
+                  self.oper([a], [b]), self.oper([], [a], [loop, done]), assem.LABEL("L2:", done), self.oper([], [c])]
+        flow = flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs))
+        live = regalloc.Liveness(flow)
+        nodes = flow.mynodes.to_list()
+        self.assertEqual([live.out(node) for node in nodes], [{a, c}, {b, c}, {b, c}, {a, c}, {a, c}, set()])
+        self.assertEqual(live.live_in(nodes[0]), {c})
+        self.assertTrue(self.interferes(live, a, c))
+        self.assertTrue(self.interferes(live, b, c))
+        self.assertFalse(self.interferes(live, a, b))
+        self.assertEqual(live.number_of_edges, 2)
+        self.assertIs(live.gtemp(live.tnode(b)), b)
+
+    def test_move(self):
+        a, t = temp.Temp(), temp.Temp()
+        instrs = [self.oper([a], []), assem.MOVE("move", t, a), self.oper([], [a, t])]
+        live = regalloc.Liveness(flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs)))
+        self.assertFalse(self.interferes(live, a, t))
+        moves: regalloc.MoveList = live.moves()
+        self.assertIs(live.gtemp(moves.src), a)
+        self.assertIs(live.gtemp(moves.dst), t)
+        self.assertIsNone(moves.tail)
+
+    def test_unconditional_jump(self):
+        #Nothing falls through a jump, so b is dead after it.
+        a, b = temp.Temp(), temp.Temp()
+        skip = temp.Label()
+        instrs = [self.oper([a, b], []), self.oper([], [], [skip]), self.oper([], [b]),
+                  assem.LABEL("skip:", skip), self.oper([], [a])]
+        flow = flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs))
+        live = regalloc.Liveness(flow)
+        self.assertEqual(live.out(flow.mynodes.get(1)), {a})
+
+    def test_blocks(self):
+        #Blocks start at the entry, at L1 and after each jump; the jump to the missing label
+        #goes to the last instruction, which starts a block of its own.
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        loop, done, missing = temp.Label(), temp.Label(), temp.Label()
+        instrs = [self.oper([a], []), assem.LABEL("L1:", loop), self.oper([b], [a]), self.oper([c], [c, b]),
+                  self.oper([a], [b]), self.oper([], [a], [loop, done]), assem.LABEL("L2:", done),
+                  self.oper([], [a], [missing]), self.oper([b], []), self.oper([], [c])]
+        flow = flowgraph.BlockFlowGraph(util.Converter.to_InstrList(instrs))
+        self.assertEqual(flow.starts, [0, 1, 5, 6, 7, 8])
+        self.assertEqual([sorted(succs) for succs in flow.succ_sets], [[1], [1, 2], [4], [4], []])
+        self.assertEqual(flow.mapping[loop].my_key, 1)
+        self.assertEqual(temps_of(flow.use(flow.node(1))), [a, c])
+        self.assertEqual(temps_of(flow.deff(flow.node(1))), [b, c, a])
+        self.assertEqual(len(flow.instr_graph().mynodes), 8)
+
+        live = regalloc.Liveness(flow)
+        self.assertEqual(live.out(flow.node(1)), {a, c})
+        self.assertEqual([live.instr_out(index) for index in range(8)],
+                         [{a, c}, {b, c}, {b, c}, {a, c}, {a, c}, {c}, {c}, set()])
+
+    def test_correct_programs(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            with open(src_file_path, "r") as source_file:
+                frags = MJCompiler().compile_source(source_file, CompileResult(src_file_path))
+            self.assertTrue(frags, src_file_path)
+            for instrs in frags:
+                flow = flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs))
+                live = regalloc.Liveness(flow)
+                live_in, live_out = naive_liveness(flow)
+                blocks = regalloc.Liveness(flowgraph.BlockFlowGraph(util.Converter.to_InstrList(instrs)))
+                self.assertEqual((blocks.in_bits, blocks.out_bits), (live.in_bits, live.out_bits), src_file_path)
+                self.assertEqual(blocks.number_of_edges, live.number_of_edges, src_file_path)
+                for node in flow.mynodes:
+                    self.assertEqual(live.live_in(node), live_in[node], src_file_path)
+                    self.assertEqual(live.out(node), live_out[node], src_file_path)
+                    if not flow.is_move(node):
+                        defs = flow.deff(node)
+                        while defs is not None:
+                            for t in live_out[node] - {defs.head}:
+                                self.assertTrue(self.interferes(live, defs.head, t))
+                            defs = defs.tail
@@ -1,9 +1,13 @@
 import json
 import os
+import tempfile
 import unittest
+from unittest import mock
 
 from pymjc.front.lexer import MJLexer
 from pymjc.front.parser import MJParser
+from pymjc.front import parsetab
+from pymjc.front.parsetab import ParseTableCache
 
 from tests import util
 
@@ -45,7 +49,7 @@ class ParserTest(unittest.TestCase):
                 parser.src_file_name = file_name
                 parser.parse(lexer.tokenize(content))
                 source_test_file.close()
-                debug_file = open(parser.debugfile, "r" )
+                debug_file = open(MJParser.write_debugfile(), "r" )
                 number_of_shift_reduce, number_of_reduce_reduce = util.process_debug_file(debug_file.read())
                 debug_file.close()
                 cls.actual_values[file_name] = util.compute_parser_oracles(number_of_shift_reduce, number_of_reduce_reduce, parser.syntax_error)                
@@ -68,3 +72,50 @@ class ParserTest(unittest.TestCase):
             actual = self.actual_values[test_file_name]["has_parser_error"]
             expected = self.test_suite_oracles[test_file_name]["has_parser_error"]
             self.assertEqual(actual, expected, test_file_name)
+
+    def test_cached_parse_tables(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ParseTableCache(cache_dir)
+            signature = cache.signature(MJParser._grammar, MJParser.precedence)
+            self.assertIsNone(cache.load(signature))
+
+            table = cache.load_or_build(MJParser._grammar, MJParser.precedence)
+            cached_table = cache.load(signature)
+            self.assertIsNotNone(cached_table)
+            self.assertEqual(cached_table.lr_action, table.lr_action)
+            self.assertEqual(cached_table.lr_goto, table.lr_goto)
+            self.assertEqual(cached_table.defaulted_states, table.defaulted_states)
+            self.assertEqual(cached_table.lr_action, MJParser._lrtable.lr_action)
+            self.assertEqual(str(cached_table), str(MJParser._lrtable))
+
+    def test_build_without_sly_internals(self):
+        #When sly lacks the private build steps, MJParser is built by sly alone, without the cache.
+        lr_action = MJParser._lrtable.lr_action
+        grammar, lrtable = MJParser._grammar, MJParser._lrtable
+        self.addCleanup(setattr, MJParser, "_grammar", grammar)
+        self.addCleanup(setattr, MJParser, "_lrtable", lrtable)
+        del MJParser._lrtable
+        with mock.patch.object(MJParser, "sly_build_steps", MJParser.sly_build_steps + ("_Parser__missing_step",)), \
+             mock.patch.object(parsetab.ParseTableCache, "load_or_build") as load_or_build:
+            MJParser._build(list(vars(MJParser).items()))
+        load_or_build.assert_not_called()
+        self.assertIsNot(MJParser._lrtable, lrtable)
+        self.assertEqual(MJParser._lrtable.lr_action, lr_action)
+        parser = MJParser()
+        parser.parse(MJLexer().tokenize("class Main { public static void main(String[] a) { System.out.println(1); } }"))
+        self.assertFalse(parser.syntax_error)
+
+    def test_compact_ast_positions(self):
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        with open(os.path.join(test_data_path, "correct", "Factorial.java"), "r") as source_test_file:
+            content = source_test_file.read()
+        parser = MJParser()
+        program = parser.parse(MJLexer().tokenize(content))
+        class_decl = program.class_decl_list.element_at(0)
+        method_decl = class_decl.method_decl_list.element_at(0)
+        self.assertFalse(hasattr(program, "__dict__"))
+        self.assertFalse(hasattr(method_decl, "__dict__"))
+        self.assertEqual(program.get_lineno(), 1)
+        self.assertEqual(class_decl.get_lineno(), 7)
+        self.assertEqual(method_decl.get_lineno(), 9)
+        self.assertEqual(parser._line_positions, {})
@@ -0,0 +1,239 @@
+import glob
+import io
+import os
+import re
+import unittest
+
+from pymjc import util
+from pymjc.back import assem, flowgraph, mips, regalloc
+from pymjc.context import CompilationContext
+from pymjc.front import temp, translate
+from pymjc.front.symbol import Symbol
+from pymjc.run import CompileResult, MJCompiler
+
+
+class Registers(temp.TempMap):
+
+    def __init__(self, names: dict):
+        self.names = names
+
+    def temp_map(self, t: temp.Temp) -> str:
+        return self.names.get(t)
+
+
+def temps(temp_list: temp.TempList) -> list:
+    return mips.MipsFrame.temps(temp_list)
+
+
+class ColorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+        self.r1, self.r2 = temp.Temp(), temp.Temp()
+        self.initial = Registers({self.r1: "$r1", self.r2: "$r2"})
+        self.registers = temp.TempArray([self.r1, self.r2])
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def oper(self, dest: list, src: list) -> assem.OPER:
+        return assem.OPER("op", temp.TempArray(dest) if dest else None, temp.TempArray(src) if src else None)
+
+    def color(self, instrs: list) -> regalloc.Color:
+        live = regalloc.Liveness(flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs)))
+        return regalloc.Color(live, self.initial, self.registers)
+
+    def test_two_registers(self):
+        #a and b are live together, c takes the register of a once a is dead.
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        color = self.color([self.oper([a], []), self.oper([b], [a]), self.oper([c], [a, b]), self.oper([], [c, b])])
+        self.assertIsNone(color.spills())
+        self.assertNotEqual(color.temp_map(a), color.temp_map(b))
+        self.assertNotEqual(color.temp_map(b), color.temp_map(c))
+        self.assertEqual(color.temp_map(self.r2), "$r2")
+
+    def test_spill(self):
+        #Three temps live at once do not fit in two registers: the one used least is spilled.
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        color = self.color([self.oper([a], []), self.oper([b], []), self.oper([c], []),
+                            self.oper([], [a, b, c]), self.oper([], [a, b])])
+        self.assertEqual(temps(color.spills()), [c])
+
+    def test_coalesce(self):
+        a, b = temp.Temp(), temp.Temp()
+        color = self.color([self.oper([a], []), assem.MOVE("move", b, a), self.oper([], [b])])
+        self.assertEqual(color.number_of_coalesced_moves(), 1)
+        self.assertEqual(color.temp_map(a), color.temp_map(b))
+
+    def test_coalesce_with_precolored(self):
+        #George's test lets a join the register it is moved into.
+        a = temp.Temp()
+        color = self.color([self.oper([a], []), assem.MOVE("move", self.r2, a), self.oper([], [self.r2])])
+        self.assertEqual(color.temp_map(a), "$r2")
+
+    def test_constrained_move(self):
+        a, b = temp.Temp(), temp.Temp()
+        color = self.color([self.oper([a], []), assem.MOVE("move", b, a), self.oper([a], [a]), self.oper([], [a, b])])
+        self.assertEqual(color.number_of_coalesced_moves(), 0)
+        self.assertEqual({color.temp_map(a), color.temp_map(b)}, {"$r1", "$r2"})
+
+
+class RegAllocTest(unittest.TestCase):
+
+    def test_spill_rewrite(self):
+        with CompilationContext():
+            frame = mips.MipsFrame()
+            a, b = temp.Temp(), temp.Temp()
+            instrs = [assem.OPER("li `d0,1\n", temp.TempArray([a]), None),
+                      assem.OPER("add `d0,`s0,`s1\n", temp.TempArray([a]), temp.TempArray([a, b]))]
+            frame.spill(instrs, [a])
+            self.assertEqual([instr.assem for instr in instrs],
+                             ["li `d0,1\n", "sw `s0,-4(`s1)\n", "lw `d0,-4(`s0)\n", "add `d0,`s0,`s1\n", "sw `s0,-4(`s1)\n"])
+            self.assertEqual(temps(instrs[3].use())[1], b)
+            self.assertIs(temps(instrs[3].use())[0], temps(instrs[3].deff())[0])
+            self.assertIs(temps(instrs[2].use())[0], mips.MipsFrame.FP_TEMP)
+            self.assertEqual(frame.offset, -4)
+
+    def test_correct_programs(self):
+        #Every temp gets a register and no two temps that interfere share one.
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            with CompilationContext(), open(src_file_path, "r") as source_file:
+                compiler = MJCompiler()
+                frag = compiler.compile_to_ir(source_file, CompileResult(src_file_path))
+                while frag is not None:
+                    if isinstance(frag, translate.ProcFrag):
+                        allocation = regalloc.RegAlloc(frag.frame, util.Converter.to_InstrList(compiler.select_frag_instructions(frag)))
+                        color: regalloc.Color = allocation.color
+                        for u, v in color.ig.edges():
+                            if not (color.precolored[u] and color.precolored[v]):
+                                self.assertNotEqual(color.colors[u], color.colors[v], src_file_path)
+                        for instr in allocation.instrs.to_list():
+                            for t in temps(instr.use()) + temps(instr.deff()):
+                                self.assertIsNotNone(allocation.temp_map(t))
+                            if isinstance(instr, assem.MOVE):
+                                self.assertNotEqual(allocation.temp_map(instr.src), allocation.temp_map(instr.dest))
+                    frag = frag.get_next()
+
+    def test_compile_reports_allocation(self):
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        with open(os.path.join(data_dir, "Factorial.java"), "r") as source_file:
+            result = MJCompiler().compile(source_file)
+        self.assertFalse(result.has_errors())
+        self.assertIn("regalloc", result.timings)
+        self.assertGreater(result.coalesced_moves, 0)
+        self.assertEqual(result.to_dict()["spills"], result.spills)
+        with open(os.path.join(data_dir, "Factorial.java"), "r") as source_file:
+            linear_result = MJCompiler(linear_scan=True).compile(source_file)
+        self.assertFalse(linear_result.has_errors())
+        self.assertIn("regalloc", linear_result.timings)
+
+    def test_frame_covers_spill_slots(self):
+        #Thirty locals live at once spill, and the frame of every procedure holds its slots below
+        #$fp as well as the outgoing arguments above $sp.
+        locals_decl = " ".join(f"int a{i};" for i in range(30))
+        locals_init = " ".join(f"a{i} = x + {i};" for i in range(30))
+        source = io.StringIO("class Main { public static void main(String[] a) { System.out.println(new D().m(1, 2, 3, 4, 5, 6)); } }\n"
+                             "class D { public int m(int x, int b, int c, int d, int e, int f) { " + locals_decl + " " + locals_init +
+                             " return " + " + ".join(f"a{i}" for i in range(30)) + "; } }\n")
+        source.name = "Spill.java"
+        for linear_scan in [False, True]:
+            output = io.StringIO()
+            result = MJCompiler(linear_scan=linear_scan).compile(source, output)
+            source.seek(0)
+            self.assertFalse(result.has_errors())
+            self.assertGreater(result.spills, 0)
+            for proc in output.getvalue().split("\t.text\n")[1:]:
+                frame_size = int(re.search(r"_framesize=(\d+)", proc).group(1))
+                below_fp = [-int(offset) for offset in re.findall(r"(-?\d+)\(\$fp\)", proc) if int(offset) < 0]
+                above_sp = [int(offset) + mips.MipsFrame.WORD_SIZE for offset in re.findall(r"(\d+)\(\$sp\)", proc)]
+                self.assertLessEqual(max(below_fp, default=0) + max(above_sp, default=0), frame_size, proc)
+
+    def test_spill_slots_below_formals(self):
+        #Spills never store into the word at $fp, where this is read from, nor above it.
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for linear_scan in [False, True]:
+            output = io.StringIO()
+            with open(os.path.join(data_dir, "Factorial.java"), "r") as source_file:
+                result = MJCompiler(linear_scan=linear_scan).compile(source_file, output)
+            self.assertGreater(result.spills, 0)
+            stores = [int(offset) for offset in re.findall(r"sw \$\w+,(-?\d+)\(\$fp\)", output.getvalue())]
+            self.assertTrue(stores)
+            self.assertTrue(all(offset < 0 for offset in stores), stores)
+
+    def test_locals_do_not_alias_formals(self):
+        with CompilationContext():
+            formals = util.BoolList()
+            for escape in [True, True, True, True, True, True]:
+                formals.add_bool(escape)
+            frame = mips.MipsFrame().new_frame(Symbol.symbol("D$m"), formals)
+            formal_offsets = {access.offset for access in frame.formals}
+            local_offsets = {frame.alloc_local(True).offset for i in range(4)}
+        self.assertNotIn(0, local_offsets)
+        self.assertEqual(len(local_offsets), 4)
+        self.assertFalse(formal_offsets & local_offsets)
+
+
+class LinearScanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+        self.r1, self.r2 = temp.Temp(), temp.Temp()
+        self.initial = Registers({self.r1: "$r1", self.r2: "$r2"})
+        self.registers = temp.TempArray([self.r1, self.r2])
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def oper(self, dest: list, src: list) -> assem.OPER:
+        return assem.OPER("op", temp.TempArray(dest) if dest else None, temp.TempArray(src) if src else None)
+
+    def scan(self, instrs: list) -> regalloc.LinearScan:
+        live = regalloc.Liveness(flowgraph.AssemFlowGraph(util.Converter.to_InstrList(instrs)), False)
+        return regalloc.LinearScan(live, self.initial, self.registers)
+
+    def test_intervals(self):
+        #a dies where b is defined, so they share a register; c overlaps both.
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        scan = self.scan([self.oper([a, c], []), self.oper([b], [a]), self.oper([], [b, c])])
+        self.assertIsNone(scan.spills())
+        self.assertEqual(scan.temp_map(a), scan.temp_map(b))
+        self.assertNotEqual(scan.temp_map(a), scan.temp_map(c))
+        self.assertEqual((scan.start[0], scan.end[0]), (1, 2))
+
+    def test_precolored(self):
+        #r1 is taken while a lives, so a gets r2.
+        a = temp.Temp()
+        scan = self.scan([self.oper([a], []), self.oper([self.r1], []), self.oper([], [a, self.r1])])
+        self.assertEqual(scan.temp_map(a), "$r2")
+
+    def test_spill_longest(self):
+        a, b, c = temp.Temp(), temp.Temp(), temp.Temp()
+        scan = self.scan([self.oper([a], []), self.oper([b], []), self.oper([c], []),
+                          self.oper([], [b, c]), self.oper([], [a])])
+        self.assertEqual(temps(scan.spills()), [a])
+
+    def test_correct_programs(self):
+        #No two temps share a register at any instruction where both are live.
+        data_dir = os.path.join(os.path.dirname(__file__), "testdata", "correct")
+        for src_file_path in sorted(glob.glob(os.path.join(data_dir, "*.java"))):
+            with CompilationContext(), open(src_file_path, "r") as source_file:
+                compiler = MJCompiler(linear_scan=True)
+                frag = compiler.compile_to_ir(source_file, CompileResult(src_file_path))
+                while frag is not None:
+                    if isinstance(frag, translate.ProcFrag):
+                        instrs = compiler.select_frag_instructions(frag)
+                        allocation = regalloc.RegAlloc(frag.frame, util.Converter.to_InstrList(instrs), True)
+                        self.assertIsInstance(allocation.color, regalloc.LinearScan)
+                        #Liveness of the last round, before the moves within a register are dropped
+                        live: regalloc.Liveness = allocation.color.live
+                        for index, instr in enumerate(live.instrs):
+                            here = live.instr_out(index) | set(temps(instr.deff()))
+                            registers = [allocation.temp_map(t) for t in here if mips.MipsFrame.tmp_map.get(t) is None]
+                            machine = {mips.MipsFrame.tmp_map[t] for t in here if mips.MipsFrame.tmp_map.get(t) is not None}
+                            self.assertNotIn(None, registers, src_file_path)
+                            self.assertEqual(len(registers), len(set(registers)), src_file_path)
+                            self.assertFalse(machine & set(registers), src_file_path)
+                    frag = frag.get_next()
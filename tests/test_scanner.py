@@ -0,0 +1,133 @@
+import io
+import json
+import os
+import unittest
+
+from tests import util
+from pymjc.front.lexer import MJLexer
+from pymjc.front.parser import MJParser
+from pymjc.front.scanner import MJScanner
+from pymjc.run import MJCompiler
+
+
+def token_tuples(token_list):
+    return [(token.type, token.value, token.lineno, token.index) for token in token_list]
+
+
+class ScannerTest(unittest.TestCase):
+
+    actual_values = {}
+
+    test_suite_oracles = {}
+
+    test_data_file_path_map = {}
+
+    @classmethod
+    def setUpClass(cls):
+        test_suite_oracles_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testoracle" + str(os.path.sep) + "lexer_test_suite_oracles.json"
+        with open(test_suite_oracles_path) as test_suite_oracles_file:
+            cls.test_suite_oracles = json.load(test_suite_oracles_file)
+
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        for dir_path, dir_names, file_names in os.walk(test_data_path):
+            for file_name in file_names:
+                cls.test_data_file_path_map[file_name] = os.path.join(dir_path, file_name)
+
+        for file_name in cls.test_suite_oracles:
+            with open(cls.test_data_file_path_map[file_name], "r") as source_test_file:
+                scanner = MJScanner()
+                scanner.src_file_name = file_name
+                token_list = list(scanner.tokenize(source_test_file.read()))
+                cls.actual_values[file_name] = util.compute_lexer_oracles(token_list, scanner.bad_tokens)
+
+    def assert_same_tokens(self, content, message=None):
+        lexer = MJLexer()
+        scanner = MJScanner()
+        self.assertEqual(token_tuples(scanner.tokenize(content)), token_tuples(lexer.tokenize(content)), message)
+        self.assertEqual(token_tuples(scanner.bad_tokens), token_tuples(lexer.bad_tokens), message)
+
+    def test_lexer_oracles(self):
+        for test_file_name in self.test_suite_oracles:
+            actual = self.actual_values[test_file_name]
+            expected = self.test_suite_oracles[test_file_name]
+            self.assertEqual(actual, expected, test_file_name)
+
+    def test_same_tokens_as_lexer(self):
+        for test_file_name, test_file_path in self.test_data_file_path_map.items():
+            with open(test_file_path, "r") as source_test_file:
+                self.assert_same_tokens(source_test_file.read(), test_file_name)
+
+    def test_same_tokens_on_corner_cases(self):
+        self.assert_same_tokens("System.out.println System.out.printlnx System.out.print")
+        self.assert_same_tokens("x = a&&b & c | d; // trailing comment\n\n\ny = 1;")
+        self.assert_same_tokens("/**/ /*.*/ /* not a comment */ a/b")
+        self.assert_same_tokens("int\tx;\r\n\f  \n")
+        self.assert_same_tokens("_a1 1a 007 ٣٤ @#$ é")
+        self.assert_same_tokens("")
+        self.assert_same_tokens("   ")
+        self.assert_same_tokens("class A { }\n")
+
+    def test_parser_accepts_scanner_tokens(self):
+        for test_file_name, test_file_path in self.test_data_file_path_map.items():
+            with open(test_file_path, "r") as source_test_file:
+                content = source_test_file.read()
+            lexer_parser = MJParser()
+            lexer_parser.parse(MJLexer().tokenize(content))
+            scanner_parser = MJParser()
+            scanner_parser.parse(MJScanner().tokenize(content))
+            self.assertEqual(scanner_parser.syntax_error, lexer_parser.syntax_error, test_file_name)
+
+    def assert_same_stream_tokens(self, content, message=None):
+        expected_scanner = MJScanner()
+        expected = token_tuples(expected_scanner.tokenize(content))
+        expected_bad_tokens = [(token.value[0], token.lineno, token.index) for token in expected_scanner.bad_tokens]
+        for chunk_size in [1, 2, 7, 18, 19, 64, 4096]:
+            scanner = MJScanner()
+            self.assertEqual(token_tuples(scanner.tokenize_stream(io.StringIO(content), chunk_size)), expected, (message, chunk_size))
+            self.assertEqual([(token.value[0], token.lineno, token.index) for token in scanner.bad_tokens], expected_bad_tokens, (message, chunk_size))
+
+    def test_stream_tokens(self):
+        for test_file_name, test_file_path in self.test_data_file_path_map.items():
+            with open(test_file_path, "r") as source_test_file:
+                self.assert_same_stream_tokens(source_test_file.read(), test_file_name)
+
+    def test_stream_tokens_on_corner_cases(self):
+        self.assert_same_stream_tokens("System.out.println System.out.printlnx System.out.print")
+        self.assert_same_stream_tokens("x = a&&b & c | d; // trailing comment\n\n\ny = 1;")
+        self.assert_same_stream_tokens("/**/ /*.*/ /* not a comment */ a/b")
+        self.assert_same_stream_tokens("averyveryveryverylongidentifier_with_more_than_one_chunk 1234567890123456789012345")
+        self.assert_same_stream_tokens("")
+        self.assert_same_stream_tokens("int x;//no newline at the end")
+
+    def assert_same_lexer_stream_tokens(self, content, message=None):
+        expected_lexer = MJLexer()
+        expected = token_tuples(expected_lexer.tokenize(content))
+        expected_bad_tokens = [(token.value[0], token.lineno, token.index) for token in expected_lexer.bad_tokens]
+        for chunk_size in [1, 2, 7, 64, 4096]:
+            mj_lexer = MJLexer()
+            stream_tokens = token_tuples(mj_lexer.tokenize_stream(io.StringIO(content), chunk_size))
+            self.assertEqual(stream_tokens, expected, (message, chunk_size))
+            self.assertEqual(len(mj_lexer.bad_tokens), len(expected_bad_tokens), (message, chunk_size))
+
+    def test_lexer_stream_tokens(self):
+        #The sly lexer streams line by line and gives the tokens of tokenize().
+        for test_file_name, test_file_path in self.test_data_file_path_map.items():
+            with open(test_file_path, "r") as source_test_file:
+                self.assert_same_lexer_stream_tokens(source_test_file.read(), test_file_name)
+        self.assert_same_lexer_stream_tokens("x = a&&b & c | d; // trailing comment\n\n\ny = 1;")
+        self.assert_same_lexer_stream_tokens("")
+        self.assert_same_lexer_stream_tokens("int x;//no newline at the end")
+
+    def test_compiler_streams_by_default(self):
+        #Neither lexer makes the compiler read a source file whole.
+        class ChunkedFile(io.StringIO):
+            def read(self, size=-1):
+                if size is None or size < 0:
+                    raise AssertionError("whole file read")
+                return super().read(size)
+
+        for lexer_class in [MJLexer, MJScanner]:
+            source_file = ChunkedFile("class Main { public static void main(String[] a) { System.out.println(1); } }\n")
+            source_file.name = "Main.java"
+            result = MJCompiler(lexer_class).compile(source_file)
+            self.assertFalse(result.has_errors(), lexer_class)
@@ -5,7 +5,9 @@ from pymjc.front.ast import Program
 
 from pymjc.front.lexer import MJLexer
 from pymjc.front.parser import MJParser
-from pymjc.front.visitor import FillSymbolTableVisitor, TypeCheckingVisitor
+from pymjc.back import mips
+from pymjc.front import tree
+from pymjc.front.visitor import DeclarationVisitor, FillSymbolTableVisitor, FusedTranslateVisitor, FusedTypeCheckingVisitor, TypeCheckingVisitor
 
 from tests import util
 
@@ -13,6 +15,8 @@ from tests import util
 class SemanticTest(unittest.TestCase):
     
     actual_values = {}
+
+    fused_actual_values = {}
     
     test_suite_oracles = {}
 
@@ -61,6 +65,19 @@ class SemanticTest(unittest.TestCase):
                 source_test_file.close()
                 cls.actual_values[file_name] = util.compute_semantic_oracles(semantic_errors)                
 
+                declaration_collector = DeclarationVisitor()
+                declaration_collector.src_file_name = file_name
+                declaration_collector.init_semantic_errors()
+                declaration_collector.visit_program(program)
+
+                fused_translator = FusedTranslateVisitor(declaration_collector.get_symbol_table(), mips.MipsFrame(), tree.TreeFactory())
+                fused_type_checker = FusedTypeCheckingVisitor(fused_translator)
+                fused_type_checker.src_file_name = file_name
+                fused_type_checker.fill_semantic_errors(declaration_collector.semantic_errors)
+                fused_type_checker.set_symbol_table(declaration_collector.get_symbol_table())
+                fused_type_checker.visit_program(program)
+                cls.fused_actual_values[file_name] = util.compute_semantic_oracles(fused_type_checker.semantic_errors)
+
 
     def test_number_of_already_declared_class(self):
         for test_file_name in self.test_suite_oracles:
@@ -233,3 +250,9 @@ class SemanticTest(unittest.TestCase):
             actual = self.actual_values[test_file_name]["number_of_WRONG_ARG_NUMBER"]
             expected = self.test_suite_oracles[test_file_name]["number_of_WRONG_ARG_NUMBER"]
             self.assertEqual(actual, expected, test_file_name)
+
+    def test_fused_semantics(self):
+        for test_file_name in self.test_suite_oracles:
+            actual = self.fused_actual_values[test_file_name]
+            expected = self.test_suite_oracles[test_file_name]
+            self.assertEqual(actual, expected, test_file_name)
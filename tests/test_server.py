@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import unittest
+from collections import defaultdict
+
+from pymjc.run import MJCompiler
+from pymjc.server import MJCompileServer
+
+from tests import util
+
+
+class ServerTest(unittest.TestCase):
+
+    responses = {}
+
+    test_suite_oracles = {}
+
+    @classmethod
+    def setUpClass(cls):
+        test_suite_oracles_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testoracle" + str(os.path.sep) + "semantic_test_suite_oracles.json"
+        with open(test_suite_oracles_path) as test_suite_oracles_file:
+            cls.test_suite_oracles = json.load(test_suite_oracles_file)
+
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        requests = io.StringIO()
+        for dir_name in ["correct", os.path.join("faulty", "semantic")]:
+            for file_name in sorted(os.listdir(os.path.join(test_data_path, dir_name))):
+                with open(os.path.join(test_data_path, dir_name, file_name), "r") as source_test_file:
+                    requests.write(json.dumps({"id": file_name, "file_name": file_name, "source": source_test_file.read()}) + "\n")
+        requests.write(json.dumps({"id": "shutdown", "command": "shutdown"}) + "\n")
+        requests.write(json.dumps({"id": "ignored", "command": "ping"}) + "\n")
+        requests.seek(0)
+
+        responses = io.StringIO()
+        MJCompileServer().serve_stream(requests, responses)
+        for line in responses.getvalue().splitlines():
+            response = json.loads(line)
+            cls.responses[response["id"]] = response
+
+    def test_stops_after_shutdown(self):
+        self.assertIn("shutdown", self.responses)
+        self.assertNotIn("ignored", self.responses)
+
+    def test_diagnostics(self):
+        for test_file_name in self.test_suite_oracles:
+            diagnostics = self.responses[test_file_name]["diagnostics"]
+            actual = util.compute_semantic_oracles(defaultdict(int, diagnostics["semantic_errors"]))
+            expected = self.test_suite_oracles[test_file_name]
+            self.assertEqual(actual, expected, test_file_name)
+
+    def test_bad_request(self):
+        server = MJCompileServer()
+        self.assertFalse(json.loads(server.handle_line("not json"))["ok"])
+        self.assertFalse(server.handle_request({"id": 1, "command": "link"})["ok"])
+        self.assertFalse(server.handle_request({"id": 2, "output": "bytecode"})["ok"])
+
+    def test_syntax_error(self):
+        response = MJCompileServer().handle_request({"id": 1, "source": "class A {"})
+        self.assertFalse(response["ok"])
+        self.assertTrue(response["diagnostics"]["syntax_error"])
+
+    def test_ir(self):
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        with open(os.path.join(test_data_path, "correct", "Factorial.java"), "r") as source_file:
+            response = MJCompileServer().handle_request({"id": 1, "output": "ir", "source": source_file.read()})
+        self.assertTrue(response["ok"])
+        self.assertEqual([frag["name"] for frag in response["ir"]], ["Factorial$main", "Factorial$main.Fac$ComputeFac"])
+        for frag in response["ir"]:
+            self.assertIn("MOVE(", frag["ir"])
+            self.assertIn("TEMP $fp", frag["ir"])
+
+    def test_assembly(self):
+        #The allocated assembly of the command line.
+        test_data_path = os.path.dirname(os.path.realpath(__file__)) + str(os.path.sep) + "testdata" + str(os.path.sep)
+        with open(os.path.join(test_data_path, "correct", "Factorial.java"), "r") as source_file:
+            source = source_file.read()
+            source_file.seek(0)
+            output = io.StringIO()
+            MJCompiler().compile(source_file, output)
+        response = MJCompileServer().handle_request({"id": 1, "output": "assembly", "source": source})
+        self.assertTrue(response["ok"])
+        self.assertIn("regalloc", response["diagnostics"]["timings"])
+        self.assertEqual(response["assembly"], output.getvalue())
+        self.assertNotIn("\n\n", response["assembly"])
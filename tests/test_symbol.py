@@ -0,0 +1,193 @@
+import io
+import re
+import sys
+import unittest
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, translate, tree
+from pymjc.front.lexer import MJLexer
+from pymjc.front.parser import MJParser
+from pymjc.front.symbol import ClassEntry, Symbol, SymbolTable
+from pymjc.front.visitor import FillSymbolTableVisitor
+from pymjc.run import CompileResult, MJCompiler
+
+
+HIERARCHY_SOURCE = """
+class Main {
+    public static void main(String[] a) {
+        System.out.println(new C().run());
+    }
+}
+
+class C extends B {
+    int c;
+    public int run() { return c + b + a; }
+    public int get() { return 3; }
+}
+
+class A {
+    int a;
+    public int get() { return 1; }
+    public int base() { return 0; }
+}
+
+class B extends A {
+    int b;
+    public int get() { return 2; }
+}
+
+class D extends A {
+    int d;
+}
+
+class X extends Y {
+    int x;
+}
+
+class Y extends X {
+    int y;
+}
+"""
+
+
+class SymbolTest(unittest.TestCase):
+
+    symbol_table = None
+
+    semantic_errors = None
+
+    @classmethod
+    def setUpClass(cls):
+        program = MJParser().parse(MJLexer().tokenize(HIERARCHY_SOURCE))
+        symbol_table_creator = FillSymbolTableVisitor()
+        symbol_table_creator.init_semantic_errors()
+        symbol_table_creator.visit_program(program)
+        cls.symbol_table = symbol_table_creator.get_symbol_table()
+        cls.semantic_errors = symbol_table_creator.semantic_errors
+
+    def test_topological_order(self):
+        class_order = self.symbol_table.get_hierarchy().get_class_order()
+        self.assertEqual(sorted(class_order), sorted(["Main", "A", "B", "C", "D", "X", "Y"]))
+        self.assertLess(class_order.index("A"), class_order.index("B"))
+        self.assertLess(class_order.index("B"), class_order.index("C"))
+        self.assertLess(class_order.index("A"), class_order.index("D"))
+
+    def test_flattened_tables(self):
+        hierarchy = self.symbol_table.get_hierarchy()
+        self.assertEqual(list(hierarchy.get_fields("C").keys()), ["a", "b", "c"])
+        self.assertIsNotNone(hierarchy.get_method("C", "base"))
+        self.assertIs(hierarchy.get_method("C", "get"), self.symbol_table.get_class_entry("C").get_method("get"))
+        self.assertIsNot(hierarchy.get_method("C", "get"), self.symbol_table.get_class_entry("A").get_method("get"))
+        #The class entries keep only their own members.
+        self.assertEqual(list(self.symbol_table.get_class_entry("C").get_fields().keys()), ["c"])
+        self.assertEqual(list(self.symbol_table.get_class_entry("C").get_methods().keys()), ["run", "get"])
+
+    def test_stable_slot_offsets(self):
+        hierarchy = self.symbol_table.get_hierarchy()
+        for class_id in ["B", "C", "D"]:
+            self.assertEqual(hierarchy.get_field_offset(class_id, "a"), hierarchy.get_field_offset("A", "a"))
+            self.assertEqual(hierarchy.get_method_offset(class_id, "get"), hierarchy.get_method_offset("A", "get"))
+            self.assertEqual(hierarchy.get_method_offset(class_id, "base"), hierarchy.get_method_offset("A", "base"))
+        self.assertEqual(hierarchy.get_field_offset("C", "c"), 2)
+        self.assertEqual(hierarchy.get_num_fields("C"), 3)
+        self.assertEqual(hierarchy.get_num_methods("C"), 3)
+
+    def test_is_subtype(self):
+        self.assertTrue(self.symbol_table.is_subtype("C", "A"))
+        self.assertTrue(self.symbol_table.is_subtype("C", "B"))
+        self.assertTrue(self.symbol_table.is_subtype("C", "C"))
+        self.assertTrue(self.symbol_table.is_subtype("D", "A"))
+        self.assertFalse(self.symbol_table.is_subtype("A", "C"))
+        self.assertFalse(self.symbol_table.is_subtype("D", "B"))
+        self.assertFalse(self.symbol_table.is_subtype("C", "D"))
+        self.assertFalse(self.symbol_table.is_subtype("C", "Unknown"))
+
+    def test_cycle_is_broken(self):
+        hierarchy = self.symbol_table.get_hierarchy()
+        self.assertEqual([hierarchy.get_super_class("X"), hierarchy.get_super_class("Y")].count(None), 1)
+        self.assertNotEqual(self.symbol_table.is_subtype("X", "Y"), self.symbol_table.is_subtype("Y", "X"))
+
+    def test_no_declaration_errors(self):
+        self.assertEqual(sum(self.semantic_errors.values()), 0)
+
+    def test_deep_chain(self):
+        number_of_classes = 300
+        lines = ["class Main { public static void main(String[] a) { System.out.println(1); } }"]
+        for index in reversed(range(number_of_classes)):
+            super_class = f" extends K{index - 1}" if index > 0 else ""
+            lines.append(f"class K{index}{super_class} {{ int f{index}; public int m{index}() {{ return 1; }} }}")
+        program = MJParser().parse(MJLexer().tokenize("\n".join(lines)))
+        symbol_table_creator = FillSymbolTableVisitor()
+        symbol_table_creator.init_semantic_errors()
+        symbol_table_creator.visit_program(program)
+        symbol_table = symbol_table_creator.get_symbol_table()
+        last_class = f"K{number_of_classes - 1}"
+        self.assertEqual(len(symbol_table.get_hierarchy().get_fields(last_class)), number_of_classes)
+        self.assertEqual(symbol_table.get_hierarchy().get_field_offset(last_class, "f0"), 0)
+        self.assertTrue(symbol_table.is_subtype(last_class, "K0"))
+
+    def test_interned_keys(self):
+        for class_id, class_entry in self.symbol_table.class_scopes.items():
+            self.assertIs(class_id, sys.intern(class_id))
+            for field_id in class_entry.get_fields():
+                self.assertIs(field_id, sys.intern(field_id))
+        self.assertIs(self.symbol_table.get_class_entry("".join(["C"])), self.symbol_table.get_class_entry("C"))
+
+    def test_hidden_fields(self):
+        #A field declared again in a subclass hides the inherited one in a slot of its own.
+        source = ("class Main { public static void main(String[] a) { System.out.println(new B().get()); } }\n"
+                  "class A { int a; public int get() { return a; } }\n"
+                  "class B extends A { boolean a; int b; public boolean flag() { return a; } }\n")
+        symbol_table_creator = FillSymbolTableVisitor()
+        symbol_table_creator.init_semantic_errors()
+        symbol_table_creator.visit_program(MJParser().parse(MJLexer().tokenize(source)))
+        symbol_table = symbol_table_creator.get_symbol_table()
+        hierarchy = symbol_table.get_hierarchy()
+        self.assertEqual(hierarchy.get_field_offset("A", "a"), 0)
+        self.assertEqual(hierarchy.get_field_offset("B", "a"), 1)
+        self.assertEqual(hierarchy.get_field_offset("B", "b"), 2)
+        self.assertEqual(hierarchy.get_num_fields("B"), 3)
+        self.assertEqual(type(symbol_table.get_field("A", "a")).__name__, "IntegerType")
+        self.assertEqual(type(symbol_table.get_field("B", "a")).__name__, "BooleanType")
+        self.assertEqual(type(symbol_table.get_class_entry("A").get_field("a")).__name__, "IntegerType")
+
+    def test_lazy_hierarchy(self):
+        #The hierarchy is built on first use and again after any new declaration.
+        symbol_table = SymbolTable()
+        symbol_table.add_scope("A", ClassEntry())
+        symbol_table.add_scope("B", ClassEntry("A"))
+        self.assertTrue(symbol_table.is_subtype("B", "A"))
+        symbol_table.add_scope("C", ClassEntry("B"))
+        self.assertTrue(symbol_table.is_subtype("C", "A"))
+        symbol_table.add_field("c", None)
+        self.assertTrue(symbol_table.contains_field("C", "c"))
+        self.assertFalse(symbol_table.contains_field("B", "c"))
+
+    def test_translated_fields(self):
+        #Fields are read and written at their slot in the object, inherited ones included, and
+        #objects are as large as all their fields.
+        source = ("class Main { public static void main(String[] a) { System.out.println(new B().run()); } }\n"
+                  "class A { int a; int[] v; }\n"
+                  "class B extends A { int b; public int run() { int c; v = new int[2]; v[1] = a; c = v[1]; b = c + 1; return b; } }\n")
+        with CompilationContext():
+            frag: translate.Frag = MJCompiler().compile_to_ir(source, CompileResult("Fields.java"))
+            ir = {}
+            while frag is not None:
+                if isinstance(frag, translate.ProcFrag):
+                    text = io.StringIO()
+                    printer = tree.Print(temp_map=temp.CombineMap(frag.frame, temp.DefaultMap()), out=text)
+                    for stmt in tree.SEQ.statements(frag.body):
+                        printer.print_only_stm(stmt)
+                    ir[frag.frame.name.to_string().split(".")[-1]] = text.getvalue()
+                frag = frag.get_next()
+        offsets = re.findall(r"BINOP\(PLUS,\s*MEM\(\s*TEMP \$fp\),\s*CONST (\d+)\)", ir["B$run"])
+        self.assertEqual(sorted(set(int(offset) for offset in offsets)), [4, 8, 12])
+        self.assertRegex(ir["Main$main"], r"NAME _malloc,\s*CONST 0,\s*BINOP\(MUL,\s*CONST 4,\s*CONST 4\)")
+
+    def test_intern_table_per_compilation(self):
+        with CompilationContext() as context:
+            self.assertIs(Symbol.symbol("C$run"), Symbol.symbol("C$run"))
+            self.assertEqual(len(context.symbols), 1)
+            symbol = Symbol.symbol("C$run")
+        with CompilationContext():
+            self.assertIsNot(Symbol.symbol("C$run"), symbol)
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+import re
+import unittest
+from unittest import mock
+
+from pymjc.context import CompilationContext
+from pymjc.front import ast, temp, translate, tree
+from pymjc.run import CompileResult, MJCompiler
+
+
+SOURCE = ("class Main { public static void main(String[] a) { System.out.println(new C().run(3, 4)); } }\n"
+          "class C { int f; int g;\n"
+          "  public int run(int x, int y) { int z; z = x - y; f = z; return this.get(y, x); }\n"
+          "  public int get(int p, int q) { return p; } }\n")
+
+
+class TranslateTest(unittest.TestCase):
+
+    fused_semantics: bool = False
+
+    def setUp(self):
+        #The printed IR and the frame of every method, by method name.
+        self.ir = {}
+        self.frames = {}
+        with CompilationContext():
+            frag: translate.Frag = MJCompiler(fused_semantics=self.fused_semantics).compile_to_ir(SOURCE, CompileResult("C.java"))
+            while frag is not None:
+                if isinstance(frag, translate.ProcFrag):
+                    text = io.StringIO()
+                    printer = tree.Print(temp_map=temp.CombineMap(frag.frame, temp.DefaultMap()), out=text)
+                    for stmt in tree.SEQ.statements(frag.body):
+                        printer.print_only_stm(stmt)
+                    name: str = frag.frame.name.to_string().split(".")[-1]
+                    self.ir[name] = text.getvalue()
+                    self.frames[name] = frag.frame
+                frag = frag.get_next()
+
+    def test_frames_get_a_formal_per_parameter(self):
+        self.assertEqual(len(self.frames["Main$main"].formals), 1)
+        self.assertEqual(len(self.frames["C$run"].formals), 2)
+        self.assertEqual(len(self.frames["C$get"].formals), 2)
+
+    def test_statements(self):
+        #Statements are translated as statements, one after the other, ahead of the return value.
+        self.assertNotIn("EXP(", self.ir["C$run"])
+        self.assertRegex(self.ir["C$run"], r"ESEQ\(\s*SEQ\(\s*MOVE\(\s*TEMP t\d+,\s*BINOP\(MINUS,")
+
+    def test_assignments(self):
+        x, y = re.search(r"BINOP\(MINUS,\s*TEMP (t\d+),\s*TEMP (t\d+)\)", self.ir["C$run"]).groups()
+        z: str = re.search(r"MOVE\(\s*TEMP (t\d+),\s*BINOP\(MINUS,", self.ir["C$run"]).group(1)
+        self.assertRegex(self.ir["C$run"], r"MOVE\(\s*MEM\(\s*BINOP\(PLUS,\s*MEM\(\s*TEMP \$fp\),\s*CONST 4\)\),\s*TEMP " + z + r"\)")
+        self.assertNotIn(z, (x, y))
+
+    def test_call_arguments_in_order(self):
+        self.assertRegex(self.ir["Main$main"], r"NAME C\$run,\s*CALL\([^()]*BINOP\([^()]*\)\),\s*CONST 3,\s*CONST 4\)")
+        x, y = re.search(r"BINOP\(MINUS,\s*TEMP (t\d+),\s*TEMP (t\d+)\)", self.ir["C$run"]).groups()
+        self.assertRegex(self.ir["C$run"], r"NAME C\$get,\s*MEM\(\s*TEMP \$fp\),\s*TEMP " + y + r",\s*TEMP " + x + r"\)")
+
+    def test_new_object(self):
+        #The object is the value of the malloc call, with a word for each field and one more.
+        self.assertRegex(self.ir["Main$main"],
+                         r"NAME C\$run,\s*CALL\(\s*NAME _malloc,\s*CONST 0,\s*BINOP\(MUL,\s*CONST 3,\s*CONST 4\)\),")
+
+
+class FusedTranslateTest(TranslateTest):
+
+    fused_semantics: bool = True
+
+    def visits(self, fused_semantics: bool) -> dict:
+        #Statements and expressions of BinaryTree.java, in the order each visitor took them.
+        visits = {"accept": [], "accept_type": [], "accept_ir": []}
+
+        def counting(kind, method):
+            def accept(element, visitor):
+                value = method(element, visitor)
+                if isinstance(element, (ast.Statement, ast.Exp)):
+                    visits[kind].append(id(element))
+                return value
+            return accept
+
+        src_file_path: str = os.path.join(os.path.dirname(os.path.realpath(__file__)), "testdata", "correct", "BinaryTree.java")
+        with open(src_file_path) as src_file:
+            source: str = src_file.read()
+        with contextlib.ExitStack() as patches, CompilationContext():
+            for node_class in vars(ast).values():
+                if isinstance(node_class, type) and issubclass(node_class, ast.Component):
+                    for kind in visits:
+                        if kind in vars(node_class):
+                            patches.enter_context(mock.patch.object(node_class, kind, counting(kind, vars(node_class)[kind])))
+            self.assertIsNotNone(MJCompiler(fused_semantics=fused_semantics).compile_to_ir(source, CompileResult("BinaryTree.java")))
+        return visits
+
+    def test_each_body_is_visited_once(self):
+        default: dict = self.visits(False)
+        fused: dict = self.visits(True)
+        #Declarations come from the headers alone, and the translator takes each node right after the
+        #type checker is done with it, never walking into its children.
+        self.assertEqual(fused["accept"], [])
+        self.assertEqual(len(set(fused["accept_type"])), len(fused["accept_type"]))
+        self.assertEqual(fused["accept_ir"], fused["accept_type"])
+        self.assertEqual(len(fused["accept_type"]), len(default["accept_type"]))
+        self.assertEqual(len(fused["accept_ir"]), len(default["accept_ir"]))
+        self.assertEqual(len(default["accept"]), len(default["accept_type"]))
@@ -0,0 +1,67 @@
+import unittest
+
+from pymjc.context import CompilationContext
+from pymjc.front import temp, tree
+
+
+class TreeFactoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.context = CompilationContext()
+        self.context.__enter__()
+        self.fp = temp.Temp()
+        self.ir = tree.TreeFactory()
+
+    def tearDown(self):
+        self.context.__exit__(None, None, None)
+
+    def frame_access(self, ir, offset: int) -> tree.Exp:
+        return ir.MEM(ir.BINOP(tree.BINOP.PLUS, ir.TEMP(self.fp), ir.CONST(offset)))
+
+    def test_equal_pure_trees_are_shared(self):
+        self.assertIs(self.ir.CONST(4), self.ir.CONST(4))
+        self.assertIs(self.ir.TEMP(self.fp), self.ir.TEMP(self.fp))
+        self.assertIs(self.frame_access(self.ir, -8), self.frame_access(self.ir, -8))
+        self.assertIsNot(self.frame_access(self.ir, -8), self.frame_access(self.ir, -4))
+        self.assertIsNot(self.ir.TEMP(self.fp), self.ir.TEMP(temp.Temp()))
+        #CONST 4, the two temps and CONST, BINOP and MEM for each of the two offsets
+        self.assertEqual(self.ir.size(), 1 + 2 + 3 * 2)
+        key = self.ir.get_key(self.ir.BINOP(tree.BINOP.PLUS, self.ir.TEMP(self.fp), self.ir.CONST(-8)))
+        self.assertEqual(key, (tree.BINOP, tree.BINOP.PLUS, self.ir.TEMP(self.fp), self.ir.CONST(-8)))
+
+    def test_side_effects_are_not_shared(self):
+        label = temp.Label("f")
+        call = self.ir.CALL(self.ir.NAME(label), None)
+        self.assertIsNot(call, self.ir.CALL(self.ir.NAME(label), None))
+        self.assertFalse(self.ir.is_shared(call))
+        plus = self.ir.BINOP(tree.BINOP.PLUS, call, self.ir.CONST(1))
+        self.assertIsNot(plus, self.ir.BINOP(tree.BINOP.PLUS, call, self.ir.CONST(1)))
+        self.assertFalse(self.ir.is_shared(self.ir.MEM(plus)))
+        eseq = self.ir.ESEQ(tree.EXP(self.ir.CONST(0)), self.ir.CONST(1))
+        self.assertIsNot(eseq, self.ir.ESEQ(tree.EXP(self.ir.CONST(0)), self.ir.CONST(1)))
+
+    def test_share_plain_tree(self):
+        plain = tree.BINOP(tree.BINOP.MUL, self.frame_access(tree, -4), tree.CONST(4))
+        shared = self.ir.share(plain)
+        self.assertIs(shared, self.ir.BINOP(tree.BINOP.MUL, self.frame_access(self.ir, -4), self.ir.CONST(4)))
+        call = tree.CALL(tree.NAME(temp.Label("g")), tree.ExpList(plain, None))
+        self.assertIs(self.ir.share(call), call)
+
+    def test_equal(self):
+        label = temp.Label("f")
+        left = tree.CALL(tree.NAME(label), tree.ExpList(self.frame_access(tree, -4), tree.ExpList(tree.CONST(1), None)))
+        right = tree.CALL(tree.NAME(label), tree.ExpArray([self.frame_access(self.ir, -4), self.ir.CONST(1)]))
+        self.assertTrue(self.ir.equal(left, right))
+        self.assertTrue(self.ir.equal(self.frame_access(self.ir, -4), self.frame_access(self.ir, -4)))
+        self.assertFalse(self.ir.equal(self.frame_access(self.ir, -4), self.frame_access(self.ir, -8)))
+        self.assertFalse(self.ir.equal(left, tree.CALL(tree.NAME(label), tree.ExpArray([self.ir.CONST(1)]))))
+        self.assertFalse(self.ir.equal(tree.MOVE(tree.TEMP(self.fp), tree.CONST(1)), tree.EXP(tree.CONST(1))))
+
+    def test_without_hash_consing(self):
+        ir = tree.TreeFactory(False)
+        self.assertIsNot(ir.CONST(4), ir.CONST(4))
+        self.assertIsNot(self.frame_access(ir, -8), self.frame_access(ir, -8))
+        self.assertEqual(ir.size(), 0)
+        plain = self.frame_access(tree, -8)
+        self.assertIs(ir.share(plain), plain)
+        self.assertTrue(ir.equal(plain, self.frame_access(ir, -8)))
@@ -0,0 +1,40 @@
+class Main {
+    public static void main(String[] args){
+        System.out.println(new B().run(new B()));
+    }
+}
+
+class A {
+
+    public A same(A other){
+        return other ;
+    }
+}
+
+class B extends A {
+
+    int b;
+
+    public int run(A x){
+        A up;
+        B down;
+        up = new B();
+        up = this.same(x);
+        down = new A();
+        down = this.same(up);
+        b = new C().take(new A());
+        b = new C().take(new B());
+        return b ;
+    }
+
+    public B back(A x){
+        return x ;
+    }
+}
+
+class C {
+
+    public int take(B x){
+        return 1 ;
+    }
+}